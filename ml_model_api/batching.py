@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    # 동시에 들어온 요청을 모아 predict(입력 리스트) 한 번으로 처리하고 결과를 요청별로 돌려준다.
+    #   result = await batcher(x)
+    # 첫 요청이 들어오면 max_wait_ms 동안(또는 max_batch_size 개가 찰 때까지) 더 기다렸다가 묶는다.
+    # predict 는 워커 스레드에서 돌아서 이벤트 루프를 막지 않는다 (numpy/scikit-learn 은 연산 중 GIL 을 놓음).
+    # predict 는 입력과 같은 길이, 같은 순서의 결과를 돌려줘야 한다.
+    def __init__(self, predict, max_batch_size=64, max_wait_ms=2.0, workers=1):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers
+        self.executor = None
+        self.queue = None
+        self.task = None
+        self.loop = None
+        self.slots = None
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    async def __call__(self, item):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.start()
+        future = loop.create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    def start(self):
+        # 처음 호출된 이벤트 루프에서 수집 태스크를 띄운다 (테스트처럼 루프가 바뀌면 새로 띄움)
+        self.loop = asyncio.get_running_loop()
+        if self.executor is not None:
+            # 이전 루프의 풀. 그 루프의 요청은 루프와 함께 끝났으므로 기다리지 않고 닫는다.
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="predict")
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.task = self.loop.create_task(self.collect())
+
+    async def stop(self):
+        # 아직 predict 에 넘기지 않은 요청은 RuntimeError 로 끝낸다 (기다리는 쪽이 영영 걸려 있지 않도록)
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        while not self.queue.empty():
+            self.fail([self.queue.get_nowait()], RuntimeError("배처가 멈췄습니다"))
+        # 이미 predict 를 기다리는 배치가 끝날 때까지
+        for _ in range(self.workers):
+            await self.slots.acquire()
+        self.executor.shutdown()
+        self.executor = self.task = self.loop = None
+
+    async def collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self.queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                # 워커가 모두 바쁘면 여기서 기다리는 동안 다음 배치가 큐에 쌓인다
+                await self.slots.acquire()
+            except asyncio.CancelledError:  # stop(): 모으던 배치도 끝낸다
+                self.fail(batch, RuntimeError("배처가 멈췄습니다"))
+                raise
+            loop.create_task(self.run(batch))
+
+    @staticmethod
+    def fail(batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def run(self, batch):
+        loop = asyncio.get_running_loop()
+        # 이미 끊긴 요청(취소된 future)은 predict 에서 뺀다
+        batch = [(item, future) for item, future in batch if not future.done()]
+        try:
+            if not batch:
+                return
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.predict, [item for item, _ in batch]
+                )
+            except Exception as error:
+                self.fail(batch, error)
+                return
+            finally:
+                with self.lock:
+                    self.counts["batches"] += 1
+                    self.counts["items"] += len(batch)
+                    self.counts["predict_us"] += int(
+                        (time.perf_counter() - started) * 1_000_000
+                    )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+        batches = counts.get("batches", 0)
+        return {
+            **counts,
+            "mean_batch_size": counts["items"] / batches if batches else 0.0,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+        }
+
+    def reset_stats(self):
+        with self.lock:
+            self.counts.clear()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import re
+import time
+from collections import Counter, deque
+
+# 채널 이름: 레스토랑별 / 지역별
+CHANNEL = re.compile(r"^(restaurant|region):\d+$")
+# 허브가 끊을 때의 종료 코드 (4000~4999 는 애플리케이션용)
+CLOSE_SLOW = 4429  # 보낼 큐가 넘쳤다 (HTTP 429 에 맞춤)
+CLOSE_IDLE = 4408  # 하트비트에 답이 없다 (HTTP 408 에 맞춤)
+DROP = "drop"
+DISCONNECT = "disconnect"
+
+
+class Subscriber:
+    # 연결 하나. 보낼 메시지는 길이 제한이 있는 큐에 쌓이고 이 연결의 writer 태스크 하나가 순서대로 보낸다.
+    # 발행하는 쪽은 큐에 넣기만 하므로 느린 연결 하나가 다른 연결이나 발행을 막지 않는다.
+    def __init__(self, hub, send, close):
+        self.hub = hub
+        self.send = send  # async (text)
+        self.close_connection = close  # async (code)
+        self.queue = deque()
+        self.ready = asyncio.Event()
+        self.channels = set()
+        self.dropped = 0
+        self.closed = False
+        self.last_seen = time.monotonic()
+        self.task = asyncio.get_running_loop().create_task(self.write())
+
+    def push(self, text):
+        # 큐가 차 있으면 DROP: 가장 오래된 것을 버린다 (실시간 알림은 최신이 중요), DISCONNECT: 끊는다
+        if self.closed:
+            return False
+        if len(self.queue) >= self.hub.max_queue:
+            if self.hub.overflow == DISCONNECT:
+                self.hub.evict(self, CLOSE_SLOW)
+                return False
+            self.hub.counts["dropped"] += 1
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(text)
+        self.ready.set()
+        return True
+
+    def seen(self):
+        self.last_seen = time.monotonic()
+
+    async def write(self):
+        try:
+            while True:
+                if not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+                await self.send(self.queue.popleft())
+                self.hub.counts["sent"] += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception:  # 연결이 끊겼다 (받는 쪽 루프도 곧 끝난다)
+            self.hub.disconnect(self)
+
+
+class Hub:
+    # 채널 구독/발행. 한 프로세스(이벤트 루프 하나) 안에서만 나눠 준다.
+    #   subscriber = hub.connect(websocket.send_text, websocket.close)
+    #   hub.subscribe(subscriber, "restaurant:12")
+    #   hub.publish("restaurant:12", {"type": "review", ...})
+    # 메시지는 채널마다 한 번만 JSON 으로 바꾸고 같은 문자열을 구독자 큐에 넣는다.
+    # heartbeat_seconds 마다 ping 을 보내고, idle_seconds 동안 아무 메시지(pong 포함)도 보내지 않은 연결은 끊는다.
+    def __init__(
+        self,
+        max_queue=256,
+        overflow=DROP,
+        heartbeat_seconds=20.0,
+        idle_seconds=60.0,
+        max_channels=100,
+    ):
+        if overflow not in (DROP, DISCONNECT):
+            raise ValueError(f"overflow 는 {DROP} 또는 {DISCONNECT}: {overflow}")
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.heartbeat_seconds = heartbeat_seconds
+        self.idle_seconds = idle_seconds
+        self.max_channels = max_channels
+        self.channels = {}  # 채널 → {구독자}
+        self.subscribers = set()
+        self.counts = Counter()
+        self.task = None
+
+    def connect(self, send, close):
+        subscriber = Subscriber(self, send, close)
+        self.subscribers.add(subscriber)
+        self.counts["connected"] += 1
+        return subscriber
+
+    def subscribe(self, subscriber, channel):
+        if not CHANNEL.match(channel):
+            raise ValueError(f"알 수 없는 채널: {channel}")
+        if channel in subscriber.channels:
+            return
+        if len(subscriber.channels) >= self.max_channels:
+            raise ValueError(f"채널은 연결당 {self.max_channels}개까지")
+        subscriber.channels.add(channel)
+        self.channels.setdefault(channel, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber, channel):
+        subscriber.channels.discard(channel)
+        members = self.channels.get(channel)
+        if members is not None:
+            members.discard(subscriber)
+            if not members:
+                del self.channels[channel]
+
+    def disconnect(self, subscriber):
+        # 끊긴 연결을 정리한다 (여러 번 불려도 된다)
+        if subscriber.closed:
+            return
+        subscriber.closed = True
+        for channel in list(subscriber.channels):
+            self.unsubscribe(subscriber, channel)
+        self.subscribers.discard(subscriber)
+        subscriber.queue.clear()
+        if subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def evict(self, subscriber, code):
+        # 허브가 먼저 끊는다. 종료 프레임은 큐를 거치지 않고 보낸다.
+        if subscriber.closed:
+            return
+        self.counts["evicted_slow" if code == CLOSE_SLOW else "evicted_idle"] += 1
+        self.disconnect(subscriber)
+        asyncio.get_running_loop().create_task(self._close(subscriber, code))
+
+    async def _close(self, subscriber, code):
+        try:
+            await subscriber.close_connection(code)
+        except Exception:  # 이미 끊긴 연결
+            pass
+
+    def publish(self, channel, message):
+        # 구독자 큐에 넣기만 하고 돌아온다. 넣은 구독자 수를 돌려준다.
+        members = self.channels.get(channel)
+        self.counts["published"] += 1
+        if not members:
+            return 0
+        text = json.dumps({"channel": channel, **message}, ensure_ascii=False)
+        delivered = 0
+        for subscriber in list(members):  # push 가 끊으면 members 가 바뀐다
+            delivered += subscriber.push(text)
+        return delivered
+
+    async def heartbeat(self):
+        ping = json.dumps({"type": "ping"})
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            deadline = time.monotonic() - self.idle_seconds
+            for subscriber in list(self.subscribers):
+                if subscriber.last_seen < deadline:
+                    self.evict(subscriber, CLOSE_IDLE)
+                else:
+                    subscriber.push(ping)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.heartbeat())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        for subscriber in list(self.subscribers):
+            self.disconnect(subscriber)
+            await self._close(subscriber, 1001)
+
+    def stats(self):
+        return {
+            **self.counts,
+            "connections": len(self.subscribers),
+            "channels": len(self.channels),
+            "queued": sum(len(subscriber.queue) for subscriber in self.subscribers),
+        }
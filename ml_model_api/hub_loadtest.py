@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from hub import DISCONNECT, DROP, Hub
+
+# 실시간 허브의 팬아웃 지연: 한 채널을 구독한 연결 N개에 이벤트 하나가 닿기까지 걸리는 시간.
+# 소켓 대신 같은 프로세스 안의 가짜 연결을 쓴다 (보내기 = 도착 시각 기록, 느린 연결은 slow_ms 만큼 잠듦).
+# 연결마다 차례로 await send 하는 단순한 방식과 허브(연결별 제한 큐 + writer 태스크)를 비교한다.
+#   python hub_loadtest.py --subscribers 10000 --events 50
+#   python hub_loadtest.py --slow 0.01 --slow-ms 200 --overflow disconnect
+
+
+class Connection:
+    def __init__(self, published, latencies, slow_seconds):
+        self.published = published  # 메시지 문자열 → 발행 시각
+        self.latencies = latencies
+        self.slow_seconds = slow_seconds
+        self.closed_with = None
+
+    async def send(self, text):
+        if self.slow_seconds:
+            await asyncio.sleep(self.slow_seconds)
+            return
+        self.latencies.append(time.perf_counter() - self.published[text])
+
+    async def close(self, code):
+        self.closed_with = code
+
+
+def connections(options, published, latencies):
+    rng = random.Random(options.seed)
+    return [
+        Connection(
+            published,
+            latencies,
+            options.slow_ms / 1000 if rng.random() < options.slow else 0,
+        )
+        for _ in range(options.subscribers)
+    ]
+
+
+def message(sequence):
+    return {"type": "rating", "data": {"restaurant": sequence, "rating": 4.5}}
+
+
+async def naive(options):
+    # 발행하는 쪽이 연결마다 JSON 을 만들어 차례로 보낸다 (느린 연결이 뒤의 모두를 붙잡는다)
+    published, latencies, blocked = {}, [], []
+    clients = connections(options, published, latencies)
+    for sequence in range(options.events):
+        text = json.dumps({"channel": "region:1", **message(sequence)})
+        started = time.perf_counter()
+        published[text] = started
+        for client in clients:
+            await client.send(json.dumps({"channel": "region:1", **message(sequence)}))
+        blocked.append(time.perf_counter() - started)
+        await asyncio.sleep(options.interval_ms / 1000)
+    return latencies, blocked, {}
+
+
+async def hub(options):
+    published, latencies, blocked = {}, [], []
+    clients = connections(options, published, latencies)
+    server = Hub(max_queue=options.max_queue, overflow=options.overflow)
+    fast = []
+    for client in clients:
+        subscriber = server.connect(client.send, client.close)
+        server.subscribe(subscriber, "region:1")
+        if not client.slow_seconds:
+            fast.append(subscriber)
+    for sequence in range(options.events):
+        text = json.dumps(
+            {"channel": "region:1", **message(sequence)}, ensure_ascii=False
+        )
+        started = time.perf_counter()
+        published[text] = started
+        server.publish("region:1", message(sequence))
+        blocked.append(time.perf_counter() - started)
+        await asyncio.sleep(options.interval_ms / 1000)
+    # 빠른 연결이 마지막 이벤트까지 받을 때까지
+    while any(subscriber.queue for subscriber in fast):
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0)
+    stats = server.stats()
+    await server.stop()
+    return latencies, blocked, stats
+
+
+def quantiles(values):
+    if len(values) < 2:
+        return [values[0] if values else 0.0] * 99
+    return statistics.quantiles(values, n=100)
+
+
+def report(name, latencies, blocked):
+    latency = quantiles(latencies)
+    block = quantiles(blocked)
+    print(
+        f"{name:<8}{len(latencies):>12,}{latency[49] * 1000:>10.2f}"
+        f"{latency[98] * 1000:>10.2f}{max(latencies, default=0) * 1000:>10.2f}"
+        f"{block[49] * 1000:>14.2f}"
+    )
+
+
+async def main(options):
+    print(
+        f"{options.subscribers:,} subscribers, {options.events} events, "
+        f"{options.slow:.1%} slow ({options.slow_ms:g} ms per send)"
+    )
+    print(
+        f"{'':<8}{'deliveries':>12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        f"{'publish ms':>14}"
+    )
+    for name, run in (("naive", naive), ("hub", hub)):
+        latencies, blocked, stats = await run(options)
+        report(name, latencies, blocked)
+    print(
+        "hub: "
+        + ", ".join(
+            f"{key} {stats.get(key, 0):,}"
+            for key in ("sent", "dropped", "evicted_slow", "connections")
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=20.0, help="발행 간격")
+    parser.add_argument("--slow", type=float, default=0.0, help="느린 연결 비율")
+    parser.add_argument("--slow-ms", type=float, default=100.0)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--overflow", choices=[DROP, DISCONNECT], default=DROP)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from batching import MicroBatcher
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# 묶어서 predict 하는 것과 요청마다 predict 하는 것의 처리량/지연 비교 (HTTP 없이 같은 프로세스 안에서)
+#   python loadtest.py --requests 20000 --concurrency 64
+#   python loadtest.py --model forest --batch-size 128 --wait-ms 5
+
+
+def build_model(name, features, seed):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(5000, features))
+    y = (x[:, 0] + x[:, 1] * x[:, 2] > 0).astype(int)
+    if name == "forest":
+        model = RandomForestClassifier(n_estimators=50, max_depth=8, random_state=seed)
+    else:
+        model = LogisticRegression(max_iter=500)
+    return model.fit(x, y)
+
+
+async def drive(call, inputs, concurrency):
+    # concurrency 명의 사용자가 쉬지 않고 요청을 보낸다. 요청별 지연(초) 목록을 돌려준다.
+    latencies = []
+    position = iter(range(len(inputs)))
+
+    async def user():
+        for index in position:
+            started = time.perf_counter()
+            await call(inputs[index])
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<10}{len(latencies) / elapsed:>10.0f} req/s"
+        f"{quantiles[49] * 1000:>9.2f}{quantiles[94] * 1000:>9.2f}"
+        f"{quantiles[98] * 1000:>9.2f}"
+    )
+
+
+async def main(options):
+    model = build_model(options.model, options.features, options.seed)
+    inputs = np.random.default_rng(options.seed + 1).normal(
+        size=(options.requests, options.features)
+    )
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(options.workers)
+
+    async def unbatched(x):
+        return await loop.run_in_executor(executor, model.predict, x[None, :])
+
+    batcher = MicroBatcher(
+        lambda xs: model.predict(np.stack(xs)),
+        max_batch_size=options.batch_size,
+        max_wait_ms=options.wait_ms,
+        workers=options.workers,
+    )
+
+    print(f"{'':<10}{'throughput':>14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, call in (("unbatched", unbatched), ("batched", batcher)):
+        await drive(call, inputs[: options.concurrency * 2], options.concurrency)
+        started = time.perf_counter()
+        latencies = await drive(call, inputs, options.concurrency)
+        report(name, latencies, time.perf_counter() - started)
+    stats = batcher.stats()
+    print(f"mean batch size {stats['mean_batch_size']:.1f} over {stats['batches']:,}")
+    await batcher.stop()
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=["logistic", "forest"], default="logistic")
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
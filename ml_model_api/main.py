@@ -1,8 +1,28 @@
+import os
+from contextlib import asynccontextmanager
 from datetime import time
 
-from fastapi import Cookie, FastAPI, Response
+import recommend
+from fastapi import Cookie, FastAPI, HTTPException, Query, Response
 
-app = FastAPI()
+# 모델 관련 import(numpy, joblib)와 적재를 워커가 요청을 받기 전에 끝낸다. False 면 첫 요청 때.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "True") == "True"
+
+if MODEL_WARMUP:
+    # gunicorn --preload 면 여기는 fork 전 부모에서 한 번 돈다. 부모가 mmap 한 배열을 워커들이 물려받고,
+    # 아래 lifespan 의 warmup 은 워커마다 조회 경로만 거친다.
+    recommend.preload()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if MODEL_WARMUP:
+        recommend.warmup()
+    yield
+    await recommend.batcher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/")
@@ -77,6 +97,20 @@ def read_restaurants(
     return fake_restaurant_db[skip : skip + limit]  # 0: 1
 
 
+# GET /restaurants/3/similar?k=5 → 3번을 좋아한 사람들이 좋아한 레스토랑 5개
+@app.get("/restaurants/{restaurant_id}/similar")
+async def similar_restaurants(
+    restaurant_id: int, k: int = Query(default=10, ge=1, le=100)
+):
+    similar = await recommend.batcher((restaurant_id, k))
+    if similar is None:
+        raise HTTPException(status_code=404, detail="추천 정보가 없는 레스토랑입니다.")
+    return [
+        {"restaurant_id": neighbor, "score": round(score, 4)}
+        for neighbor, score in similar
+    ]
+
+
 @app.get("/items/")
 async def read_items(ads_id: str | None = Cookie(default=None)):
     return {"ads_id": ads_id}
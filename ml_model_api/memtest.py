@@ -0,0 +1,67 @@
+import argparse
+import multiprocessing
+import tempfile
+
+import joblib
+import numpy as np
+from registry import Registry, memory, publish
+
+# 워커 N 개가 같은 모델을 읽을 때 워커별 메모리 비교: 통째로 읽기 vs mmap (부모에서 미리 읽고 fork)
+#   python memtest.py --mb 400 --workers 4
+
+
+def worker(model, path, queue, barrier):
+    before = memory()
+    if model is None:
+        model = joblib.load(path)  # mmap 없이 워커마다 복사본
+    # 요청을 처리하듯 배열 전체를 한 번 훑는다
+    checksum = sum(float(array.sum()) for array in model.values())
+    barrier.wait()  # 모든 워커가 살아 있을 때 재야 공유 페이지가 나눠서 잡힌다
+    after = memory()
+    barrier.wait()
+    queue.put((before, after, checksum))
+
+
+def run(label, model, path, workers):
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    barrier = context.Barrier(workers)
+    processes = [
+        context.Process(target=worker, args=(model, path, queue, barrier))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    for number, (before, after, _) in enumerate(results):
+        print(
+            f"{label:<8}worker {number}  rss {before['rss']:>7.0f} → {after['rss']:>7.0f}"
+            f"  pss {before['pss']:>7.0f} → {after['pss']:>7.0f}"
+            f"  private {before['private']:>7.0f} → {after['private']:>7.0f} MB"
+        )
+    total = sum(after["pss"] for _, after, _ in results)
+    print(f"{label:<8}workers' pss total {total:,.0f} MB")
+
+
+def main(options):
+    rng = np.random.default_rng(0)
+    size = options.mb * 1024 * 1024 // 8 // 2
+    model = {"weights": rng.random(size), "bias": rng.random(size)}
+    with tempfile.TemporaryDirectory() as root:
+        version = publish(root, "memtest", model)
+        del model
+        path = f"{root}/memtest/{version}/model.joblib"
+
+        run("copy", None, path, options.workers)
+        registry = Registry(root)
+        registry.preload("memtest")  # fork 전에 부모에서
+        run("mmap", registry.get("memtest"), path, options.workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=400, help="모델 배열 크기(MB)")
+    parser.add_argument("--workers", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+from batching import MicroBatcher
+from registry import Registry
+
+# Django 쪽 manage.py build_recommendations 가 만든 이웃 목록 (restaurant/recommend.py 참고)
+RECOMMENDATION_DIR = Path(
+    os.getenv(
+        "RECOMMENDATION_DIR",
+        Path(__file__).resolve().parent.parent / "var" / "recommendations",
+    )
+)
+
+
+class Neighbors:
+    # 이웃 배열은 mmap 으로 열어서 워커끼리 공유하고, 새로 빌드되면 registry 가 알아서 바꿔 끼운다
+    def __init__(self, registry=None, name="item_neighbors"):
+        self.registry = registry or Registry(RECOMMENDATION_DIR)
+        self.name = name
+
+    def load(self):
+        return self.registry.get(self.name)
+
+    def similar(self, restaurant_id, k=10):
+        # [(레스토랑 id, 점수)] 유사도 내림차순. 모르는 id 면 None.
+        return self.similar_many([(restaurant_id, k)])[0]
+
+    def similar_many(self, requests):
+        # [(레스토랑 id, k)] → 요청마다 similar() 결과. id 찾기는 한 번의 searchsorted 로 한다.
+        import numpy as np  # 워커 시작 비용에서 빼려고 첫 요청(또는 warmup) 때 불러온다
+
+        arrays = self.load()
+        if arrays is None or not len(arrays["restaurant_ids"]):
+            return [None] * len(requests)
+        ids = arrays["restaurant_ids"]
+        wanted = np.fromiter((restaurant_id for restaurant_id, _ in requests), np.int64)
+        positions = np.minimum(np.searchsorted(ids, wanted), len(ids) - 1)
+        found = (ids[positions] == wanted).tolist()
+        begins = arrays["indptr"][positions].tolist()
+        ends = arrays["indptr"][positions + 1].tolist()
+        results = []
+        for index, (_, k) in enumerate(requests):
+            if not found[index]:
+                results.append(None)
+                continue
+            begin, end = begins[index], min(ends[index], begins[index] + k)
+            results.append(
+                list(
+                    zip(
+                        arrays["neighbors"][begin:end].tolist(),
+                        arrays["scores"][begin:end].tolist(),
+                    )
+                )
+            )
+        return results
+
+
+def preload():
+    # fork 전에 부모 프로세스에서 이웃 배열을 mmap 해 둔다 (registry.Registry.preload)
+    neighbors.registry.preload(neighbors.name)
+
+
+def warmup():
+    # numpy import, 이웃 배열 mmap, 조회 경로를 한 번씩 거쳐 둔다
+    neighbors.similar_many([(0, 1)])
+
+
+neighbors = Neighbors()
+# 동시에 들어온 /similar 요청을 묶어서 찾는다
+batcher = MicroBatcher(
+    neighbors.similar_many,
+    max_batch_size=int(os.getenv("RECOMMENDATION_BATCH_SIZE", 64)),
+    max_wait_ms=float(os.getenv("RECOMMENDATION_BATCH_WAIT_MS", 1)),
+)
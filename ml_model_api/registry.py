@@ -0,0 +1,139 @@
+import errno
+import itertools
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 모델 저장 구조 (restaurant/recommend.py 도 이 모듈의 publish 로 발행한다)
+#   <root>/<이름>/<버전>/model.joblib   압축하지 않은 joblib. numpy 배열은 mmap 으로 열린다.
+#   <root>/<이름>/CURRENT               지금 서비스할 버전 이름. os.replace 로 통째로 바뀐다.
+# 워커들은 같은 파일을 mmap_mode="r" 로 열기 때문에 배열이 페이지 캐시 한 벌을 공유한다 (워커 수만큼 RAM 을 쓰지 않음).
+MODEL_DIR = Path(
+    os.getenv("MODEL_DIR", Path(__file__).resolve().parent.parent / "var" / "models")
+)
+# CURRENT 가 바뀌었는지 확인하는 최소 간격(초)
+RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_SECONDS", 5))
+
+
+def _move_into_place(staging, base, version):
+    # 버전을 정하지 않았으면 <시각>-<pid>, 이미 있으면(같은 초에 다시 발행) -2, -3 … 을 붙인다.
+    # 비어 있지 않은 디렉터리 위로는 rename 이 실패하므로 다른 프로세스와 같은 이름을 잡아도 덮어쓰지 않는다.
+    if version is not None:
+        os.replace(staging, base / version)
+        return version
+    stamp = time.strftime("%Y%m%d%H%M%S") + f"-{os.getpid()}"
+    for attempt in itertools.count(1):
+        version = stamp if attempt == 1 else f"{stamp}-{attempt}"
+        try:
+            os.replace(staging, base / version)
+            return version
+        except OSError as error:
+            if error.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                raise
+
+
+def publish(root, name, model, version=None, keep=3):
+    # 새 버전을 다 쓴 뒤에 CURRENT 를 바꾼다. 서비스 중인 워커는 다음 확인 때 새 버전으로 넘어간다.
+    # 지난 버전은 keep 개만 남긴다 (지운 파일도 이미 mmap 한 워커는 끝까지 읽을 수 있다).
+    import joblib
+
+    base = Path(root) / name
+    base.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=base, prefix=".staging-"))
+    try:
+        joblib.dump(model, staging / "model.joblib")  # 압축하면 mmap 으로 못 연다
+        version = _move_into_place(staging, base, version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    fd, tmp = tempfile.mkstemp(dir=base, prefix=".current-")
+    with os.fdopen(fd, "w") as output:
+        output.write(version)
+    os.replace(tmp, base / "CURRENT")
+
+    versions = sorted(
+        (path for path in base.iterdir() if path.is_dir() and path.name[0] != "."),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for path in versions[:-keep]:
+        if path.name != version:
+            shutil.rmtree(path, ignore_errors=True)
+    return version
+
+
+class Registry:
+    def __init__(self, root=None):
+        self.root = Path(root or MODEL_DIR)
+        self.lock = threading.Lock()
+        self.loaded = {}  # 이름 → (버전, 모델)
+        self.checked = {}  # 이름 → 마지막으로 CURRENT 를 확인한 시각
+
+    def current_version(self, name):
+        try:
+            return (self.root / name / "CURRENT").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def get(self, name):
+        # 지금 버전의 모델. 아직 발행된 적 없으면 None.
+        now = time.monotonic()
+        loaded = self.loaded.get(name)
+        if loaded and now - self.checked.get(name, 0) < RELOAD_CHECK_SECONDS:
+            return loaded[1]
+        with self.lock:
+            self.checked[name] = now
+            version = self.current_version(name)
+            if version is None:
+                self.loaded.pop(name, None)
+                return None
+            loaded = self.loaded.get(name)
+            if loaded is None or loaded[0] != version:
+                import joblib  # numpy 까지 끌고 오므로 모델을 처음 쓸 때 불러온다
+
+                model = joblib.load(
+                    self.root / name / version / "model.joblib", mmap_mode="r"
+                )
+                # 예전 버전은 들고 있던 요청이 끝나면 GC 되면서 mmap 도 닫힌다
+                self.loaded[name] = loaded = (version, model)
+        return loaded[1]
+
+    def version(self, name):
+        loaded = self.loaded.get(name)
+        return loaded[0] if loaded else None
+
+    def preload(self, *names):
+        # gunicorn --preload 로 부모 프로세스에서 불러두면 fork 된 워커가 매핑을 그대로 물려받는다
+        for name in names or self.names():
+            self.get(name)
+
+    def names(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(path.parent.name for path in self.root.glob("*/CURRENT"))
+
+
+def memory():
+    # 현재 프로세스 메모리(MB). rss 는 공유 페이지도 다 세므로 워커별 실제 몫은 pss/private 로 본다.
+    fields = {
+        "Rss": "rss",
+        "Pss": "pss",
+        "Private_Clean": "private",
+        "Private_Dirty": "private",
+    }
+    usage = {"rss": 0.0, "pss": 0.0, "private": 0.0}
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            for line in rollup:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    usage[fields[key]] += int(rest.split()[0]) / 1024
+    except FileNotFoundError:  # 리눅스가 아님
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+
+registry = Registry()
@@ -1,17 +1,51 @@
-from fastapi import FastAPI, WebSocket
+import json
+import os
+import secrets
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
+from hub import DROP, Hub
+from pydantic import BaseModel
+
+# 실시간 이벤트 허브. Django 가 커밋 후 POST /publish 로 이벤트를 보내면 채널 구독자에게 나눠 준다.
+# 구독 정보가 프로세스 메모리에 있으므로 워커 하나로 띄운다: uvicorn websocketsServer:app --workers 1
+HUB_PUBLISH_TOKEN = os.getenv("HUB_PUBLISH_TOKEN", "")  # 비어 있으면 /publish 를 닫는다
+# 연결당 보낼 큐 길이와 넘쳤을 때 처리 (drop: 오래된 것부터 버림, disconnect: 끊음)
+HUB_MAX_QUEUE = int(os.getenv("HUB_MAX_QUEUE", 256))
+HUB_OVERFLOW = os.getenv("HUB_OVERFLOW", DROP)  # 그 밖의 값이면 Hub 가 ValueError
+# ping 간격과, 클라이언트가 아무것도 보내지 않으면 끊는 시간(초)
+HUB_HEARTBEAT_SECONDS = float(os.getenv("HUB_HEARTBEAT_SECONDS", 20))
+HUB_IDLE_SECONDS = float(os.getenv("HUB_IDLE_SECONDS", 60))
+HUB_MAX_CHANNELS = int(os.getenv("HUB_MAX_CHANNELS", 100))  # 연결당 구독 채널 수
+
+hub = Hub(
+    max_queue=HUB_MAX_QUEUE,
+    overflow=HUB_OVERFLOW,
+    heartbeat_seconds=HUB_HEARTBEAT_SECONDS,
+    idle_seconds=HUB_IDLE_SECONDS,
+    max_channels=HUB_MAX_CHANNELS,
+)
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    hub.start()
+    yield
+    await hub.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 html = """
 <!DOCTYPE html>
 <html>
-  <head><title>Chat</title></head>
+  <head><title>Live</title></head>
   <body>
-    <h1>WebSocket Chat</h1>
-    <form action="" onsubmit="sendMessage(event)">
-        <input type="text" id="messageText" autocomplete="off"/>
-        <button>Send</button>
+    <h1>실시간 이벤트</h1>
+    <form action="" onsubmit="subscribe(event)">
+        <input type="text" id="channel" value="restaurant:1" autocomplete="off"/>
+        <button>구독</button>
     </form>
     <ul id='messages'></ul>
 
@@ -19,6 +53,11 @@ html = """
         var ws = new WebSocket("ws://localhost:8000/ws");
 
         ws.onmessage = function(event) {
+            var data = JSON.parse(event.data);
+            if (data.type === "ping") {
+                ws.send(JSON.stringify({action: "pong"}));
+                return;
+            }
             var messages = document.getElementById('messages');
             var message = document.createElement('li');
             var content = document.createTextNode(event.data);
@@ -26,10 +65,9 @@ html = """
             messages.appendChild(message);
         };
 
-        function sendMessage(event) {
-            var input = document.getElementById("messageText");
-            ws.send(input.value);
-            input.value = '';
+        function subscribe(event) {
+            var input = document.getElementById("channel");
+            ws.send(JSON.stringify({action: "subscribe", channels: [input.value]}));
             event.preventDefault();
         }
     </script>
@@ -43,12 +81,76 @@ async def get():
     return HTMLResponse(html)
 
 
+def handle(subscriber, text):
+    # 클라이언트 메시지:
+    #   {"action": "subscribe" | "unsubscribe", "channels": ["restaurant:12", "region:3"]}
+    #   {"action": "pong"}  (하트비트 응답. 어떤 메시지든 받으면 살아 있는 것으로 본다)
+    try:
+        message = json.loads(text)
+        action = message["action"]
+        channels = message.get("channels", [])
+        if not isinstance(channels, list):
+            raise ValueError("channels 는 목록이어야 합니다")
+    except (ValueError, KeyError, TypeError) as error:
+        return {"type": "error", "detail": f"잘못된 메시지: {error}"}
+    if action == "pong":
+        return None
+    if action == "subscribe":
+        try:
+            for channel in channels:
+                hub.subscribe(subscriber, str(channel))
+        except ValueError as error:
+            return {"type": "error", "detail": str(error)}
+    elif action == "unsubscribe":
+        for channel in channels:
+            hub.unsubscribe(subscriber, str(channel))
+    else:
+        return {"type": "error", "detail": f"알 수 없는 action: {action}"}
+    return {"type": "subscriptions", "channels": sorted(subscriber.channels)}
+
+
 @app.websocket("/ws")  # 클라이언트는 ws://localhost:8000/ws 로 연결
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()  # 클라이언트의 WebSocket 연결 요청을 수락
-    while True:  # 무한루프
-        # 클라이언트로부터 텍스트 메시지를 기다림 (await -> 비동기)
-        data = await websocket.receive_text()
+    await websocket.accept()
+    subscriber = hub.connect(websocket.send_text, websocket.close)
+    try:
+        # 보내기는 subscriber 의 writer 태스크가 하고, 여기서는 받기만 한다
+        while not subscriber.closed:
+            text = await websocket.receive_text()
+            subscriber.seen()
+            reply = handle(subscriber, text)
+            if reply is not None:
+                subscriber.push(json.dumps(reply, ensure_ascii=False))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(subscriber)
+
+
+class Event(BaseModel):
+    channel: str
+    type: str
+    data: dict = {}
+
+
+class Events(BaseModel):
+    events: list[Event]
+
+
+@app.post("/publish")
+async def publish(body: Events, x_hub_token: str = Header(default="")):
+    # Django(restaurant/realtime.py)가 트랜잭션 하나의 이벤트를 모아 보낸다
+    if not HUB_PUBLISH_TOKEN or not secrets.compare_digest(
+        x_hub_token.encode(), HUB_PUBLISH_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="토큰이 맞지 않습니다")
+    delivered = sum(
+        hub.publish(event.channel, {"type": event.type, "data": event.data})
+        for event in body.events
+    )
+    return {"events": len(body.events), "delivered": delivered}
+
 
-        # 받은 메시지를 다시 클라이언트에게 전송 (Echo 방식)
-        await websocket.send_text(f"Message text was: {data}")
+@app.get("/stats")
+async def stats():
+    return hub.stats()
@@ -56,11 +56,14 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "rest_framework",
     "restaurant",
 ]
 
 MIDDLEWARE = [
+    "restaurant.profiler.QueryProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "restaurant.replicas.PinPrimaryMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -110,14 +113,93 @@ DATABASES = {
     }
 }
 
+# 읽기 복제본: DB_REPLICA_HOSTS="host1,host2" → replica1, replica2 (계정/DB 이름은 primary 와 같음)
+for number, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    DATABASES[f"replica{number}"] = {**DATABASES["default"], "HOST": host.strip()}
+
 if os.environ.get("TEST"):
+    # 로컬/테스트용 SQLite 대역. 복제는 되지 않으므로 TEST_REPLICAS=True 일 때만 읽기를 보낸다.
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+        },
+        "replica1": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db_replica1.sqlite3",
+        },
+        "replica2": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db_replica2.sqlite3",
+        },
+    }
+
+# 성능 벤치마크(manage.py bench_suite) 전용 SQLite 파일. 지정하면 다른 DB 설정을 모두 대신한다.
+if os.environ.get("BENCH_DB"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ["BENCH_DB"],
         }
     }
 
+# restaurant 앱 모델의 읽기를 보낼 복제본. 쓰기 후에는 같은 요청과 DATABASE_PIN_SECONDS 동안 primary 를 읽는다.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica")]
+if os.environ.get("TEST") and os.getenv("TEST_REPLICAS") != "True":
+    DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ["restaurant.replicas.ReplicaRouter"]
+# 복제 지연이 이 값(초)을 넘거나 접속이 안 되면 primary 로 읽는다. 상태는 CHECK_INTERVAL 초마다 다시 확인.
+DATABASE_REPLICA_MAX_LAG = int(os.getenv("DATABASE_REPLICA_MAX_LAG", 2))
+DATABASE_REPLICA_CHECK_INTERVAL = int(os.getenv("DATABASE_REPLICA_CHECK_INTERVAL", 5))
+DATABASE_PIN_SECONDS = int(os.getenv("DATABASE_PIN_SECONDS", 5))
+
+# Cache
+# default: 워커 프로세스 메모리, shared: 같은 서버의 워커들이 함께 쓰는 파일 캐시 (외부 서비스 불필요)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "restaurant-local",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("SHARED_CACHE_DIR", BASE_DIR / "var" / "cache"),
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+
+# 메인 페이지 조각(칼럼/추천 레스토랑) 캐시 유지 시간(초). 데이터가 바뀌면 시그널이 먼저 무효화한다.
+INDEX_CACHE_TIMEOUT = int(os.getenv("INDEX_CACHE_TIMEOUT", 600))
+
+# 읽기 전용 JSON API (restaurant.api). 목록은 커서 페이지네이션, 응답마다 ETag.
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+}
+
+# 요청별 SQL 기록 + Server-Timing 헤더. 꺼져 있으면 미들웨어가 아예 빠진다.
+QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "False") == "True"
+# 같은 모양의 쿼리가 이 횟수 이상이면 N+1 로 본다
+QUERY_PROFILER_REPEAT_THRESHOLD = int(os.getenv("QUERY_PROFILER_REPEAT_THRESHOLD", 3))
+# 이 시간(ms) 이상 걸린 요청 중 SAMPLE_RATE 비율만 restaurant.profiler 로거에 리포트를 남긴다
+QUERY_PROFILER_SLOW_MS = int(os.getenv("QUERY_PROFILER_SLOW_MS", 500))
+QUERY_PROFILER_SAMPLE_RATE = float(os.getenv("QUERY_PROFILER_SAMPLE_RATE", 0.1))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "restaurant.profiler": {"handlers": ["console"], "level": "WARNING"},
+        "restaurant.warmup": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# wsgi/asgi 를 불러올 때 URLconf, 템플릿, 인메모리 색인을 미리 적재해서 워커가 준비된 뒤에 요청을 받게 한다
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "False") == "True"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -148,6 +230,9 @@ USE_I18N = True
 
 USE_TZ = True
 
+# 영업시간(start_time/end_time/last_order_time)을 해석하는 기준 시간대
+RESTAURANT_TIME_ZONE = os.getenv("RESTAURANT_TIME_ZONE", "Asia/Seoul")
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -162,30 +247,117 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# 업로드 이미지의 썸네일/WebP 파생본을 만드는 프로세스 풀 크기. ASYNC=False 면 커밋 직후 같은 프로세스에서 생성.
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", 2))
+IMAGE_DERIVATIVES_ASYNC = os.getenv("IMAGE_DERIVATIVES_ASYNC", "True") == "True"
+
+# 레스토랑별 리뷰 피드 첫 페이지 캐시 유지 시간(초). 리뷰가 바뀌면 시그널이 먼저 무효화한다.
+REVIEW_FEED_CACHE_SECONDS = int(os.getenv("REVIEW_FEED_CACHE_SECONDS", 300))
+
+# 리뷰 일괄 수집(/api/reviews/batch/). 토큰이 비어 있으면 엔드포인트가 닫힌다. 크롤러는 Authorization: Bearer <토큰>.
+REVIEW_INGEST_TOKEN = os.getenv("REVIEW_INGEST_TOKEN", "")
+# 트랜잭션 하나에 넣는 리뷰 수
+REVIEW_INGEST_BATCH_SIZE = int(os.getenv("REVIEW_INGEST_BATCH_SIZE", 500))
+# 수집된 리뷰 이미지 URL 을 내려받는 스레드 수와 제한. ASYNC=False 면 커밋 직후 같은 스레드에서 받는다.
+REVIEW_IMAGE_FETCH_WORKERS = int(os.getenv("REVIEW_IMAGE_FETCH_WORKERS", 4))
+REVIEW_IMAGE_FETCH_ASYNC = os.getenv("REVIEW_IMAGE_FETCH_ASYNC", "True") == "True"
+REVIEW_IMAGE_FETCH_TIMEOUT = float(os.getenv("REVIEW_IMAGE_FETCH_TIMEOUT", 10))
+REVIEW_IMAGE_MAX_BYTES = int(os.getenv("REVIEW_IMAGE_MAX_MB", 10)) * 2**20
+# 내려받을 이미지 호스트(쉼표로 구분, 하위 도메인 포함). 비어 있으면 공인 주소인 호스트는 모두 허용. 내부 주소와 리다이렉트는 항상 거절.
+REVIEW_IMAGE_HOSTS = [
+    host.strip().lower()
+    for host in os.getenv("REVIEW_IMAGE_HOSTS", "").split(",")
+    if host.strip()
+]
+
+# 근처 레스토랑 검색용 인메모리 지리 인덱스를 DB에서 다시 읽어오는 주기(초)
+GEO_INDEX_MAX_AGE = int(os.getenv("GEO_INDEX_MAX_AGE", 300))
+
+# 예산 검색(/api/restaurants/budget/)의 인메모리 메뉴 이름 사전을 DB에서 다시 읽어오는 주기(초)
+MENU_NAMES_MAX_AGE = int(os.getenv("MENU_NAMES_MAX_AGE", 300))
+
+# 패싯 필터(/api/restaurants/facets/, 관리자 태그 필터)의 인메모리 비트셋을 DB에서 다시 읽어오는 주기(초)
+FACET_INDEX_MAX_AGE = int(os.getenv("FACET_INDEX_MAX_AGE", 300))
+
+# 지역/카테고리/전체 순위표(/api/leaderboards/). 점수는 (C·평균 + 별점 합) / (C + 평가 수) 의 베이지안 평균, C = PRIOR_WEIGHT.
+# 프로세스마다 메모리에 두고 SNAPSHOT 파일로 빨리 다시 띄운다. MAX_AGE(초)마다 DB 에서 다시 만들고(평균도 다시 계산),
+# SYNC_SECONDS 마다 다른 워커가 바꾼 레스토랑을 updated_at 으로 따라잡는다.
+LEADERBOARD_PRIOR_WEIGHT = float(os.getenv("LEADERBOARD_PRIOR_WEIGHT", 10))
+LEADERBOARD_MAX_AGE = int(os.getenv("LEADERBOARD_MAX_AGE", 3600))
+LEADERBOARD_SYNC_SECONDS = int(os.getenv("LEADERBOARD_SYNC_SECONDS", 5))
+LEADERBOARD_SNAPSHOT = Path(
+    os.getenv("LEADERBOARD_SNAPSHOT", BASE_DIR / "var" / "leaderboards.pickle")
+)
+
+# 주소 → 지역 해석용 인메모리 트라이를 다시 읽어오는 주기(초). 같은 프로세스의 Region 변경은 즉시 반영됨.
+REGION_RESOLVER_MAX_AGE = int(os.getenv("REGION_RESOLVER_MAX_AGE", 3600))
+
+# "이 식당을 좋아한 사람들이 좋아한 식당" 이웃 목록(manage.py build_recommendations 결과). ml_model_api 가 읽는다.
+RECOMMENDATION_DIR = Path(
+    os.getenv("RECOMMENDATION_DIR", BASE_DIR / "var" / "recommendations")
+)
+
+# 실시간 허브(ml_model_api/websocketsServer.py): 새 리뷰/평점/폐업 여부 변경을 커밋 후 POST /publish 로 보낸다.
+# URL 이 비어 있으면 보내지 않는다. TOKEN 은 허브의 HUB_PUBLISH_TOKEN 과 같아야 한다. ASYNC=False 면 커밋 직후 같은 스레드에서 보낸다.
+REALTIME_HUB_URL = os.getenv("REALTIME_HUB_URL", "")
+REALTIME_HUB_TOKEN = os.getenv("REALTIME_HUB_TOKEN", "")
+REALTIME_PUBLISH_TIMEOUT = float(os.getenv("REALTIME_PUBLISH_TIMEOUT", 2))
+REALTIME_PUBLISH_ASYNC = os.getenv("REALTIME_PUBLISH_ASYNC", "True") == "True"
+
+# 레스토랑/칼럼 검색 색인(스냅샷 + 변경 저널)을 저장할 디렉터리
+SEARCH_INDEX_DIR = Path(os.getenv("SEARCH_INDEX_DIR", BASE_DIR / "var" / "search"))
+
+# 이미지 필드(게시글/가게/메뉴/리뷰 이미지)는 "blobs" 에 저장: 같은 내용은 한 번만, 이름은 sha256 (restaurant/storage.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "blobs": {"BACKEND": "restaurant.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# blobs/ 아래 객체는 내용이 바뀌지 않으므로 브라우저/CDN 이 1년 동안 다시 묻지 않게 한다
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 # Use Amazon
 if os.environ.get("S3_BUCKET"):
+    S3_MEDIA = {
+        "bucket_name": os.environ.get("S3_BUCKET"),
+        "region_name": os.environ.get("S3_REGION", "ap-northeast-2"),
+        "custom_domain": os.environ.get("S3_CUSTOM_DOMAIN"),
+        "location": "media",
+        "default_acl": "public-read",
+        "querystring_auth": False,
+    }
+    # S3 를 감싸서 큰 파일은 멀티파트로 동시에 올리고, 읽은 객체는 로컬 디스크에 캐시한다 (restaurant/storage.py)
+    CACHED_S3_MEDIA = {
+        "backend": "storages.backends.s3.S3Storage",
+        "options": S3_MEDIA,
+        "cache_dir": Path(
+            os.getenv("MEDIA_CACHE_DIR", BASE_DIR / "var" / "media-cache")
+        ),
+        "cache_max_bytes": int(os.getenv("MEDIA_CACHE_MAX_MB", 1024)) * 2**20,
+        "chunk_size": int(os.getenv("MEDIA_UPLOAD_CHUNK_MB", 8)) * 2**20,
+        "max_concurrency": int(os.getenv("MEDIA_UPLOAD_CONCURRENCY", 4)),
+    }
     STORAGES = {
         "default": {
-            "BACKEND": "storages.backends.s3.S3Storage",
+            "BACKEND": "restaurant.storage.CachedStorage",
+            "OPTIONS": CACHED_S3_MEDIA,
+        },
+        "blobs": {
+            "BACKEND": "restaurant.storage.ContentAddressedStorage",
             "OPTIONS": {
-                "bucket_name": os.environ.get("S3_BUCKET"),
-                "region_name": os.environ.get("S3_REGION", "ap-northeast-2"),
-                "custom_domain": os.environ.get("S3_CUSTOM_DOMAIN"),
-                "location": "media",
-                "default_acl": "public-read",
-                "querystring_auth": False,
+                "backend": "restaurant.storage.CachedStorage",
+                "options": {
+                    **CACHED_S3_MEDIA,
+                    "options": {
+                        **S3_MEDIA,
+                        "object_parameters": {"CacheControl": IMMUTABLE_CACHE_CONTROL},
+                    },
+                },
             },
         },
         "staticfiles": {
             "BACKEND": "storages.backends.s3.S3Storage",
-            "OPTIONS": {
-                "bucket_name": os.environ.get("S3_BUCKET"),
-                "region_name": os.environ.get("S3_REGION", "ap-northeast-2"),
-                "custom_domain": os.environ.get("S3_CUSTOM_DOMAIN"),
-                "location": "static",
-                "default_acl": "public-read",
-                "querystring_auth": False,
-            },
+            "OPTIONS": {**S3_MEDIA, "location": "static"},
         },
     }
 
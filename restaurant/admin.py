@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import facets
 from .models import (
     Article,
     CuisineType,
@@ -58,6 +59,26 @@ class RestaurantImageInline(admin.TabularInline):
     extra = 1
 
 
+class TagFacetFilter(admin.SimpleListFilter):
+    # 태그마다 레스토랑 수(폐업 포함)를 함께 보여준다. 수는 인메모리 패싯 비트셋에서 (restaurant/facets.py)
+    title = "태그"
+    parameter_name = "tags__id__exact"  # 예전 list_filter = ["tags"] 와 같은 URL
+
+    def lookups(self, request, model_admin):
+        _, counts = facets.query(include_closed=True, facets=(facets.TAG,))
+        counts = counts[facets.TAG]
+        tags = sorted(
+            Tag.objects.values_list("pk", "name"),
+            key=lambda tag: (-counts.get(tag[0], 0), tag[1]),
+        )
+        return [(pk, f"{name} ({counts.get(pk, 0):,})") for pk, name in tags]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(tags__id=self.value())
+        return queryset
+
+
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
     list_display = [
@@ -70,6 +91,9 @@ class RestaurantAdmin(admin.ModelAdmin):
         "rating_count",
         "region",
     ]
+    list_select_related = [
+        "region"
+    ]  # nullable FK 라 기본 select_related() 가 따라가지 않음
     fields = [
         "name",
         "branch_name",
@@ -82,7 +106,7 @@ class RestaurantAdmin(admin.ModelAdmin):
     ]
     readonly_fields = ["rating", "rating_count", "region"]
     search_fields = ["name", "branch_name"]
-    list_filter = ["tags"]
+    list_filter = [TagFacetFilter]
     autocomplete_fields = ["tags"]
     inlines = [RestaurantMenuInline, RestaurantImageInline]  # 수정할때만 보여지는 폼
 
@@ -115,6 +139,8 @@ class ReviewImageInline(admin.TabularInline):
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ["id", "restaurant_name", "author", "rating", "content_partial"]
+    list_select_related = ["restaurant"]  # restaurant_name 이 행마다 쿼리하지 않도록
+    ordering = ["-created_at", "-id"]  # 모델에 기본 정렬이 없으므로 최신 순을 여기서
     inlines = [ReviewImageInline]
 
     # 인스턴스를 생성할때 인라인 표시 안하도록
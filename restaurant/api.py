@@ -0,0 +1,499 @@
+import hashlib
+import hmac
+import time
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.parsers import BaseParser
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from . import facets, feed, importer, ingest, leaderboards, menus
+from .models import (
+    CuisineType,
+    Region,
+    Restaurant,
+    RestaurantCard,
+    RestaurantCategory,
+    RestaurantImage,
+    RestaurantMenu,
+    RestaurantMenuSummary,
+    Review,
+    ReviewImage,
+    Tag,
+)
+from .serializers import (
+    RestaurantMenuSerializer,
+    RestaurantSerializer,
+    ReviewSerializer,
+)
+from .views import CARD_VALUES
+
+
+class NewestFirstPagination(CursorPagination):
+    # pk 키셋 페이지네이션: 커서에는 마지막 id 만 들어가므로 깊은 페이지도 첫 페이지와 비용이 같다
+    ordering = "-id"
+    page_size = 20
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class OldestFirstPagination(NewestFirstPagination):
+    ordering = "id"
+
+
+class ReviewFeedPagination(BasePagination):
+    # (created_at, id) 키셋 페이지네이션 (restaurant/feed.py). 다음 페이지 방향만 있다.
+    page_size = NewestFirstPagination.page_size
+    max_page_size = NewestFirstPagination.max_page_size
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(limit, 1), self.max_page_size)
+
+    def is_first_page(self, request):
+        return not request.query_params.get("cursor") and (
+            self.get_limit(request) == self.page_size
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            rows, self.next_cursor = feed.page(
+                queryset,
+                request.query_params.get("cursor"),
+                self.get_limit(request),
+            )
+        except feed.InvalidCursor:
+            raise NotFound("잘못된 커서입니다.")
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), "cursor", self.next_cursor
+        )
+
+    def get_previous_link(self):
+        return None
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": None,
+                "results": data,
+            }
+        )
+
+
+def make_etag(*parts):
+    # 강한 ETag. 본문을 직렬화하지 않고 (id, updated_at) 만으로 만든다.
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def versions(objects):
+    return [(obj.pk, obj.updated_at.isoformat()) for obj in objects]
+
+
+class VersionedMixin:
+    # get_queryset(): 필터만 건 기본 쿼리셋, with_related(): 직렬화에 필요한 select/prefetch.
+    # 먼저 (id, updated_at) 만 읽어 If-None-Match 와 비교하고, 다를 때만 본문을 읽는다.
+    def with_related(self, queryset):
+        return queryset
+
+    def not_modified(self, etag):
+        return get_conditional_response(self.request, etag=etag)
+
+
+class VersionedListAPIView(VersionedMixin, ListAPIView):
+    # 첫 번째 쿼리에서 읽는 컬럼. 페이지네이션이 정렬/커서에 쓰는 컬럼도 여기 있어야 행마다 다시 읽지 않는다.
+    page_fields = ("id", "updated_at")
+
+    def page_etag(self, objects):
+        paginator = self.paginator
+        return make_etag(
+            paginator.get_next_link(), paginator.get_previous_link(), *versions(objects)
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset.only(*self.page_fields))
+        response = self.not_modified(self.page_etag(page))
+        if response is not None:
+            return response
+
+        ids = [obj.pk for obj in page]
+        loaded = self.with_related(queryset.model.objects.all()).in_bulk(ids)
+        objects = [loaded[pk] for pk in ids if pk in loaded]
+        response = self.get_paginated_response(
+            self.get_serializer(objects, many=True).data
+        )
+        response["ETag"] = self.page_etag(objects)
+        return response
+
+
+class VersionedRetrieveAPIView(VersionedMixin, RetrieveAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs["pk"]
+        updated_at = (
+            self.get_queryset()
+            .filter(pk=pk)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            raise Http404
+        response = self.not_modified(make_etag(pk, updated_at.isoformat()))
+        if response is not None:
+            return response
+
+        instance = self.with_related(self.get_queryset()).filter(pk=pk).first()
+        if instance is None:
+            raise Http404
+        response = Response(self.get_serializer(instance).data)
+        response["ETag"] = make_etag(instance.pk, instance.updated_at.isoformat())
+        return response
+
+
+class RestaurantMixin:
+    serializer_class = RestaurantSerializer
+
+    def get_queryset(self):
+        return Restaurant.objects.all()
+
+    def with_related(self, queryset):
+        return queryset.select_related(
+            "category__cuisine_type", "region"
+        ).prefetch_related(
+            "tags",
+            Prefetch(
+                "restaurantimage_set",
+                queryset=RestaurantImage.objects.order_by(
+                    "-is_representative", "order", "pk"
+                ),
+            ),
+        )
+
+
+class RestaurantList(RestaurantMixin, VersionedListAPIView):
+    # GET /api/restaurants/?category=1&region=2&limit=20&cursor=...
+    pagination_class = NewestFirstPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(is_closed=False)
+        for param in ("category", "region"):
+            value = self.request.query_params.get(param)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f"{param}_id": int(value)})
+        return queryset
+
+
+class RestaurantDetail(RestaurantMixin, VersionedRetrieveAPIView):
+    # GET /api/restaurants/<pk>/
+    pass
+
+
+class RestaurantMenuList(VersionedListAPIView):
+    # GET /api/restaurants/<pk>/menus/ (등록 순)
+    serializer_class = RestaurantMenuSerializer
+    pagination_class = OldestFirstPagination
+
+    def get_queryset(self):
+        return RestaurantMenu.objects.filter(restaurant_id=self.kwargs["pk"])
+
+
+REQUIRED = object()
+
+
+class QueryParamsMixin:
+    def param(self, name, cast, default=REQUIRED):
+        value = self.request.query_params.get(name, "").strip()
+        if not value:
+            if default is REQUIRED:
+                raise ValidationError({name: "필수 항목입니다."})
+            return default
+        try:
+            return cast(value)
+        except ValueError:
+            raise ValidationError({name: "숫자여야 합니다."})
+
+
+class BudgetSearch(QueryParamsMixin, APIView):
+    # GET /api/restaurants/budget/?max_price=8000&min_price=0&q=김밥&lat=37.56&lon=126.97&radius=1&limit=20
+    # 가격 범위 안에 (이름에 q 가 들어간) 메뉴가 있는 레스토랑을 가장 싼 일치 메뉴 순으로. lat/lon 을 주면 반경(km) 안에서만.
+    max_radius_km = 20.0
+    max_limit = 100
+
+    def get(self, request):
+        max_price = self.param("max_price", int)
+        min_price = self.param("min_price", int, 0)
+        if not 0 <= min_price <= max_price:
+            raise ValidationError(
+                {"min_price": "0 <= min_price <= max_price 여야 합니다."}
+            )
+        latitude = self.param("lat", float, None)
+        longitude = self.param("lon", float, None)
+        if (latitude is None) != (longitude is None):
+            raise ValidationError({"lat": "lat 와 lon 은 함께 지정해야 합니다."})
+        radius = min(max(self.param("radius", float, 1.0), 0.0), self.max_radius_km)
+        limit = min(max(self.param("limit", int, 20), 1), self.max_limit)
+
+        matches = menus.budget_search(
+            max_price,
+            min_price=min_price,
+            query=request.query_params.get("q", ""),
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius,
+            limit=limit,
+        )
+        ids = [match[0] for match in matches]
+        cards = RestaurantCard.objects.in_bulk(ids)
+        summaries = RestaurantMenuSummary.objects.in_bulk(ids)
+        results = []
+        for restaurant_id, menu_id, name, price, distance in matches:
+            card = cards.get(restaurant_id)
+            summary = summaries.get(restaurant_id)
+            if card is None or summary is None:  # 카드가 아직 만들어지기 전
+                continue
+            results.append(
+                {
+                    "id": restaurant_id,
+                    "name": card.name,
+                    "branch_name": card.branch_name,
+                    "address": card.address,
+                    "thumbnail_url": card.thumbnail_url,
+                    "rating": str(card.rating),
+                    "distance_km": None if distance is None else round(distance, 3),
+                    "menu": {"id": menu_id, "name": name, "price": price},
+                    "menu_summary": {
+                        "item_count": summary.item_count,
+                        "min_price": summary.min_price,
+                        "median_price": summary.median_price,
+                        "max_price": summary.max_price,
+                    },
+                }
+            )
+        return Response({"results": results})
+
+
+class FacetSearch(QueryParamsMixin, APIView):
+    # GET /api/restaurants/facets/?tag=1,2&tag=3&category=4&cuisine=1&region=5&limit=20&cursor=123
+    # 쉼표로 나눈 id 는 OR, 같은 이름을 여러 번 주면 AND: 위 예는 (태그 1 또는 2) 그리고 태그 3 그리고 카테고리 4 ...
+    # 영업 중인 결과 전체의 수, 패싯 값별 수("분식 (123)"), 레스토랑 카드(최신 순, 커서는 마지막 id)를 함께 돌려준다.
+    max_limit = 100
+    max_facet_values = 50  # 패싯마다 수가 많은 순으로
+    models = {
+        facets.TAG: Tag,
+        facets.CATEGORY: RestaurantCategory,
+        facets.CUISINE: CuisineType,
+        facets.REGION: Region,
+    }
+
+    def filters(self):
+        filters = []
+        for facet in facets.FACETS:
+            for value in self.request.query_params.getlist(facet):
+                try:
+                    ids = [int(pk) for pk in value.split(",") if pk.strip()]
+                except ValueError:
+                    raise ValidationError({facet: "쉼표로 구분한 id 여야 합니다."})
+                if ids:
+                    filters.append({facet: ids})
+        return filters
+
+    def facet_values(self, facet, counts):
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        objects = self.models[facet].objects.in_bulk(
+            [pk for pk, _ in top[: self.max_facet_values]]
+        )
+        return [
+            {"id": pk, "name": str(objects[pk]), "count": count}
+            for pk, count in top[: self.max_facet_values]
+            if pk in objects
+        ]
+
+    def get(self, request):
+        filters = self.filters()
+        limit = min(max(self.param("limit", int, 20), 1), self.max_limit)
+        cursor = self.param("cursor", int, None)
+
+        ids, counts = facets.query(filters)
+        page = ids if cursor is None else ids[ids < cursor]
+        page = page[::-1][: limit + 1].tolist()
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = page[-1]
+
+        cards = {
+            row["restaurant_id"]: row
+            for row in RestaurantCard.objects.filter(pk__in=page).values(*CARD_VALUES)
+        }
+        results = []
+        for pk in page:
+            row = cards.get(pk)
+            if row is None:  # 카드가 아직 만들어지기 전
+                continue
+            row["id"] = row.pop("restaurant_id")
+            row["rating"] = str(row["rating"])
+            results.append(row)
+        return Response(
+            {
+                "count": len(ids),
+                "facets": {
+                    facet: self.facet_values(facet, values)
+                    for facet, values in counts.items()
+                },
+                "next_cursor": next_cursor,
+                "results": results,
+            }
+        )
+
+
+class Leaderboard(QueryParamsMixin, APIView):
+    # GET /api/leaderboards/?region=3&limit=20&offset=0 (또는 ?category=2, 둘 다 없으면 전체)
+    # 베이지안 평균 순 (restaurant/leaderboards.py). 순위는 메모리에서 바로 나오고 카드만 DB에서 읽는다.
+    max_limit = 100
+
+    def get(self, request):
+        region = self.param("region", int, None)
+        category = self.param("category", int, None)
+        if region is not None and category is not None:
+            raise ValidationError(
+                {"region": "region 과 category 중 하나만 지정하세요."}
+            )
+        if region is not None:
+            scope = (leaderboards.REGION, region)
+        elif category is not None:
+            scope = (leaderboards.CATEGORY, category)
+        else:
+            scope = leaderboards.ALL
+        limit = min(max(self.param("limit", int, 20), 1), self.max_limit)
+        offset = max(self.param("offset", int, 0), 0)
+
+        ranked = leaderboards.top(scope, limit, offset)
+        cards = {
+            row["restaurant_id"]: row
+            for row in RestaurantCard.objects.filter(
+                pk__in=[pk for pk, _, _ in ranked]
+            ).values(*CARD_VALUES)
+        }
+        results = []
+        for rank, (pk, score, _) in enumerate(ranked, offset + 1):
+            row = cards.get(pk)
+            if row is None:  # 카드가 아직 만들어지기 전이거나 삭제됨
+                continue
+            row["id"] = row.pop("restaurant_id")
+            row["rating"] = str(row["rating"])
+            results.append({"rank": rank, "score": round(score, 3), **row})
+        return Response({"results": results})
+
+
+class ReviewList(VersionedListAPIView):
+    # GET /api/restaurants/<pk>/reviews/?limit=20&cursor=... (최신 순)
+    # 기본 limit 의 첫 페이지는 공유 캐시에 두고, 리뷰가 바뀌면 시그널이 지운다.
+    serializer_class = ReviewSerializer
+    pagination_class = ReviewFeedPagination
+    page_fields = ("id", "updated_at", "created_at")
+
+    def get_queryset(self):
+        return Review.objects.filter(restaurant_id=self.kwargs["pk"])
+
+    def list(self, request, *args, **kwargs):
+        if not self.paginator.is_first_page(request):
+            return super().list(request, *args, **kwargs)
+        key = feed.first_page_key(self.kwargs["pk"])
+        cached = feed.get_first_page(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                feed.set_first_page(
+                    key,
+                    (
+                        response["ETag"],
+                        list(response.data["results"]),
+                        self.paginator.next_cursor,
+                    ),
+                )
+            return response
+
+        etag, results, self.paginator.next_cursor = cached
+        self.paginator.request = request
+        response = self.not_modified(etag) or self.paginator.get_paginated_response(
+            results
+        )
+        response["ETag"] = etag
+        return response
+
+    def with_related(self, queryset):
+        return queryset.select_related("social_channel").prefetch_related(
+            # 일괄 수집된 뒤 아직 내려받지 않은 이미지(image="")는 빼고
+            Prefetch(
+                "reviewimage_set",
+                queryset=ReviewImage.objects.exclude(image="").order_by("pk"),
+            )
+        )
+
+
+class NDJSONParser(BaseParser):
+    # 본문을 한 번에 읽지 않고 (줄 번호, dict 또는 RowError) 를 한 줄씩 넘긴다
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return importer.read_rows(stream, "jsonl")
+
+
+class HasIngestToken(BasePermission):
+    def has_permission(self, request, view):
+        token = settings.REVIEW_INGEST_TOKEN
+        header = request.headers.get("Authorization", "")
+        return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
+
+
+class ReviewBatch(APIView):
+    # POST /api/reviews/batch/ (Content-Type: application/x-ndjson, 한 줄에 리뷰 하나. 형식은 restaurant/ingest.py)
+    # 잘못된 줄은 건너뛰고 나머지는 넣는다. 응답의 errors 에 줄 번호와 이유.
+    parser_classes = [NDJSONParser]
+    permission_classes = [HasIngestToken]
+
+    def post(self, request):
+        rows = request.data
+        if isinstance(rows, dict):  # 본문이 비어 있음
+            raise ParseError("NDJSON 본문이 필요합니다.")
+        ingester = ingest.ReviewIngester(batch_size=settings.REVIEW_INGEST_BATCH_SIZE)
+        started = time.perf_counter()
+        received = 0
+        for received in ingester.run(rows):
+            pass
+        elapsed = time.perf_counter() - started
+        stats = ingester.stats
+        return Response(
+            {
+                "received": received,
+                "created": stats["created"],
+                "duplicates": stats["duplicates"],
+                "skipped": stats["skipped"],
+                "images": stats["images"],
+                "errors": [
+                    {"line": line_no, "error": error}
+                    for line_no, error in ingester.errors
+                ],
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "reviews_per_sec": round(stats["created"] / elapsed if elapsed else 0),
+            }
+        )
@@ -0,0 +1,369 @@
+import math
+import random
+import time
+from decimal import Decimal
+
+from . import geo
+from .bulk import chunked
+
+SEOUL_CITY_HALL = (37.566535, 126.977969)
+
+BRANDS = [
+    "김밥천국",
+    "한솥도시락",
+    "돈까스하우스",
+    "국수나무",
+    "본죽",
+    "맘스터치",
+    "홍콩반점",
+    "새마을식당",
+]
+BRANCHES = [
+    "강남점",
+    "역삼점",
+    "선릉점",
+    "홍대점",
+    "신촌점",
+    "종로점",
+    "잠실점",
+    "판교점",
+]
+FEATURES = [
+    "저렴한 가격",
+    "빠른 제공",
+    "포장 전문",
+    "혼밥 가능",
+    "단체석",
+    "주차 가능",
+    "심야 영업",
+]
+MENUS = [
+    "김밥",
+    "라면",
+    "돈까스",
+    "제육볶음",
+    "비빔밥",
+    "짜장면",
+    "칼국수",
+    "떡볶이",
+    "순대국",
+]
+DISTRICTS = [
+    "강남구 테헤란로",
+    "마포구 양화로",
+    "종로구 종로",
+    "송파구 올림픽로",
+    "서초구 강남대로",
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def summarize(samples_ms):
+    values = sorted(samples_ms)
+    return {
+        "runs": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+    }
+
+
+def measure(func, args_list):
+    # args_list 의 각 인자 튜플로 func 를 한 번씩 실행하고 밀리초 단위 통계를 돌려준다
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def random_point(rng, center=SEOUL_CITY_HALL, spread_km=20.0):
+    # 중심에서 spread_km 이내 정사각형 안의 임의 좌표
+    lat, lon = center
+    dlat = spread_km / geo.KM_PER_DEGREE
+    dlon = spread_km / (geo.KM_PER_DEGREE * math.cos(math.radians(lat)))
+    return lat + rng.uniform(-dlat, dlat), lon + rng.uniform(-dlon, dlon)
+
+
+def synthetic_restaurants(count, seed=0, spread_km=20.0):
+    # 벤치마크용 가짜 레스토랑 (bulk_create 는 save() 를 거치지 않으므로 geohash 를 직접 채움)
+    from .models import Restaurant
+
+    rng = random.Random(seed)
+    for number in range(count):
+        latitude, longitude = random_point(rng, spread_km=spread_km)
+        yield Restaurant(
+            name=f"{rng.choice(BRANDS)} {number}",
+            branch_name=rng.choice(BRANCHES),
+            description=f"{rng.choice(MENUS)} 전문점",
+            address=f"서울 {rng.choice(DISTRICTS)} {rng.randint(1, 500)}",
+            feature=", ".join(rng.sample(FEATURES, 2)),
+            is_closed=rng.random() < 0.05,
+            latitude=round(latitude, 12),
+            longitude=round(longitude, 12),
+            geohash=geo.encode_geohash(latitude, longitude),
+        )
+
+
+SEOUL_GU = [
+    "강남구",
+    "강동구",
+    "강북구",
+    "강서구",
+    "관악구",
+    "광진구",
+    "구로구",
+    "금천구",
+    "노원구",
+    "도봉구",
+    "동대문구",
+    "동작구",
+    "마포구",
+    "서대문구",
+    "서초구",
+    "성동구",
+    "성북구",
+    "송파구",
+    "양천구",
+    "영등포구",
+    "용산구",
+    "은평구",
+    "종로구",
+    "중구",
+    "중랑구",
+]
+CUISINES = {
+    "한식": ["분식", "백반", "국밥", "고기"],
+    "중식": ["중화요리", "마라"],
+    "일식": ["돈까스", "초밥", "라멘"],
+    "양식": ["버거", "파스타"],
+}
+STAR_WEIGHTS = [5, 10, 20, 35, 30]  # 1~5점 비율
+
+
+def seed_dataset(
+    restaurants,
+    reviews_per_restaurant=50,
+    menus_per_restaurant=3,
+    tags=50,
+    dongs_per_gu=20,
+    seed=0,
+    chunk_size=5_000,
+    progress=None,
+):
+    # 벤치마크용 데이터를 시드 하나로 항상 같게 만든다. 리뷰 집계값은 만들면서 계산해 넣는다.
+    # 시그널을 거치지 않는 bulk_create 만 쓰므로, 카드는 마지막에 한 번에 다시 만든다.
+    from . import cards, menus
+    from .models import (
+        Article,
+        CuisineType,
+        Region,
+        Restaurant,
+        RestaurantCategory,
+        RestaurantMenu,
+        Review,
+        Tag,
+    )
+
+    rng = random.Random(seed)
+    categories = []
+    for cuisine_name, category_names in CUISINES.items():
+        cuisine = CuisineType.objects.create(name=cuisine_name)
+        categories += RestaurantCategory.objects.bulk_create(
+            RestaurantCategory(name=name, cuisine_type=cuisine)
+            for name in category_names
+        )
+    category_ids = [category.pk for category in categories]
+    region_ids = [
+        region.pk
+        for region in Region.objects.bulk_create(
+            Region(sido="서울", sigungu=gu, eupmyeondong=f"{gu[:-1]}{number}동")
+            for gu in SEOUL_GU
+            for number in range(1, dongs_per_gu + 1)
+        )
+    ]
+    tag_ids = [
+        tag.pk
+        for tag in Tag.objects.bulk_create(
+            Tag(name=f"태그{number}") for number in range(tags)
+        )
+    ]
+    Article.objects.bulk_create(
+        Article(
+            title=f"{rng.choice(MENUS)} 맛집 지도 {number}",
+            content="-",
+            show_at_index=number % 2 == 0,
+            is_published=True,
+        )
+        for number in range(20)
+    )
+
+    counts = {"restaurants": 0, "reviews": 0, "menus": 0}
+    TagLink = Restaurant.tags.through
+    for chunk in chunked(synthetic_restaurants(restaurants, seed), chunk_size):
+        ratings = []
+        for restaurant in chunk:
+            restaurant.category_id = rng.choice(category_ids)
+            restaurant.region_id = rng.choice(region_ids)
+            stars = rng.choices(
+                range(1, 6), STAR_WEIGHTS, k=rng.randint(0, 2 * reviews_per_restaurant)
+            )
+            for star in stars:
+                field = f"rating_{star}_count"
+                setattr(restaurant, field, getattr(restaurant, field) + 1)
+            restaurant.rating_count = len(stars)
+            restaurant.rating_sum = sum(stars)
+            if stars:
+                restaurant.rating = (Decimal(sum(stars)) / len(stars)).quantize(
+                    Decimal("0.01")
+                )
+            ratings.append(stars)
+        created = Restaurant.objects.bulk_create(chunk)
+
+        TagLink.objects.bulk_create(
+            TagLink(restaurant_id=restaurant.pk, tag_id=tag_id)
+            for restaurant in created
+            for tag_id in rng.sample(tag_ids, rng.randint(2, 4))
+        )
+        RestaurantMenu.objects.bulk_create(
+            RestaurantMenu(
+                restaurant_id=restaurant.pk,
+                name=name,
+                price=rng.randrange(5_000, 20_000, 500),
+            )
+            for restaurant in created
+            for name in rng.sample(MENUS, menus_per_restaurant)
+        )
+        reviews = (
+            Review(
+                restaurant_id=restaurant.pk,
+                title=f"{restaurant.name} 후기",
+                author=f"user{rng.randrange(100_000)}",
+                content=f"{rng.choice(MENUS)} {rng.choice(FEATURES)}",
+                rating=star,
+            )
+            for restaurant, stars in zip(created, ratings)
+            for star in stars
+        )
+        for batch in chunked(reviews, chunk_size):
+            Review.objects.bulk_create(batch)
+        counts["restaurants"] += len(created)
+        counts["reviews"] += sum(map(len, ratings))
+        counts["menus"] += len(created) * menus_per_restaurant
+        if progress:
+            progress(counts)
+
+    cards.rebuild(chunk_size)
+    menus.rebuild(chunk_size)
+    return counts
+
+
+def compare(baseline, current, threshold=0.2, min_ms=2.0):
+    # 기준 결과보다 p95 가 threshold 비율(그리고 min_ms) 이상 느려졌거나 쿼리 수가 늘어난 시나리오
+    regressions = []
+    for name, stats in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        if (
+            stats["p95_ms"] > old["p95_ms"] * (1 + threshold)
+            and stats["p95_ms"] - old["p95_ms"] >= min_ms
+        ):
+            regressions.append(
+                f"{name}: p95 {old['p95_ms']:.2f}ms → {stats['p95_ms']:.2f}ms"
+            )
+        if stats["queries"] > old["queries"]:
+            regressions.append(f"{name}: queries {old['queries']} → {stats['queries']}")
+    return regressions
+
+
+def synthetic_ratings(count, users, restaurants, seed=0, clusters=20):
+    # 추천 벤치마크용 (작성자, 레스토랑 id, 별점). 사용자마다 선호 군집이 있어 그 군집 레스토랑에 후하게 준다.
+    # 인기 순위 r 이 뽑힐 확률 ∝ 1/r (Zipf) 이 되도록 restaurants ** U(0, 1) 로 뽑고, 순위를 id 로 섞는다.
+    rng = random.Random(seed)
+    for _ in range(count):
+        user = rng.randrange(users)
+        rank = int(restaurants ** rng.random()) - 1
+        restaurant_id = rank * 7919 % restaurants + 1
+        liked = restaurant_id % clusters == user % clusters
+        stars = rng.choices(
+            range(1, 6), [1, 2, 4, 8, 10] if liked else [4, 8, 10, 5, 2]
+        )
+        yield f"user{user}", restaurant_id, stars[0]
+
+
+def synthetic_reviews(count, restaurant_ids, seed=0, images=0.2):
+    # 리뷰 일괄 수집 벤치마크용 NDJSON 행. images 비율만큼 이미지 URL 을 붙인다 (내려받기는 수집 처리량에 들어가지 않음).
+    rng = random.Random(seed)
+    for number in range(count):
+        menu = rng.choice(MENUS)
+        row = {
+            "key": f"synthetic:{seed}:{number}",
+            "restaurant": rng.choice(restaurant_ids),
+            "title": f"{menu} 맛집",
+            "author": f"user{rng.randrange(count // 10 + 1)}",
+            "content": f"{menu} 이(가) {rng.choice(FEATURES)} 이라 좋았어요.",
+            "rating": rng.choices(range(1, 6), [1, 2, 4, 8, 10])[0],
+            "channel": rng.choice(["네이버", "카카오", "인스타그램"]),
+        }
+        if rng.random() < images:
+            row["images"] = [f"https://example.com/reviews/{number}.jpg"]
+        yield row
+
+
+def synthetic_feed(count, seed=0, end=None, spread_days=3 * 365, ties=0.05):
+    # 리뷰 피드 벤치마크용 리뷰 필드값. 오래된 것부터 created_at 이 늘어나고, ties 비율만큼은 바로 앞 리뷰와
+    # 같은 시각이다 (일괄 수집된 리뷰처럼). 같은 시각끼리의 순서는 id 가 정한다.
+    from datetime import datetime, timedelta, timezone
+
+    rng = random.Random(seed)
+    end = end or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    step = spread_days * 86_400 / max(count, 1)
+    created_at = end - timedelta(days=spread_days)
+    for number in range(count):
+        if number and rng.random() >= ties:
+            created_at += timedelta(seconds=rng.uniform(0, 2 * step))
+        menu = rng.choice(MENUS)
+        yield {
+            "title": f"{menu} 후기",
+            "author": f"user{rng.randrange(100_000)}",
+            "content": f"{menu} {rng.choice(FEATURES)}",
+            "rating": rng.choices(range(1, 6), STAR_WEIGHTS)[0],
+            "created_at": created_at,
+        }
+
+
+MENU_PREFIXES = ["", "참치", "치즈", "매운", "왕", "모둠"]
+RARE_MENU = "트러플 김밥"  # 예산 검색 벤치마크의 드문 이름 (약 1만 개에 하나)
+
+
+def synthetic_menus(restaurant_ids, per_restaurant=20, seed=0):
+    # 예산 검색 벤치마크용 메뉴. 가격은 2,000~30,000원 (500원 단위)
+    from .models import RestaurantMenu
+
+    rng = random.Random(seed)
+    for restaurant_id in restaurant_ids:
+        for _ in range(per_restaurant):
+            name = (
+                RARE_MENU
+                if rng.random() < 0.0001
+                else f"{rng.choice(MENU_PREFIXES)}{rng.choice(MENUS)}"
+            )
+            yield RestaurantMenu(
+                restaurant_id=restaurant_id,
+                name=name,
+                price=rng.randrange(2_000, 30_000, 500),
+            )
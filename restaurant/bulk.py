@@ -0,0 +1,29 @@
+from django.db import connections, router
+
+
+def chunked(iterable, size):
+    # iterable 을 size 개씩 리스트로 묶는다 (마지막 묶음은 더 짧을 수 있음)
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def upsert(model, objs, unique_fields, update_fields, batch_size=None):
+    # INSERT ... ON CONFLICT DO UPDATE (MySQL: ON DUPLICATE KEY UPDATE) 한 문장으로 갱신.
+    # bulk_update() 는 필드마다 CASE WHEN 을 만들어 수천 행에서는 훨씬 느리다.
+    # MySQL 은 충돌 대상 컬럼을 지정할 수 없으므로 unique_fields 를 넘기지 않는다 (PK/UNIQUE 전체가 대상).
+    connection = connections[router.db_for_write(model)]
+    if not connection.features.supports_update_conflicts_with_target:
+        unique_fields = None
+    return model.objects.bulk_create(
+        objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
@@ -0,0 +1,103 @@
+from django.db.models import OuterRef, Prefetch, Subquery
+
+from .bulk import upsert
+from .images import derivative_url
+from .models import Restaurant, RestaurantCard, RestaurantImage
+
+CARD_FIELDS = [
+    "name",
+    "branch_name",
+    "address",
+    "is_closed",
+    "category",
+    "category_name",
+    "cuisine_type_name",
+    "region",
+    "region_name",
+    "tag_names",
+    "image_url",
+    "thumbnail_url",
+    "rating",
+    "rating_count",
+    "updated_at",
+]
+
+
+def card_queryset():
+    # 카드 하나를 만드는 데 필요한 것을 쿼리 4번(레스토랑+FK, 태그, 이미지)으로 청크 단위로 읽음
+    return Restaurant.objects.select_related(
+        "category__cuisine_type", "region"
+    ).prefetch_related(
+        "tags",
+        Prefetch(
+            "restaurantimage_set",
+            # 대표 이미지가 먼저, 없으면 순서가 가장 앞선 이미지
+            queryset=RestaurantImage.objects.order_by(
+                "-is_representative", "order", "pk"
+            ),
+            to_attr="card_images",
+        ),
+    )
+
+
+def build(restaurant):
+    category = restaurant.category
+    cuisine_type = category.cuisine_type if category else None
+    image = restaurant.card_images[0].image if restaurant.card_images else None
+    return RestaurantCard(
+        restaurant_id=restaurant.pk,
+        name=restaurant.name,
+        branch_name=restaurant.branch_name or "",
+        address=restaurant.address,
+        is_closed=restaurant.is_closed,
+        category=category,
+        category_name=category.name if category else "",
+        cuisine_type_name=cuisine_type.name if cuisine_type else "",
+        region=restaurant.region,
+        region_name=str(restaurant.region) if restaurant.region else "",
+        tag_names=sorted(tag.name for tag in restaurant.tags.all()),
+        image_url=image.url if image else "",
+        thumbnail_url=derivative_url(image, "sm") if image else "",
+        rating=restaurant.rating,
+        rating_count=restaurant.rating_count,
+    )
+
+
+def _upsert(cards):
+    upsert(
+        RestaurantCard, cards, unique_fields=["restaurant"], update_fields=CARD_FIELDS
+    )
+
+
+def refresh(restaurant_ids, chunk_size=1_000):
+    # 주어진 레스토랑들의 카드를 다시 만든다 (삭제된 레스토랑은 CASCADE 로 카드도 지워짐)
+    restaurant_ids = list(dict.fromkeys(restaurant_ids))
+    for start in range(0, len(restaurant_ids), chunk_size):
+        chunk = restaurant_ids[start : start + chunk_size]
+        _upsert(
+            [build(restaurant) for restaurant in card_queryset().filter(pk__in=chunk)]
+        )
+
+
+def rebuild(chunk_size=1_000):
+    # 전체 재생성. pk 키셋 순회라 메모리는 청크 크기만큼만 사용.
+    last_id = 0
+    total = 0
+    while True:
+        restaurants = list(
+            card_queryset().filter(pk__gt=last_id).order_by("pk")[:chunk_size]
+        )
+        if not restaurants:
+            return total
+        _upsert([build(restaurant) for restaurant in restaurants])
+        total += len(restaurants)
+        last_id = restaurants[-1].pk
+
+
+def sync_ratings(restaurant_ids):
+    # 평점 집계는 queryset.update() 로 바뀌어 시그널이 없으므로 ratings 쪽에서 직접 호출
+    source = Restaurant.objects.filter(pk=OuterRef("pk"))
+    RestaurantCard.objects.filter(pk__in=restaurant_ids).update(
+        rating=Subquery(source.values("rating")[:1]),
+        rating_count=Subquery(source.values("rating_count")[:1]),
+    )
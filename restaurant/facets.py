@@ -0,0 +1,317 @@
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .bulk import chunked
+
+TAG = "tag"
+CATEGORY = "category"
+CUISINE = "cuisine"
+REGION = "region"
+FACETS = (TAG, CATEGORY, CUISINE, REGION)
+NONE = -1  # 카테고리/지역이 없음
+
+# 비트 n = pk 가 n 인 레스토랑. uint8 로 풀어 pk 를 꺼낼 때 순서가 맞도록 리틀 엔디언으로 고정.
+WORD = np.dtype("<u8")
+ONE = np.uint64(1)
+RESTAURANT_ROW = np.dtype(
+    [("pk", np.int64), ("category", np.int32), ("region", np.int32), ("closed", bool)]
+)
+TAG_ROW = np.dtype([("restaurant", np.int64), ("tag", np.int64)])
+
+
+def empty(words):
+    return np.zeros(words, WORD)
+
+
+def to_bits(pks, words):
+    pks = np.asarray(pks, np.int64)
+    bits = empty(words)
+    np.bitwise_or.at(bits, pks >> 6, ONE << (pks & 63).astype(WORD))
+    return bits
+
+
+def to_ids(bits):
+    # 빈 워드는 풀지 않는다
+    words = np.flatnonzero(bits)
+    positions = np.flatnonzero(
+        np.unpackbits(bits[words].view(np.uint8), bitorder="little")
+    )
+    return words[positions >> 6] * 64 + (positions & 63)
+
+
+def tally(values):
+    # id 배열 → {id: 개수} (NONE 제외)
+    values = values[values >= 0]
+    if not len(values):
+        return {}
+    counts = np.bincount(values)
+    return {int(pk): int(counts[pk]) for pk in np.flatnonzero(counts)}
+
+
+def widen(array, length, fill=0):
+    # 마지막 축을 length 로 늘린 복사본
+    wider = np.full(array.shape[:-1] + (length,), fill, array.dtype)
+    wider[..., : array.shape[-1]] = array
+    return wider
+
+
+class FacetIndex:
+    # 레스토랑 pk 를 비트 번호로 쓰는 패싯 색인.
+    # 태그(다대다)와 폐업 여부는 값마다 비트셋 하나. 하나만 갖는 카테고리/지역은 pk → id 열(int32)로 두고
+    # 필터할 때 비트셋으로 만든다 (지역 수천 개 × 레스토랑 수만큼의 비트를 들고 있지 않도록).
+    # 음식 종류는 카테고리를 따라간다 (cuisines: 카테고리 id → 음식 종류 id).
+
+    def __init__(self, size=0):
+        self.size = -(-size // 64) * 64
+        self.present = empty(self.words)
+        self.closed = empty(self.words)
+        self.category = np.full(self.size, NONE, np.int32)
+        self.region = np.full(self.size, NONE, np.int32)
+        self.tag_ids = []  # 행 번호 → 태그 id
+        self.tag_rows = {}
+        self.tags = np.zeros((0, self.words), WORD)
+        self.cuisines = {}
+        self.built_at = time.monotonic()
+
+    @property
+    def words(self):
+        return self.size // 64
+
+    @classmethod
+    def from_db(cls, chunk_size=10_000):
+        # 레스토랑 한 번, 태그 연결 한 번 읽어서 numpy 로 한꺼번에 비트를 세운다 (행마다 파이썬 연산 없음)
+        from .models import Restaurant, RestaurantCategory
+
+        restaurants = np.fromiter(
+            (
+                (
+                    pk,
+                    NONE if category is None else category,
+                    NONE if region is None else region,
+                    closed,
+                )
+                for pk, category, region, closed in Restaurant.objects.values_list(
+                    "pk", "category_id", "region_id", "is_closed"
+                ).iterator(chunk_size)
+            ),
+            RESTAURANT_ROW,
+        )
+        links = np.fromiter(
+            Restaurant.tags.through.objects.values_list("restaurant_id", "tag_id")
+            .order_by()
+            .iterator(chunk_size),
+            TAG_ROW,
+        )
+        pks = restaurants["pk"]
+        index = cls(
+            max(
+                int(pks.max()) + 1 if len(pks) else 0,
+                int(links["restaurant"].max()) + 1 if len(links) else 0,
+            )
+        )
+        index.present = to_bits(pks, index.words)
+        index.closed = to_bits(pks[restaurants["closed"]], index.words)
+        index.category[pks] = restaurants["category"]
+        index.region[pks] = restaurants["region"]
+
+        tag_ids, rows = np.unique(links["tag"], return_inverse=True)
+        index.tag_ids = tag_ids.tolist()
+        index.tag_rows = {tag: row for row, tag in enumerate(index.tag_ids)}
+        index.tags = np.zeros((len(tag_ids), index.words), WORD)
+        restaurant_ids = links["restaurant"]
+        np.bitwise_or.at(
+            index.tags,
+            (rows, restaurant_ids >> 6),
+            ONE << (restaurant_ids & 63).astype(WORD),
+        )
+        index.cuisines = dict(
+            RestaurantCategory.objects.exclude(cuisine_type=None).values_list(
+                "pk", "cuisine_type_id"
+            )
+        )
+        return index
+
+    def grow(self, pk):
+        if pk < self.size:
+            return
+        size = max(self.size, 64)
+        while size <= pk:
+            size *= 2
+        self.size = size
+        self.present = widen(self.present, self.words)
+        self.closed = widen(self.closed, self.words)
+        self.category = widen(self.category, size, NONE)
+        self.region = widen(self.region, size, NONE)
+        self.tags = widen(self.tags, self.words)
+
+    def tag_row(self, tag):
+        row = self.tag_rows.get(tag)
+        if row is None:
+            row = self.tag_rows[tag] = len(self.tag_ids)
+            self.tag_ids.append(tag)
+            self.tags = np.vstack([self.tags, empty(self.words)])
+        return row
+
+    def set(self, pk, category=None, region=None, closed=False, tags=(), cuisine=None):
+        self.grow(pk)
+        word, bit = pk >> 6, ONE << np.uint64(pk & 63)
+        self.present[word] |= bit
+        if closed:
+            self.closed[word] |= bit
+        else:
+            self.closed[word] &= ~bit
+        self.category[pk] = NONE if category is None else category
+        self.region[pk] = NONE if region is None else region
+        self.tags[:, word] &= ~bit
+        for tag in tags:
+            row = self.tag_row(tag)  # 새 태그면 self.tags 가 바뀌므로 먼저
+            self.tags[row, word] |= bit
+        if category is not None:
+            if cuisine is None:
+                self.cuisines.pop(category, None)
+            else:
+                self.cuisines[category] = cuisine
+
+    def remove(self, pk):
+        if pk >= self.size:
+            return
+        word, bit = pk >> 6, ONE << np.uint64(pk & 63)
+        self.present[word] &= ~bit
+        self.closed[word] &= ~bit
+        self.category[pk] = NONE
+        self.region[pk] = NONE
+        self.tags[:, word] &= ~bit
+
+    def bits(self, facet, values):
+        # values 중 하나라도 가진 레스토랑 비트셋 (OR)
+        if facet == TAG:
+            rows = [self.tag_rows[tag] for tag in values if tag in self.tag_rows]
+            if not rows:
+                return empty(self.words)
+            return np.bitwise_or.reduce(self.tags[rows], axis=0)
+        if facet == CUISINE:
+            cuisines = set(values)
+            facet = CATEGORY
+            values = [
+                category
+                for category, cuisine in self.cuisines.items()
+                if cuisine in cuisines
+            ]
+        if facet == CATEGORY:
+            column = self.category
+        elif facet == REGION:
+            column = self.region
+        else:
+            raise ValueError(f"알 수 없는 패싯: {facet}")
+        # np.isin 은 매번 정렬하므로 id → bool 표로 한 번에 (NONE(-1) 은 항상 False 인 마지막 칸을 가리킨다)
+        wanted = np.zeros(int(column.max(initial=0)) + 2, bool)
+        wanted[[value for value in values if 0 <= value < len(wanted) - 1]] = True
+        return np.packbits(wanted[column], bitorder="little").view(WORD)
+
+    def search(self, filters=(), include_closed=False):
+        # filters: [{패싯: [id, ...], ...}, ...]. 한 dict 안은 모두 OR, dict 끼리는 AND.
+        # 예) [{TAG: [1, 2]}, {CATEGORY: [3], CUISINE: [1]}] = (태그 1 또는 2) 그리고 (카테고리 3 또는 음식 종류 1)
+        result = self.present.copy()
+        if not include_closed:
+            result &= ~self.closed
+        for group in filters:
+            matched = empty(self.words)
+            for facet, values in group.items():
+                matched |= self.bits(facet, values)
+            result &= matched
+        return result
+
+    def counts(self, result, facets=FACETS):
+        # result 비트셋의 (pk 배열, 패싯 값마다 레스토랑 수 {패싯: {id: 개수}}) — 0 인 값은 빠짐
+        counts = {}
+        if TAG in facets:
+            words = np.flatnonzero(result)
+            # 결과가 드물면 빈 워드를 건너뛰는 쪽이 싸다
+            if len(words) * 4 < len(result):
+                hits = np.bitwise_count(self.tags[:, words] & result[words]).sum(axis=1)
+            else:
+                hits = np.bitwise_count(self.tags & result).sum(axis=1)
+            counts[TAG] = {
+                self.tag_ids[row]: int(hits[row]) for row in np.flatnonzero(hits)
+            }
+        ids = to_ids(result)
+        if CATEGORY in facets or CUISINE in facets:
+            by_category = tally(self.category[ids])
+            if CATEGORY in facets:
+                counts[CATEGORY] = by_category
+            if CUISINE in facets:
+                by_cuisine = {}
+                for category, count in by_category.items():
+                    cuisine = self.cuisines.get(category)
+                    if cuisine is not None:
+                        by_cuisine[cuisine] = by_cuisine.get(cuisine, 0) + count
+                counts[CUISINE] = by_cuisine
+        if REGION in facets:
+            counts[REGION] = tally(self.region[ids])
+        return ids, counts
+
+    def query(self, filters=(), include_closed=False, facets=FACETS):
+        # (맞는 레스토랑 pk 배열(오름차순), 패싯별 개수)
+        return self.counts(self.search(filters, include_closed), facets)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    # 프로세스 단위 싱글턴. 다른 워커의 변경은 FACET_INDEX_MAX_AGE 초마다 재구축으로 따라잡는다.
+    global _index
+    max_age = getattr(settings, "FACET_INDEX_MAX_AGE", 300)
+    index = _index
+    if index is None or time.monotonic() - index.built_at > max_age:
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.built_at > max_age:
+                _index = FacetIndex.from_db()
+            index = _index
+    return index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def query(filters=(), include_closed=False, facets=FACETS):
+    index = get_index()
+    # 갱신이 배열을 늘리는 도중에 읽지 않도록 같은 락 안에서
+    with _index_lock:
+        return index.query(filters, include_closed, facets)
+
+
+def refresh(pks, chunk_size=1_000):
+    # 커밋된 DB 값으로 레스토랑들의 비트를 다시 쓴다. 없어진 레스토랑은 지운다.
+    from .models import Restaurant
+
+    index = _index
+    if index is None:  # 아직 만들어지지 않았으면 첫 조회 때 DB에서 통째로 읽어온다
+        return
+    for chunk in chunked(sorted(set(pks)), chunk_size):
+        rows = list(
+            Restaurant.objects.filter(pk__in=chunk).values_list(
+                "pk",
+                "category_id",
+                "region_id",
+                "is_closed",
+                "category__cuisine_type_id",
+            )
+        )
+        tags = {}
+        for restaurant_id, tag_id in Restaurant.tags.through.objects.filter(
+            restaurant_id__in=chunk
+        ).values_list("restaurant_id", "tag_id"):
+            tags.setdefault(restaurant_id, []).append(tag_id)
+        with _index_lock:
+            for pk, category, region, closed, cuisine in rows:
+                index.set(pk, category, region, closed, tags.get(pk, ()), cuisine)
+            for pk in set(chunk) - {row[0] for row in rows}:
+                index.remove(pk)
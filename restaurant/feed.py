@@ -0,0 +1,87 @@
+import base64
+import binascii
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+
+# 레스토랑별 리뷰 피드: (restaurant, -created_at, -id) 복합 인덱스를 그대로 타는 키셋 페이지네이션.
+# 커서에는 마지막 행의 (created_at, id) 가 들어가므로 10,000 번째 페이지도 첫 페이지와 같은 비용이다.
+ORDERING = ("-created_at", "-id")
+CACHE = "shared"  # 첫 페이지 캐시는 워커끼리 공유해야 무효화가 모두에게 보인다
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(review):
+    token = f"{review.created_at.isoformat()}|{review.pk}"
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk = token.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def after(queryset, cursor):
+    # 커서 다음 행들. created_at <= x 가 인덱스 범위를 정하고, 같은 시각끼리는 id 로 가른다.
+    if not cursor:
+        return queryset
+    created_at, pk = decode_cursor(cursor)
+    return queryset.filter(created_at__lte=created_at).filter(
+        Q(created_at__lt=created_at) | Q(pk__lt=pk)
+    )
+
+
+def page(queryset, cursor=None, limit=20):
+    # (행 목록, 다음 커서 또는 None). limit + 1 개를 읽어 다음 페이지가 있는지 안다.
+    rows = list(after(queryset, cursor).order_by(*ORDERING)[: limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _version_key(restaurant_id):
+    return f"review-feed-version:{restaurant_id}"
+
+
+def first_page_key(restaurant_id):
+    # 요청을 시작할 때 읽은 버전으로 키를 만든다. 그 사이에 무효화되면 새로 만든 페이지는 옛 키에 저장되어
+    # 다시 읽히지 않는다 (fragments.py 와 같은 방식).
+    cache = caches[CACHE]
+    version = cache.get(_version_key(restaurant_id))
+    if version is None:
+        cache.add(_version_key(restaurant_id), time.time_ns(), None)
+        version = cache.get(_version_key(restaurant_id))
+    return f"review-feed:{restaurant_id}:{version}"
+
+
+def get_first_page(key):
+    return caches[CACHE].get(key)
+
+
+def set_first_page(key, value):
+    caches[CACHE].set(key, value, settings.REVIEW_FEED_CACHE_SECONDS)
+
+
+def invalidate(restaurant_ids):
+    # 리뷰(또는 리뷰 이미지)가 바뀐 레스토랑의 첫 페이지 캐시 버전을 커밋 후 올린다
+    restaurant_ids = set(restaurant_ids)
+    if not restaurant_ids:
+        return
+
+    def bump():
+        version = time.time_ns()
+        caches[CACHE].set_many(
+            {_version_key(pk): version for pk in restaurant_ids}, None
+        )
+
+    transaction.on_commit(bump)
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+# 1차: 프로세스 메모리(locmem), 2차: 워커끼리 공유하는 파일 캐시. 버전 키와 생성 락은 항상 2차에 둔다.
+LOCAL = "default"
+SHARED = "shared"
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name, status):
+    with _stats_lock:
+        _stats[f"{name}:{status}"] += 1
+
+
+def stats():
+    # {"index:articles:hit": 10, "index:articles:miss": 1, ...} (현재 프로세스 기준)
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _version_key(name):
+    return f"fragment-version:{name}"
+
+
+def version(name):
+    shared = caches[SHARED]
+    current = shared.get(_version_key(name))
+    if current is None:
+        shared.add(_version_key(name), time.time_ns(), None)
+        current = shared.get(_version_key(name))
+    return current
+
+
+def bump(name):
+    # 새 버전 번호로 바꾸면 이전 버전 키는 더 이상 읽히지 않는다 (삭제 없이 무효화)
+    caches[SHARED].set(_version_key(name), time.time_ns(), None)
+
+
+class Fragment:
+    def __init__(self, name, timeout=600, lock_timeout=10, wait=2.0):
+        self.name = name
+        self.timeout = timeout
+        self.lock_timeout = (
+            lock_timeout  # 생성하던 워커가 죽어도 이 시간 뒤에는 락이 풀림
+        )
+        self.wait = wait  # 이전 버전도 없을 때 다른 워커의 생성을 기다리는 최대 시간
+
+    def _get(self, key):
+        local = caches[LOCAL]
+        value = local.get(key)
+        if value is None:
+            value = caches[SHARED].get(key)
+            if value is not None:
+                local.set(key, value, self.timeout)
+        return value
+
+    def _set(self, key, value):
+        caches[LOCAL].set(key, value, self.timeout)
+        caches[SHARED].set(key, value, self.timeout)
+
+    def get_or_render(self, render):
+        # (html, "hit" | "miss" | "stale") 반환. miss 는 이 워커가 직접 다시 만든 경우.
+        key = f"fragment:{self.name}:{version(self.name)}"
+        stale_key = f"fragment:{self.name}:stale"
+
+        value = self._get(key)
+        if value is not None:
+            _count(self.name, "hit")
+            return value, "hit"
+
+        lock_key = f"{key}:lock"
+        shared = caches[SHARED]
+        if shared.add(lock_key, 1, self.lock_timeout):
+            try:
+                value = render()
+                self._set(key, value)
+                shared.set(stale_key, value, None)
+            finally:
+                shared.delete(lock_key)
+            _count(self.name, "miss")
+            return value, "miss"
+
+        # 다른 워커가 만드는 중: 직전 버전을 그대로 내보낸다
+        value = self._get(stale_key)
+        if value is not None:
+            _count(self.name, "stale")
+            return value, "stale"
+
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self._get(key)
+            if value is not None:
+                _count(self.name, "hit")
+                return value, "hit"
+        _count(self.name, "miss")
+        return render(), "miss"
+
+
+INDEX_ARTICLES = "index:articles"
+INDEX_RESTAURANTS = "index:restaurants"
+
+index_articles = Fragment(INDEX_ARTICLES, timeout=settings.INDEX_CACHE_TIMEOUT)
+index_restaurants = Fragment(INDEX_RESTAURANTS, timeout=settings.INDEX_CACHE_TIMEOUT)
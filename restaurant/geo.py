@@ -0,0 +1,311 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_KM / 360  # 위도 1도 ≈ 111.195km
+
+GEOHASH_PRECISION = 9  # 9자리 지오해시 셀 ≈ 4.8m x 4.8m
+CELL_DEGREES = 0.01  # 인메모리 그리드 셀 한 변의 크기 (위도 기준 약 1.1km)
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    # 경도/위도 구간을 번갈아 이등분하면서 5비트씩 base32 문자로 변환
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            bounds[0] = mid
+        else:
+            bits = bits * 2
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = bit_count = 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision):
+    # (위도 폭, 경도 폭) 도 단위
+    lat_bits = precision * 5 // 2
+    lon_bits = precision * 5 - lat_bits
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def geohash_cover(min_lat, min_lon, max_lat, max_lon, max_cells=16):
+    # 바운딩 박스를 덮는 지오해시 접두어 집합. 셀 수가 max_cells 이하가 되는 가장 정밀한 자릿수를 고른다.
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = geohash_cell_size(precision)
+        rows = math.ceil((max_lat - min_lat) / lat_step) + 1
+        cols = math.ceil((max_lon - min_lon) / lon_step) + 1
+        if rows * cols <= max_cells:
+            break
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lon = min_lon
+        while True:
+            cells.add(encode_geohash(lat, lon, precision))
+            if lon >= max_lon:
+                break
+            lon = min(lon + lon_step, max_lon)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_step, max_lat)
+    return cells
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    # 반경 radius_km 원을 감싸는 (min_lat, min_lon, max_lat, max_lon)
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return (
+        max(latitude - dlat, -90.0),
+        max(longitude - dlon, -180.0),
+        min(latitude + dlat, 90.0),
+        min(longitude + dlon, 180.0),
+    )
+
+
+class GeoIndex:
+    # 균일 그리드 셀(위경도 CELL_DEGREES 단위) → 레스토랑 id 집합 + 좌표는 packed float 배열에 보관.
+    # 후보는 셀 단위로 좁히고, 최종 거리는 하버사인으로 정확히 계산한다.
+    # 경도 ±180도 경계를 넘는 검색은 고려하지 않는다 (국내 서비스).
+
+    def __init__(self, cell_degrees=CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.ids = array("q")
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.built_at = time.monotonic()
+        self._slots = {}  # id -> 배열 위치
+        self._cells = defaultdict(set)  # (row, col) -> id 집합
+
+    @classmethod
+    def from_queryset(cls, queryset, **kwargs):
+        index = cls(**kwargs)
+        rows = queryset.values_list("id", "latitude", "longitude")
+        for pk, latitude, longitude in rows.iterator(chunk_size=10_000):
+            index.add(pk, float(latitude), float(longitude))
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, pk):
+        return pk in self._slots
+
+    def _cell(self, latitude, longitude):
+        return (
+            math.floor(latitude / self.cell_degrees),
+            math.floor(longitude / self.cell_degrees),
+        )
+
+    def add(self, pk, latitude, longitude):
+        if pk in self._slots:
+            self.remove(pk)
+        self._slots[pk] = len(self.ids)
+        self.ids.append(pk)
+        self.latitudes.append(latitude)
+        self.longitudes.append(longitude)
+        self._cells[self._cell(latitude, longitude)].add(pk)
+
+    def remove(self, pk):
+        slot = self._slots.pop(pk, None)
+        if slot is None:
+            return False
+        cell = self._cell(self.latitudes[slot], self.longitudes[slot])
+        members = self._cells[cell]
+        members.discard(pk)
+        if not members:
+            del self._cells[cell]
+
+        # 마지막 원소를 빈 자리로 옮겨서 배열을 빽빽하게 유지 (swap-remove)
+        last = len(self.ids) - 1
+        if slot != last:
+            moved = self.ids[last]
+            self.ids[slot] = moved
+            self.latitudes[slot] = self.latitudes[last]
+            self.longitudes[slot] = self.longitudes[last]
+            self._slots[moved] = slot
+        self.ids.pop()
+        self.latitudes.pop()
+        self.longitudes.pop()
+        return True
+
+    def _ring(self, row, col, radius):
+        if radius == 0:
+            yield row, col
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield row - radius, c
+            yield row + radius, c
+        for r in range(row - radius + 1, row + radius):
+            yield r, col - radius
+            yield r, col + radius
+
+    def _ring_min_km(self, latitude, ring):
+        # ring 번째 고리 안의 점까지의 최소 거리 하한 (질의점은 중심 셀 어딘가에 있으므로 ring-1칸)
+        if ring <= 1:
+            return 0.0
+        span = (ring - 1) * self.cell_degrees
+        worst_lat = min(abs(latitude) + ring * self.cell_degrees, 90.0)
+        cos_lat = max(math.cos(math.radians(worst_lat)), 1e-6)
+        return span * KM_PER_DEGREE * cos_lat
+
+    def nearby(self, latitude, longitude, radius_km=None, k=None):
+        # (id, 거리 km) 리스트를 가까운 순으로 반환
+        if radius_km is None and k is None:
+            raise ValueError("radius_km 또는 k 중 하나는 지정해야 합니다.")
+        if k is not None and k <= 0:
+            return []
+
+        row, col = self._cell(latitude, longitude)
+        heap = []  # k개를 유지하는 최대 힙 (-거리, id)
+        matches = []
+        occupied = len(self._cells)
+        seen_cells = 0
+        ring = 0
+        max_ring = int(
+            360 / self.cell_degrees
+        )  # 동시 수정으로 셀 수가 어긋나도 끝나도록
+        while seen_cells < occupied and ring <= max_ring:
+            lower_bound = self._ring_min_km(latitude, ring)
+            if radius_km is not None and lower_bound > radius_km:
+                break
+            if k is not None and len(heap) == k and lower_bound > -heap[0][0]:
+                break
+
+            for cell in self._ring(row, col, ring):
+                members = self._cells.get(cell)
+                if not members:
+                    continue
+                seen_cells += 1
+                for pk in tuple(
+                    members
+                ):  # 다른 스레드의 갱신과 겹쳐도 안전하도록 복사본 순회
+                    slot = self._slots.get(pk)
+                    if slot is None:
+                        continue
+                    distance = haversine_km(
+                        latitude,
+                        longitude,
+                        self.latitudes[slot],
+                        self.longitudes[slot],
+                    )
+                    if radius_km is not None and distance > radius_km:
+                        continue
+                    if k is None:
+                        matches.append((distance, pk))
+                    elif len(heap) < k:
+                        heapq.heappush(heap, (-distance, pk))
+                    elif distance < -heap[0][0]:
+                        heapq.heapreplace(heap, (-distance, pk))
+            ring += 1
+
+        if k is not None:
+            matches = [(-negative, pk) for negative, pk in heap]
+        matches.sort()
+        return [(pk, distance) for distance, pk in matches]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _indexed_queryset():
+    from .models import Restaurant
+
+    # 위경도 0,0 은 좌표 미입력(기본값)으로 간주해서 색인하지 않음
+    return Restaurant.objects.filter(is_closed=False).exclude(latitude=0, longitude=0)
+
+
+def get_index():
+    # 프로세스 단위 싱글턴. 다른 워커의 변경은 GEO_INDEX_MAX_AGE 초마다 재구축으로 따라잡는다.
+    global _index
+    max_age = getattr(settings, "GEO_INDEX_MAX_AGE", 300)
+    index = _index
+    if index is None or time.monotonic() - index.built_at > max_age:
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.built_at > max_age:
+                _index = GeoIndex.from_queryset(_indexed_queryset())
+            index = _index
+    return index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def index_restaurant(restaurant):
+    index = _index
+    if index is None:  # 아직 만들어지지 않았으면 첫 조회 때 DB에서 통째로 읽어온다
+        return
+    latitude = float(restaurant.latitude)
+    longitude = float(restaurant.longitude)
+    with _index_lock:
+        if restaurant.is_closed or (latitude == 0 and longitude == 0):
+            index.remove(restaurant.pk)
+        else:
+            index.add(restaurant.pk, latitude, longitude)
+
+
+def unindex_restaurant(pk):
+    index = _index
+    if index is None:
+        return
+    with _index_lock:
+        index.remove(pk)
+
+
+def nearby_restaurants(queryset, latitude, longitude, radius_km=1.0, k=10):
+    # 인덱스에서 후보를 뽑고 queryset 조건(폐업 여부 포함)으로 DB에서 한 번 더 걸러낸다.
+    # 조건에 걸려 k개가 모자라면 후보 수를 늘려서 다시 시도.
+    latitude = float(latitude)
+    longitude = float(longitude)
+    index = get_index()
+    limit = None if k is None else max(k * 2, 16)
+    while True:
+        hits = index.nearby(latitude, longitude, radius_km=radius_km, k=limit)
+        found = queryset.filter(is_closed=False).in_bulk([pk for pk, _ in hits])
+        results = []
+        for pk, distance in hits:
+            restaurant = found.get(pk)
+            if restaurant is None:
+                continue
+            restaurant.distance = distance
+            results.append(restaurant)
+        if limit is None or len(results) >= k or len(hits) < limit:
+            return results if k is None else results[:k]
+        limit *= 4
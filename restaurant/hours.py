@@ -0,0 +1,57 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def business_minutes(start_time, end_time, last_order_time=None):
+    # 영업시간을 (오픈, 마감, 라스트오더) "하루 시작부터 몇 분" 으로 변환. 자정을 넘기면 1440 이상으로 늘려서
+    # 항상 오픈 <= 라스트오더 <= 마감 이 되게 한다. 예: 18:00~02:00 → (1080, 1560, ...)
+    if start_time is None or end_time is None:
+        return None, None, None
+
+    opening = minute_of_day(start_time)
+    closing = minute_of_day(end_time)
+    if closing == MINUTES_PER_DAY - 1:
+        closing = MINUTES_PER_DAY  # 23:59 마감은 "자정까지" 로 취급
+    if closing <= opening:
+        closing += MINUTES_PER_DAY  # 자정 넘어 영업 (시작=종료면 24시간 영업)
+
+    if last_order_time is None:
+        last_order = closing
+    else:
+        last_order = minute_of_day(last_order_time)
+        if last_order < opening:
+            last_order += MINUTES_PER_DAY
+        last_order = min(last_order, closing)
+    return opening, closing, last_order
+
+
+def local_minute(value=None):
+    # 레스토랑 기준 시간대(RESTAURANT_TIME_ZONE, 기본 Asia/Seoul)의 "하루 시작부터 몇 분"
+    zone = ZoneInfo(getattr(settings, "RESTAURANT_TIME_ZONE", "Asia/Seoul"))
+    if value is None:
+        value = timezone.now()
+    if isinstance(value, datetime):
+        if timezone.is_naive(value):
+            value = value.replace(tzinfo=zone)
+        value = value.astimezone(zone)
+    return minute_of_day(value)
+
+
+def open_at_q(value=None, accepting_orders=False):
+    # 오늘 시작한 영업 구간에 들어있거나, 어제 시작해서 자정을 넘긴 구간에 들어있으면 영업 중.
+    # 오픈 시각은 항상 1440 미만이므로 두 번째 조건은 마감(또는 라스트오더) 비교만으로 충분하다.
+    minute = local_minute(value)
+    until = "last_order_minute" if accepting_orders else "close_minute"
+    return Q(open_minute__lte=minute, **{f"{until}__gt": minute}) | Q(
+        **{f"{until}__gt": minute + MINUTES_PER_DAY}
+    )
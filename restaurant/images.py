@@ -0,0 +1,167 @@
+import atexit
+import io
+import logging
+import os
+import posixpath
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .storage import ContentAddressedStorage, blob_storage
+
+logger = logging.getLogger(__name__)
+
+# 긴 변 기준 픽셀 크기. 목록 카드는 thumb/sm, 상세 화면은 md/lg 를 쓴다.
+SIZES = {"thumb": 200, "sm": 480, "md": 960, "lg": 1600}
+FORMATS = {"webp": ("WEBP", 80), "jpg": ("JPEG", 82)}
+DERIVATIVE_ROOT = "derivatives"
+
+
+def derivative_name(name, size, fmt):
+    # 원본 경로로부터 항상 같은 키를 만든다. restaurant/a.png → derivatives/restaurant/a/thumb.webp
+    stem, _ = posixpath.splitext(name)
+    return f"{DERIVATIVE_ROOT}/{stem}/{size}.{fmt}"
+
+
+def derivative_names(name):
+    return {
+        (size, fmt): derivative_name(name, size, fmt)
+        for size in SIZES
+        for fmt in FORMATS
+    }
+
+
+def derivative_url(fieldfile, size="thumb", fmt="webp"):
+    if not fieldfile:
+        return None
+    return fieldfile.storage.url(derivative_name(fieldfile.name, size, fmt))
+
+
+class ImageDerivativesMixin:
+    # image_fields 에 적은 ImageField 들은 업로드 후 백그라운드에서 파생 이미지가 만들어진다
+    image_fields = ()
+
+    def derivative_url(self, size="thumb", fmt="webp", field=None):
+        return derivative_url(getattr(self, field or self.image_fields[0]), size, fmt)
+
+    def srcset(self, fmt="webp", field=None):
+        # <img srcset="..."> 용 "url 200w, url 480w, ..."
+        fieldfile = getattr(self, field or self.image_fields[0])
+        if not fieldfile:
+            return ""
+        return ", ".join(
+            f"{derivative_url(fieldfile, size, fmt)} {width}w"
+            for size, width in SIZES.items()
+        )
+
+
+def generate(name, force=False, storage=None):
+    # 원본 하나의 모든 파생 이미지를 만든다. 이미 다 있으면 건너뜀. 반환값은 바이트 통계.
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    # 이미지 필드는 모두 storage=blob_storage 이므로 기본값도 같은 저장소. 파생 이미지는 내용 주소가 아니라
+    # derivative_name 그대로 두어야 하므로(url 도 백엔드 기준) 감싼 백엔드에서 읽고 쓴다.
+    storage = storage or blob_storage()
+    if isinstance(storage, ContentAddressedStorage):
+        storage = storage.backend
+    targets = derivative_names(name)
+    stats = {"name": name, "source_bytes": 0, "derivatives": {}, "skipped": False}
+    if not force and all(storage.exists(target) for target in targets.values()):
+        stats["skipped"] = True
+        return stats
+
+    try:
+        with storage.open(name, "rb") as source:
+            data = source.read()
+        stats["source_bytes"] = len(data)
+        with Image.open(io.BytesIO(data)) as original:
+            original = ImageOps.exif_transpose(original)
+            original.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as error:
+        logger.warning("파생 이미지 생성 실패 %s: %s", name, error)
+        stats["skipped"] = True
+        return stats
+
+    for size, edge in SIZES.items():
+        resized = original.copy()
+        resized.thumbnail(
+            (edge, edge), Image.Resampling.LANCZOS
+        )  # 비율 유지, 확대하지 않음
+        for fmt, (pil_format, quality) in FORMATS.items():
+            image = resized
+            if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, quality=quality, optimize=True)
+            target = targets[(size, fmt)]
+            if storage.exists(target):
+                storage.delete(target)  # get_available_name 이 접미사를 붙이지 않도록
+            storage.save(target, ContentFile(buffer.getvalue()))
+            stats["derivatives"][(size, fmt)] = buffer.tell()
+    return stats
+
+
+def _init_worker(settings_module):
+    # spawn 방식(macOS 등)으로 뜬 워커에서도 Django 설정을 읽을 수 있도록
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    # multiprocessing 은 이미지를 처음 올릴 때 불러온다 (모든 워커/manage.py 시작 비용에서 뺌)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "proj.settings"),),
+            )
+            # 인터프리터가 모듈을 정리하기 전에 닫는다. 그대로 두면 GC 때 관리 스레드가 오류를 남긴다.
+            atexit.register(_executor.shutdown)
+    return _executor
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("파생 이미지 생성 중 오류", exc_info=future.exception())
+
+
+def schedule(name):
+    # 요청 스레드에서는 커밋 후 작업을 프로세스 풀에 넘기기만 한다
+    if not name:
+        return
+
+    def submit():
+        if settings.IMAGE_DERIVATIVES_ASYNC:
+            get_executor().submit(generate, name).add_done_callback(_log_failure)
+        else:
+            generate(name)
+
+    transaction.on_commit(submit)
+
+
+def generate_many(names, workers=1, force=False):
+    # 백필용. workers <= 1 이면 현재 프로세스에서 차례로 실행. names 순서대로 통계를 yield.
+    if workers <= 1:
+        for name in names:
+            yield generate(name, force=force)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "proj.settings"),),
+    ) as executor:
+        yield from executor.map(generate, names, [force] * len(names), chunksize=8)
@@ -0,0 +1,348 @@
+import csv
+import json
+from collections import Counter
+from datetime import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from . import menus
+from .bulk import chunked, upsert
+from .models import Region, Restaurant, RestaurantCategory, RestaurantMenu, Tag
+
+# 파일 컬럼 → Restaurant 필드 (카테고리/지역/태그/메뉴는 따로 해석)
+TEXT_FIELDS = ("description", "feature", "phone")
+DECIMAL_FIELDS = ("latitude", "longitude")
+TIME_FIELDS = ("start_time", "end_time", "last_order_time")
+# set_derived_fields() 가 채우는 필드 (region 은 파일에 지역이 없고 주소로 찾은 경우에만 바뀜)
+DERIVED_FIELDS = (
+    "geohash",
+    "open_minute",
+    "close_minute",
+    "last_order_minute",
+    "region",
+)
+TRUE_VALUES = {"1", "true", "t", "y", "yes", "폐업"}
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_rows(stream, fmt):
+    # (줄 번호, dict) 를 한 줄씩 yield. 파일 전체를 메모리에 올리지 않는다.
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_no, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError) as error:
+                    yield line_no, RowError(f"JSON 파싱 실패: {error}")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _split(value):
+    # CSV 는 "가성비|혼밥", JSONL 은 리스트
+    if isinstance(value, list):
+        return [_text(item) for item in value if _text(item)]
+    return [item.strip() for item in _text(value).split("|") if item.strip()]
+
+
+def _menus(value):
+    # CSV 는 "김밥:3500|라면:4000", JSONL 은 [{"name": "김밥", "price": 3500}] 도 허용
+    menus = {}
+    for item in value if isinstance(value, list) else _split(value):
+        if isinstance(item, dict):
+            name, price = _text(item.get("name")), item.get("price") or 0
+        else:
+            name, separator, price = str(item).rpartition(":")
+            name = name.strip() if separator else price.strip()
+            price = price if separator else 0
+        if not name:
+            continue
+        try:
+            menus[name] = int(price)
+        except (TypeError, ValueError):
+            raise RowError(f"메뉴 가격이 숫자가 아닙니다: {item}")
+    return menus
+
+
+def _region_key(row):
+    if any(row.get(key) for key in ("sido", "sigungu", "eupmyeondong")):
+        return tuple(_text(row.get(key)) for key in ("sido", "sigungu", "eupmyeondong"))
+    parts = _text(row.get("region")).split()
+    if not parts:
+        return None
+    if len(parts) != 3:
+        raise RowError(
+            f"지역은 '시도 시군구 읍면동' 형식이어야 합니다: {row['region']}"
+        )
+    return tuple(parts)
+
+
+def parse_row(row):
+    # 파일 한 행 → 레코드. 파일에 없는 컬럼은 fields 에 넣지 않아 기존 값을 덮어쓰지 않는다.
+    name = _text(row.get("name"))
+    if not name:
+        raise RowError("name 이 비어 있습니다.")
+    record = {
+        "key": (name, _text(row.get("branch_name")), _text(row.get("address"))),
+        "fields": {},
+        "category": None,
+        "region": None,
+        "tags": None,
+        "menus": None,
+    }
+    fields = record["fields"]
+    for field in TEXT_FIELDS:
+        if field in row:
+            fields[field] = _text(row[field]) or (None if field == "phone" else "")
+    for field in DECIMAL_FIELDS:
+        if _text(row.get(field)):
+            try:
+                fields[field] = Decimal(_text(row[field]))
+            except InvalidOperation:
+                raise RowError(f"{field} 가 숫자가 아닙니다: {row[field]}")
+    for field in TIME_FIELDS:
+        if field in row:
+            value = _text(row[field])
+            try:
+                fields[field] = time.fromisoformat(value) if value else None
+            except ValueError:
+                raise RowError(f"{field} 는 HH:MM 형식이어야 합니다: {value}")
+    if "is_closed" in row:
+        fields["is_closed"] = _text(row["is_closed"]).lower() in TRUE_VALUES
+    if "category" in row:
+        record["category"] = _text(row["category"])
+    if any(key in row for key in ("region", "sido", "sigungu", "eupmyeondong")):
+        record["region"] = _region_key(row) or ()
+    if "tags" in row:
+        record["tags"] = _split(row["tags"])
+    if "menus" in row:
+        record["menus"] = _menus(row["menus"])
+    return record
+
+
+class Lookups:
+    # 지역/카테고리/태그 이름 → pk. 처음에 한 번 읽고, 없는 것은 청크마다 모아서 한 번에 만든다.
+    def __init__(self):
+        self.regions = {
+            (sido, sigungu, eupmyeondong): pk
+            for pk, sido, sigungu, eupmyeondong in Region.objects.values_list(
+                "pk", "sido", "sigungu", "eupmyeondong"
+            )
+        }
+        self.categories = {}
+        for pk, name in RestaurantCategory.objects.order_by("-pk").values_list(
+            "pk", "name"
+        ):
+            self.categories[name] = pk  # 같은 이름이 여러 개면 가장 먼저 만든 것
+        self.tags = dict(Tag.objects.values_list("name", "pk"))
+
+    def ensure(self, records):
+        regions = {r["region"] for r in records if r["region"]} - set(self.regions)
+        if regions:
+            Region.objects.bulk_create(
+                [Region(sido=s, sigungu=g, eupmyeondong=e) for s, g, e in regions],
+                ignore_conflicts=True,
+            )
+            for pk, *key in Region.objects.filter(
+                sido__in={key[0] for key in regions}
+            ).values_list("pk", "sido", "sigungu", "eupmyeondong"):
+                self.regions[tuple(key)] = pk
+
+        categories = {r["category"] for r in records if r["category"]}
+        categories -= set(self.categories)
+        if categories:
+            created = RestaurantCategory.objects.bulk_create(
+                [RestaurantCategory(name=name) for name in sorted(categories)]
+            )
+            if all(category.pk for category in created):
+                self.categories.update((c.name, c.pk) for c in created)
+            else:  # MySQL 은 bulk_create 가 pk 를 돌려주지 않으므로 다시 읽음
+                for pk, name in RestaurantCategory.objects.filter(
+                    name__in=categories
+                ).values_list("pk", "name"):
+                    self.categories.setdefault(name, pk)
+
+        tags = {tag for r in records for tag in r["tags"] or ()} - set(self.tags)
+        if tags:
+            Tag.objects.bulk_create(
+                [Tag(name=name) for name in tags], ignore_conflicts=True
+            )
+            self.tags.update(
+                Tag.objects.filter(name__in=tags).values_list("name", "pk")
+            )
+
+
+def _key(restaurant):
+    return (restaurant.name, restaurant.branch_name or "", restaurant.address)
+
+
+def _existing(keys):
+    # (이름, 지점, 주소) → Restaurant. 이름/주소 인덱스로 후보를 읽어 정확히 일치하는 것만.
+    found = {}
+    for restaurant in Restaurant.objects.filter(
+        name__in={key[0] for key in keys}, address__in={key[2] for key in keys}
+    ).order_by("pk"):
+        found.setdefault(_key(restaurant), restaurant)
+    return found
+
+
+class RestaurantImporter:
+    def __init__(self, batch_size=1_000):
+        self.batch_size = batch_size
+        self.lookups = Lookups()
+        self.stats = Counter()
+
+    def import_chunk(self, records):
+        # 청크 하나를 트랜잭션 하나로. 쿼리 수는 행 수가 아니라 청크 수에 비례한다.
+        from . import signals
+
+        records = list({record["key"]: record for record in records}.values())
+        with transaction.atomic():
+            self.lookups.ensure(records)
+            existing = _existing([record["key"] for record in records])
+
+            to_create, to_update, update_fields = [], [], set(DERIVED_FIELDS)
+            for record in records:
+                restaurant = existing.get(record["key"])
+                if restaurant is None:
+                    name, branch_name, address = record["key"]
+                    restaurant = Restaurant(
+                        name=name, branch_name=branch_name or None, address=address
+                    )
+                    to_create.append(restaurant)
+                else:
+                    to_update.append(restaurant)
+                for field, value in record["fields"].items():
+                    setattr(restaurant, field, value)
+                update_fields.update(record["fields"])
+                if record["category"] is not None:
+                    restaurant.category_id = self.lookups.categories.get(
+                        record["category"]
+                    )
+                    update_fields.add("category")
+                if record["region"] is not None:
+                    restaurant.region_id = self.lookups.regions.get(record["region"])
+                    update_fields.add("region")
+                region_id = restaurant.region_id
+                restaurant.set_derived_fields()
+                if record["region"]:  # 파일에 적힌 지역이 주소로 찾은 지역보다 우선
+                    restaurant.region_id = region_id
+
+            Restaurant.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                # 기존 행은 전체 컬럼을 읽어 왔으므로 pk 충돌 upsert 로 한 번에 갱신
+                upsert(
+                    Restaurant,
+                    to_update,
+                    unique_fields=["pk"],
+                    update_fields=sorted(update_fields),
+                    batch_size=self.batch_size,
+                )
+            if to_create and to_create[0].pk is None:
+                existing = _existing([record["key"] for record in records])
+            else:
+                existing = {_key(r): r for r in to_create + to_update}
+
+            ids = {record["key"]: existing[record["key"]].pk for record in records}
+            self._sync_tags(records, ids)
+            self._sync_menus(records, ids)
+            signals.restaurants_changed(
+                ids.values()
+            )  # 검색 색인/카드/패싯/메인 캐시 (커밋 후)
+
+        self.stats["created"] += len(to_create)
+        self.stats["updated"] += len(to_update)
+
+    def _sync_tags(self, records, ids):
+        # 파일에 적힌 태그 집합으로 맞춘다: 없는 연결만 추가, 빠진 연결만 삭제
+        Through = Restaurant.tags.through
+        wanted = {
+            ids[record["key"]]: {self.lookups.tags[tag] for tag in record["tags"]}
+            for record in records
+            if record["tags"] is not None
+        }
+        if not wanted:
+            return
+        current = {}
+        stale = []
+        for pk, restaurant_id, tag_id in Through.objects.filter(
+            restaurant_id__in=wanted
+        ).values_list("pk", "restaurant_id", "tag_id"):
+            if tag_id in wanted[restaurant_id]:
+                current.setdefault(restaurant_id, set()).add(tag_id)
+            else:
+                stale.append(pk)
+        if stale:
+            Through.objects.filter(pk__in=stale).delete()
+        Through.objects.bulk_create(
+            [
+                Through(restaurant_id=restaurant_id, tag_id=tag_id)
+                for restaurant_id, tag_ids in wanted.items()
+                for tag_id in tag_ids - current.get(restaurant_id, set())
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def _sync_menus(self, records, ids):
+        # (레스토랑, 메뉴 이름) 기준 upsert. 파일에 없는 기존 메뉴는 지우지 않는다(이미지 보존).
+        wanted = {
+            ids[record["key"]]: record["menus"] for record in records if record["menus"]
+        }
+        if not wanted:
+            return
+        changed = []
+        for menu in RestaurantMenu.objects.filter(restaurant_id__in=wanted).only(
+            "pk", "restaurant_id", "name", "price"
+        ):
+            price = wanted[menu.restaurant_id].pop(menu.name, None)
+            if price is not None and price != menu.price:
+                menu.price = price
+                changed.append(menu)
+        RestaurantMenu.objects.bulk_update(
+            changed, ["price"], batch_size=self.batch_size
+        )
+        RestaurantMenu.objects.bulk_create(
+            [
+                RestaurantMenu(restaurant_id=restaurant_id, name=name, price=price)
+                for restaurant_id, items in wanted.items()
+                for name, price in items.items()
+            ],
+            batch_size=self.batch_size,
+        )
+        self.stats["menus"] += len(changed) + sum(map(len, wanted.values()))
+        # bulk_create/bulk_update 는 시그널이 없으므로 가격 요약과 이름 사전을 직접
+        menus.refresh(wanted)
+        names = [name for items in wanted.values() for name in items]
+        transaction.on_commit(lambda: menus.remember_names(names))
+
+    def run(self, rows, on_error=None):
+        # rows: read_rows() 결과. 청크마다 처리한 행 수를 yield (진행률 표시용)
+        done = 0
+        for chunk in chunked(rows, self.batch_size):
+            records = []
+            for line_no, row in chunk:
+                try:
+                    if isinstance(row, RowError):
+                        raise row
+                    records.append(parse_row(row))
+                except RowError as error:
+                    self.stats["skipped"] += 1
+                    if on_error:
+                        on_error(line_no, error)
+            if records:
+                self.import_chunk(records)
+            done += len(chunk)
+            yield done
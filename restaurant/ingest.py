@@ -0,0 +1,430 @@
+import http.client
+import ipaddress
+import logging
+import posixpath
+import socket
+import threading
+import urllib.request
+from collections import Counter
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from . import feed, fragments, images, ratings, realtime
+from .bulk import chunked
+from .importer import RowError
+from .models import Restaurant, Review, ReviewImage, SocialChannel
+
+logger = logging.getLogger(__name__)
+
+# 크롤러가 보내는 NDJSON 한 줄 (restaurant/api.py ReviewBatch):
+#   {"key": "naver:123", "restaurant": 1, "title": "..", "author": "..", "content": "..",
+#    "rating": 5, "channel": "네이버", "images": ["https://..", {"url": "https://..", "name": ".."}]}
+# key 는 크롤러가 정하는 고유 키. 같은 키를 다시 보내면 건너뛰므로 배치를 통째로 재전송해도 안전하다.
+TEXT_FIELDS = ("title", "author", "content")
+URL_SCHEMES = ("http", "https")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def _images(value):
+    # ["url", ...] 또는 [{"url": .., "name": ..}, ...] → [(url, name)]
+    if value in (None, ""):
+        return []
+    if not isinstance(value, list):
+        raise RowError("images 는 리스트여야 합니다.")
+    result = []
+    for item in value:
+        url, name = (
+            (_text(item.get("url")), _text(item.get("name")))
+            if isinstance(item, dict)
+            else (_text(item), "")
+        )
+        if urlparse(url).scheme not in URL_SCHEMES:
+            raise RowError(f"이미지 URL 은 http(s) 여야 합니다: {url}")
+        if len(url) > _max_length(ReviewImage, "source_url"):
+            raise RowError(f"이미지 URL 이 너무 깁니다: {url[:50]}…")
+        name = name or posixpath.basename(urlparse(url).path) or "image"
+        result.append((url, name[: _max_length(ReviewImage, "name")]))
+    return result
+
+
+def parse_review(row):
+    # 한 줄 → 레코드. 모델 검증기(1~5점, 최대 길이)와 같은 규칙을 full_clean() 없이 파이썬에서 확인한다.
+    if not isinstance(row, dict):
+        raise RowError("한 줄에 JSON 객체 하나여야 합니다.")
+    key = _text(row.get("key"))
+    if not key:
+        raise RowError("key 가 비어 있습니다.")
+    if len(key) > _max_length(Review, "source_key"):
+        raise RowError(f"key 가 너무 깁니다: {key[:50]}…")
+    try:
+        restaurant_id = int(row.get("restaurant"))
+        rating = int(row.get("rating"))
+    except (TypeError, ValueError):
+        raise RowError("restaurant 와 rating 은 정수여야 합니다.")
+    if rating not in ratings.STARS:
+        raise RowError(f"rating 은 1~5 사이여야 합니다: {rating}")
+    fields = {}
+    for field in TEXT_FIELDS:
+        value = _text(row.get(field))
+        if not value:
+            raise RowError(f"{field} 가 비어 있습니다.")
+        limit = _max_length(Review, field)
+        if limit and len(value) > limit:
+            raise RowError(f"{field} 는 {limit}자 이하여야 합니다.")
+        fields[field] = value
+    channel = _text(row.get("channel"))
+    if len(channel) > _max_length(SocialChannel, "name"):
+        raise RowError(f"channel 이 너무 깁니다: {channel[:50]}…")
+    return {
+        "key": key,
+        "restaurant_id": restaurant_id,
+        "rating": rating,
+        "fields": fields,
+        "channel": channel or None,
+        "images": _images(row.get("images")),
+    }
+
+
+class ReviewIngester:
+    def __init__(self, batch_size=500, max_errors=100, fetch=True):
+        # fetch=False: 이미지 행만 만들고 내려받기는 나중에 (ingest_reviews --fetch-pending)
+        self.batch_size = batch_size
+        self.fetch = fetch
+        self.max_errors = max_errors
+        self.stats = Counter()
+        self.errors = []  # [(줄 번호, 메시지)] 앞에서부터 max_errors 개
+        self.channels = None  # 이름 → pk (처음 쓸 때 한 번 읽음)
+
+    def error(self, line_no, error):
+        self.stats["skipped"] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_no, str(error)))
+
+    def _ensure_channels(self, records):
+        # 처음 보는 채널 이름만 모아서 만든다 (SocialChannel.name 은 unique 가 아니므로 가장 먼저 만든 것을 쓴다)
+        if self.channels is None:
+            self.channels = {}
+            for pk, name in SocialChannel.objects.order_by("-pk").values_list(
+                "pk", "name"
+            ):
+                self.channels[name] = pk
+        names = {r["channel"] for r in records if r["channel"]} - set(self.channels)
+        if not names:
+            return
+        SocialChannel.objects.bulk_create(
+            [SocialChannel(name=name) for name in sorted(names)]
+        )
+        for pk, name in (
+            SocialChannel.objects.filter(name__in=names)
+            .order_by("-pk")
+            .values_list("pk", "name")
+        ):
+            self.channels[name] = pk
+
+    def ingest_chunk(self, records):
+        # records: [(줄 번호, 레코드)]. 같은 키를 가진 다른 요청과 동시에 넣다가 UNIQUE 에 걸리면
+        # 청크가 통째로 롤백되므로 이미 있는 키를 다시 읽고 한 번 더 시도한다.
+        try:
+            self._ingest_chunk(records)
+        except IntegrityError:
+            self.channels = None
+            self._ingest_chunk(records)
+
+    def _ingest_chunk(self, records):
+        # 청크 하나 = 트랜잭션 하나. 쿼리 수는 리뷰 수가 아니라 청크 수에 비례한다.
+        stats, errors = Counter(), []
+        seen, unique = set(), []
+        for line_no, record in records:
+            if record["key"] in seen:
+                stats["duplicates"] += 1
+            else:
+                seen.add(record["key"])
+                unique.append((line_no, record))
+
+        with transaction.atomic():
+            existing = set(
+                Review.objects.filter(source_key__in=seen).values_list(
+                    "source_key", flat=True
+                )
+            )
+            restaurants = set(
+                Restaurant.objects.filter(
+                    pk__in={record["restaurant_id"] for _, record in unique}
+                ).values_list("pk", flat=True)
+            )
+            fresh = []
+            for line_no, record in unique:
+                if record["key"] in existing:
+                    stats["duplicates"] += 1
+                elif record["restaurant_id"] not in restaurants:
+                    errors.append(
+                        (line_no, f"레스토랑이 없습니다: {record['restaurant_id']}")
+                    )
+                else:
+                    fresh.append(record)
+            if not fresh:
+                self._merge(stats, errors)
+                return
+
+            self._ensure_channels(fresh)
+            reviews = Review.objects.bulk_create(
+                [
+                    Review(
+                        source_key=record["key"],
+                        restaurant_id=record["restaurant_id"],
+                        rating=record["rating"],
+                        social_channel_id=self.channels.get(record["channel"]),
+                        **record["fields"],
+                    )
+                    for record in fresh
+                ],
+                batch_size=self.batch_size,
+            )
+            if reviews[0].pk is None:
+                # MySQL 은 bulk_create 가 pk 를 돌려주지 않으므로 다시 읽음
+                ids = dict(
+                    Review.objects.filter(
+                        source_key__in=[r["key"] for r in fresh]
+                    ).values_list("source_key", "pk")
+                )
+            else:
+                ids = {review.source_key: review.pk for review in reviews}
+            for review in reviews:
+                review.pk = ids[review.source_key]
+            realtime.reviews_created(reviews)
+
+            # 이미지는 URL 만 적어 둔 채로 만들고(image=""), 내려받기는 커밋 후 백그라운드에서 한다
+            pending = [
+                ReviewImage(review_id=ids[record["key"]], name=name, source_url=url)
+                for record in fresh
+                for url, name in record["images"]
+            ]
+            if pending:
+                ReviewImage.objects.bulk_create(pending, batch_size=self.batch_size)
+            if pending and self.fetch:
+                schedule_fetch(
+                    ReviewImage.objects.filter(
+                        review_id__in=ids.values(), image=""
+                    ).values_list("pk", flat=True)
+                )
+
+            # 별점 집계는 리뷰마다가 아니라 청크마다 레스토랑당 UPDATE 두 번
+            changes = ratings.RatingChanges()
+            for record in fresh:
+                changes.add(record["restaurant_id"], record["rating"])
+            changes.apply()
+            transaction.on_commit(lambda: fragments.bump(fragments.INDEX_RESTAURANTS))
+            feed.invalidate(record["restaurant_id"] for record in fresh)
+
+        stats["created"] += len(fresh)
+        stats["images"] += len(pending)
+        self._merge(stats, errors)
+
+    def _merge(self, stats, errors):
+        # 트랜잭션이 커밋된 뒤에만 통계에 더한다 (재시도 때 두 번 세지 않도록)
+        self.stats.update(stats)
+        for line_no, error in errors:
+            self.error(line_no, error)
+
+    def run(self, rows):
+        # rows: importer.read_rows() 처럼 (줄 번호, dict 또는 RowError). 청크마다 처리한 줄 수를 yield.
+        done = 0
+        for chunk in chunked(rows, self.batch_size):
+            records = []
+            for line_no, row in chunk:
+                try:
+                    if isinstance(row, RowError):
+                        raise row
+                    records.append((line_no, parse_review(row)))
+                except RowError as error:
+                    self.error(line_no, error)
+            if records:
+                self.ingest_chunk(records)
+            done += len(chunk)
+            yield done
+
+
+def allowed_host(host):
+    # REVIEW_IMAGE_HOSTS 가 비어 있으면 모든 공개 호스트, 아니면 그 도메인과 하위 도메인만
+    domains = settings.REVIEW_IMAGE_HOSTS
+    return not domains or any(
+        host == domain or host.endswith("." + domain) for domain in domains
+    )
+
+
+def public_addresses(host, port):
+    # 크롤러가 보낸 URL 로 내부망(루프백/사설/링크 로컬 등)에 요청하지 않도록, 이름이 가리키는 주소가
+    # 하나라도 공인 주소가 아니면 거절한다
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not address.is_global:
+            raise ValueError(f"공인 주소가 아닙니다: {host} ({address})")
+    return infos
+
+
+def _connect_public(address, timeout, source_address=None):
+    # http.client 의 연결 함수 대신. 검사한 주소로 바로 연결하므로 검사와 연결 사이에 DNS 가 바뀌어도 안전하다.
+    error = OSError(f"주소가 없습니다: {address[0]}")
+    for family, kind, proto, _, sockaddr in public_addresses(*address):
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as exc:
+            sock.close()
+            error = exc
+    raise error
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = (
+            _connect_public  # __init__ 이 인스턴스 속성으로 정한다
+        )
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _connect_public
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # 리다이렉트는 따라가지 않는다 (3xx 는 HTTPError 로 실패)
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(
+    urllib.request.ProxyHandler(
+        {}
+    ),  # 환경 변수의 프록시를 거치면 주소 검사가 프록시에만 걸린다
+    _PublicHTTPHandler,
+    _PublicHTTPSHandler,
+    _NoRedirect,
+)
+
+
+def download(url, max_bytes):
+    parsed = urlparse(url)
+    if parsed.scheme not in URL_SCHEMES or not parsed.hostname:
+        raise ValueError(f"http(s) URL 이 아닙니다: {url}")
+    if not allowed_host(parsed.hostname.lower()):
+        raise ValueError(f"허용되지 않은 호스트입니다: {parsed.hostname}")
+    request = urllib.request.Request(url, headers={"User-Agent": "restaurant-ingest"})
+    with _opener.open(request, timeout=settings.REVIEW_IMAGE_FETCH_TIMEOUT) as response:
+        data = response.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"{max_bytes} 바이트보다 큽니다")
+    return data
+
+
+def fetch_images(pks):
+    # 아직 내려받지 않은 리뷰 이미지를 받아 blobs 에 저장하고 파생 이미지 생성을 맡긴다. 반환값은 개수 통계.
+    field = ReviewImage._meta.get_field("image")
+    stats = Counter()
+    for image in (
+        ReviewImage.objects.filter(pk__in=list(pks), image="")
+        .exclude(source_url="")
+        .select_related("review")
+    ):
+        try:
+            data = download(image.source_url, settings.REVIEW_IMAGE_MAX_BYTES)
+        except (OSError, ValueError) as error:
+            logger.warning("리뷰 이미지 내려받기 실패 %s: %s", image.source_url, error)
+            stats["failed"] += 1
+            continue
+        extension = posixpath.splitext(urlparse(image.source_url).path)[1]
+        name = field.storage.save(
+            field.generate_filename(image, f"{image.pk}{extension or '.jpg'}"),
+            ContentFile(data),
+            max_length=field.max_length,
+        )
+        now = timezone.now()
+        if ReviewImage.objects.filter(pk=image.pk, image="").update(
+            image=name, updated_at=now
+        ):
+            Review.objects.filter(pk=image.review_id).update(updated_at=now)
+            feed.invalidate([image.review.restaurant_id])
+            images.schedule(name)
+            stats["fetched"] += 1
+        else:  # 다른 워커가 먼저 받았으면 올린 참조를 놓는다
+            field.storage.delete(name)
+    return stats
+
+
+def pending_images():
+    return ReviewImage.objects.filter(image="").exclude(source_url="")
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    # 내려받기는 I/O 대기라 스레드 풀로 충분하다
+    global _fetcher
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ThreadPoolExecutor(
+                max_workers=settings.REVIEW_IMAGE_FETCH_WORKERS,
+                thread_name_prefix="review-images",
+            )
+    return _fetcher
+
+
+def _fetch_in_thread(pks):
+    try:
+        return fetch_images(pks)
+    finally:
+        connections.close_all()  # 이 스레드가 연 연결
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("리뷰 이미지 처리 중 오류", exc_info=future.exception())
+
+
+def schedule_fetch(pks):
+    # 요청 스레드에서는 커밋 후 pk 목록을 풀에 넘기기만 한다. 실패한 것은 ingest_reviews --fetch-pending 으로 다시.
+    pks = list(pks)
+    if not pks:
+        return
+
+    def submit():
+        if settings.REVIEW_IMAGE_FETCH_ASYNC:
+            get_fetcher().submit(_fetch_in_thread, pks).add_done_callback(_log_failure)
+        else:
+            fetch_images(pks)
+
+    transaction.on_commit(submit)
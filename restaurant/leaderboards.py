@@ -0,0 +1,307 @@
+import bisect
+import os
+import pickle
+import tempfile
+import threading
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .bulk import chunked
+
+ALL = ("all", None)
+REGION = "region"
+CATEGORY = "category"
+# 다른 프로세스의 변경을 updated_at 으로 따라잡을 때 겹쳐 읽는 구간. updated_at 은 문장 실행 시각이라
+# 그보다 늦게 커밋된 트랜잭션도 놓치지 않도록.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class SortedList:
+    # 정렬된 짧은 리스트(버킷)들의 리스트. 버킷 최댓값(maxes)을 이분 탐색해서 버킷을 찾고 그 안에서만 넣고 뺀다.
+    # 통째로 다시 정렬하지 않고 O(log n) 탐색 + 버킷 크기(LOAD)만큼의 이동으로 끝난다.
+    LOAD = 500
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self.buckets = [
+            keys[start : start + self.LOAD] for start in range(0, len(keys), self.LOAD)
+        ]
+        self.maxes = [bucket[-1] for bucket in self.buckets]
+        self.size = len(keys)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, key):
+        self.size += 1
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            return
+        slot = bisect.bisect_left(self.maxes, key)
+        if slot == len(self.maxes):
+            slot -= 1
+            self.buckets[slot].append(key)
+            self.maxes[slot] = key
+        else:
+            bisect.insort(self.buckets[slot], key)
+        bucket = self.buckets[slot]
+        if len(bucket) > 2 * self.LOAD:
+            half = bucket[self.LOAD :]
+            del bucket[self.LOAD :]
+            self.buckets.insert(slot + 1, half)
+            self.maxes[slot] = bucket[-1]
+            self.maxes.insert(slot + 1, half[-1])
+
+    def remove(self, key):
+        slot = bisect.bisect_left(self.maxes, key)
+        bucket = self.buckets[slot]
+        del bucket[bisect.bisect_left(bucket, key)]
+        self.size -= 1
+        if bucket:
+            self.maxes[slot] = bucket[-1]
+        else:
+            del self.buckets[slot]
+            del self.maxes[slot]
+
+    def index(self, key):
+        slot = bisect.bisect_left(self.maxes, key)
+        before = sum(len(bucket) for bucket in self.buckets[:slot])
+        return before + bisect.bisect_left(self.buckets[slot], key)
+
+    def slice(self, start, stop):
+        # [start, stop) 번째 키들. 앞쪽 버킷은 길이만 보고 건너뛴다.
+        found = []
+        count = stop - start
+        for bucket in self.buckets:
+            if start >= len(bucket):
+                start -= len(bucket)
+                continue
+            found += bucket[start : start + count - len(found)]
+            start = 0
+            if len(found) >= count:
+                break
+        return found
+
+
+class Leaderboards:
+    # 전체 / 지역별 / 카테고리별 순위표. 점수는 베이지안 평균 (C·m + 별점 합) / (C + 평가 수):
+    # 리뷰가 적을수록 전체 평균 m 쪽으로 당겨지므로 5점 하나짜리가 4.7점 250개를 앞서지 못한다.
+    # m 은 만들 때 한 번 정해 두고 다시 만들 때까지 고정한다 (m 이 바뀌면 모든 점수가 움직이므로).
+    # 키는 (-점수, -평가 수, pk) 라 오름차순이 곧 순위.
+
+    def __init__(self, prior_mean, prior_weight):
+        self.prior_mean = prior_mean
+        self.prior_weight = prior_weight
+        self.boards = {}  # 범위 → SortedList
+        self.entries = {}  # pk → (키, 지역 id, 카테고리 id)
+        self.built_at = self.synced_at = timezone.now()
+
+    @classmethod
+    def from_rows(cls, rows, prior_weight):
+        # rows: (pk, 지역 id, 카테고리 id, 폐업 여부, 별점 합, 평가 수)
+        rows = [row for row in rows if not row[3] and row[5]]
+        total = sum(row[5] for row in rows)
+        prior_mean = sum(row[4] for row in rows) / total if total else 0.0
+        boards = cls(prior_mean, prior_weight)
+        keys = {}
+        for pk, region, category, _, rating_sum, rating_count in rows:
+            key = boards.key(pk, rating_sum, rating_count)
+            boards.entries[pk] = (key, region, category)
+            for scope in boards.scopes(region, category):
+                keys.setdefault(scope, []).append(key)
+        boards.boards = {scope: SortedList(values) for scope, values in keys.items()}
+        return boards
+
+    def score(self, rating_sum, rating_count):
+        return (self.prior_weight * self.prior_mean + rating_sum) / (
+            self.prior_weight + rating_count
+        )
+
+    def key(self, pk, rating_sum, rating_count):
+        return (-self.score(rating_sum, rating_count), -rating_count, pk)
+
+    def scopes(self, region, category):
+        yield ALL
+        if region is not None:
+            yield (REGION, region)
+        if category is not None:
+            yield (CATEGORY, category)
+
+    def set(self, pk, region, category, closed, rating_sum, rating_count):
+        self.remove(pk)
+        if closed or not rating_count:  # 평가가 없는 곳은 순위에 넣지 않는다
+            return
+        key = self.key(pk, rating_sum, rating_count)
+        self.entries[pk] = (key, region, category)
+        for scope in self.scopes(region, category):
+            self.boards.setdefault(scope, SortedList()).add(key)
+
+    def remove(self, pk):
+        entry = self.entries.pop(pk, None)
+        if entry is None:
+            return
+        key, region, category = entry
+        for scope in self.scopes(region, category):
+            board = self.boards[scope]
+            board.remove(key)
+            if not board:
+                del self.boards[scope]
+
+    def top(self, scope=ALL, limit=20, offset=0):
+        # [(pk, 점수, 평가 수)]
+        board = self.boards.get(scope)
+        if board is None:
+            return []
+        return [
+            (pk, -negative_score, -negative_count)
+            for negative_score, negative_count, pk in board.slice(
+                offset, offset + limit
+            )
+        ]
+
+    def rank(self, pk, scope=ALL):
+        # 1부터. 순위표에 없으면 None
+        entry = self.entries.get(pk)
+        if entry is None or scope not in set(self.scopes(*entry[1:])):
+            return None
+        return self.boards[scope].index(entry[0]) + 1
+
+
+def _rows(queryset):
+    return queryset.values_list(
+        "pk", "region_id", "category_id", "is_closed", "rating_sum", "rating_count"
+    )
+
+
+def build():
+    from .models import Restaurant
+
+    started = timezone.now()
+    boards = Leaderboards.from_rows(
+        _rows(Restaurant.objects.all()).iterator(chunk_size=10_000),
+        settings.LEADERBOARD_PRIOR_WEIGHT,
+    )
+    boards.synced_at = started  # 읽는 동안 바뀐 것은 다음 catch_up 이 다시 읽는다
+    return boards
+
+
+def save(boards, path=None):
+    path = Path(path or settings.LEADERBOARD_SNAPSHOT)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=path.parent, suffix=".pickle")
+    with os.fdopen(fd, "wb") as snapshot:
+        pickle.dump(boards, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def load(path=None):
+    try:
+        with open(path or settings.LEADERBOARD_SNAPSHOT, "rb") as snapshot:
+            return pickle.load(snapshot)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def apply(boards, rows):
+    for pk, region, category, closed, rating_sum, rating_count in rows:
+        boards.set(pk, region, category, closed, rating_sum, rating_count)
+
+
+def catch_up(boards):
+    # 마지막으로 맞춘 뒤 updated_at 이 바뀐 레스토랑만 다시 읽는다 (평점 집계도 updated_at 을 올린다).
+    # 삭제된 레스토랑은 여기서 보이지 않으므로 다음 재구축 때 빠진다. 조회는 락 밖에서, 반영만 락 안에서.
+    from .models import Restaurant
+
+    now = timezone.now()
+    rows = list(
+        _rows(
+            Restaurant.objects.filter(updated_at__gte=boards.synced_at - SYNC_OVERLAP)
+        )
+    )
+    with _boards_lock:
+        apply(boards, rows)
+        boards.synced_at = now
+
+
+_boards = None
+_boards_lock = (
+    threading.Lock()
+)  # 순위표 읽기/수정. DB 조회나 재구축 동안에는 잡지 않는다.
+_sync_lock = threading.Lock()  # 재구축/따라잡기는 한 스레드만
+
+
+def _stale(boards, now):
+    if boards is None:
+        return True
+    return (
+        now - boards.built_at > timedelta(seconds=settings.LEADERBOARD_MAX_AGE)
+        or boards.prior_weight != settings.LEADERBOARD_PRIOR_WEIGHT
+    )
+
+
+def _behind(boards, now):
+    return now - boards.synced_at > timedelta(seconds=settings.LEADERBOARD_SYNC_SECONDS)
+
+
+def get_boards():
+    # 프로세스 단위 싱글턴. 처음에는 디스크 스냅샷을 읽고 그 뒤 바뀐 것만 따라잡는다 (없거나 오래됐으면 DB에서 만들고 저장).
+    # LEADERBOARD_MAX_AGE 마다 다시 만들어 평균 m 과 삭제를 반영하고, LEADERBOARD_SYNC_SECONDS 마다 다른 워커의 변경을 따라잡는다.
+    # 새로 만드는 동안 다른 요청은 기다리지 않고 지금 순위표를 쓰며, 다 만든 뒤 참조만 바꾼다.
+    global _boards
+    boards = _boards
+    now = timezone.now()
+    if boards is not None and not _stale(boards, now) and not _behind(boards, now):
+        return boards
+    if boards is None:
+        _sync_lock.acquire()  # 보여줄 것이 없으니 먼저 시작한 스레드를 기다린다
+    elif not _sync_lock.acquire(blocking=False):
+        return boards  # 다른 스레드가 이미 맞추는 중
+    try:
+        boards = _boards
+        now = timezone.now()
+        if boards is None:
+            boards = load()
+            if boards is not None and not _stale(boards, now):
+                catch_up(boards)
+        if _stale(boards, now):
+            boards = build()
+            save(boards)
+            catch_up(boards)  # 만드는 동안 커밋된 refresh 를 새 순위표에도 반영
+        elif _behind(boards, now):
+            catch_up(boards)
+        with _boards_lock:
+            _boards = boards
+        return boards
+    finally:
+        _sync_lock.release()
+
+
+def reset_boards():
+    global _boards
+    with _boards_lock:
+        _boards = None
+
+
+def refresh(pks, chunk_size=1_000):
+    # 커밋된 평점/지역/카테고리/폐업 여부로 이 레스토랑들의 자리를 다시 잡는다. 없어진 레스토랑은 뺀다.
+    from .models import Restaurant
+
+    if _boards is None:  # 아직 만들어지지 않았으면 첫 조회 때 읽어온다
+        return
+    for chunk in chunked(sorted(set(pks)), chunk_size):
+        rows = list(_rows(Restaurant.objects.filter(pk__in=chunk)))
+        with _boards_lock:
+            boards = _boards  # 그 사이 재구축으로 바뀌었으면 새 순위표에
+            apply(boards, rows)
+            for pk in set(chunk) - {row[0] for row in rows}:
+                boards.remove(pk)
+
+
+def top(scope=ALL, limit=20, offset=0):
+    boards = get_boards()
+    with _boards_lock:
+        return boards.top(scope, limit, offset)
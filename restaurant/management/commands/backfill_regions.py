@@ -0,0 +1,73 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from restaurant import regions, signals
+from restaurant.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = (
+        "레스토랑 주소를 지역(Region) 트라이로 해석해 region 을 청크 단위로 채웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5_000)
+        parser.add_argument(
+            "--only-missing", action="store_true", help="region 이 비어 있는 레스토랑만"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="저장하지 않고 해석 결과만 보고"
+        )
+
+    def handle(self, *args, chunk_size, only_missing, dry_run, **options):
+        regions.reset_resolver()
+        resolver = regions.get_resolver()
+        queryset = Restaurant.objects.all()
+        if only_missing:
+            queryset = queryset.filter(region__isnull=True)
+
+        started = time.perf_counter()
+        checked = changed = unresolved = 0
+        samples = []
+        last_id = 0
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", "address", "region_id")[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            checked += len(rows)
+
+            # 같은 지역끼리 모아 UPDATE ... WHERE id IN (...) 한 번씩
+            by_region = defaultdict(list)
+            for pk, address, region_id in rows:
+                resolved = resolver.resolve(address)
+                if resolved is None:
+                    unresolved += 1
+                    if len(samples) < 10 and address:
+                        samples.append(address)
+                elif resolved != region_id:
+                    by_region[resolved].append(pk)
+            changed += sum(map(len, by_region.values()))
+            if dry_run or not by_region:
+                continue
+            with transaction.atomic():
+                for region_id, pks in by_region.items():
+                    Restaurant.objects.filter(pk__in=pks).update(region_id=region_id)
+                signals.restaurants_changed(
+                    [pk for pks in by_region.values() for pk in pks], search_index=False
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"checked {checked} restaurants in {elapsed:.1f}s, "
+            f"{changed} {'would change' if dry_run else 'updated'}, {unresolved} unresolved"
+        )
+        for address in samples:
+            self.stdout.write(f"  unresolved: {address}")
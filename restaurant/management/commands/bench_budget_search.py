@@ -0,0 +1,188 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min
+
+from restaurant import bench, geo, menus
+from restaurant.models import Restaurant, RestaurantMenu
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        '예산 검색("근처 8,000원 이하 김밥"): 메뉴 JOIN + MIN() 집계 vs 메뉴 가격 요약/인덱스를 쓰는 '
+        "menus.budget_search 벤치마크. 합성 데이터는 마지막에 롤백합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=500_000)
+        parser.add_argument("--menus-per-restaurant", type=int, default=20)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument(
+            "--baseline-queries",
+            type=int,
+            default=5,
+            help="JOIN 방식은 느리므로 따로 적게",
+        )
+        parser.add_argument("--radius", type=float, default=1.0, help="km")
+        parser.add_argument("--max-price", type=int, default=8_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            # 시드 중에는 내구성보다 속도
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            geo.reset_index()
+            menus.reset_names()
+
+    def seed(self, restaurants, menus_per_restaurant, seed):
+        started = time.perf_counter()
+        total = 0
+        for chunk in bench.chunked(
+            bench.synthetic_restaurants(restaurants, seed), 5_000
+        ):
+            created = Restaurant.objects.bulk_create(chunk)
+            for batch in bench.chunked(
+                bench.synthetic_menus(
+                    [restaurant.pk for restaurant in created],
+                    menus_per_restaurant,
+                    seed=seed + created[0].pk,
+                ),
+                10_000,
+            ):
+                RestaurantMenu.objects.bulk_create(batch)
+            total += len(created)
+            if total % 50_000 == 0:
+                self.stdout.write(
+                    f"{total:,} restaurants ({time.perf_counter() - started:.0f}s)"
+                )
+        self.stdout.write(
+            f"seeded {restaurants:,} restaurants, "
+            f"{restaurants * menus_per_restaurant:,} menus in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+        started = time.perf_counter()
+        summaries = menus.rebuild(5_000)
+        self.stdout.write(
+            f"built {summaries:,} menu summaries in {time.perf_counter() - started:.1f}s"
+        )
+
+    def run(
+        self,
+        restaurants,
+        menus_per_restaurant,
+        queries,
+        baseline_queries,
+        radius,
+        max_price,
+        seed,
+        **options,
+    ):
+        self.seed(restaurants, menus_per_restaurant, seed)
+        geo.reset_index()
+        menus.reset_names()
+        started = time.perf_counter()
+        geo.get_index()
+        self.stdout.write(f"built geo index in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        names = menus.get_names()
+        self.stdout.write(
+            f"built menu name dictionary ({len(names.names):,} names) in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+        rng = random.Random(seed + 1)
+        points = [bench.random_point(rng) for _ in range(queries)]
+        dishes = [rng.choice(bench.MENUS) for _ in range(queries)]
+
+        def join_near(latitude, longitude, query):
+            # 기존 방식: 바운딩 박스 안 레스토랑과 메뉴를 JOIN 해서 레스토랑마다 MIN(price)
+            return list(
+                Restaurant.objects.filter(is_closed=False)
+                .bounding_box(latitude, longitude, radius)
+                .filter(
+                    restaurantmenu__price__lte=max_price,
+                    restaurantmenu__name__icontains=query,
+                )
+                .annotate(cheapest=Min("restaurantmenu__price"))
+                .order_by("cheapest", "pk")
+                .values_list("pk", "cheapest")[:20]
+            )
+
+        def join_global(query):
+            return list(
+                Restaurant.objects.filter(
+                    is_closed=False,
+                    restaurantmenu__price__lte=max_price,
+                    restaurantmenu__name__icontains=query,
+                )
+                .annotate(cheapest=Min("restaurantmenu__price"))
+                .order_by("cheapest", "pk")
+                .values_list("pk", "cheapest")[:20]
+            )
+
+        def near(latitude, longitude, query):
+            return menus.budget_search(
+                max_price,
+                query=query,
+                latitude=latitude,
+                longitude=longitude,
+                radius_km=radius,
+            )
+
+        def near_any(latitude, longitude):
+            return menus.budget_search(
+                max_price, latitude=latitude, longitude=longitude, radius_km=radius
+            )
+
+        def near_wide(latitude, longitude, query):
+            # 반경이 넓어 후보가 CANDIDATE_LIMIT 를 넘으면 가격순 훑기로 바뀐다
+            return menus.budget_search(
+                max_price,
+                query=query,
+                latitude=latitude,
+                longitude=longitude,
+                radius_km=radius * 5,
+            )
+
+        def anywhere(query):
+            return menus.budget_search(max_price, query=query)
+
+        near_args = [(lat, lon, dish) for (lat, lon), dish in zip(points, dishes)]
+        scenarios = {
+            "join_near": (join_near, near_args[:baseline_queries]),
+            "join_global": (
+                join_global,
+                [(dish,) for dish in dishes[:baseline_queries]],
+            ),
+            "budget_near": (near, near_args),
+            "budget_near_any_dish": (near_any, points),
+            "budget_near_wide": (near_wide, near_args),
+            "budget_global": (anywhere, [(dish,) for dish in dishes]),
+            "budget_global_rare": (anywhere, [(bench.RARE_MENU,)] * queries),
+            # 어떤 메뉴에도 없는 문자열: 사전과 최근 행만 보고 끝나야 한다
+            "budget_global_miss": (
+                anywhere,
+                [(f"없는메뉴{rng.randrange(10**9)}",) for _ in range(queries)],
+            ),
+        }
+        self.stdout.write(f"{'method':<24}{'p50':>10}{'p95':>10}{'p99':>10} (ms)")
+        for name, (func, args_list) in scenarios.items():
+            func(*args_list[0])  # 워밍업
+            stats = bench.measure(func, args_list)
+            self.stdout.write(
+                f"{name:<24}{stats['p50_ms']:>10.2f}"
+                f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            )
@@ -0,0 +1,183 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from restaurant import bench, facets
+from restaurant.models import CuisineType, Region, Restaurant, RestaurantCategory, Tag
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "패싯 필터: 조건에 맞는 레스토랑 수와 태그/카테고리/음식 종류/지역별 수를 SQL GROUP BY 로 세는 것과 "
+        "인메모리 비트셋(restaurant/facets.py)으로 세는 것을 비교하고, 비트셋 재구축 시간을 잽니다. "
+        "합성 데이터는 마지막에 롤백합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=1_000_000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--dongs-per-gu", type=int, default=20)
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument(
+            "--baseline-runs", type=int, default=3, help="SQL 방식은 느리므로 따로 적게"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            # 시드 중에는 내구성보다 속도
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            facets.reset_index()
+
+    def seed(self, restaurants, tags, dongs_per_gu, seed):
+        started = time.perf_counter()
+        rng = random.Random(seed)
+        category_ids = []
+        for cuisine_name, category_names in bench.CUISINES.items():
+            cuisine = CuisineType.objects.create(name=cuisine_name)
+            category_ids += [
+                category.pk
+                for category in RestaurantCategory.objects.bulk_create(
+                    RestaurantCategory(name=name, cuisine_type=cuisine)
+                    for name in category_names
+                )
+            ]
+        region_ids = [
+            region.pk
+            for region in Region.objects.bulk_create(
+                Region(sido="벤치", sigungu=gu, eupmyeondong=f"{gu[:-1]}{number}동")
+                for gu in bench.SEOUL_GU
+                for number in range(1, dongs_per_gu + 1)
+            )
+        ]
+        tag_ids = [
+            tag.pk
+            for tag in Tag.objects.bulk_create(
+                Tag(name=f"패싯 벤치 태그{number}") for number in range(tags)
+            )
+        ]
+        # 태그는 인기 차이가 크다 (앞쪽 태그일수록 많이 붙음)
+        weights = [1 / (rank + 1) for rank in range(tags)]
+        TagLink = Restaurant.tags.through
+        total = 0
+        for chunk in bench.chunked(
+            bench.synthetic_restaurants(restaurants, seed), 5_000
+        ):
+            for restaurant in chunk:
+                restaurant.category_id = rng.choice(category_ids)
+                restaurant.region_id = rng.choice(region_ids)
+            created = Restaurant.objects.bulk_create(chunk)
+            TagLink.objects.bulk_create(
+                TagLink(restaurant_id=restaurant.pk, tag_id=tag_id)
+                for restaurant in created
+                for tag_id in set(rng.choices(tag_ids, weights, k=rng.randint(1, 5)))
+            )
+            total += len(created)
+            if total % 100_000 == 0:
+                self.stdout.write(
+                    f"{total:,} restaurants ({time.perf_counter() - started:.0f}s)"
+                )
+        self.stdout.write(
+            f"seeded {restaurants:,} restaurants, {TagLink.objects.count():,} tag links "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return category_ids, region_ids, tag_ids
+
+    def run(
+        self, restaurants, tags, dongs_per_gu, runs, baseline_runs, seed, **options
+    ):
+        category_ids, region_ids, tag_ids = self.seed(
+            restaurants, tags, dongs_per_gu, seed
+        )
+        facets.reset_index()
+        started = time.perf_counter()
+        facets.get_index()
+        self.stdout.write(f"built facet index in {time.perf_counter() - started:.2f}s")
+
+        def sql(filters):
+            # 기존 방식: 조건마다 JOIN/IN 으로 거르고 패싯마다 GROUP BY
+            queryset = Restaurant.objects.filter(is_closed=False)
+            for group in filters:
+                ((facet, values),) = group.items()
+                lookup = {
+                    facets.TAG: "tags__in",
+                    facets.CATEGORY: "category__in",
+                    facets.CUISINE: "category__cuisine_type__in",
+                    facets.REGION: "region__in",
+                }[facet]
+                queryset = queryset.filter(
+                    pk__in=Restaurant.objects.filter(**{lookup: values}).values("pk")
+                )
+            counts = {
+                facets.TAG: dict(
+                    Restaurant.tags.through.objects.filter(restaurant__in=queryset)
+                    .values_list("tag_id")
+                    .annotate(count=Count("pk"))
+                    .order_by()
+                )
+            }
+            for facet, field in [
+                (facets.CATEGORY, "category_id"),
+                (facets.CUISINE, "category__cuisine_type_id"),
+                (facets.REGION, "region_id"),
+            ]:
+                counts[facet] = dict(
+                    queryset.exclude(**{field: None})
+                    .values_list(field)
+                    .annotate(count=Count("pk"))
+                    .order_by()
+                )
+            return queryset.count(), counts
+
+        def bitmap(filters):
+            ids, counts = facets.query(filters)
+            return len(ids), counts
+
+        cuisine_ids = list(
+            CuisineType.objects.filter(
+                pk__in=RestaurantCategory.objects.filter(pk__in=category_ids).values(
+                    "cuisine_type"
+                )
+            ).values_list("pk", flat=True)
+        )
+        cases = {
+            "all_open": [],
+            "popular_tag": [{facets.TAG: tag_ids[:1]}],
+            "tag_or_tag": [{facets.TAG: tag_ids[:2]}],
+            "tag_and_category": [
+                {facets.TAG: tag_ids[:1]},
+                {facets.CATEGORY: category_ids[:1]},
+            ],
+            "rare_tag_cuisine_region": [
+                {facets.TAG: tag_ids[-1:]},
+                {facets.CUISINE: cuisine_ids[:1]},
+                {facets.REGION: region_ids[: dongs_per_gu * 5]},
+            ],
+        }
+        self.stdout.write(
+            f"{'filters':<26}{'matches':>10}{'sql p50':>10}{'bitmap p50':>12}"
+            f"{'p95':>9} (ms)"
+        )
+        for name, filters in cases.items():
+            expected = sql(filters)
+            # 두 방식의 결과가 같은지 확인하고 워밍업을 겸한다
+            assert bitmap(filters) == expected, name
+            baseline = bench.measure(sql, [(filters,)] * baseline_runs)
+            current = bench.measure(bitmap, [(filters,)] * runs)
+            self.stdout.write(
+                f"{name:<26}{expected[0]:>10,}{baseline['p50_ms']:>10.1f}"
+                f"{current['p50_ms']:>12.2f}{current['p95_ms']:>9.2f}"
+            )
@@ -0,0 +1,160 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast
+
+from restaurant import bench, leaderboards
+from restaurant.models import CuisineType, Region, Restaurant, RestaurantCategory
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "순위표: 베이지안 평균으로 ORDER BY 하는 SQL 과 인메모리 정렬 구조의 top-N, 평점 변경 한 건 반영, "
+        "재구축/스냅샷 저장/읽기 시간을 잽니다. 합성 데이터는 마지막에 롤백합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=1_000_000)
+        parser.add_argument("--dongs-per-gu", type=int, default=20)
+        parser.add_argument("--runs", type=int, default=1_000)
+        parser.add_argument(
+            "--baseline-runs", type=int, default=5, help="SQL 방식은 느리므로 따로 적게"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            # 시드 중에는 내구성보다 속도
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            leaderboards.reset_boards()
+
+    def seed(self, restaurants, dongs_per_gu, seed):
+        started = time.perf_counter()
+        rng = random.Random(seed)
+        category_ids = []
+        for cuisine_name, category_names in bench.CUISINES.items():
+            cuisine = CuisineType.objects.create(name=cuisine_name)
+            category_ids += [
+                category.pk
+                for category in RestaurantCategory.objects.bulk_create(
+                    RestaurantCategory(name=name, cuisine_type=cuisine)
+                    for name in category_names
+                )
+            ]
+        region_ids = [
+            region.pk
+            for region in Region.objects.bulk_create(
+                Region(sido="벤치", sigungu=gu, eupmyeondong=f"{gu[:-1]}{number}동")
+                for gu in bench.SEOUL_GU
+                for number in range(1, dongs_per_gu + 1)
+            )
+        ]
+        total = 0
+        for chunk in bench.chunked(
+            bench.synthetic_restaurants(restaurants, seed), 5_000
+        ):
+            for restaurant in chunk:
+                restaurant.category_id = rng.choice(category_ids)
+                restaurant.region_id = rng.choice(region_ids)
+                # 평가 수는 긴 꼬리(대부분 적고 일부만 수백 개), 평균은 식당마다 다르게
+                count = min(int(rng.paretovariate(1.1)) - 1, 5_000)
+                restaurant.rating_count = count
+                restaurant.rating_sum = round(count * rng.uniform(2.5, 5.0))
+            Restaurant.objects.bulk_create(chunk)
+            total += len(chunk)
+            if total % 100_000 == 0:
+                self.stdout.write(
+                    f"{total:,} restaurants ({time.perf_counter() - started:.0f}s)"
+                )
+        self.stdout.write(
+            f"seeded {restaurants:,} restaurants in {time.perf_counter() - started:.1f}s"
+        )
+        return region_ids, category_ids
+
+    def run(self, restaurants, dongs_per_gu, runs, baseline_runs, seed, **options):
+        region_ids, category_ids = self.seed(restaurants, dongs_per_gu, seed)
+
+        started = time.perf_counter()
+        boards = leaderboards.build()
+        self.stdout.write(
+            f"built {len(boards.boards):,} boards ({len(boards.entries):,} ranked) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "leaderboards.pickle"
+            started = time.perf_counter()
+            leaderboards.save(boards, path)
+            saved = time.perf_counter() - started
+            started = time.perf_counter()
+            leaderboards.load(path)
+            self.stdout.write(
+                f"snapshot {path.stat().st_size / 2**20:.1f}MB: "
+                f"save {saved:.2f}s, load {time.perf_counter() - started:.2f}s"
+            )
+
+        prior = boards.prior_weight * boards.prior_mean
+
+        def sql(**filters):
+            # 기존 방식: 점수 식으로 전체를 정렬 (인덱스를 쓸 수 없다)
+            score = (Value(prior) + Cast(F("rating_sum"), FloatField())) / (
+                Value(boards.prior_weight) + F("rating_count")
+            )
+            return list(
+                Restaurant.objects.filter(
+                    is_closed=False, rating_count__gt=0, **filters
+                )
+                .alias(score=score)
+                .order_by("-score", "-rating_count", "pk")
+                .values_list("pk", flat=True)[:20]
+            )
+
+        def memory(scope):
+            return [pk for pk, _, _ in boards.top(scope, 20)]
+
+        rng = random.Random(seed + 1)
+        region = rng.choice(region_ids)
+        category = rng.choice(category_ids)
+        cases = {
+            "global": ({}, leaderboards.ALL),
+            "region": ({"region_id": region}, (leaderboards.REGION, region)),
+            "category": ({"category_id": category}, (leaderboards.CATEGORY, category)),
+        }
+        self.stdout.write(
+            f"{'top 20':<12}{'sql p50 ms':>12}{'memory p50 µs':>16}{'p99 µs':>10}"
+        )
+        for name, (filters, scope) in cases.items():
+            assert sql(**filters) == memory(scope), name
+            baseline = bench.measure(lambda: sql(**filters), [()] * baseline_runs)
+            current = bench.measure(memory, [(scope,)] * runs)
+            self.stdout.write(
+                f"{name:<12}{baseline['p50_ms']:>12.1f}"
+                f"{current['p50_ms'] * 1000:>16.1f}{current['p99_ms'] * 1000:>10.1f}"
+            )
+
+        # 평점 변경 한 건: 예전 자리에서 빼고 새 점수로 세 순위표(전체/지역/카테고리)에 넣는다
+        entries = list(boards.entries.items())
+        changes = []
+        for _ in range(runs):
+            pk, (key, region, category) = rng.choice(entries)
+            count = -key[1] + 1
+            changes.append((pk, region, category, False, round(count * 4.5), count))
+        stats = bench.measure(boards.set, changes)
+        self.stdout.write(
+            f"rating change: p50 {stats['p50_ms'] * 1000:.1f}µs, "
+            f"p99 {stats['p99_ms'] * 1000:.1f}µs"
+        )
@@ -0,0 +1,98 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from restaurant import bench, geo
+from restaurant.models import Restaurant
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "근처 레스토랑 검색: 위경도 바운딩 박스 쿼리 vs 지오해시 vs 인메모리 지리 인덱스 벤치마크"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--radius", type=float, default=1.0, help="km")
+        parser.add_argument("-k", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        # 합성 데이터는 트랜잭션 안에서 넣고 마지막에 롤백해서 DB 를 원래대로 둔다
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            geo.reset_index()
+
+    def run(self, rows, queries, radius, k, seed, **options):
+        started = time.perf_counter()
+        for chunk in bench.chunked(bench.synthetic_restaurants(rows, seed), 5_000):
+            Restaurant.objects.bulk_create(chunk)
+        self.stdout.write(f"seeded {rows} rows in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        geo.reset_index()
+        index = geo.get_index()
+        self.stdout.write(
+            f"built index ({len(index)} rows) in {time.perf_counter() - started:.2f}s"
+        )
+
+        rng = random.Random(seed + 1)
+        points = [bench.random_point(rng) for _ in range(queries)]
+
+        def bounding_box(latitude, longitude):
+            # 기존 방식: 사각형 범위로 가져와서 Decimal → float 변환 후 파이썬에서 거리 정렬
+            candidates = Restaurant.objects.filter(is_closed=False).bounding_box(
+                latitude, longitude, radius
+            )
+            ranked = sorted(
+                (
+                    geo.haversine_km(
+                        latitude, longitude, float(r.latitude), float(r.longitude)
+                    ),
+                    r.pk,
+                )
+                for r in candidates
+            )
+            return [pk for distance, pk in ranked if distance <= radius][:k]
+
+        def geohash_cover(latitude, longitude):
+            candidates = Restaurant.objects.filter(is_closed=False).geohash_cover(
+                latitude, longitude, radius
+            )
+            ranked = sorted(
+                (
+                    geo.haversine_km(
+                        latitude, longitude, float(r.latitude), float(r.longitude)
+                    ),
+                    r.pk,
+                )
+                for r in candidates.only("latitude", "longitude")
+            )
+            return [pk for distance, pk in ranked if distance <= radius][:k]
+
+        def index_only(latitude, longitude):
+            return index.nearby(latitude, longitude, radius_km=radius, k=k)
+
+        def manager(latitude, longitude):
+            return Restaurant.objects.nearby(latitude, longitude, radius=radius, k=k)
+
+        results = {
+            "bounding_box": bench.measure(bounding_box, points),
+            "geohash_cover": bench.measure(geohash_cover, points),
+            "geo_index": bench.measure(index_only, points),
+            "objects.nearby": bench.measure(manager, points),
+        }
+        self.stdout.write(f"{'method':<16}{'p50':>10}{'p95':>10}{'p99':>10} (ms)")
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<16}{stats['p50_ms']:>10.2f}"
+                f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            )
@@ -0,0 +1,110 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from restaurant import bench, feed
+from restaurant.models import Restaurant, Review
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "리뷰 피드: 레스토랑 하나에 리뷰를 몰아 넣고 1 ~ 10,000 번째 페이지를 OFFSET 과 키셋 커서로 읽는 "
+        "지연시간을 비교합니다. 합성 데이터는 마지막에 롤백합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reviews", type=int, default=1_000_000)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--pages", default="1,10,100,1000,10000", help="쉼표로 구분한 페이지 번호"
+        )
+        parser.add_argument("--runs", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        # 피드 캐시는 건드리지 않는다: 롤백될 리뷰로 만든 첫 페이지가 공유 캐시에 남으면 안 되므로
+        # 여기서는 쿼리만 잰다.
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            call_command("migrate", verbosity=0, interactive=False)
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "PRAGMA synchronous = OFF"
+                )  # 시드 중에는 내구성보다 속도
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, reviews, seed):
+        started = time.perf_counter()
+        restaurant = Restaurant.objects.create(name="리뷰 피드 벤치마크")
+        # bulk_create 도 auto_now_add 로 created_at 을 지금 시각으로 덮어쓰므로 시드하는 동안만 끈다
+        field = Review._meta.get_field("created_at")
+        field.auto_now_add = False
+        try:
+            for number, chunk in enumerate(
+                bench.chunked(bench.synthetic_feed(reviews, seed), 10_000), 1
+            ):
+                Review.objects.bulk_create(
+                    Review(restaurant=restaurant, **fields) for fields in chunk
+                )
+                if number % 20 == 0:
+                    self.stdout.write(f"{number * 10_000:,} reviews")
+        finally:
+            field.auto_now_add = True
+        self.stdout.write(
+            f"seeded {reviews:,} reviews in {time.perf_counter() - started:.1f}s"
+        )
+        return restaurant
+
+    def run(self, reviews, limit, pages, runs, seed, **options):
+        restaurant = self.seed(reviews, seed)
+        queryset = Review.objects.filter(restaurant=restaurant)
+        ordered = queryset.order_by(*feed.ORDERING)
+        pages = [int(page) for page in pages.split(",")]
+
+        results = {}
+        for number in [page for page in pages if (page - 1) * limit < reviews]:
+            offset = (number - 1) * limit
+            cursor = None
+            if offset:
+                # 이전 페이지 마지막 행으로 커서를 만든다 (측정에서 제외)
+                cursor = feed.encode_cursor(ordered.only("created_at")[offset - 1])
+
+            def keyset():
+                return feed.page(queryset, cursor, limit)
+
+            def offset_page():
+                return list(ordered[offset : offset + limit])
+
+            # 두 방식이 같은 행을 돌려주는지 확인하고 워밍업을 겸한다
+            rows, _ = keyset()
+            assert [row.pk for row in rows] == [row.pk for row in offset_page()]
+            results[number] = (
+                bench.measure(offset_page, [()] * runs),
+                bench.measure(keyset, [()] * runs),
+            )
+
+        # 마지막 페이지의 키셋 쿼리가 review_feed_idx 만으로 정렬까지 끝내는지 (임시 정렬이 없어야 한다)
+        plan = feed.after(queryset, cursor).order_by(*feed.ORDERING)[: limit + 1]
+        self.stdout.write(f"keyset plan: {plan.explain()}")
+
+        self.stdout.write(
+            f"{'page':>8}{'offset p50':>12}{'p95':>9}{'keyset p50':>12}{'p95':>9} (ms)"
+        )
+        for number, (offset_stats, keyset_stats) in results.items():
+            self.stdout.write(
+                f"{number:>8,}{offset_stats['p50_ms']:>12.2f}{offset_stats['p95_ms']:>9.2f}"
+                f"{keyset_stats['p50_ms']:>12.2f}{keyset_stats['p95_ms']:>9.2f}"
+            )
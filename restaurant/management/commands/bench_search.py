@@ -0,0 +1,96 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from restaurant import bench, search
+from restaurant.models import Restaurant, RestaurantMenu
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "검색: icontains (LIKE '%q%') 스캔 vs 역색인(BM25) 벤치마크"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, queries, seed, **options):
+        started = time.perf_counter()
+        rng = random.Random(seed)
+        for chunk in bench.chunked(bench.synthetic_restaurants(rows, seed), 5_000):
+            created = Restaurant.objects.bulk_create(chunk)
+            RestaurantMenu.objects.bulk_create(
+                RestaurantMenu(
+                    restaurant=restaurant,
+                    name=rng.choice(bench.MENUS),
+                    price=rng.randrange(5_000, 20_000, 500),
+                )
+                for restaurant in created
+            )
+        self.stdout.write(f"seeded {rows} rows in {time.perf_counter() - started:.1f}s")
+
+        # 스냅샷 디렉터리를 건드리지 않도록 메모리 색인만 따로 만든다
+        started = time.perf_counter()
+        index = search.SearchIndex()
+        for pk, fields in search.documents(search.RESTAURANT):
+            index.add(pk, fields)
+        self.stdout.write(
+            f"built index ({len(index)} docs, {len(index.postings)} terms) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        # 흔한 단어 하나짜리 질의와 "브랜드 번호" 처럼 좁혀지는 질의를 반반 섞음
+        words = bench.BRANDS + bench.MENUS + bench.FEATURES + bench.BRANCHES
+        terms = [
+            (
+                (
+                    rng.choice(words)
+                    if number % 2
+                    else f"{rng.choice(bench.BRANDS)} {rng.randrange(rows)}"
+                ),
+            )
+            for number in range(queries)
+        ]
+
+        def icontains(query):
+            # 지금 관리자 검색과 같은 LIKE 스캔을 검색 대상 필드 전체로 넓힌 것
+            condition = Q()
+            for field in ["name", "branch_name", "description", "feature", "address"]:
+                condition |= Q(**{f"{field}__icontains": query})
+            condition |= Q(restaurantmenu__name__icontains=query)
+            # 관련도 순위가 없으니 평점순으로 정렬 → 매칭되는 행을 모두 읽어야 함
+            return list(
+                Restaurant.objects.filter(condition)
+                .distinct()
+                .order_by("-rating", "pk")
+                .values_list("pk", flat=True)[:20]
+            )
+
+        def inverted_index(query):
+            return index.search(query, 20)
+
+        results = {
+            "icontains": bench.measure(icontains, terms),
+            "bm25_index": bench.measure(inverted_index, terms),
+        }
+        self.stdout.write(f"{'method':<12}{'p50':>10}{'p95':>10}{'p99':>10} (ms)")
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<12}{stats['p50_ms']:>10.2f}"
+                f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            )
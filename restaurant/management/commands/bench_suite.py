@@ -0,0 +1,260 @@
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, override_settings
+
+from restaurant import bench, fragments, profiler, ratings
+from restaurant.models import Restaurant, Review, Tag
+
+BENCH_USER = "bench"
+
+
+class Command(BaseCommand):
+    help = (
+        "합성 데이터(시드 고정)를 SQLite 에 넣고 메인 페이지, 관리자 목록, 태그 필터, 평점 집계를 측정해 "
+        "p50/p95/p99, 쿼리 수, 최대 메모리를 JSON 으로 저장합니다. "
+        "예: BENCH_DB=var/bench.sqlite3 python manage.py bench_suite --compare var/base.json"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=100_000)
+        parser.add_argument("--reviews-per-restaurant", type=int, default=50)
+        parser.add_argument("--menus-per-restaurant", type=int, default=3)
+        parser.add_argument("--tags", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--runs", type=int, default=50)
+        parser.add_argument(
+            "--no-seed",
+            action="store_true",
+            help="이미 시드된 DB 를 그대로 측정 (커밋 사이 비교 시 시드 시간 절약)",
+        )
+        parser.add_argument("--output", default=str(Path("var") / "bench.json"))
+        parser.add_argument(
+            "--compare", help="이전 결과 JSON. 느려진 시나리오가 있으면 실패"
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=0.2, help="허용하는 p95 증가 비율"
+        )
+        parser.add_argument(
+            "--min-ms",
+            type=float,
+            default=2.0,
+            help="이보다 작은 p95 증가는 측정 잡음으로 보고 무시",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError(
+                "벤치마크는 SQLite 에서만 실행합니다. BENCH_DB=<파일 경로> 를 지정하세요."
+            )
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            call_command("migrate", verbosity=0, interactive=False)
+
+        if options["no_seed"]:
+            if not Restaurant.objects.exists():
+                raise CommandError("--no-seed 인데 DB 가 비어 있습니다.")
+        elif Restaurant.objects.exists():
+            raise CommandError(
+                "이미 데이터가 있는 DB 입니다. 새 BENCH_DB 파일을 쓰거나 --no-seed 를 지정하세요."
+            )
+        else:
+            self.seed(**options)
+
+        results = self.run(options["runs"], options["seed"])
+        report = {"meta": self.meta(options), "results": results}
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+
+        self.stdout.write(
+            f"{'scenario':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'peak KB':>10}"
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{stats['queries']:>9}{stats['peak_kb']:>10.0f}"
+            )
+        self.stdout.write(f"saved {output}")
+
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+            regressions = bench.compare(
+                baseline, report, options["threshold"], options["min_ms"]
+            )
+            for line in regressions:
+                self.stderr.write(f"regression {line}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s)")
+            self.stdout.write(f"no regressions against {options['compare']}")
+
+    def seed(self, restaurants, seed, **options):
+        started = time.perf_counter()
+
+        def progress(counts):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{counts['restaurants']:,} restaurants, {counts['reviews']:,} reviews "
+                f"({elapsed:.0f}s)"
+            )
+
+        if not connection.in_atomic_block:  # 트랜잭션 안에서는 바꿀 수 없음
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "PRAGMA synchronous = OFF"
+                )  # 시드 중에는 내구성보다 속도
+        with transaction.atomic():
+            counts = bench.seed_dataset(
+                restaurants,
+                reviews_per_restaurant=options["reviews_per_restaurant"],
+                menus_per_restaurant=options["menus_per_restaurant"],
+                tags=options["tags"],
+                seed=seed,
+                progress=progress,
+            )
+            User.objects.create_superuser(BENCH_USER, "bench@example.com", BENCH_USER)
+        self.stdout.write(
+            f"seeded {counts['restaurants']:,} restaurants, {counts['reviews']:,} reviews, "
+            f"{counts['menus']:,} menus in {time.perf_counter() - started:.1f}s"
+        )
+
+    def run(self, runs, seed):
+        rng = random.Random(seed + 1)
+        client = Client()
+        client.force_login(User.objects.get(username=BENCH_USER))
+        tag_ids = list(Tag.objects.values_list("pk", flat=True))
+        max_id = Restaurant.objects.order_by("-pk").values_list("pk", flat=True)[0]
+
+        def get(path):
+            response = client.get(path, secure=True)
+            if response.status_code != 200:
+                raise CommandError(f"GET {path} → {response.status_code}")
+
+        def index_cold():
+            # 조각 캐시를 비워서 렌더링 경로 전체를 잰다
+            caches[fragments.LOCAL].clear()
+            fragments.bump(fragments.INDEX_ARTICLES)
+            fragments.bump(fragments.INDEX_RESTAURANTS)
+            get("/")
+
+        def tag_filter(tag_id):
+            return list(
+                Restaurant.objects.filter(tags__id=tag_id, is_closed=False)
+                .order_by("-rating", "-pk")
+                .values_list("pk", flat=True)[:20]
+            )
+
+        def review_write(restaurant_id, rating):
+            # 리뷰 하나 저장 → 집계 증분 갱신. 매번 롤백해서 데이터셋을 그대로 둔다.
+            with transaction.atomic():
+                Review.objects.create(
+                    restaurant_id=restaurant_id,
+                    title="-",
+                    author="bench",
+                    content="-",
+                    rating=rating,
+                )
+                transaction.set_rollback(True)
+
+        def rating_reconcile(start):
+            ratings.reconcile(range(start, start + 100), fix=False)
+
+        def pages(model):
+            # 관리자 목록은 100개씩. 앞쪽 20페이지 안에서 고른다.
+            last = min(max((model.objects.count() + 99) // 100, 1), 20)
+            return [(rng.randint(1, last),) for _ in range(runs)]
+
+        scenarios = {
+            "index": (index_cold, [()] * runs),
+            "index_cached": (lambda: get("/"), [()] * runs),
+            "admin_restaurants": (
+                lambda page: get(f"/admin/restaurant/restaurant/?p={page}"),
+                pages(Restaurant),
+            ),
+            "admin_reviews": (
+                lambda page: get(f"/admin/restaurant/review/?p={page}"),
+                pages(Review),
+            ),
+            "admin_restaurants_by_tag": (
+                lambda tag_id: get(
+                    f"/admin/restaurant/restaurant/?tags__id__exact={tag_id}"
+                ),
+                [(rng.choice(tag_ids),) for _ in range(runs)],
+            ),
+            "tag_filter": (tag_filter, [(rng.choice(tag_ids),) for _ in range(runs)]),
+            "review_write": (
+                review_write,
+                [(rng.randint(1, max_id), rng.randint(1, 5)) for _ in range(runs)],
+            ),
+            "rating_reconcile": (
+                rating_reconcile,
+                [(rng.randint(1, max(max_id - 100, 1)),) for _ in range(runs)],
+            ),
+        }
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for name, (func, args_list) in scenarios.items():
+                self.stdout.write(f"running {name}...")
+                results[name] = self.measure(func, args_list)
+        return results
+
+    def measure(self, func, args_list):
+        func(*args_list[0])  # 워밍업
+        with profiler.profile() as result:
+            func(*args_list[0])
+        tracemalloc.start()
+        try:
+            func(*args_list[0])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats = bench.measure(func, args_list)
+        stats["queries"] = result.count
+        stats["peak_kb"] = peak / 1024
+        return stats
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "restaurants": Restaurant.objects.count(),
+            "reviews": Review.objects.count(),
+            **{
+                key: options[key]
+                for key in (
+                    "reviews_per_restaurant",
+                    "menus_per_restaurant",
+                    "tags",
+                    "seed",
+                    "runs",
+                )
+            },
+        }
@@ -0,0 +1,160 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from restaurant import feed, fragments, images, signals
+from restaurant.models import (
+    Article,
+    MediaBlob,
+    RestaurantImage,
+    RestaurantMenu,
+    Review,
+    ReviewImage,
+)
+from restaurant.storage import blob_storage
+
+# 내용 주소 저장소를 쓰는 필드들
+FIELDS = [
+    (Article, "preview_image"),
+    (RestaurantImage, "image"),
+    (RestaurantMenu, "image"),
+    (ReviewImage, "image"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "blobs/ 로 옮겨지기 전에 올라온 이미지를 내용(sha256)별로 한 벌만 남기고 행들이 그 파일을 "
+        "가리키게 바꿉니다. 줄어든 용량을 보고합니다. 예: python manage.py dedupe_media --dry-run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="해시와 용량만 계산하고 바꾸지 않음"
+        )
+        parser.add_argument(
+            "--keep-originals",
+            action="store_true",
+            help="옮긴 뒤에도 예전 파일과 파생 이미지를 지우지 않음",
+        )
+        parser.add_argument("--progress-every", type=int, default=500)
+
+    def legacy_names(self, prefix):
+        # 예전 경로 → 그 경로를 가진 (모델, 필드) 목록
+        names = defaultdict(list)
+        for model, field in FIELDS:
+            for name in (
+                model.objects.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .exclude(**{f"{field}__startswith": prefix + "/"})
+                .order_by()
+                .values_list(field, flat=True)
+                .distinct()
+            ):
+                names[name].append((model, field))
+        return names
+
+    def handle(self, *args, dry_run, keep_originals, progress_every, **options):
+        storage = blob_storage()
+        backend = storage.backend
+        names = self.legacy_names(storage.prefix)
+        self.stdout.write(
+            f"{len(names)} files to check{' (dry run)' if dry_run else ''}"
+        )
+
+        started = time.perf_counter()
+        scanned = missing = rows = bytes_before = bytes_after = 0
+        seen = {}  # digest → 이번 실행에서 정한 blob 이름
+        for done, (name, fields) in enumerate(sorted(names.items()), 1):
+            if not backend.exists(name):
+                missing += 1
+                continue
+            with backend.open(name, "rb") as content:
+                digest, size = storage.digest(content)
+                scanned += 1
+                bytes_before += size
+                if (
+                    digest not in seen
+                    and not MediaBlob.objects.filter(digest=digest).exists()
+                ):
+                    bytes_after += size  # 처음 보는 내용만 새로 남는다
+                blob_name = seen.setdefault(digest, storage.blob_name(digest, name))
+                if not dry_run:
+                    blob_name, moved = self.move(
+                        storage, name, content, digest, size, fields
+                    )
+                    seen[digest] = blob_name
+                    rows += moved
+            if not dry_run:
+                self.copy_derivatives(backend, name, blob_name)
+                if not keep_originals:
+                    self.remove(backend, name)
+            if done % progress_every == 0:
+                self.stdout.write(f"[{done}/{len(names)}]")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"scanned {scanned} files ({missing} missing) in {elapsed:.1f}s, "
+            f"{len(seen)} unique blobs, {rows} rows repointed"
+        )
+        reclaimed = bytes_before - bytes_after
+        # 실제로 지운 경우만 reclaimed, 아니면 지웠을 때 줄어들 용량
+        label = "reclaimable" if dry_run or keep_originals else "reclaimed"
+        self.stdout.write(
+            f"bytes before {bytes_before:,}, after {bytes_after:,}, "
+            f"{label} {reclaimed:,} ({100 * reclaimed / bytes_before if bytes_before else 0:.1f}%)"
+        )
+
+    def move(self, storage, name, content, digest, size, fields):
+        # 파일을 blobs/ 로 올리고(이미 있으면 그대로) 예전 경로를 가리키던 행을 모두 새 이름으로 바꾼다.
+        # 바꾼 행 수만큼 참조 수를 올린다.
+        with transaction.atomic():
+            blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+                digest=digest,
+                defaults={"name": storage.blob_name(digest, name), "size": size},
+            )
+            if not storage.backend.exists(blob.name):
+                content.seek(0)
+                storage.backend.save(blob.name, content)
+            moved = 0
+            for model, field in fields:
+                rows = model.objects.filter(**{field: name})
+                self.invalidate(model, rows)
+                moved += rows.update(**{field: blob.name})
+            MediaBlob.objects.filter(pk=blob.pk).update(refs=F("refs") + moved)
+        return blob.name, moved
+
+    def invalidate(self, model, rows):
+        # update() 는 시그널을 보내지 않으므로 이미지 주소가 들어간 카드/피드/메인 조각 캐시를 직접 갱신한다.
+        # 커밋 후에 돌므로 예전 파일을 지우기 전에 새 이름을 가리키게 된다.
+        if model is Article:
+            transaction.on_commit(lambda: fragments.bump(fragments.INDEX_ARTICLES))
+        elif model is ReviewImage:
+            reviews = Review.objects.filter(
+                pk__in=set(rows.values_list("review_id", flat=True))
+            )
+            reviews.update(updated_at=timezone.now())
+            feed.invalidate(reviews.values_list("restaurant_id", flat=True))
+        else:
+            signals.restaurants_changed(
+                set(rows.values_list("restaurant_id", flat=True)),
+                search_index=False,
+                membership=False,
+            )
+
+    def copy_derivatives(self, backend, name, blob_name):
+        # 썸네일/WebP 는 다시 만들지 않고 새 이름으로 복사해 둔다 (없으면 다음 업로드/백필 때 만들어짐)
+        targets = images.derivative_names(blob_name)
+        for key, source in images.derivative_names(name).items():
+            if backend.exists(source) and not backend.exists(targets[key]):
+                with backend.open(source, "rb") as derivative:
+                    backend.save(targets[key], derivative)
+
+    def remove(self, backend, name):
+        backend.delete(name)
+        for derivative in images.derivative_names(name).values():
+            backend.delete(derivative)
@@ -0,0 +1,66 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from restaurant import images
+
+
+class Command(BaseCommand):
+    help = "기존 업로드 이미지 전체에 썸네일/WebP 파생 이미지를 만들고 절약된 용량과 처리량을 보고합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--force", action="store_true", help="이미 있는 파생 이미지도 다시 생성"
+        )
+        parser.add_argument("--progress-every", type=int, default=100)
+
+    def source_names(self):
+        # ImageDerivativesMixin 을 쓰는 모든 모델의 이미지 경로 (중복 제거)
+        names = set()
+        for model in apps.get_app_config("restaurant").get_models():
+            for field in getattr(model, "image_fields", ()):
+                names.update(
+                    model.objects.exclude(**{field: ""})
+                    .exclude(**{f"{field}__isnull": True})
+                    .order_by()
+                    .values_list(field, flat=True)
+                    .distinct()
+                )
+        return sorted(names)
+
+    def handle(self, *args, workers, force, progress_every, **options):
+        names = self.source_names()
+        self.stdout.write(f"{len(names)} images, {workers} workers")
+
+        started = time.perf_counter()
+        done = generated = source_bytes = 0
+        derivative_bytes = {}
+        for stats in images.generate_many(names, workers=workers, force=force):
+            done += 1
+            if not stats["skipped"]:
+                generated += 1
+                source_bytes += stats["source_bytes"]
+                for key, size in stats["derivatives"].items():
+                    derivative_bytes[key] = derivative_bytes.get(key, 0) + size
+            if done % progress_every == 0 or done == len(names):
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"[{done}/{len(names)}] {done / elapsed if elapsed else 0:.1f} img/s"
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"generated {generated}, skipped {len(names) - generated} in {elapsed:.1f}s "
+            f"({generated / elapsed / max(workers, 1) if elapsed else 0:.2f} img/s per core)"
+        )
+        if not generated:
+            return
+        self.stdout.write(f"originals: {source_bytes:,} bytes")
+        for (size, fmt), total in sorted(derivative_bytes.items()):
+            saved = 100 * (1 - total / source_bytes) if source_bytes else 0
+            self.stdout.write(
+                f"  {size:<6}{fmt:<5}{total:>14,} bytes  ({saved:5.1f}% smaller)"
+            )
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 대상별로 자식 프로세스에서 실행할 코드와 작업 디렉터리
+TARGETS = {
+    "wsgi": ("import proj.wsgi", settings.BASE_DIR),
+    "check": (
+        "import django; django.setup(); "
+        "from django.core.management import call_command; call_command('check')",
+        settings.BASE_DIR,
+    ),
+    "fastapi": ("import main", settings.BASE_DIR / "ml_model_api"),
+}
+
+
+def parse_importtime(stderr):
+    # python -X importtime 출력 → [(들여쓰기 깊이, 모듈, 자기 시간 us, 누적 us)]
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def by_package(rows):
+    # 최상위 패키지별 자기 시간 합 (us). 누가 불렀는지와 상관없이 그 패키지 코드를 읽는 데 든 시간.
+    totals = defaultdict(int)
+    for _, name, self_us, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "새 프로세스에서 wsgi/check/fastapi 시작에 드는 시간과 import 시간을 패키지별로 보여줍니다. "
+        "예: python manage.py import_report fastapi --limit 10"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "target", choices=sorted(TARGETS), nargs="?", default="wsgi"
+        )
+        parser.add_argument("--limit", type=int, default=15)
+        parser.add_argument("--runs", type=int, default=3, help="시작 시간은 중앙값")
+        parser.add_argument(
+            "--warmup",
+            action="store_true",
+            help="WARMUP_ON_START=True 로 실행 (wsgi 대상)",
+        )
+
+    def handle(self, *args, **options):
+        code, cwd = TARGETS[options["target"]]
+        env = dict(os.environ, WARMUP_ON_START=str(options["warmup"]))
+        env.setdefault("DJANGO_SETTINGS_MODULE", "proj.settings")
+
+        elapsed = []
+        for _ in range(options["runs"]):
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", code],
+                cwd=cwd,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            elapsed.append(time.perf_counter() - started)
+            if result.returncode:
+                raise CommandError(result.stderr.strip().splitlines()[-1])
+        elapsed.sort()
+        rows = parse_importtime(result.stderr)
+        imports_ms = sum(row[2] for row in rows) / 1000
+
+        self.stdout.write(
+            f"{options['target']}: start {elapsed[len(elapsed) // 2] * 1000:.0f}ms "
+            f"(median of {len(elapsed)}), imports {imports_ms:.0f}ms, "
+            f"{len(rows)} modules"
+        )
+        self.stdout.write(f"{'package':<28}{'ms':>8}")
+        for package, self_us in by_package(rows)[: options["limit"]]:
+            self.stdout.write(f"{package:<28}{self_us / 1000:>8.1f}")
@@ -0,0 +1,65 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV/JSONL 파일의 레스토랑(카테고리/지역/태그/메뉴 포함)을 청크 단위로 일괄 등록합니다. "
+        "(이름, 지점, 주소)가 같은 레스토랑은 새로 만들지 않고 갱신하므로 여러 번 실행해도 안전합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV 또는 JSONL 파일 경로 (- 이면 표준 입력)")
+        parser.add_argument("--format", choices=["csv", "jsonl"])
+        parser.add_argument("--encoding", default="utf-8-sig")
+        parser.add_argument("--batch-size", type=int, default=1_000)
+        parser.add_argument("--progress-every", type=int, default=10_000)
+        parser.add_argument(
+            "--max-errors", type=int, default=20, help="출력할 오류 행의 최대 개수"
+        )
+
+    def handle(self, *args, path, encoding, batch_size, progress_every, **options):
+        fmt = options["format"]
+        if fmt is None:
+            fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+        if path == "-":
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(Path(path), encoding=encoding, newline="")
+            except OSError as error:
+                raise CommandError(error)
+
+        errors = []
+
+        def on_error(line_no, error):
+            errors.append(line_no)
+            if len(errors) <= options["max_errors"]:
+                self.stderr.write(f"line {line_no}: {error}")
+
+        run = importer.RestaurantImporter(batch_size=batch_size)
+        started = time.perf_counter()
+        done = reported = 0
+        try:
+            for done in run.run(importer.read_rows(stream, fmt), on_error=on_error):
+                if done - reported >= progress_every:
+                    reported = done
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{done:,} rows ({done / elapsed:,.0f} rows/s)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        stats = run.stats
+        self.stdout.write(
+            f"imported {done:,} rows in {elapsed:.1f}s "
+            f"({done / elapsed if elapsed else 0:,.0f} rows/s): "
+            f"{stats['created']:,} created, {stats['updated']:,} updated, "
+            f"{stats['skipped']:,} skipped, {stats['menus']:,} menus written"
+        )
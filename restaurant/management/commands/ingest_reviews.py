@@ -0,0 +1,98 @@
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant import bench, importer, ingest
+from restaurant.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = (
+        "NDJSON 리뷰 파일을 /api/reviews/batch/ 와 같은 경로(일괄 검증, 청크 트랜잭션)로 넣고 "
+        "초당 리뷰 수를 보고합니다. --synthetic 으로 합성 리뷰를 넣어 처리량만 잴 수 있습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", help="NDJSON 파일 경로 (- 이면 표준 입력)"
+        )
+        parser.add_argument("--synthetic", type=int, help="합성 리뷰 개수")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.REVIEW_INGEST_BATCH_SIZE
+        )
+        parser.add_argument("--progress-every", type=int, default=10_000)
+        parser.add_argument(
+            "--max-errors", type=int, default=20, help="출력할 오류 행의 최대 개수"
+        )
+        parser.add_argument(
+            "--fetch-pending",
+            action="store_true",
+            help="수집은 하지 않고 아직 내려받지 못한 리뷰 이미지를 다시 받음",
+        )
+
+    def handle(self, *args, path, batch_size, progress_every, max_errors, **options):
+        if options["fetch_pending"]:
+            return self.fetch_pending()
+        stream = None
+        if options["synthetic"]:
+            restaurant_ids = list(Restaurant.objects.values_list("pk", flat=True))
+            if not restaurant_ids:
+                raise CommandError("레스토랑이 없습니다.")
+            rows = enumerate(
+                bench.synthetic_reviews(
+                    options["synthetic"], restaurant_ids, seed=options["seed"]
+                ),
+                1,
+            )
+        elif path == "-":
+            rows = importer.read_rows(sys.stdin, "jsonl")
+        elif path:
+            try:
+                stream = open(Path(path), encoding="utf-8")
+            except OSError as error:
+                raise CommandError(error)
+            rows = importer.read_rows(stream, "jsonl")
+        else:
+            raise CommandError("path 나 --synthetic 이 필요합니다.")
+
+        # 처리량에는 수집만 넣는다. 이미지는 끝난 뒤 --fetch-pending 으로 받는다.
+        run = ingest.ReviewIngester(
+            batch_size=batch_size, max_errors=max_errors, fetch=False
+        )
+        started = time.perf_counter()
+        done = reported = 0
+        try:
+            for done in run.run(rows):
+                if done - reported >= progress_every:
+                    reported = done
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{done:,} rows ({run.stats['created'] / elapsed:,.0f} reviews/s)"
+                    )
+        finally:
+            if stream is not None:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        for line_no, error in run.errors:
+            self.stderr.write(f"line {line_no}: {error}")
+        stats = run.stats
+        self.stdout.write(
+            f"ingested {done:,} rows in {elapsed:.1f}s "
+            f"({stats['created'] / elapsed if elapsed else 0:,.0f} reviews/s): "
+            f"{stats['created']:,} created, {stats['duplicates']:,} duplicates, "
+            f"{stats['skipped']:,} skipped, {stats['images']:,} images queued"
+        )
+
+    def fetch_pending(self):
+        started = time.perf_counter()
+        pks = list(ingest.pending_images().values_list("pk", flat=True))
+        stats = ingest.fetch_images(pks)
+        self.stdout.write(
+            f"{len(pks):,} pending images: {stats['fetched']:,} fetched, "
+            f"{stats['failed']:,} failed in {time.perf_counter() - started:.1f}s"
+        )
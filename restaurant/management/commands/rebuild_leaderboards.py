@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from restaurant import leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        "DB 전체로 순위표(전체/지역/카테고리)를 다시 만들고 스냅샷 파일에 저장합니다. "
+        "워커는 다음 시작 때 이 스냅샷을 읽고 그 뒤 바뀐 레스토랑만 따라잡습니다."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        boards = leaderboards.build()
+        built = time.perf_counter() - started
+        leaderboards.save(boards)
+        self.stdout.write(
+            f"ranked {len(boards.entries):,} restaurants on {len(boards.boards):,} boards "
+            f"(prior mean {boards.prior_mean:.2f}, weight {boards.prior_weight:g}) "
+            f"in {built:.1f}s → {settings.LEADERBOARD_SNAPSHOT}"
+        )
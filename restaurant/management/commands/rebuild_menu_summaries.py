@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurant import menus
+
+
+class Command(BaseCommand):
+    help = "레스토랑별 메뉴 가격 요약(RestaurantMenuSummary) 전체를 메뉴 행에서 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1_000)
+
+    def handle(self, *args, chunk_size=1_000, **options):
+        started = time.perf_counter()
+        total = menus.rebuild(chunk_size=chunk_size)
+        self.stdout.write(
+            f"rebuilt {total} menu summaries in {time.perf_counter() - started:.1f}s"
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant import ratings
+from restaurant.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = "리뷰 테이블 기준으로 레스토랑 평점 집계(합계/개수/별점 분포)를 청크 단위로 검증하고 바로잡습니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="수정하지 않고 어긋난 레스토랑만 보고 (있으면 실패 코드로 종료)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1_000)
+
+    def handle(self, *args, verify=False, chunk_size=1_000, **options):
+        started = time.perf_counter()
+        checked = 0
+        drifted = []
+        last_id = 0
+        while True:
+            # id 기준 키셋 순회로 레스토랑/리뷰를 메모리에 한꺼번에 올리지 않음
+            ids = list(
+                Restaurant.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            drifted += ratings.reconcile(ids, fix=not verify)
+            checked += len(ids)
+            last_id = ids[-1]
+            if options["verbosity"] > 1:
+                self.stdout.write(f"checked {checked} restaurants")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"checked {checked} restaurants in {elapsed:.1f}s, "
+            f"{len(drifted)} {'drifted' if verify else 'fixed'}"
+        )
+        if verify and drifted:
+            preview = ", ".join(str(pk) for pk in drifted[:20])
+            raise CommandError(f"rating aggregates drifted for: {preview}")
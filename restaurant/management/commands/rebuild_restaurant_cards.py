@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurant import cards
+
+
+class Command(BaseCommand):
+    help = "목록용 레스토랑 카드(RestaurantCard) 테이블 전체를 원본 모델에서 다시 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1_000)
+
+    def handle(self, *args, chunk_size=1_000, **options):
+        started = time.perf_counter()
+        total = cards.rebuild(chunk_size=chunk_size)
+        self.stdout.write(
+            f"rebuilt {total} cards in {time.perf_counter() - started:.1f}s"
+        )
@@ -0,0 +1,355 @@
+import bisect
+import statistics
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Q
+
+from . import geo
+from .bulk import chunked, upsert
+from .models import Restaurant, RestaurantMenu, RestaurantMenuSummary
+
+# 가격대 경계(원). 가격 p 는 bisect_right(PRICE_BUCKETS, p) 번째 가격대 → 요약의 price_buckets 비트 하나.
+PRICE_BUCKETS = (
+    3_000,
+    5_000,
+    6_000,
+    7_000,
+    8_000,
+    9_000,
+    10_000,
+    12_000,
+    15_000,
+    20_000,
+    30_000,
+    50_000,
+)
+SUMMARY_FIELDS = [
+    "item_count",
+    "min_price",
+    "max_price",
+    "median_price",
+    "price_buckets",
+    "updated_at",
+]
+# 반경 안 레스토랑이 이보다 많으면 요약+IN 대신 가격 인덱스를 싼 순서로 훑는 쪽이 싸다
+CANDIDATE_LIMIT = 5_000
+# 이름이 일치하는 메뉴 행이 이보다 적으면 (name, price) 인덱스로 그 행들만 읽는다 (드문 이름)
+NAME_ROWS_LIMIT = 20_000
+SCAN_BATCH = 1_000
+
+
+def bucket(price):
+    return bisect.bisect_right(PRICE_BUCKETS, price)
+
+
+def bucket_mask(min_price, max_price):
+    # [min_price, max_price] 와 겹치는 가격대 비트들
+    return sum(1 << n for n in range(bucket(min_price), bucket(max_price) + 1))
+
+
+def summarize(restaurant_id, prices):
+    prices = sorted(prices)
+    return RestaurantMenuSummary(
+        restaurant_id=restaurant_id,
+        item_count=len(prices),
+        min_price=prices[0],
+        max_price=prices[-1],
+        median_price=statistics.median_low(prices),
+        price_buckets=sum({1 << bucket(price) for price in prices}),
+    )
+
+
+def refresh(restaurant_ids, chunk_size=1_000):
+    # 주어진 레스토랑들의 요약을 메뉴 행에서 다시 계산한다. 메뉴가 없어진 레스토랑은 요약 행을 지운다.
+    restaurant_ids = list(dict.fromkeys(restaurant_ids))
+    total = 0
+    for chunk in chunked(restaurant_ids, chunk_size):
+        prices = {}
+        for restaurant_id, price in RestaurantMenu.objects.filter(
+            restaurant_id__in=chunk
+        ).values_list("restaurant_id", "price"):
+            prices.setdefault(restaurant_id, []).append(price)
+        if prices:
+            upsert(
+                RestaurantMenuSummary,
+                [summarize(pk, values) for pk, values in prices.items()],
+                unique_fields=["restaurant"],
+                update_fields=SUMMARY_FIELDS,
+            )
+        RestaurantMenuSummary.objects.filter(pk__in=set(chunk) - set(prices)).delete()
+        total += len(prices)
+    return total
+
+
+def rebuild(chunk_size=1_000):
+    # 전체 재계산. 레스토랑 pk 키셋 순회라 메모리는 청크 크기만큼만 사용.
+    last_id = 0
+    total = 0
+    while True:
+        pks = list(
+            Restaurant.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            return total
+        total += refresh(pks, chunk_size)
+        last_id = pks[-1]
+
+
+class MenuNames:
+    # 메뉴 이름 → 행 수. 이름 종류는 메뉴 행보다 훨씬 적어서 프로세스 메모리에 둔다.
+    # 부분 일치는 소문자 이름을 줄바꿈으로 이어 붙인 문자열 하나에서 str.find 로 찾는다.
+
+    def __init__(self, counts):
+        self.counts = {name: count for name, count in counts if "\n" not in name}
+        self.names = list(self.counts)
+        lowered = [name.lower() for name in self.names]
+        self.offsets = array("q")  # lowered[i] 는 text[offsets[i]:offsets[i + 1] - 1]
+        position = 0
+        for name in lowered:
+            self.offsets.append(position)
+            position += len(name) + 1
+        self.offsets.append(position)
+        self.text = "".join(f"{name}\n" for name in lowered)
+        self.added = {}  # 만든 뒤에 이 프로세스에서 새로 저장된 이름
+        self.last_pk = (
+            0  # 사전에 들어간 마지막 메뉴 행. 그 뒤 행은 다른 워커가 넣었을 수 있다.
+        )
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(
+            queryset.values_list("name")
+            .annotate(count=Count("pk"))
+            .order_by()
+            .iterator()
+        )
+
+    def add(self, name, count=1):
+        # count 가 음수면 지워졌거나 이름이 바뀐 행. 0 이 된 이름은 찾지 않는다.
+        if name in self.counts:
+            self.counts[name] = max(self.counts[name] + count, 0)
+            return
+        count += self.added.get(name, 0)
+        if count > 0:
+            self.added[name] = count
+        else:
+            self.added.pop(name, None)
+
+    def matching(self, query):
+        # query 가 들어간 이름 → 행 수 (대소문자 무시)
+        query = query.lower()
+        found = {}
+        if "\n" in query:
+            return found
+        start = self.text.find(query)
+        while start != -1:
+            slot = bisect.bisect_right(self.offsets, start) - 1
+            name = self.names[slot]
+            if self.counts[name]:
+                found[name] = self.counts[name]
+            start = self.text.find(query, self.offsets[slot + 1])
+        for name, count in self.added.items():
+            if query in name.lower():
+                found[name] = found.get(name, 0) + count
+        return found
+
+    def recent(self, query):
+        # 사전을 만든 뒤에 들어온 행(pk > last_pk)에서만 찾는다. 다른 워커가 방금 만든 이름이 사전에 없을 때
+        # 표 전체를 LIKE 로 훑지 않도록 pk 범위로 자른다. 읽는 행은 그동안 들어온 행 수를 넘지 않는다.
+        found = {}
+        for name in RestaurantMenu.objects.filter(
+            pk__gt=self.last_pk, name__icontains=query
+        ).values_list("name", flat=True)[:NAME_ROWS_LIMIT]:
+            found[name] = found.get(name, 0) + 1
+        return found
+
+
+_names = None
+_names_lock = threading.Lock()
+
+
+def get_names():
+    # 프로세스 단위 싱글턴. 다른 워커에서 생긴 이름은 MENU_NAMES_MAX_AGE 초마다 다시 읽어 따라잡는다.
+    global _names
+    max_age = getattr(settings, "MENU_NAMES_MAX_AGE", 300)
+    names = _names
+    if names is None or time.monotonic() - names.built_at > max_age:
+        with _names_lock:
+            if _names is None or time.monotonic() - _names.built_at > max_age:
+                last_pk = RestaurantMenu.objects.aggregate(last=Max("pk"))["last"] or 0
+                _names = MenuNames.from_queryset(
+                    RestaurantMenu.objects.filter(pk__lte=last_pk)
+                )
+                _names.last_pk = last_pk
+            names = _names
+    return names
+
+
+def reset_names():
+    global _names
+    with _names_lock:
+        _names = None
+
+
+def names_loaded():
+    return _names is not None
+
+
+def remember_names(names, count=1):
+    # 커밋된 메뉴 행의 이름을 이 프로세스의 사전에 더한다 (지운 행은 count=-1).
+    # 아직 만들어지지 않았으면 첫 조회 때 DB에서 읽는다.
+    current = _names
+    if current is None:
+        return
+    with _names_lock:
+        for name in names:
+            current.add(name, count)
+
+
+def _matching_menus(min_price, max_price, query):
+    menus = RestaurantMenu.objects.filter(price__range=(min_price, max_price))
+    if query:
+        menus = menus.filter(name__icontains=query)
+    return menus.values_list("restaurant_id", "pk", "name", "price")
+
+
+def _among(restaurant_ids, min_price, max_price, query):
+    # 후보가 적을 때: 요약(가격 범위 + 가격대 비트맵)으로 예산 안 메뉴가 없는 곳을 먼저 빼고,
+    # 남은 레스토랑의 메뉴만 (restaurant, price) 인덱스로 읽어 레스토랑마다 가장 싼 일치 메뉴를 고른다.
+    cheapest = {}
+    for chunk in chunked(sorted(restaurant_ids), CANDIDATE_LIMIT):
+        summaries = (
+            RestaurantMenuSummary.objects.filter(
+                pk__in=chunk,
+                restaurant__is_closed=False,
+                min_price__lte=max_price,
+                max_price__gte=min_price,
+            )
+            .alias(hit=F("price_buckets").bitand(bucket_mask(min_price, max_price)))
+            .filter(hit__gt=0)
+        )
+        for row in _matching_menus(min_price, max_price, query).filter(
+            restaurant_id__in=summaries.values("pk")
+        ):
+            best = cheapest.get(row[0])
+            if best is None or (row[3], row[1]) < (best[3], best[1]):
+                cheapest[row[0]] = row
+    return list(cheapest.values())
+
+
+def _open(restaurant_ids):
+    closed = set()
+    for chunk in chunked(restaurant_ids, CANDIDATE_LIMIT):
+        closed.update(
+            Restaurant.objects.filter(pk__in=chunk, is_closed=True).values_list(
+                "pk", flat=True
+            )
+        )
+    return set(restaurant_ids) - closed
+
+
+def _by_name(names, min_price, max_price, restaurant_ids):
+    # 이름이 드물 때: 일치하는 이름들만 (name, price) 인덱스로 읽는다. 가격 범위 전체를 훑지 않는다.
+    cheapest = {}
+    for chunk in chunked(sorted(names), 1_000):
+        for row in _matching_menus(min_price, max_price, "").filter(name__in=chunk):
+            if restaurant_ids is not None and row[0] not in restaurant_ids:
+                continue
+            best = cheapest.get(row[0])
+            if best is None or (row[3], row[1]) < (best[3], best[1]):
+                cheapest[row[0]] = row
+    allowed = _open(cheapest)
+    return [row for pk, row in cheapest.items() if pk in allowed]
+
+
+def _scan(min_price, max_price, query, restaurant_ids, limit):
+    # 후보가 많거나 위치 조건이 없을 때: 메뉴를 가격 인덱스 순서로 (price, id) 키셋으로 읽으면서
+    # 처음 만나는 레스토랑을 모은다. 먼저 만난 메뉴가 그 레스토랑의 가장 싼 일치 메뉴다.
+    # 흔한 메뉴는 금방 끝나지만, 드문 이름은 가격 범위 전체를 훑을 수 있다 (위치를 주면 후보로 좁혀진다).
+    menus = _matching_menus(min_price, max_price, query).order_by("price", "pk")
+    found = {}
+    skipped = set()  # 폐업 또는 후보 밖
+    cursor = None
+    size = min(
+        limit * 4, SCAN_BATCH
+    )  # 흔한 조건은 첫 배치에서 끝나므로 작게 시작해서 두 배씩
+    while len(found) < limit:
+        batch = menus
+        if cursor:
+            price, pk = cursor
+            batch = batch.filter(price__gte=price).filter(
+                Q(price__gt=price) | Q(pk__gt=pk)
+            )
+        rows = list(batch[:size])
+        new = {row[0] for row in rows} - found.keys() - skipped
+        if restaurant_ids is not None:
+            skipped |= new - restaurant_ids
+            new &= restaurant_ids
+        skipped |= new - _open(new)
+        for row in rows:
+            if row[0] not in found and row[0] not in skipped:
+                found[row[0]] = row
+                if len(found) == limit:
+                    break
+        if len(rows) < size:
+            break
+        cursor = rows[-1][3], rows[-1][1]
+        size = min(size * 2, SCAN_BATCH)
+    return list(found.values())
+
+
+def budget_search(
+    max_price,
+    min_price=0,
+    query="",
+    latitude=None,
+    longitude=None,
+    radius_km=1.0,
+    limit=20,
+):
+    # 가격 범위 안에 (이름에 query 가 들어간) 메뉴가 있는 영업 중 레스토랑을 가장 싼 일치 메뉴 순으로.
+    # [(레스토랑 id, 메뉴 id, 메뉴 이름, 가격, 거리 km 또는 None)]. 위치를 주면 반경 안에서만.
+    query = query.strip()
+    distances = None
+    if latitude is not None and longitude is not None:
+        distances = dict(
+            geo.get_index().nearby(
+                float(latitude), float(longitude), radius_km=radius_km
+            )
+        )
+        if not distances:
+            return []
+
+    # 읽을 메뉴 행이 가장 적은 쪽을 고른다: 드문 이름 → 근처 후보가 적음 → 가격순 훑기.
+    # 사전에 없는 이름은 사전을 만든 뒤 다른 워커가 넣은 행에서만 찾아본다 (없는 이름으로 표 전체를 훑지 않음).
+    names = None
+    if query:
+        dictionary = get_names()
+        names = dictionary.matching(query) or dictionary.recent(query)
+        if not names:
+            return []
+    if names is not None and sum(names.values()) <= NAME_ROWS_LIMIT:
+        rows = _by_name(names, min_price, max_price, distances)
+    elif distances is not None and len(distances) <= CANDIDATE_LIMIT:
+        rows = _among(distances, min_price, max_price, query)
+    else:
+        rows = _scan(
+            min_price,
+            max_price,
+            query,
+            None if distances is None else set(distances),
+            limit,
+        )
+
+    distances = distances or {}
+    rows.sort(key=lambda row: (row[3], distances.get(row[0], 0.0), row[0]))
+    return [
+        (restaurant_id, menu_id, name, price, distances.get(restaurant_id))
+        for restaurant_id, menu_id, name, price in rows[:limit]
+    ]
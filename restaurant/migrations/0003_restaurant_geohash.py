@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+from restaurant.geo import encode_geohash
+
+
+def fill_geohash(apps, schema_editor):
+    Restaurant = apps.get_model("restaurant", "Restaurant")
+    batch = []
+    for restaurant in Restaurant.objects.only("latitude", "longitude").iterator(
+        chunk_size=2_000
+    ):
+        restaurant.geohash = encode_geohash(
+            float(restaurant.latitude), float(restaurant.longitude)
+        )
+        batch.append(restaurant)
+        if len(batch) == 2_000:
+            Restaurant.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        Restaurant.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0002_alter_article_options_alter_cuisinetype_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=12,
+                verbose_name="지오해시",
+            ),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
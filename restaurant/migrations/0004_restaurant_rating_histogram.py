@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0003_restaurant_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="1점 평가수"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="2점 평가수"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="3점 평가수"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="4점 평가수"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="5점 평가수"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_sum",
+            field=models.PositiveBigIntegerField(default=0, verbose_name="평점 합계"),
+        ),
+    ]
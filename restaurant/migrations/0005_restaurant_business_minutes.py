@@ -0,0 +1,75 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+from restaurant.hours import business_minutes
+
+
+def fill_business_minutes(apps, schema_editor):
+    Restaurant = apps.get_model("restaurant", "Restaurant")
+    batch = []
+    restaurants = Restaurant.objects.exclude(start_time=None).exclude(end_time=None)
+    for restaurant in restaurants.only(
+        "start_time", "end_time", "last_order_time"
+    ).iterator(chunk_size=2_000):
+        (
+            restaurant.open_minute,
+            restaurant.close_minute,
+            restaurant.last_order_minute,
+        ) = business_minutes(
+            restaurant.start_time, restaurant.end_time, restaurant.last_order_time
+        )
+        batch.append(restaurant)
+        if len(batch) == 2_000:
+            Restaurant.objects.bulk_update(
+                batch, ["open_minute", "close_minute", "last_order_minute"]
+            )
+            batch = []
+    if batch:
+        Restaurant.objects.bulk_update(
+            batch, ["open_minute", "close_minute", "last_order_minute"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0004_restaurant_rating_histogram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="close_minute",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="마감(분)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="last_order_minute",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="라스트 오더(분)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="open_minute",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="오픈(분)",
+            ),
+        ),
+        migrations.RunPython(fill_business_minutes, migrations.RunPython.noop),
+    ]
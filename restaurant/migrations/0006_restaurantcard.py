@@ -0,0 +1,131 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0005_restaurant_business_minutes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RestaurantCard",
+            fields=[
+                (
+                    "restaurant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card",
+                        serialize=False,
+                        to="restaurant.restaurant",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="이름")),
+                (
+                    "branch_name",
+                    models.CharField(blank=True, max_length=100, verbose_name="지점"),
+                ),
+                (
+                    "address",
+                    models.CharField(blank=True, max_length=255, verbose_name="주소"),
+                ),
+                (
+                    "is_closed",
+                    models.BooleanField(default=False, verbose_name="폐업 여부"),
+                ),
+                (
+                    "category_name",
+                    models.CharField(
+                        blank=True, max_length=20, verbose_name="카테고리"
+                    ),
+                ),
+                (
+                    "cuisine_type_name",
+                    models.CharField(
+                        blank=True, max_length=20, verbose_name="음식 종류"
+                    ),
+                ),
+                (
+                    "region_name",
+                    models.CharField(blank=True, max_length=62, verbose_name="지역"),
+                ),
+                (
+                    "tag_names",
+                    models.JSONField(blank=True, default=list, verbose_name="태그"),
+                ),
+                (
+                    "image_url",
+                    models.CharField(
+                        blank=True, max_length=500, verbose_name="대표 이미지"
+                    ),
+                ),
+                (
+                    "thumbnail_url",
+                    models.CharField(
+                        blank=True, max_length=500, verbose_name="대표 이미지 썸네일"
+                    ),
+                ),
+                (
+                    "rating",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default="0.0",
+                        max_digits=3,
+                        verbose_name="평점",
+                    ),
+                ),
+                (
+                    "rating_count",
+                    models.PositiveIntegerField(default=0, verbose_name="평가수"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="수정일"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="restaurant.restaurantcategory",
+                    ),
+                ),
+                (
+                    "region",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="restaurant.region",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "레스토랑 카드",
+                "verbose_name_plural": "레스토랑 카드",
+                "indexes": [
+                    models.Index(
+                        fields=["is_closed", "-rating", "-restaurant"],
+                        name="card_rating_idx",
+                    ),
+                    models.Index(
+                        fields=["category", "is_closed", "-rating", "-restaurant"],
+                        name="card_category_rating_idx",
+                    ),
+                    models.Index(
+                        fields=["region", "is_closed", "-rating", "-restaurant"],
+                        name="card_region_rating_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0006_restaurantcard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, verbose_name="수정일"
+            ),
+        ),
+    ]
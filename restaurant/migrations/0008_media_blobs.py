@@ -0,0 +1,87 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+import restaurant.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0007_restaurant_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(max_length=64, unique=True, verbose_name="sha256"),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, unique=True, verbose_name="경로"),
+                ),
+                ("size", models.PositiveBigIntegerField(verbose_name="크기")),
+                (
+                    "refs",
+                    models.PositiveIntegerField(default=0, verbose_name="참조 수"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="생성일"),
+                ),
+            ],
+            options={
+                "verbose_name": "미디어 파일",
+                "verbose_name_plural": "미디어 파일",
+            },
+        ),
+        migrations.AlterField(
+            model_name="article",
+            name="preview_image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=restaurant.storage.blob_storage,
+                upload_to="article",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="restaurantimage",
+            name="image",
+            field=models.ImageField(
+                storage=restaurant.storage.blob_storage,
+                upload_to="restaurant",
+                verbose_name="이미지",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="restaurantmenu",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=restaurant.storage.blob_storage,
+                upload_to="restaurant-menu",
+                verbose_name="이미지",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reviewimage",
+            name="image",
+            field=models.ImageField(
+                storage=restaurant.storage.blob_storage, upload_to="review"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0008_media_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="source_key",
+            field=models.CharField(
+                blank=True,
+                max_length=100,
+                null=True,
+                unique=True,
+                verbose_name="수집 키",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reviewimage",
+            name="source_url",
+            field=models.URLField(blank=True, max_length=500, verbose_name="원본 URL"),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0009_review_ingest"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="review",
+            options={"verbose_name": "리뷰", "verbose_name_plural": "리뷰"},
+        ),
+        # MySQL 은 FK 를 받쳐 줄 인덱스가 있어야 FK 단독 인덱스를 지울 수 있으므로 복합 인덱스를 먼저
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["restaurant", "-created_at", "-id"], name="review_feed_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="review",
+            name="restaurant",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="restaurant.restaurant",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0010_review_feed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RestaurantMenuSummary",
+            fields=[
+                (
+                    "restaurant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="menu_summary",
+                        serialize=False,
+                        to="restaurant.restaurant",
+                    ),
+                ),
+                (
+                    "item_count",
+                    models.PositiveIntegerField(default=0, verbose_name="메뉴 수"),
+                ),
+                (
+                    "min_price",
+                    models.PositiveIntegerField(default=0, verbose_name="최저가"),
+                ),
+                (
+                    "max_price",
+                    models.PositiveIntegerField(default=0, verbose_name="최고가"),
+                ),
+                (
+                    "median_price",
+                    models.PositiveIntegerField(default=0, verbose_name="중앙값"),
+                ),
+                (
+                    "price_buckets",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="가격대 비트맵"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="수정일"),
+                ),
+            ],
+            options={
+                "verbose_name": "메뉴 가격 요약",
+                "verbose_name_plural": "메뉴 가격 요약",
+            },
+        ),
+        migrations.AlterField(
+            model_name="restaurantmenu",
+            name="price",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, verbose_name="가격"
+            ),
+        ),
+        # MySQL 은 FK 를 받쳐 줄 인덱스가 있어야 FK 단독 인덱스를 지울 수 있으므로 복합 인덱스를 먼저
+        migrations.AddIndex(
+            model_name="restaurantmenu",
+            index=models.Index(
+                fields=["restaurant", "price"], name="menu_restaurant_price_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="restaurantmenu",
+            name="restaurant",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="restaurant.restaurant",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurantmenu",
+            index=models.Index(fields=["name", "price"], name="menu_name_price_idx"),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:34
+
+from django.db import migrations, models
+
+import restaurant.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0011_menu_price_summary"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="reviewimage",
+            name="image",
+            field=models.ImageField(
+                blank=True, storage=restaurant.storage.blob_storage, upload_to="review"
+            ),
+        ),
+    ]
@@ -1,11 +1,20 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Q
 from django.forms import ValidationError
 
+from . import geo, hours, regions
+from .images import ImageDerivativesMixin
+from .storage import blob_storage
+
+
+class Article(ImageDerivativesMixin, models.Model):
+    image_fields = ("preview_image",)
 
-class Article(models.Model):
     title = models.CharField(max_length=100, db_index=True)  # 검색 속도 향상
-    preview_image = models.ImageField(upload_to="article", null=True, blank=True)
+    preview_image = models.ImageField(
+        upload_to="article", storage=blob_storage, null=True, blank=True
+    )
     # 업로드된 이미지는 /media/article/ 폴더 안에 저장됨.
 
     content = models.TextField()
@@ -30,6 +39,47 @@ class Article(models.Model):
         return f"{self.id} - {self.title}"
 
 
+class RestaurantQuerySet(models.QuerySet):
+    def bounding_box(self, latitude, longitude, radius_km):
+        # 위도/경도 인덱스 두 개에 걸친 사각형 범위 검색 (거리 정렬은 하지 않음)
+        min_lat, min_lon, max_lat, max_lon = geo.bounding_box(
+            float(latitude), float(longitude), radius_km
+        )
+        return self.filter(
+            latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon)
+        )
+
+    def geohash_cover(self, latitude, longitude, radius_km):
+        # 반경을 덮는 지오해시 접두어들로 후보를 좁힘 (geohash 인덱스 하나만 사용)
+        query = Q()
+        for prefix in geo.geohash_cover(
+            *geo.bounding_box(float(latitude), float(longitude), radius_km)
+        ):
+            query |= Q(geohash__startswith=prefix)
+        return self.filter(query)
+
+    def open_at(self, value=None, accepting_orders=False):
+        # value 시각(naive 면 RESTAURANT_TIME_ZONE 기준)에 영업 중인 레스토랑.
+        # accepting_orders=True 면 라스트 오더 전인 곳만. 다른 filter() 와 자유롭게 조합 가능.
+        return self.filter(
+            hours.open_at_q(value, accepting_orders=accepting_orders), is_closed=False
+        )
+
+    def open_now(self, accepting_orders=False):
+        return self.open_at(None, accepting_orders=accepting_orders)
+
+    def in_region(self, sido, sigungu=None, eupmyeondong=None):
+        # 지역 이름(별칭 허용: "서울"/"서울특별시")으로 필터. 주소 LIKE 대신 region FK 인덱스를 쓴다.
+        return self.filter(
+            region_id__in=regions.get_resolver().region_ids(sido, sigungu, eupmyeondong)
+        )
+
+    def nearby(self, latitude, longitude, radius=1.0, k=10):
+        # 영업 중(폐업 아님)인 가장 가까운 레스토랑 k개를 거리순 리스트로 반환.
+        # 각 객체의 .distance 에 거리(km)가 들어있음. radius=None 이면 거리 제한 없이 k개.
+        return geo.nearby_restaurants(self, latitude, longitude, radius_km=radius, k=k)
+
+
 class Restaurant(models.Model):
     name = models.CharField("이름", max_length=100, db_index=True)
     branch_name = models.CharField(
@@ -53,6 +103,9 @@ class Restaurant(models.Model):
         db_index=True,
         default="0.0000",
     )
+    geohash = models.CharField(
+        "지오해시", max_length=12, db_index=True, blank=True, editable=False
+    )  # 위도/경도로부터 save() 때 자동 계산됨. 접두어가 같으면 가까운 위치.
     phone = models.CharField(
         "전화번호", max_length=16, help_text="E.164 포맷", blank=True, null=True
     )
@@ -62,11 +115,28 @@ class Restaurant(models.Model):
     rating_count = models.PositiveIntegerField(
         "평가수", default=0
     )  # 0 이상의 양의 정수만 허용하는 필드 (예:좋아요 수, 평가 수 등).
+    # 아래 필드들은 리뷰 저장/삭제 시 restaurant.ratings 가 F() 로 증감시킨다. rating 은 rating_sum / rating_count.
+    rating_sum = models.PositiveBigIntegerField("평점 합계", default=0)
+    rating_1_count = models.PositiveIntegerField("1점 평가수", default=0)
+    rating_2_count = models.PositiveIntegerField("2점 평가수", default=0)
+    rating_3_count = models.PositiveIntegerField("3점 평가수", default=0)
+    rating_4_count = models.PositiveIntegerField("4점 평가수", default=0)
+    rating_5_count = models.PositiveIntegerField("5점 평가수", default=0)
     start_time = models.TimeField(
         "영업 시작 시간", null=True, blank=True
     )  # 시/분/초 단위의 시간만 저장하는 필드 (날짜는 없음). 예: 18:30:00
     end_time = models.TimeField("영업 종료 시간", null=True, blank=True)
     last_order_time = models.TimeField("라스트 오더 시간", null=True, blank=True)
+    # 위 세 시간을 분 단위로 바꾼 값 (save() 때 계산). 자정을 넘기는 마감은 1440 이상. restaurant.hours 참고.
+    open_minute = models.PositiveSmallIntegerField(
+        "오픈(분)", null=True, blank=True, editable=False, db_index=True
+    )
+    close_minute = models.PositiveSmallIntegerField(
+        "마감(분)", null=True, blank=True, editable=False, db_index=True
+    )
+    last_order_minute = models.PositiveSmallIntegerField(
+        "라스트 오더(분)", null=True, blank=True, editable=False, db_index=True
+    )
     category = models.ForeignKey(
         "RestaurantCategory",
         on_delete=models.SET_NULL,
@@ -91,6 +161,10 @@ class Restaurant(models.Model):
         # restaurant.region 정방향 참조: 레스토랑이 어느지역에 속하는지 확인
         # region.restaurants.all() 역참조: 이 지역에 속한 모든 레스토랑들을 조회
     )
+    # API 의 ETag 기준. save() 외에 update()/태그/메뉴/이미지 변경 때도 signals.restaurants_changed 가 갱신한다.
+    updated_at = models.DateTimeField("수정일", auto_now=True, db_index=True)
+
+    objects = RestaurantQuerySet.as_manager()
 
     class Meta:
         verbose_name = "레스토랑"
@@ -100,6 +174,42 @@ class Restaurant(models.Model):
         return f"{self.name} {self.branch_name}" if self.branch_name else self.name
         # 지점명이 있으면 "이름 지점명", 없으면 "이름"만 반환 → 관리자 페이지에서 식별 용이.
 
+    @property
+    def rating_histogram(self):
+        # {별점: 개수} 예: {1: 0, 2: 3, 3: 10, 4: 40, 5: 70}
+        return {star: getattr(self, f"rating_{star}_count") for star in range(1, 6)}
+
+    # 저장 시 자동으로 다시 계산되는 필드: {원본 필드: 파생 필드}
+    DERIVED_FIELDS = {
+        ("latitude", "longitude"): ("geohash",),
+        ("start_time", "end_time", "last_order_time"): (
+            "open_minute",
+            "close_minute",
+            "last_order_minute",
+        ),
+        ("address",): ("region",),
+    }
+
+    def set_derived_fields(self):
+        # save() 를 거치지 않는 bulk_create/bulk_update 전에는 직접 호출해야 함
+        self.geohash = geo.encode_geohash(float(self.latitude), float(self.longitude))
+        self.open_minute, self.close_minute, self.last_order_minute = (
+            hours.business_minutes(self.start_time, self.end_time, self.last_order_time)
+        )
+        # 주소로 지역을 찾지 못하면 직접 지정한 지역을 그대로 둔다
+        self.region_id = regions.resolve(self.address) or self.region_id
+
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for sources, derived in self.DERIVED_FIELDS.items():
+                if update_fields & set(sources):
+                    update_fields.update(derived)
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
 
 class CuisineType(models.Model):  # 퀴진
     name = models.CharField("이름", max_length=20)
@@ -129,7 +239,9 @@ class RestaurantCategory(models.Model):
         return self.name
 
 
-class RestaurantImage(models.Model):
+class RestaurantImage(ImageDerivativesMixin, models.Model):
+    image_fields = ("image",)
+
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE)
     is_representative = models.BooleanField(
         "대표 이미지 여부", default=False
@@ -137,7 +249,7 @@ class RestaurantImage(models.Model):
     order = models.PositiveIntegerField("순서", null=True, blank=True)
     name = models.CharField("이름", max_length=100, null=True, blank=True)
     image = models.ImageField(
-        "이미지", max_length=100, upload_to="restaurant"
+        "이미지", max_length=100, upload_to="restaurant", storage=blob_storage
     )  # 사용자가 이미지를 업로드하면 MEDIA_ROOT/restaurant/ 폴더 아래에 이미지 파일이 저장됩니다. MEDIA_ROOT가 /media/라고 가정하면
     created_at = models.DateTimeField(
         "생성일", auto_now_add=True, db_index=True
@@ -168,12 +280,20 @@ class RestaurantImage(models.Model):
             # "이 레스토랑에 이미 대표 이미지로 설정된 다른 이미지가 있는지 확인"하는 코드입니다.
 
 
-class RestaurantMenu(models.Model):
-    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE)
+class RestaurantMenu(ImageDerivativesMixin, models.Model):
+    image_fields = ("image",)
+
+    # FK 단독 인덱스 대신 아래 (restaurant, price) 복합 인덱스의 앞 컬럼을 쓴다
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, db_index=False)
     name = models.CharField("이름", max_length=100)
-    price = models.PositiveIntegerField("가격", default=0)
+    # 가격순으로 훑는 예산 검색용 (restaurant/menus.py)
+    price = models.PositiveIntegerField("가격", default=0, db_index=True)
     image = models.ImageField(
-        "이미지", upload_to="restaurant-menu", null=True, blank=True
+        "이미지",
+        upload_to="restaurant-menu",
+        storage=blob_storage,
+        null=True,
+        blank=True,
     )
     # 사용자가 이미지를 업로드하면 MEDIA_ROOT/restaurant-menu/ 폴더 아래에 이미지 파일이 저장됩니다. MEDIA_ROOT가 /media/라고 가정하면
 
@@ -185,12 +305,47 @@ class RestaurantMenu(models.Model):
     class Meta:
         verbose_name = "가게 메뉴"
         verbose_name_plural = "가게 메뉴"
+        indexes = [
+            # 레스토랑 몇 곳의 예산 안 메뉴만 가격순으로 (restaurant/menus.py)
+            models.Index(
+                fields=["restaurant", "price"], name="menu_restaurant_price_idx"
+            ),
+            # 드문 이름의 메뉴만 골라 읽기 (restaurant/menus.py MenuNames)
+            models.Index(fields=["name", "price"], name="menu_name_price_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Review(models.Model):
+class RestaurantMenuSummary(models.Model):
+    # 레스토랑별 메뉴 가격 요약. 메뉴가 저장/삭제될 때 restaurant.menus.refresh() 가 다시 계산한다.
+    # 메뉴가 하나도 없는 레스토랑은 행이 없다. 직접 수정하지 말 것.
+    restaurant = models.OneToOneField(
+        Restaurant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="menu_summary",
+    )
+    item_count = models.PositiveIntegerField("메뉴 수", default=0)
+    min_price = models.PositiveIntegerField("최저가", default=0)
+    max_price = models.PositiveIntegerField("최고가", default=0)
+    median_price = models.PositiveIntegerField("중앙값", default=0)
+    # 비트 n: menus.PRICE_BUCKETS 의 n 번째 가격대에 메뉴가 하나라도 있음
+    price_buckets = models.PositiveBigIntegerField("가격대 비트맵", default=0)
+    updated_at = models.DateTimeField("수정일", auto_now=True)
+
+    class Meta:
+        verbose_name = "메뉴 가격 요약"
+        verbose_name_plural = "메뉴 가격 요약"
+
+    def __str__(self):
+        return f"{self.restaurant_id}: {self.min_price}~{self.max_price}"
+
+
+class Review(ImageDerivativesMixin, models.Model):
+    image_fields = ("profile_image",)
+
     title = models.CharField("제목", max_length=100)
     author = models.CharField("작성자", max_length=100)
     profile_image = models.ImageField(
@@ -202,17 +357,28 @@ class Review(models.Model):
     )
     # 양의 정수만 허용되는 필드로 값의 범위는 0부터 32,767까지 가능하지만 아래 validators로 실제 허용 범위는 1~5로 제한됩니다.
 
-    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE)
+    # FK 단독 인덱스 대신 아래 review_feed 복합 인덱스의 앞 컬럼을 쓴다
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, db_index=False)
     social_channel = models.ForeignKey(
         "SocialChannel", on_delete=models.SET_NULL, blank=True, null=True
     )
+    # 크롤러가 붙인 고유 키 (/api/reviews/batch/ 재전송 시 중복 방지). 관리자 화면에서 쓴 리뷰는 NULL.
+    source_key = models.CharField(
+        "수집 키", max_length=100, unique=True, null=True, blank=True
+    )
     created_at = models.DateTimeField("생성일", auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField("수정일", auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "리뷰"
         verbose_name_plural = "리뷰"
-        ordering = ["-created_at"]
+        # 기본 정렬은 두지 않는다: count()/집계/exists() 에 ORDER BY 가 끼지 않도록. 순서가 필요한 곳에서 직접 정렬.
+        indexes = [
+            # 레스토랑별 최신 리뷰 피드 (restaurant/feed.py). 정렬과 키셋 커서가 인덱스 순서 그대로다.
+            models.Index(
+                fields=["restaurant", "-created_at", "-id"], name="review_feed_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.author}:{self.title}"
@@ -230,10 +396,16 @@ class Review(models.Model):
 # ----------사용안함-----------------
 
 
-class ReviewImage(models.Model):
+class ReviewImage(ImageDerivativesMixin, models.Model):
+    image_fields = ("image",)
+
     review = models.ForeignKey(Review, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
-    image = models.ImageField(max_length=100, upload_to="review")
+    # 일괄 수집된 이미지는 내려받기 전(또는 실패한 뒤)에는 빈 문자열이고 source_url 만 있다 (restaurant/ingest.py)
+    image = models.ImageField(
+        max_length=100, upload_to="review", storage=blob_storage, blank=True
+    )
+    source_url = models.URLField("원본 URL", max_length=500, blank=True)
     created_at = models.DateTimeField("생성일", auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField("수정일", auto_now=True, db_index=True)
 
@@ -242,7 +414,28 @@ class ReviewImage(models.Model):
         verbose_name_plural = "리뷰이미지"
 
     def __str__(self):
-        return f"{self.id}:{self.image}"
+        return f"{self.id}:{self.image or self.source_url}"
+
+    def clean(self):
+        # 파일이나 내려받을 원본 주소 중 하나는 있어야 한다
+        if not self.image and not self.source_url:
+            raise ValidationError({"image": "이미지 파일이나 원본 URL 이 필요합니다."})
+
+
+class MediaBlob(models.Model):
+    # 내용 주소 저장소(restaurant/storage.py)의 파일 하나. refs 는 이 파일을 저장한 횟수 - 놓은 횟수.
+    digest = models.CharField("sha256", max_length=64, unique=True)
+    name = models.CharField("경로", max_length=100, unique=True)
+    size = models.PositiveBigIntegerField("크기")
+    refs = models.PositiveIntegerField("참조 수", default=0)
+    created_at = models.DateTimeField("생성일", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "미디어 파일"
+        verbose_name_plural = "미디어 파일"
+
+    def __str__(self):
+        return self.name
 
 
 class SocialChannel(models.Model):
@@ -281,3 +474,65 @@ class Region(models.Model):
 
     def __str__(self):
         return f"{self.sido} {self.sigungu} {self.eupmyeondong}"
+
+
+class RestaurantCard(models.Model):
+    # 목록 화면 카드 한 장에 필요한 값을 레스토랑당 한 행에 모아둔 읽기 전용 테이블.
+    # 원본 모델이 바뀌면 시그널이 restaurant.cards.refresh() 로 다시 채운다. 직접 수정하지 말 것.
+    restaurant = models.OneToOneField(
+        Restaurant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="card",
+    )
+    name = models.CharField("이름", max_length=100)
+    branch_name = models.CharField("지점", max_length=100, blank=True)
+    address = models.CharField("주소", max_length=255, blank=True)
+    is_closed = models.BooleanField("폐업 여부", default=False)
+    category = models.ForeignKey(
+        "RestaurantCategory",
+        on_delete=models.DO_NOTHING,  # 원본(Restaurant.category)이 SET_NULL 이고 카드는 다시 계산됨
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    category_name = models.CharField("카테고리", max_length=20, blank=True)
+    cuisine_type_name = models.CharField("음식 종류", max_length=20, blank=True)
+    region = models.ForeignKey(
+        "Region",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    region_name = models.CharField("지역", max_length=62, blank=True)
+    tag_names = models.JSONField("태그", default=list, blank=True)
+    image_url = models.CharField("대표 이미지", max_length=500, blank=True)
+    thumbnail_url = models.CharField("대표 이미지 썸네일", max_length=500, blank=True)
+    rating = models.DecimalField("평점", max_digits=3, decimal_places=2, default="0.0")
+    rating_count = models.PositiveIntegerField("평가수", default=0)
+    updated_at = models.DateTimeField("수정일", auto_now=True)
+
+    class Meta:
+        verbose_name = "레스토랑 카드"
+        verbose_name_plural = "레스토랑 카드"
+        indexes = [
+            # 목록 기본 정렬(평점순) + 키셋 페이지네이션용
+            models.Index(
+                fields=["is_closed", "-rating", "-restaurant"],
+                name="card_rating_idx",
+            ),
+            models.Index(
+                fields=["category", "is_closed", "-rating", "-restaurant"],
+                name="card_category_rating_idx",
+            ),
+            models.Index(
+                fields=["region", "is_closed", "-rating", "-restaurant"],
+                name="card_region_rating_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.branch_name}" if self.branch_name else self.name
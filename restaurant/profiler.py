@@ -0,0 +1,139 @@
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    # 값만 다른 쿼리를 같은 모양으로 묶는다: 리터럴 → ?, IN (%s, %s, ...) → IN (...)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class Profile:
+    def __init__(self):
+        self.statements = []  # (alias, sql, 걸린 시간(초))
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append(
+                (context["connection"].alias, sql, time.perf_counter() - started)
+            )
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def db_time(self):
+        return sum(duration for _, _, duration in self.statements)
+
+    def shapes(self):
+        return Counter(fingerprint(sql) for _, sql, _ in self.statements)
+
+    def repeated(self, threshold=None):
+        # {모양: 횟수} 중 threshold 번 이상 실행된 것. 보통 N+1 이다.
+        if threshold is None:
+            threshold = settings.QUERY_PROFILER_REPEAT_THRESHOLD
+        return {
+            shape: count
+            for shape, count in self.shapes().most_common()
+            if count >= threshold
+        }
+
+    def server_timing(self):
+        total = (self.elapsed or 0) * 1000
+        db = self.db_time * 1000
+        metrics = [
+            f"total;dur={total:.1f}",
+            f'db;dur={db:.1f};desc="{self.count} queries"',
+            f"app;dur={max(total - db, 0):.1f}",
+        ]
+        repeated = self.repeated()
+        if repeated:
+            metrics.append(f'repeat;desc="{len(repeated)} repeated query shapes"')
+        return ", ".join(metrics)
+
+    def report(self, limit=5):
+        lines = [
+            f"{self.count} queries, db {self.db_time * 1000:.1f}ms"
+            + (f" of {self.elapsed * 1000:.1f}ms" if self.elapsed is not None else "")
+        ]
+        for shape, count in list(self.repeated().items())[:limit]:
+            lines.append(f"  x{count} {shape}")
+        slowest = sorted(self.statements, key=lambda row: row[2], reverse=True)
+        for alias, sql, duration in slowest[:limit]:
+            lines.append(f"  {duration * 1000:.1f}ms [{alias}] {sql}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile():
+    # with profile() as result: ... → 블록 안에서 실행된 모든 DB 의 SQL 을 기록
+    result = Profile()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(result))
+        try:
+            yield result
+        finally:
+            result.elapsed = time.perf_counter() - result.started
+
+
+@contextmanager
+def query_budget(max_queries=None, max_repeats=None):
+    # 테스트용: 쿼리 수 또는 같은 모양 쿼리의 반복 횟수가 예산을 넘으면 AssertionError
+    with profile() as result:
+        yield result
+    problems = []
+    if max_queries is not None and result.count > max_queries:
+        problems.append(f"{result.count} queries > budget {max_queries}")
+    if max_repeats is not None:
+        for shape, count in result.repeated(max_repeats + 1).items():
+            problems.append(f"x{count} > budget {max_repeats}: {shape}")
+    if problems:
+        raise AssertionError("\n".join(problems + [result.report()]))
+
+
+class QueryProfilerMiddleware:
+    # QUERY_PROFILER_ENABLED=False 면 MiddlewareNotUsed 로 체인에서 빠져 비용이 없다
+    def __init__(self, get_response):
+        if not settings.QUERY_PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with profile() as result:
+            response = self.get_response(request)
+        response["Server-Timing"] = result.server_timing()
+        if (
+            result.elapsed * 1000 >= settings.QUERY_PROFILER_SLOW_MS
+            and random.random() < settings.QUERY_PROFILER_SAMPLE_RATE
+        ):
+            logger.warning(
+                "slow request %s %s\n%s",
+                request.method,
+                request.get_full_path(),
+                result.report(),
+            )
+        return response
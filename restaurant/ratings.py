@@ -0,0 +1,182 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from . import cards, leaderboards, realtime
+from .bulk import upsert
+
+STARS = range(1, 6)
+# 한 번에 바뀌는 레스토랑이 이보다 많으면 레스토랑당 UPDATE 대신 읽고-계산해서 upsert 한 문장으로 쓴다
+BULK_APPLY_THRESHOLD = 20
+
+
+def histogram_field(star):
+    return f"rating_{star}_count"
+
+
+AGGREGATE_FIELDS = ["rating", "rating_count", "rating_sum"] + [
+    histogram_field(star) for star in STARS
+]
+
+
+def ratings_synced(restaurant_ids):
+    # 집계가 바뀐 레스토랑: 카드 평점은 같은 트랜잭션에서, 순위표와 실시간 이벤트는 커밋 후에
+    cards.sync_ratings(restaurant_ids)
+    realtime.ratings_changed(restaurant_ids)
+    transaction.on_commit(lambda: leaderboards.refresh(restaurant_ids))
+
+
+def average_rating():
+    # DB 안에서 rating_sum / rating_count 로 평균을 다시 계산 (읽고-쓰기 경쟁 없음)
+    return Case(
+        When(rating_count=0, then=Value(Decimal("0.00"))),
+        default=Cast(
+            Cast(F("rating_sum"), FloatField()) / F("rating_count"),
+            DecimalField(max_digits=3, decimal_places=2),
+        ),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+class RatingChanges:
+    # 레스토랑별 별점 증감을 모아두었다가 apply() 에서 레스토랑당 UPDATE 두 번으로 반영
+    def __init__(self):
+        self._changes = defaultdict(Counter)
+
+    def __bool__(self):
+        return any(any(counter.values()) for counter in self._changes.values())
+
+    def add(self, restaurant_id, rating, count=1):
+        self._changes[restaurant_id][rating] += count
+
+    def remove(self, restaurant_id, rating, count=1):
+        self._changes[restaurant_id][rating] -= count
+
+    def apply(self):
+        from .models import Restaurant
+
+        if len(self._changes) >= BULK_APPLY_THRESHOLD:
+            return self._apply_bulk()
+        changed = []
+        with transaction.atomic():
+            for restaurant_id, counter in self._changes.items():
+                updates = {}
+                total = rating_sum = 0
+                for star, count in counter.items():
+                    if not count:
+                        continue
+                    field = histogram_field(star)
+                    updates[field] = F(field) + count
+                    total += count
+                    rating_sum += star * count
+                if not updates:
+                    continue
+                updates["rating_count"] = F("rating_count") + total
+                updates["rating_sum"] = F("rating_sum") + rating_sum
+                Restaurant.objects.filter(pk=restaurant_id).update(**updates)
+                changed.append(restaurant_id)
+            if changed:
+                Restaurant.objects.filter(pk__in=changed).update(
+                    rating=average_rating(), updated_at=timezone.now()
+                )
+                ratings_synced(changed)
+        self._changes.clear()
+        return changed
+
+    def _apply_bulk(self):
+        # 일괄 수집처럼 수백 개 레스토랑이 함께 바뀔 때: 행을 잠그고 읽어서 파이썬에서 더한 뒤 한 번에 쓴다.
+        # 잠금이 있으므로 동시에 도는 F() 증감과 섞여도 값을 잃지 않는다.
+        from .models import Restaurant
+
+        fields = AGGREGATE_FIELDS + ["updated_at"]
+        now = timezone.now()
+        changed = []
+        with transaction.atomic():
+            for restaurant in Restaurant.objects.select_for_update().filter(
+                pk__in=list(self._changes)
+            ):
+                before = Counter(
+                    {star: getattr(restaurant, histogram_field(star)) for star in STARS}
+                )
+                counter = Counter(before)
+                counter.update(self._changes[restaurant.pk])
+                if counter == before:
+                    continue
+                for field, value in expected_values(counter).items():
+                    setattr(restaurant, field, value)
+                restaurant.updated_at = now
+                changed.append(restaurant)
+            if changed:
+                upsert(Restaurant, changed, unique_fields=["pk"], update_fields=fields)
+                ratings_synced([restaurant.pk for restaurant in changed])
+        self._changes.clear()
+        return [restaurant.pk for restaurant in changed]
+
+
+def review_changed(old, new):
+    # old/new: (restaurant_id, rating) 또는 None (생성/삭제)
+    if old == new:
+        return []
+    changes = RatingChanges()
+    if old is not None:
+        changes.remove(*old)
+    if new is not None:
+        changes.add(*new)
+    return changes.apply()
+
+
+def count_reviews(restaurant_ids):
+    # {restaurant_id: Counter({별점: 개수})} — 정렬이 GROUP BY 에 끼지 않도록 order_by() 로 비워 둔다
+    from .models import Review
+
+    counts = defaultdict(Counter)
+    rows = (
+        Review.objects.filter(restaurant_id__in=restaurant_ids)
+        .order_by()
+        .values_list("restaurant_id", "rating")
+        .annotate(count=Count("id"))
+    )
+    for restaurant_id, rating, count in rows:
+        counts[restaurant_id][rating] = count
+    return counts
+
+
+def expected_values(counter):
+    values = {histogram_field(star): counter.get(star, 0) for star in STARS}
+    values["rating_count"] = sum(values.values())
+    values["rating_sum"] = sum(star * counter.get(star, 0) for star in STARS)
+    if values["rating_count"]:
+        values["rating"] = (
+            Decimal(values["rating_sum"]) / values["rating_count"]
+        ).quantize(Decimal("0.01"))
+    else:
+        values["rating"] = Decimal("0.00")
+    return values
+
+
+def reconcile(restaurant_ids, fix=True):
+    # 주어진 레스토랑들의 집계값을 리뷰 테이블과 비교해서 어긋난 id 목록을 반환 (fix=True 면 바로잡음)
+    from .models import Restaurant
+
+    fields = AGGREGATE_FIELDS
+    drifted = []
+    with transaction.atomic():
+        restaurants = Restaurant.objects.filter(pk__in=restaurant_ids).only(*fields)
+        if fix:
+            restaurants = restaurants.select_for_update()
+        counts = count_reviews(restaurant_ids)
+        for restaurant in restaurants:
+            expected = expected_values(counts.get(restaurant.pk, Counter()))
+            if any(getattr(restaurant, f) != v for f, v in expected.items()):
+                drifted.append(restaurant)
+                for field, value in expected.items():
+                    setattr(restaurant, field, value)
+                restaurant.updated_at = timezone.now()
+        if fix and drifted:
+            Restaurant.objects.bulk_update(drifted, fields + ["updated_at"])
+            ratings_synced([restaurant.pk for restaurant in drifted])
+    return [restaurant.pk for restaurant in drifted]
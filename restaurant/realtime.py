@@ -0,0 +1,132 @@
+import json
+import logging
+import threading
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+
+from .bulk import chunked
+from .models import Restaurant
+
+logger = logging.getLogger(__name__)
+
+# 실시간 허브(ml_model_api/websocketsServer.py)로 보내는 이벤트. 구독 채널은 레스토랑별/지역별 두 가지이고
+# 이벤트 하나를 레스토랑 채널과 (있으면) 지역 채널에 함께 보낸다.
+#   {"channel": "restaurant:12", "type": "review", "data": {...}}
+REVIEW = "review"  # 새 리뷰
+RATING = "rating"  # 평점/평가 수가 바뀜
+STATUS = "status"  # 폐업 여부가 바뀜
+PUBLISH_BATCH_SIZE = 500  # POST 한 번에 보내는 이벤트 수
+
+
+def enabled():
+    return bool(settings.REALTIME_HUB_URL)
+
+
+def channel_events(kind, restaurant_id, region_id, data):
+    events = [{"channel": f"restaurant:{restaurant_id}", "type": kind, "data": data}]
+    if region_id is not None:
+        events.append({"channel": f"region:{region_id}", "type": kind, "data": data})
+    return events
+
+
+def reviews_created(reviews):
+    if not enabled():
+        return
+    reviews = list(reviews)
+    regions = dict(
+        Restaurant.objects.filter(
+            pk__in={review.restaurant_id for review in reviews}
+        ).values_list("pk", "region_id")
+    )
+    events = []
+    for review in reviews:
+        data = {
+            "review": review.pk,
+            "restaurant": review.restaurant_id,
+            "rating": review.rating,
+            "title": review.title,
+            "author": review.author,
+        }
+        events += channel_events(
+            REVIEW, review.restaurant_id, regions.get(review.restaurant_id), data
+        )
+    publish(events)
+
+
+def ratings_changed(restaurant_ids):
+    # 집계를 갱신한 같은 트랜잭션 안에서 읽으므로 바뀐 값이 보인다
+    if not enabled():
+        return
+    events = []
+    for pk, region_id, rating, rating_count in Restaurant.objects.filter(
+        pk__in=list(restaurant_ids)
+    ).values_list("pk", "region_id", "rating", "rating_count"):
+        data = {"restaurant": pk, "rating": float(rating), "rating_count": rating_count}
+        events += channel_events(RATING, pk, region_id, data)
+    publish(events)
+
+
+def status_changed(restaurant):
+    if enabled():
+        data = {"restaurant": restaurant.pk, "is_closed": restaurant.is_closed}
+        publish(channel_events(STATUS, restaurant.pk, restaurant.region_id, data))
+
+
+def send(events):
+    # 허브가 꺼져 있어도 쓰기는 실패하지 않는다. 놓친 이벤트는 클라이언트가 다시 연결할 때 API 로 새로 읽는다.
+    for chunk in chunked(events, PUBLISH_BATCH_SIZE):
+        request = urllib.request.Request(
+            settings.REALTIME_HUB_URL.rstrip("/") + "/publish",
+            data=json.dumps({"events": chunk}, ensure_ascii=False).encode(),
+            headers={
+                "Content-Type": "application/json",
+                "X-Hub-Token": settings.REALTIME_HUB_TOKEN,
+            },
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=settings.REALTIME_PUBLISH_TIMEOUT
+            ) as response:
+                response.read()
+        except OSError as error:
+            logger.warning("실시간 이벤트 %d개 발행 실패: %s", len(chunk), error)
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender():
+    # 스레드 하나: 요청 스레드를 붙잡지 않으면서 이벤트 순서(커밋 순서)를 지킨다
+    global _sender
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _sender_lock:
+        if _sender is None:
+            _sender = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="realtime-publish"
+            )
+    return _sender
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("실시간 이벤트 발행 중 오류", exc_info=future.exception())
+
+
+def publish(events):
+    # 커밋된 변경만 내보낸다. 호출 한 번(청크/집계 한 번)의 이벤트가 POST 한 번이 된다.
+    events = list(events)
+    if not events or not enabled():
+        return
+
+    def submit():
+        if settings.REALTIME_PUBLISH_ASYNC:
+            get_sender().submit(send, events).add_done_callback(_log_failure)
+        else:
+            send(events)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,170 @@
+from array import array
+from pathlib import Path
+
+import joblib
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from ml_model_api.registry import publish
+
+# 결과는 ml_model_api/registry.py 의 publish 로 발행한다 (같은 저장 구조, 같은 버전 규칙).
+#   RECOMMENDATION_DIR/item_neighbors/<버전>/model.joblib + CURRENT
+# model.joblib 은 아래 배열의 dict 이고, FastAPI 워커들이 mmap 으로 함께 읽는다.
+#   restaurant_ids: 정렬된 레스토랑 id (n,)
+#   indptr: restaurant_ids[i] 의 이웃은 neighbors[indptr[i]:indptr[i + 1]] (n + 1,)
+#   neighbors, scores: 유사도 내림차순 이웃 id 와 점수
+
+
+NAME = "item_neighbors"
+KEEP_VERSIONS = 3
+
+
+def rating_matrix(rows):
+    # rows: (author, restaurant_id, rating) 반복자 → (사용자×레스토랑 CSR, 레스토랑 id 배열)
+    # 같은 작성자가 같은 레스토랑에 여러 번 남긴 리뷰는 평균을 쓴다.
+    users, items = {}, {}
+    user_index, item_index, values = array("q"), array("q"), array("f")
+    for author, restaurant_id, rating in rows:
+        user_index.append(users.setdefault(author, len(users)))
+        item_index.append(items.setdefault(restaurant_id, len(items)))
+        values.append(rating)
+    shape = (len(users), len(items))
+    user_index = np.frombuffer(user_index, dtype=np.int64)
+    item_index = np.frombuffer(item_index, dtype=np.int64)
+    totals = sparse.csr_matrix(
+        (np.frombuffer(values, dtype=np.float32), (user_index, item_index)), shape
+    )
+    counts = sparse.csr_matrix(
+        (np.ones(len(values), dtype=np.float32), (user_index, item_index)), shape
+    )
+    totals.data /= counts.data  # 같은 (행, 열) 은 같은 순서로 합쳐진다
+    return totals, np.fromiter(items, dtype=np.int64, count=len(items))
+
+
+def center(matrix):
+    # 사용자 평균을 뺀다 (adjusted cosine). 후하게/짜게 주는 사용자의 편향을 없앰.
+    counts = np.diff(matrix.indptr)
+    means = np.zeros(matrix.shape[0], dtype=np.float32)
+    np.divide(matrix.sum(axis=1).A1, counts, out=means, where=counts > 0)
+    centered = matrix.copy()
+    centered.data -= np.repeat(means, counts)
+    centered.eliminate_zeros()
+    return centered
+
+
+def top_k_neighbors(ratings, k=20, min_support=2, shrinkage=10.0, chunk_size=500):
+    # 레스토랑(열) 사이 adjusted cosine 유사도의 양수 상위 k 개. (레스토랑 수)² 행렬을 만들지 않도록
+    # chunk_size 개 레스토랑씩 희소 행렬 곱을 하고 바로 상위 k 개만 남긴다.
+    # 함께 평가한 사용자가 min_support 명 미만이면 버리고, 적을수록 shrinkage 로 점수를 깎는다.
+    centered = center(ratings.tocsr()).tocsc()
+    norms = np.sqrt(centered.multiply(centered).sum(axis=0).A1)
+    normalized = (
+        centered
+        @ sparse.diags(np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0))
+    ).tocsr()
+    rated = (ratings != 0).astype(np.float32).tocsr()
+    normalized_t = normalized.T.tocsr()
+    rated_t = rated.T.tocsr()
+
+    n_items = ratings.shape[1]
+    indptr = np.zeros(n_items + 1, dtype=np.int64)
+    neighbors, scores = [], []
+    for start in range(0, n_items, chunk_size):
+        stop = min(start + chunk_size, n_items)
+        similarity = (normalized_t[start:stop] @ normalized).tocsr()
+        support = (rated_t[start:stop] @ rated).tocsr()
+        support.sort_indices()
+        for row in range(stop - start):
+            item = start + row
+            begin, end = similarity.indptr[row], similarity.indptr[row + 1]
+            columns, values = similarity.indices[begin:end], similarity.data[begin:end]
+            keep = (values > 0) & (columns != item)
+            columns, values = columns[keep], values[keep]
+
+            # 유사도가 0 이 아니면 함께 평가한 사용자가 있으므로 support 행에 반드시 있다
+            begin, end = support.indptr[row], support.indptr[row + 1]
+            support_columns = support.indices[begin:end]
+            together = support.data[begin:end][
+                np.searchsorted(support_columns, columns)
+            ]
+            keep = together >= min_support
+            columns, values, together = columns[keep], values[keep], together[keep]
+            values = values * together / (together + shrinkage)
+
+            if len(values) > k:
+                top = np.argpartition(-values, k)[:k]
+                columns, values = columns[top], values[top]
+            order = np.lexsort((columns, -values))
+            neighbors.append(columns[order])
+            scores.append(values[order])
+            indptr[item + 1] = indptr[item] + len(order)
+    if not neighbors:
+        return indptr, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    return (
+        indptr,
+        np.concatenate(neighbors).astype(np.int64),
+        np.concatenate(scores).astype(np.float32),
+    )
+
+
+def save_neighbors(root, restaurant_ids, indptr, neighbors, scores):
+    # 열 번호 → 레스토랑 id 로 바꾸고, id 순으로 정렬해서 발행 (읽는 쪽은 searchsorted 로 찾음)
+    order = np.argsort(restaurant_ids)
+    lengths = np.diff(indptr)[order]
+    sorted_indptr = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=sorted_indptr[1:])
+    slices = [np.arange(indptr[i], indptr[i + 1]) for i in order]
+    positions = np.concatenate(slices) if slices else np.zeros(0, dtype=np.int64)
+    version = publish(
+        root,
+        NAME,
+        {
+            "restaurant_ids": restaurant_ids[order],
+            "indptr": sorted_indptr,
+            "neighbors": restaurant_ids[neighbors[positions]],
+            "scores": scores[positions],
+        },
+        keep=KEEP_VERSIONS,
+    )
+    return Path(root) / NAME / version
+
+
+def load(root, version=None):
+    # 발행된 이웃 배열 dict (기본: CURRENT 버전)
+    base = Path(root) / NAME
+    version = version or (base / "CURRENT").read_text().strip()
+    return joblib.load(base / version / "model.joblib", mmap_mode="r")
+
+
+def review_rows():
+    from .models import Review
+
+    return (
+        Review.objects.order_by()
+        .values_list("author", "restaurant_id", "rating")
+        .iterator(chunk_size=10_000)
+    )
+
+
+def build(rows=None, k=20, min_support=2, shrinkage=10.0, chunk_size=500, root=None):
+    # (author, restaurant_id, rating) 전체(기본: Review 테이블)로 이웃 목록을 만들어 저장.
+    matrix, restaurant_ids = rating_matrix(review_rows() if rows is None else rows)
+    indptr, neighbors, scores = top_k_neighbors(
+        matrix,
+        k=k,
+        min_support=min_support,
+        shrinkage=shrinkage,
+        chunk_size=chunk_size,
+    )
+    path = save_neighbors(
+        root or settings.RECOMMENDATION_DIR, restaurant_ids, indptr, neighbors, scores
+    )
+    return {
+        "ratings": matrix.nnz,
+        "users": matrix.shape[0],
+        "restaurants": matrix.shape[1],
+        "with_neighbors": int(np.count_nonzero(np.diff(indptr))),
+        "pairs": len(neighbors),
+        "path": path,
+    }
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+# 광역시도 정식 명칭/옛 명칭 → 짧은 이름. Region.sido 가 어느 쪽으로 저장돼 있어도 같은 키로 비교한다.
+SIDO_ALIASES = {
+    "서울": ("서울특별시", "서울시"),
+    "부산": ("부산광역시", "부산시"),
+    "대구": ("대구광역시", "대구시"),
+    "인천": ("인천광역시", "인천시"),
+    "광주": ("광주광역시", "광주시"),
+    "대전": ("대전광역시", "대전시"),
+    "울산": ("울산광역시", "울산시"),
+    "세종": ("세종특별자치시", "세종시"),
+    "경기": ("경기도",),
+    "강원": ("강원도", "강원특별자치도"),
+    "충북": ("충청북도",),
+    "충남": ("충청남도",),
+    "전북": ("전라북도", "전북특별자치도"),
+    "전남": ("전라남도",),
+    "경북": ("경상북도",),
+    "경남": ("경상남도",),
+    "제주": ("제주도", "제주특별자치도"),
+}
+_SIDO = {alias: short for short, aliases in SIDO_ALIASES.items() for alias in aliases}
+_SIDO.update({short: short for short in SIDO_ALIASES})
+
+_SEPARATORS = re.compile(r"[\s,]+")
+_PARENTHESES = re.compile(r"\(([^)]*)\)")
+_DONG_NUMBER = re.compile(r"(?<=[가-힣])\d+(?:\.\d+)*(?=동$)")
+
+
+def canonical_sido(name):
+    return _SIDO.get(name, name)
+
+
+def dong_variants(name):
+    # 주소의 행정동 "역삼1동" 은 Region 에 법정동 "역삼동" 만 있으면 그것으로 찾는다
+    yield name
+    stripped = _DONG_NUMBER.sub("", name)
+    if stripped != name:
+        yield stripped
+
+
+def address_tokens(address):
+    # "서울특별시 강남구 테헤란로 123 (역삼동, 강남빌딩)" → ["서울", "강남구", "테헤란로", "123", "역삼동", "강남빌딩"]
+    # 도로명 주소는 괄호 안에 동 이름이 있으므로 괄호 내용을 뒤에 붙인다.
+    if not address:
+        return []
+    address = unicodedata.normalize("NFKC", address).strip()
+    extra = " ".join(_PARENTHESES.findall(address))
+    tokens = [
+        token for token in _SEPARATORS.split(_PARENTHESES.sub(" ", address)) if token
+    ]
+    tokens += [token for token in _SEPARATORS.split(extra) if token]
+    if tokens:
+        tokens[0] = canonical_sido(tokens[0])
+    return tokens
+
+
+class _Node:
+    __slots__ = ("children", "dongs")
+
+    def __init__(self):
+        self.children = {}  # 다음 토큰 → _Node (시도 → 시군구 토큰들)
+        self.dongs = {}  # 읍면동 이름 → Region pk
+
+
+class RegionResolver:
+    # 시도 → 시군구(여러 토큰일 수 있음: "성남시 분당구") → 읍면동 트라이.
+    # 주소 한 건 해석은 토큰 몇 개의 dict 조회라 수 마이크로초면 끝난다.
+
+    def __init__(self, regions=()):
+        self.root = _Node()
+        self.sigungu = (
+            {}
+        )  # 시도 없이 시작하는 주소용: 시군구 첫 토큰 → [시도 바로 아래 _Node]
+        self.built_at = time.monotonic()
+        for pk, sido, sigungu, eupmyeondong in regions:
+            self.add(pk, sido, sigungu, eupmyeondong)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(queryset.values_list("pk", "sido", "sigungu", "eupmyeondong"))
+
+    def add(self, pk, sido, sigungu, eupmyeondong):
+        node = self.root.children.setdefault(canonical_sido(sido.strip()), _Node())
+        for depth, token in enumerate(sigungu.split()):
+            node = node.children.setdefault(token, _Node())
+            if depth == 0:
+                candidates = self.sigungu.setdefault(token, [])
+                if node not in candidates:
+                    candidates.append(node)
+        node.dongs.setdefault(eupmyeondong.strip(), pk)
+
+    def _walk(self, node, tokens, start):
+        # 시군구 토큰을 가능한 한 길게 따라간다
+        position = start
+        while position < len(tokens) and tokens[position] in node.children:
+            node = node.children[tokens[position]]
+            position += 1
+        return node, position
+
+    def _dong(self, node, tokens, start):
+        # 시군구 뒤의 토큰 중 첫 번째로 읍면동에 해당하는 것 (도로명/번지는 건너뜀)
+        dongs = node.dongs
+        for token in tokens[start:]:
+            for variant in dong_variants(token):
+                pk = dongs.get(variant)
+                if pk is not None:
+                    return pk
+        return None
+
+    def resolve(self, address):
+        # 주소 → Region pk (못 찾으면 None)
+        tokens = address_tokens(address)
+        if not tokens:
+            return None
+        sido = self.root.children.get(tokens[0])
+        if sido is not None:
+            node, position = self._walk(sido, tokens, 1)
+            return self._dong(node, tokens, position)
+        # "강남구 역삼동 ..." 처럼 시도가 빠진 주소는 시군구 이름이 한 곳뿐일 때만
+        candidates = self.sigungu.get(tokens[0], ())
+        if len(candidates) == 1:
+            node, position = self._walk(candidates[0], tokens, 1)
+            return self._dong(node, tokens, position)
+        return None
+
+    def region_ids(self, sido, sigungu=None, eupmyeondong=None):
+        # 이름(별칭 포함)으로 지정한 범위 안의 모든 Region pk. 예: ("서울특별시", "강남구")
+        node = self.root.children.get(canonical_sido(sido))
+        if node is None:
+            return set()
+        for token in (sigungu or "").split():
+            node = node.children.get(token)
+            if node is None:
+                return set()
+        if eupmyeondong:
+            pk = next(
+                (
+                    node.dongs[variant]
+                    for variant in dong_variants(eupmyeondong)
+                    if variant in node.dongs
+                ),
+                None,
+            )
+            return set() if pk is None else {pk}
+        ids = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            ids.update(current.dongs.values())
+            stack.extend(current.children.values())
+        return ids
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    # 프로세스 단위 싱글턴. Region 이 바뀌면 시그널이 초기화하고, 다른 워커는 주기적으로 다시 읽는다.
+    global _resolver
+    from .models import Region
+
+    max_age = getattr(settings, "REGION_RESOLVER_MAX_AGE", 3600)
+    resolver = _resolver
+    if resolver is None or time.monotonic() - resolver.built_at > max_age:
+        with _resolver_lock:
+            if _resolver is None or time.monotonic() - _resolver.built_at > max_age:
+                _resolver = RegionResolver.from_queryset(Region.objects.order_by("pk"))
+            resolver = _resolver
+    return resolver
+
+
+def reset_resolver():
+    global _resolver
+    with _resolver_lock:
+        _resolver = None
+
+
+def resolve(address):
+    return get_resolver().resolve(address)
@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# restaurant 앱 모델의 읽기만 복제본으로 보낸다. 세션/인증 등 나머지는 항상 primary.
+APP_LABEL = "restaurant"
+PIN_COOKIE = "db_pin"
+
+_queries = Counter()
+_queries_lock = threading.Lock()
+
+_health = {}  # alias → (확인 시각, 정상 여부)
+_health_lock = threading.Lock()
+
+
+class _State:
+    def __init__(self, pinned=False):
+        self.pinned = pinned  # True 면 이후 읽기는 모두 primary (read-your-writes)
+        self.wrote = False
+        self.replica = None  # 요청 하나 안에서는 같은 복제본을 계속 사용
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def _current():
+    # 요청 밖(관리 명령, 셸)에서는 스레드 컨텍스트에 하나를 만들어 계속 쓴다
+    state = _state.get()
+    if state is None:
+        state = _State()
+        _state.set(state)
+    return state
+
+
+def reset():
+    _state.set(None)
+
+
+def pin():
+    state = _current()
+    state.pinned = True
+    state.wrote = True
+
+
+def replicas():
+    return list(settings.DATABASE_REPLICAS)
+
+
+def count_query(execute, sql, params, many, context):
+    with _queries_lock:
+        _queries[context["connection"].alias] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def stats():
+    # {"default": 120, "replica1": 340, ...} (현재 프로세스 기준 실행된 쿼리 수)
+    with _queries_lock:
+        return dict(_queries)
+
+
+def reset_stats():
+    with _queries_lock:
+        _queries.clear()
+    with _health_lock:
+        _health.clear()
+
+
+def replica_lag(alias):
+    # 복제 지연(초). 복제가 멈춰 있으면 None.
+    connection = connections[alias]
+    if connection.vendor != "mysql":
+        return 0  # 로컬 SQLite 대역은 지연이 없다고 본다
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+            column = "Seconds_Behind_Source"
+        except Exception:  # MySQL 8.0.22 이전
+            cursor.execute("SHOW SLAVE STATUS")
+            column = "Seconds_Behind_Master"
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        names = [description[0] for description in cursor.description]
+        return dict(zip(names, row))[column]
+
+
+def is_healthy(alias):
+    now = time.monotonic()
+    with _health_lock:
+        checked_at, healthy = _health.get(alias, (None, False))
+    if (
+        checked_at is not None
+        and now - checked_at < settings.DATABASE_REPLICA_CHECK_INTERVAL
+    ):
+        return healthy
+    try:
+        lag = replica_lag(alias)
+        healthy = lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG
+    except Exception:
+        healthy = False  # 접속 실패도 지연 초과와 똑같이 취급
+    with _health_lock:
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+def health():
+    return {alias: is_healthy(alias) for alias in replicas()}
+
+
+def _in_transaction():
+    # TestCase 가 감싼 atomic 은 제외해야 테스트에서도 운영과 같은 경로로 라우팅된다
+    return any(
+        not getattr(block, "_from_testcase", False)
+        for block in connections[DEFAULT_DB_ALIAS].atomic_blocks
+    )
+
+
+def read_alias():
+    state = _current()
+    if state.pinned or _in_transaction():
+        return DEFAULT_DB_ALIAS
+    if state.replica is not None and is_healthy(state.replica):
+        return state.replica
+    healthy = [alias for alias in replicas() if is_healthy(alias)]
+    if not healthy:
+        return DEFAULT_DB_ALIAS
+    state.replica = random.choice(healthy)
+    return state.replica
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != APP_LABEL or not replicas():
+            return None
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db  # 관계를 따라가는 읽기는 원래 객체를 읽은 DB에서
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+        pin()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+
+class PinPrimaryMiddleware:
+    # 쓰기가 있었던 요청 뒤 DATABASE_PIN_SECONDS 동안은 쿠키로 primary 에 고정 (POST 후 리다이렉트 등)
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _State(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
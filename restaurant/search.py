@@ -0,0 +1,377 @@
+import fcntl
+import heapq
+import logging
+import math
+import os
+import pickle
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+_WORD = re.compile(r"\w+")
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+RESTAURANT = "restaurant"
+ARTICLE = "article"
+KINDS = (RESTAURANT, ARTICLE)
+
+
+def tokenize(text):
+    # 한글이 섞인 단어는 글자 2-gram 으로 (띄어쓰기/조사와 무관하게 부분 일치), 그 외는 단어 그대로
+    if not text:
+        return
+    text = unicodedata.normalize("NFKC", text).lower()
+    for word in _WORD.findall(text):
+        if len(word) > 1 and _HANGUL.search(word):
+            for start in range(len(word) - 1):
+                yield word[start : start + 2]
+        else:
+            yield word
+
+
+class SearchIndex:
+    # 역색인: term → {doc_id: 가중 tf}. BM25 로 점수를 매긴다.
+    k1 = 1.2
+    b = 0.75
+    common_ratio = (
+        0.05  # 문서의 5% 이상에 나오는 흔한 term 은 새 후보를 만들지 않고 점수만 더함
+    )
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_terms = {}  # doc_id → term 튜플 (삭제 시 postings 정리용)
+        self.doc_lengths = {}
+        self.total_length = 0
+        # 한글 음절 → 그 음절이 든 2-gram term. 한 글자 검색어("밥")를 "김밥", "밥천" 등으로 넓힐 때 쓴다.
+        self.syllables = {}
+
+    def __setstate__(self, state):
+        # syllables 가 없던 때의 스냅샷도 읽는다
+        self.__dict__.update(state)
+        if "syllables" not in state:
+            self.syllables = {}
+            for term in self.postings:
+                self._link(term)
+
+    def _link(self, term):
+        if len(term) == 2:
+            for syllable in set(term):
+                if _HANGUL.match(syllable):
+                    self.syllables.setdefault(syllable, set()).add(term)
+
+    def _unlink(self, term):
+        if len(term) == 2:
+            for syllable in set(term):
+                bigrams = self.syllables.get(syllable)
+                if bigrams is not None:
+                    bigrams.discard(term)
+                    if not bigrams:
+                        del self.syllables[syllable]
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id, fields):
+        # fields: [(텍스트, 가중치)] 예: [(name, 3), (description, 1)]
+        self.remove(doc_id)
+        counts = Counter()
+        for text, weight in fields:
+            for term in tokenize(text):
+                counts[term] += weight
+        length = sum(counts.values())
+        for term, frequency in counts.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                self._link(term)
+            posting[doc_id] = frequency
+        self.doc_terms[doc_id] = tuple(counts)
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                self._unlink(term)
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        return True
+
+    def _posting(self, term):
+        # 문서는 2-gram 으로만 색인되므로 한 글자 한글 검색어는 그 글자가 든 2-gram 들을 합친 posting 으로 찾는다
+        bigrams = self.syllables.get(term) if len(term) == 1 else None
+        if not bigrams:
+            return self.postings.get(term)
+        merged = Counter(self.postings.get(term, {}))  # 한 글자 단어로 색인된 문서
+        for bigram in bigrams:
+            merged.update(self.postings[bigram])
+        return merged
+
+    def search(self, query, limit=20):
+        # (doc_id, 점수) 를 점수 내림차순으로 반환
+        doc_count = len(self.doc_lengths)
+        postings = {}
+        for term in dict.fromkeys(tokenize(query)):
+            posting = self._posting(term)
+            if posting:
+                postings[term] = posting
+        terms = list(postings)
+        if not doc_count or not terms:
+            return []
+
+        # BM25: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * 길이 / 평균길이))
+        doc_lengths = self.doc_lengths
+        base = self.k1 * (1 - self.b)
+        slope = self.k1 * self.b * doc_count / self.total_length
+        boost = self.k1 + 1
+        terms.sort(key=lambda term: len(postings[term]))  # 희귀한 term 부터
+        common = max(1, int(doc_count * self.common_ratio))
+        scores = {}
+        for position, term in enumerate(terms):
+            posting = postings[term]
+            df = len(posting)
+            weight = boost * math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            if position == 0 or df < common:
+                items = posting.items()
+            else:
+                # 흔한 term: 이미 후보인 문서에만 점수를 더함 (긴 postings 전체를 돌지 않음)
+                items = [
+                    (doc_id, posting[doc_id]) for doc_id in scores if doc_id in posting
+                ]
+            get = scores.get
+            for doc_id, frequency in items:
+                scores[doc_id] = get(doc_id, 0.0) + weight * frequency / (
+                    frequency + base + slope * doc_lengths[doc_id]
+                )
+
+        if len(scores) <= limit:
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+        else:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return ranked[:limit]
+
+
+def restaurant_fields(restaurant):
+    # prefetch_related("tags", "restaurantmenu_set") 된 객체를 기대함
+    return [
+        (restaurant.name, 3),
+        (restaurant.branch_name, 2),
+        (" ".join(tag.name for tag in restaurant.tags.all()), 2),
+        (" ".join(menu.name for menu in restaurant.restaurantmenu_set.all()), 1),
+        (restaurant.feature, 1),
+        (restaurant.address, 1),
+        (restaurant.description, 1),
+    ]
+
+
+def article_fields(article):
+    return [(article.title, 3), (article.content, 1)]
+
+
+def documents(kind, pks=None):
+    # (pk, fields) 를 청크 단위로 읽어온다. pks 가 주어지면 그 문서들만.
+    from .models import Article, Restaurant
+
+    if kind == RESTAURANT:
+        queryset = Restaurant.objects.prefetch_related("tags", "restaurantmenu_set")
+        to_fields = restaurant_fields
+    else:
+        # 공개된 칼럼만 색인한다. 비공개로 바뀌면 reindex 에서 못 찾으므로 색인에서 빠진다.
+        queryset = Article.objects.filter(is_published=True)
+        to_fields = article_fields
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    for obj in queryset.order_by("pk").iterator(chunk_size=2_000):
+        yield obj.pk, to_fields(obj)
+
+
+class SearchEngine:
+    # 디렉터리 안에 snapshot.pickle (색인 전체) + journal.log (스냅샷 이후 바뀐 "종류 pk" 줄) 를 둔다.
+    # 모든 프로세스가 같은 저널을 읽어 따라오므로 워커끼리 색인이 어긋나지 않는다.
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / "snapshot.pickle"
+        self.journal_path = self.directory / "journal.log"
+        self.indexes = {kind: SearchIndex() for kind in KINDS}
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._missing_logged = False
+
+    def _journal_stat(self):
+        try:
+            return os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        # 스냅샷을 읽었으면 True. 없으면 빈 색인으로 두고 False (다음 검색 때 다시 확인).
+        # 요청 경로에서 DB 전체를 읽어 rebuild 하지 않는다: 스냅샷은 manage.py rebuild_search_index 로 만든다.
+        with self._lock:
+            try:
+                with open(self.snapshot_path, "rb") as snapshot:
+                    data = pickle.load(snapshot)
+            except FileNotFoundError:
+                if not self._missing_logged:
+                    logger.warning(
+                        "검색 색인 스냅샷이 없습니다(%s). manage.py rebuild_search_index 를 실행하세요.",
+                        self.snapshot_path,
+                    )
+                    self._missing_logged = True
+                self.indexes = {kind: SearchIndex() for kind in KINDS}
+                self._loaded = False
+                return False
+            # 스냅샷 이후의 변경은 현재 저널에 있으므로 처음부터 다시 반영 (재색인은 멱등)
+            current = self._journal_stat()
+            self.indexes = data["indexes"]
+            self._journal_inode = current.st_ino if current else None
+            self._journal_offset = 0
+            self._loaded = True
+            return True
+
+    def rebuild(self):
+        # DB 에서 전체 색인을 다시 만들고 스냅샷 저장 + 새 빈 저널로 교체
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stat = self._journal_stat()
+            started_at = stat.st_size if stat else 0
+
+            indexes = {kind: SearchIndex() for kind in KINDS}
+            for kind in KINDS:
+                for pk, fields in documents(kind):
+                    indexes[kind].add(pk, fields)
+            self.indexes = indexes
+
+            # 색인을 만드는 동안 다른 프로세스가 남긴 변경분을 반영
+            current = self._journal_stat()
+            if current is not None:
+                same_journal = stat is not None and stat.st_ino == current.st_ino
+                self._journal_inode = current.st_ino
+                self._journal_offset = started_at if same_journal else 0
+                self._replay()
+
+            # 스냅샷을 먼저 쓰고 새 저널로 교체. 다른 프로세스는 저널 inode 가 바뀐 것을 보고 스냅샷을 다시 읽는다.
+            # 스냅샷을 쓰는 동안(오래 걸림) 다른 프로세스가 남긴 줄은 스냅샷에 없으므로 새 저널로 옮긴다.
+            # 저널 잠금은 이 마지막 복사+교체 동안만 잡는다 (record 는 쓸 때마다 잠근다).
+            self._write_snapshot()
+            fd, new_journal = tempfile.mkstemp(dir=self.directory, suffix=".log")
+            with open(self.journal_path, "ab") as journal, os.fdopen(fd, "wb") as tail:
+                fcntl.flock(journal, fcntl.LOCK_EX)
+                same_journal = os.fstat(journal.fileno()).st_ino == self._journal_inode
+                with open(self.journal_path, "rb") as old:
+                    old.seek(self._journal_offset if same_journal else 0)
+                    tail.write(old.read())
+                tail.flush()
+                os.replace(new_journal, self.journal_path)
+            self._journal_inode = os.stat(self.journal_path).st_ino
+            self._journal_offset = 0
+            self._loaded = True
+
+    def _write_snapshot(self):
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".pickle")
+        with os.fdopen(fd, "wb") as snapshot:
+            pickle.dump(
+                {"indexes": self.indexes}, snapshot, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(path, self.snapshot_path)
+
+    def _replay(self):
+        stat = self._journal_stat()
+        if stat is None:
+            return
+        if stat.st_ino != self._journal_inode or stat.st_size < self._journal_offset:
+            # 다른 프로세스가 rebuild 해서 저널이 교체됨 → 새 스냅샷부터 다시
+            if not self.load():
+                return
+            stat = self._journal_stat()
+            if stat is None:
+                return
+        if stat.st_size == self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as journal:
+            journal.seek(self._journal_offset)
+            chunk = journal.read(stat.st_size - self._journal_offset)
+        complete = chunk.rfind(b"\n") + 1  # 아직 쓰는 중인 마지막 줄은 다음에
+        self._journal_offset += complete
+        changed = {kind: set() for kind in KINDS}
+        for line in chunk[:complete].decode().splitlines():
+            kind, pk = line.split()
+            changed[kind].add(int(pk))
+        for kind, pks in changed.items():
+            if pks:
+                self.reindex(kind, pks)
+
+    def reindex(self, kind, pks):
+        index = self.indexes[kind]
+        found = set()
+        for pk, fields in documents(kind, pks):
+            index.add(pk, fields)
+            found.add(pk)
+        for pk in set(pks) - found:
+            index.remove(pk)
+
+    def sync(self):
+        with self._lock:
+            if not self._loaded and not self.load():
+                return
+            self._replay()
+
+    def record(self, kind, pks):
+        # 저널 잠금을 잡고 붙인다. 잠그는 사이에 rebuild 가 저널을 바꿨으면 예전 파일에 쓴 줄은 사라지므로
+        # 경로가 아직 연 파일을 가리키는지 확인하고, 아니면 새 저널을 다시 연다.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lines = "".join(f"{kind} {pk}\n" for pk in pks)
+        while lines:
+            with open(self.journal_path, "a") as journal:
+                fcntl.flock(journal, fcntl.LOCK_EX)
+                current = self._journal_stat()
+                if (
+                    current is None
+                    or current.st_ino != os.fstat(journal.fileno()).st_ino
+                ):
+                    continue
+                journal.write(lines)
+                return
+
+    def search(self, query, limit=20):
+        self.sync()
+        return {kind: self.indexes[kind].search(query, limit) for kind in KINDS}
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    directory = Path(settings.SEARCH_INDEX_DIR)
+    if _engine is None or _engine.directory != directory:
+        with _engine_lock:
+            if _engine is None or _engine.directory != directory:
+                _engine = SearchEngine(directory)
+    return _engine
+
+
+def record_change(kind, pks):
+    get_engine().record(kind, pks)
+
+
+def search(query, limit=20):
+    # {"restaurant": [(pk, 점수)], "article": [(pk, 점수)]}
+    return get_engine().search(query, limit)
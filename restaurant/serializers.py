@@ -0,0 +1,107 @@
+from rest_framework import serializers
+
+from .images import SIZES, derivative_url
+from .models import Restaurant, RestaurantImage, RestaurantMenu, Review, ReviewImage
+
+
+class ImageField(serializers.Field):
+    # 원본 URL 과 파생 이미지(WebP) URL 들. 파생본은 업로드 후 백그라운드에서 만들어진다.
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return {
+            "url": value.url,
+            **{f"{size}_url": derivative_url(value, size) for size in SIZES},
+        }
+
+
+class RestaurantImageSerializer(serializers.ModelSerializer):
+    image = ImageField()
+
+    class Meta:
+        model = RestaurantImage
+        fields = ["id", "name", "is_representative", "order", "image"]
+
+
+class RestaurantSerializer(serializers.ModelSerializer):
+    category = serializers.CharField(
+        source="category.name", read_only=True, allow_null=True
+    )
+    cuisine_type = serializers.CharField(
+        source="category.cuisine_type.name", read_only=True, allow_null=True
+    )
+    region = serializers.StringRelatedField()
+    tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field="name")
+    images = RestaurantImageSerializer(
+        many=True, read_only=True, source="restaurantimage_set"
+    )
+    rating_histogram = serializers.DictField(read_only=True)
+
+    class Meta:
+        model = Restaurant
+        fields = [
+            "id",
+            "name",
+            "branch_name",
+            "description",
+            "address",
+            "feature",
+            "phone",
+            "is_closed",
+            "latitude",
+            "longitude",
+            "start_time",
+            "end_time",
+            "last_order_time",
+            "category",
+            "cuisine_type",
+            "region",
+            "tags",
+            "images",
+            "rating",
+            "rating_count",
+            "rating_histogram",
+            "updated_at",
+        ]
+
+
+class RestaurantMenuSerializer(serializers.ModelSerializer):
+    image = ImageField()
+
+    class Meta:
+        model = RestaurantMenu
+        fields = ["id", "restaurant", "name", "price", "image", "updated_at"]
+
+
+class ReviewImageSerializer(serializers.ModelSerializer):
+    image = ImageField()
+
+    class Meta:
+        model = ReviewImage
+        fields = ["id", "name", "image"]
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    profile_image = ImageField()
+    social_channel = serializers.StringRelatedField()
+    images = ReviewImageSerializer(many=True, read_only=True, source="reviewimage_set")
+
+    class Meta:
+        model = Review
+        fields = [
+            "id",
+            "restaurant",
+            "title",
+            "author",
+            "profile_image",
+            "content",
+            "rating",
+            "social_channel",
+            "images",
+            "created_at",
+            "updated_at",
+        ]
@@ -0,0 +1,364 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import (
+    cards,
+    facets,
+    feed,
+    fragments,
+    geo,
+    images,
+    leaderboards,
+    menus,
+    ratings,
+    realtime,
+    regions,
+    replicas,
+    search,
+)
+from .models import (
+    Article,
+    CuisineType,
+    Region,
+    Restaurant,
+    RestaurantCategory,
+    RestaurantImage,
+    RestaurantMenu,
+    Review,
+    ReviewImage,
+    Tag,
+)
+
+
+# 트랜잭션이 롤백되면 인덱스에 반영되지 않도록 커밋 이후에 갱신
+@receiver(post_save, sender=Restaurant)
+def index_restaurant_location(sender, instance, **kwargs):
+    transaction.on_commit(lambda: geo.index_restaurant(instance))
+
+
+@receiver(post_delete, sender=Restaurant)
+def unindex_restaurant_location(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: geo.unindex_restaurant(pk))
+
+
+# 리뷰 수정 전 (레스토랑, 별점)을 DB에서 읽어 두었다가 저장 후 차이만큼 집계를 증감
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._rating_before = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {"rating", "restaurant"} & set(update_fields):
+        return
+    instance._rating_before = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list("restaurant_id", "rating")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = None if created else getattr(instance, "_rating_before", None)
+    if not created and before is None:
+        return
+    ratings.review_changed(before, (instance.restaurant_id, instance.rating))
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, origin=None, **kwargs):
+    # 레스토랑 삭제로 함께 지워지는 리뷰는 집계할 필요가 없음
+    if isinstance(origin, Restaurant):
+        return
+    ratings.review_changed((instance.restaurant_id, instance.rating), None)
+
+
+# 실시간 허브로 보내는 이벤트 (커밋 후). 별점 변화는 ratings.ratings_synced 가 보낸다.
+@receiver(post_save, sender=Review)
+def publish_new_review(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        realtime.reviews_created([instance])
+
+
+@receiver(pre_save, sender=Restaurant)
+def remember_closed(sender, instance, raw=False, **kwargs):
+    instance._closed_before = None
+    if not raw and not instance._state.adding and realtime.enabled():
+        instance._closed_before = (
+            Restaurant.objects.filter(pk=instance.pk)
+            .values_list("is_closed", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Restaurant)
+def publish_closed_flip(sender, instance, created, raw=False, **kwargs):
+    before = getattr(instance, "_closed_before", None)
+    if not created and before is not None and before != instance.is_closed:
+        realtime.status_changed(instance)
+
+
+def restaurants_changed(pks, search_index=True, card=True, touch=True, membership=True):
+    # 레스토랑 문서가 바뀌었을 때 커밋 후 검색 색인 저널, 목록 카드, 패싯 비트셋/순위표를 갱신.
+    # membership: 태그/카테고리/지역/폐업 여부가 바뀌었을 수 있음 (메뉴/이미지 변경은 아님)
+    # touch: save() 를 거치지 않은 변경(태그/메뉴/이미지/update())도 API ETag 가 바뀌도록 updated_at 을 올림
+    pks = list(pks)
+    if not pks:
+        return
+    if touch:
+        Restaurant.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+    def apply():
+        if search_index:
+            search.record_change(search.RESTAURANT, pks)
+        if card:
+            cards.refresh(pks)
+        if membership:
+            facets.refresh(pks)
+            leaderboards.refresh(pks)
+        fragments.bump(fragments.INDEX_RESTAURANTS)
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        restaurants_changed([instance.pk], touch=False)  # save() 가 이미 갱신
+
+
+@receiver(post_delete, sender=Restaurant)
+def restaurant_deleted(sender, instance, **kwargs):
+    restaurants_changed(
+        [instance.pk], card=False, touch=False
+    )  # 카드는 CASCADE 로 함께 삭제됨
+
+
+@receiver(post_save, sender=RestaurantMenu)
+@receiver(post_delete, sender=RestaurantMenu)
+def menu_changed(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Restaurant):
+        return
+    # 가격 요약은 같은 트랜잭션 안에서 다시 계산 (롤백되면 함께 되돌아간다)
+    menus.refresh([instance.restaurant_id])
+    restaurants_changed([instance.restaurant_id], card=False, membership=False)
+
+
+# 예산 검색의 메뉴 이름 사전: 새 행과 지운 행, 이름 변경만 센다 (다른 워커는 MENU_NAMES_MAX_AGE 마다 다시 읽는다)
+@receiver(pre_save, sender=RestaurantMenu)
+def remember_menu_name_before(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    instance._name_before = None
+    if raw or instance._state.adding or not menus.names_loaded():
+        return
+    if update_fields is not None and "name" not in update_fields:
+        return
+    instance._name_before = (
+        RestaurantMenu.objects.filter(pk=instance.pk)
+        .values_list("name", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=RestaurantMenu)
+def remember_menu_name(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    name, before = instance.name, getattr(instance, "_name_before", None)
+    if created:
+        transaction.on_commit(lambda: menus.remember_names([name]))
+    elif before is not None and before != name:
+
+        def renamed():
+            menus.remember_names([before], -1)
+            menus.remember_names([name])
+
+        transaction.on_commit(renamed)
+
+
+@receiver(post_delete, sender=RestaurantMenu)
+def forget_menu_name(sender, instance, **kwargs):
+    name = instance.name
+    transaction.on_commit(lambda: menus.remember_names([name], -1))
+
+
+@receiver(post_save, sender=RestaurantImage)
+@receiver(post_delete, sender=RestaurantImage)
+def restaurant_image_changed(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, Restaurant):
+        restaurants_changed(
+            [instance.restaurant_id], search_index=False, membership=False
+        )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(
+    pre_delete, sender=Tag
+)  # 삭제 후에는 연결된 레스토랑을 알 수 없으므로 pre_delete
+def tag_changed(sender, instance, **kwargs):
+    restaurants_changed(instance.restaurant_set.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=Restaurant.tags.through)
+def restaurant_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # tag.restaurant_set.clear(): 지워지기 전에 대상 레스토랑을 기록
+        restaurants_changed(instance.restaurant_set.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        restaurants_changed(pk_set if reverse else [instance.pk])
+    elif action == "post_clear" and not reverse:
+        restaurants_changed([instance.pk])
+
+
+# 카테고리/음식 종류/지역 이름은 카드에만 들어감. 삭제 시 Restaurant 는 SET_NULL(시그널 없음)이라 pre_delete 에서 대상 기록.
+@receiver(post_save, sender=RestaurantCategory)
+@receiver(pre_delete, sender=RestaurantCategory)
+def category_changed(sender, instance, **kwargs):
+    restaurants_changed(
+        instance.restaurant_set.values_list("pk", flat=True), search_index=False
+    )
+
+
+@receiver(post_save, sender=CuisineType)
+def cuisine_type_changed(sender, instance, **kwargs):
+    restaurants_changed(
+        Restaurant.objects.filter(category__cuisine_type=instance).values_list(
+            "pk", flat=True
+        ),
+        search_index=False,
+    )
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+def reset_region_resolver(sender, **kwargs):
+    # 롤백될 수도 있으므로 지금 한 번, 커밋 후 한 번 더 비운다
+    regions.reset_resolver()
+    transaction.on_commit(regions.reset_resolver)
+
+
+@receiver(post_save, sender=Region)
+@receiver(pre_delete, sender=Region)
+def region_changed(sender, instance, **kwargs):
+    restaurants_changed(
+        instance.restaurants.values_list("pk", flat=True), search_index=False
+    )
+
+
+@receiver(post_save, sender=ReviewImage)
+@receiver(post_delete, sender=ReviewImage)
+def touch_review(sender, instance, raw=False, origin=None, **kwargs):
+    # 리뷰 API 응답에 이미지 목록이 들어가므로 리뷰의 updated_at(ETag)도 올린다
+    if not raw and not isinstance(origin, (Review, Restaurant)):
+        Review.objects.filter(pk=instance.review_id).update(updated_at=timezone.now())
+        feed.invalidate(
+            Review.objects.filter(pk=instance.review_id).values_list(
+                "restaurant_id", flat=True
+            )
+        )
+
+
+# 레스토랑별 리뷰 피드 첫 페이지 캐시 (수정 시 레스토랑이 바뀌었으면 예전 레스토랑도)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_feed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, Restaurant):
+        return
+    before = getattr(instance, "_rating_before", None)
+    feed.invalidate([instance.restaurant_id] + ([before[0]] if before else []))
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def reindex_article(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: search.record_change(search.ARTICLE, [pk]))
+
+
+# 메인 페이지 조각 캐시: 버전만 올리면 모든 워커가 다음 요청에서 새로 만든다
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_index_articles(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: fragments.bump(fragments.INDEX_ARTICLES))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_index_restaurants(sender, instance, raw=False, **kwargs):
+    # 별점이 바뀌면 추천 레스토랑 순위/평점도 바뀜
+    if not raw:
+        transaction.on_commit(lambda: fragments.bump(fragments.INDEX_RESTAURANTS))
+
+
+# 이미지가 있는 모델은 저장 후(커밋 후) 썸네일/WebP 생성을 프로세스 풀에 맡김. 이미 있으면 워커가 건너뜀.
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=RestaurantImage)
+@receiver(post_save, sender=RestaurantMenu)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=ReviewImage)
+def schedule_image_derivatives(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for field in instance.image_fields:
+        images.schedule(getattr(instance, field).name)
+
+
+# 내용 주소 저장소(blobs)의 참조 수: 행이 지워지거나 다른 파일로 바뀌면 예전 파일의 참조를 하나 놓는다.
+# 같은 트랜잭션에서 세므로 롤백되면 함께 되돌아가고, 실제 파일 삭제는 storage 가 커밋 후에 한다.
+BLOB_MODELS = (Article, RestaurantImage, RestaurantMenu, ReviewImage)
+
+
+def release_blob(fieldfile_or_name, field):
+    name = getattr(fieldfile_or_name, "name", fieldfile_or_name)
+    if field.storage.is_blob(name):
+        field.storage.delete(name)
+
+
+@receiver(pre_save)
+def remember_blob_names(sender, instance, raw=False, **kwargs):
+    if raw or sender not in BLOB_MODELS or instance._state.adding:
+        return
+    instance._blobs_before = (
+        sender.objects.filter(pk=instance.pk).values(*instance.image_fields).first()
+        or {}
+    )
+
+
+@receiver(post_save)
+def release_replaced_blobs(sender, instance, raw=False, **kwargs):
+    before = getattr(instance, "_blobs_before", None)
+    if raw or sender not in BLOB_MODELS or not before:
+        return
+    instance._blobs_before = None
+    for field_name, name in before.items():
+        if name and name != getattr(instance, field_name).name:
+            release_blob(name, instance._meta.get_field(field_name))
+
+
+@receiver(post_delete)
+def release_deleted_blobs(sender, instance, **kwargs):
+    if sender not in BLOB_MODELS:
+        return
+    for field_name in instance.image_fields:
+        release_blob(
+            getattr(instance, field_name), instance._meta.get_field(field_name)
+        )
+
+
+@receiver(connection_created)
+def count_queries(sender, connection, **kwargs):
+    # DB 별 쿼리 수 집계 (/db/stats/)
+    replicas.install_query_counter(connection)
@@ -0,0 +1,472 @@
+import hashlib
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+MB = 1024 * 1024
+S3_MIN_PART_SIZE = 5 * MB  # 마지막 조각을 빼면 S3 가 받는 최소 크기
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def stats():
+    # {"uploads": 3, "multipart_uploads": 1, "parts": 6, "cache_hits": 10, "cache_misses": 2, ...}
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class S3Multipart:
+    # S3Storage 의 버킷에 멀티파트 업로드. 조각은 여러 스레드에서 동시에 올라간다.
+    min_part_size = S3_MIN_PART_SIZE
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def start(self, name, content):
+        from storages.utils import clean_name
+
+        key = self.storage._normalize_name(clean_name(name))
+        params = self.storage._get_write_parameters(key, content)
+        client = self.storage.bucket.meta.client
+        upload = client.create_multipart_upload(
+            Bucket=self.storage.bucket_name, Key=key, **params
+        )
+        return {"key": key, "id": upload["UploadId"]}
+
+    def upload_part(self, upload, number, data):
+        response = self.storage.bucket.meta.client.upload_part(
+            Bucket=self.storage.bucket_name,
+            Key=upload["key"],
+            UploadId=upload["id"],
+            PartNumber=number,
+            Body=data,
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    def complete(self, upload, parts):
+        self.storage.bucket.meta.client.complete_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=upload["key"],
+            UploadId=upload["id"],
+            MultipartUpload={"Parts": parts},
+        )
+
+    def abort(self, upload):
+        self.storage.bucket.meta.client.abort_multipart_upload(
+            Bucket=self.storage.bucket_name, Key=upload["key"], UploadId=upload["id"]
+        )
+
+
+class LocalMultipart:
+    # 로컬/테스트용 S3 대역. FileSystemStorage 아래 .multipart/<업로드 id>/ 에 조각을 쓰고 완료 시 이어 붙인다.
+    min_part_size = 1
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def start(self, name, content):
+        staging = Path(self.storage.location) / ".multipart" / uuid.uuid4().hex
+        staging.mkdir(parents=True)
+        return {"name": name, "staging": staging}
+
+    def upload_part(self, upload, number, data):
+        (upload["staging"] / f"{number:05d}").write_bytes(data)
+        return {"PartNumber": number, "ETag": hashlib.md5(data).hexdigest()}
+
+    def complete(self, upload, parts):
+        target = Path(self.storage.path(upload["name"]))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=upload["staging"])
+        with os.fdopen(fd, "wb") as output:
+            for part in sorted(parts, key=lambda part: part["PartNumber"]):
+                with open(upload["staging"] / f"{part['PartNumber']:05d}", "rb") as f:
+                    shutil.copyfileobj(f, output)
+        os.replace(tmp, target)
+        shutil.rmtree(upload["staging"], ignore_errors=True)
+
+    def abort(self, upload):
+        shutil.rmtree(upload["staging"], ignore_errors=True)
+
+
+class DiskCache:
+    # 최근에 읽은 객체를 로컬 디스크에 둔다. 읽을 때마다 mtime 을 갱신하고, 합계가 max_bytes 를 넘으면
+    # mtime 이 오래된 것부터 지워 90% 아래로 맞춘다 (같은 디렉터리를 여러 워커가 함께 써도 됨).
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # 이 프로세스가 아는 합계. 넘었을 때만 디렉터리를 다시 훑는다.
+        self.estimate = None
+
+    def path(self, name):
+        digest = hashlib.sha1(name.encode()).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, name):
+        path = self.path(name)
+        try:
+            os.utime(path)
+            return open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+    def writer(self, name):
+        # 다 쓰고 나서 commit() 해야 캐시에 보인다. 도중에 실패하면 discard().
+        return _CacheWriter(self, name)
+
+    def put(self, name, tmp, size):
+        path = self.path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, path)
+        with self.lock:
+            if self.estimate is None:
+                self.estimate = self.total()
+            else:
+                self.estimate += size
+            if self.estimate > self.max_bytes:
+                self.estimate = self.evict()
+
+    def discard(self, name):
+        try:
+            self.path(name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        for path in self.directory.glob("??/*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def total(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            _count("cache_evictions")
+        return total
+
+
+class _CacheWriter:
+    def __init__(self, cache, name):
+        self.cache = cache
+        self.name = name
+        self.size = 0
+        cache.directory.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=cache.directory, prefix=".tmp-")
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def commit(self):
+        self.file.close()
+        if self.size > self.cache.max_bytes:
+            os.unlink(self.tmp)  # 캐시 전체보다 큰 객체는 두지 않는다
+            return
+        self.cache.put(self.name, self.tmp, self.size)
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.unlink(self.tmp)
+        except FileNotFoundError:
+            pass
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers):
+    # 업로드 조각 전송용 스레드 풀 (프로세스당 하나)
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers, thread_name_prefix="upload")
+    return _executor
+
+
+class WrappedStorage(Storage):
+    # 다른 백엔드(backend + options)를 감싸는 저장소의 공통 부분.
+    def __init__(
+        self, backend="django.core.files.storage.FileSystemStorage", options=None
+    ):
+        self.backend = import_string(backend)(**(options or {}))
+
+    # 이름 규칙, URL, 메타데이터는 원래 백엔드 그대로
+    def get_valid_name(self, name):
+        return self.backend.get_valid_name(name)
+
+    def get_available_name(self, name, max_length=None):
+        return self.backend.get_available_name(name, max_length=max_length)
+
+    def generate_filename(self, filename):
+        return self.backend.generate_filename(filename)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def get_accessed_time(self, name):
+        return self.backend.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backend.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+    def delete(self, name):
+        self.backend.delete(name)
+
+    def _open(self, name, mode="rb"):
+        return self.backend.open(name, mode)
+
+    def _save(self, name, content):
+        return self.backend.save(name, content)
+
+
+@deconstructible(path="restaurant.storage.CachedStorage")
+class CachedStorage(WrappedStorage):
+    # 기존 백엔드(backend + options)를 감싼다.
+    #  - 저장: chunk_size 보다 크면 멀티파트로 조각을 스레드 풀에서 동시에 올린다. 동시에 들고 있는
+    #    조각은 max_concurrency 개라서 파일 크기와 상관없이 메모리는 chunk_size × max_concurrency 이하.
+    #  - 읽기: 로컬 디스크 캐시에 있으면 거기서, 없으면 받아서 캐시에 넣으며 돌려준다.
+    #    방금 올린 원본은 바로 파생 이미지를 만들며 다시 읽으므로 저장할 때도 캐시에 넣는다.
+    def __init__(
+        self,
+        backend="django.core.files.storage.FileSystemStorage",
+        options=None,
+        cache_dir=None,
+        cache_max_bytes=1024 * MB,
+        chunk_size=8 * MB,
+        max_concurrency=4,
+    ):
+        super().__init__(backend, options)
+        self.cache = DiskCache(
+            cache_dir or Path(tempfile.gettempdir()) / "media-cache", cache_max_bytes
+        )
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.multipart = self.multipart_for(self.backend)
+        if self.multipart is not None:
+            self.chunk_size = max(chunk_size, self.multipart.min_part_size)
+
+    @staticmethod
+    def multipart_for(backend):
+        if isinstance(backend, FileSystemStorage):
+            return LocalMultipart(backend)
+        if hasattr(type(backend), "bucket") and hasattr(
+            backend, "_get_write_parameters"
+        ):
+            return S3Multipart(backend)
+        return None
+
+    def delete(self, name):
+        self.cache.discard(name)
+        self.backend.delete(name)
+
+    def _open(self, name, mode="rb"):
+        if "w" in mode or "a" in mode or "+" in mode:
+            self.cache.discard(name)
+            return self.backend.open(name, mode)
+        cached = self.cache.get(name)
+        if cached is not None:
+            _count("cache_hits")
+            return File(cached, name)
+        _count("cache_misses")
+        writer = self.cache.writer(name)
+        try:
+            with self.backend.open(name, "rb") as source:
+                for chunk in source.chunks(self.chunk_size):
+                    writer.write(chunk)
+        except BaseException:
+            writer.discard()
+            raise
+        writer.commit()
+        cached = self.cache.get(name)
+        if cached is None:  # 캐시에 두기에는 너무 커서 버려졌다
+            return self.backend.open(name, "rb")
+        return File(cached, name)
+
+    def _save(self, name, content):
+        _count("uploads")
+        size = getattr(content, "size", None)
+        if self.multipart is None or (size is not None and size <= self.chunk_size):
+            name = self.backend.save(name, content)
+            writer = self.cache.writer(name)
+            try:
+                for chunk in content.chunks(self.chunk_size):
+                    writer.write(chunk)
+            except BaseException:
+                writer.discard()
+                self.cache.discard(name)
+                raise
+            writer.commit()
+            return name
+
+        _count("multipart_uploads")
+        writer = self.cache.writer(name)
+        upload = self.multipart.start(name, content)
+        executor = get_executor(self.max_concurrency)
+        pending, parts = set(), []
+        try:
+            for number, chunk in enumerate(content.chunks(self.chunk_size), start=1):
+                writer.write(chunk)
+                if len(pending) >= self.max_concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+                pending.add(
+                    executor.submit(self.multipart.upload_part, upload, number, chunk)
+                )
+                _count("parts")
+            parts.extend(future.result() for future in wait(pending).done)
+            self.multipart.complete(upload, parts)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            self.multipart.abort(upload)
+            writer.discard()
+            raise
+        writer.commit()
+        return name
+
+
+def blob_storage():
+    # 이미지 필드의 storage= 로 쓰는 callable. 설정의 STORAGES["blobs"] (마이그레이션에는 이 경로만 남는다)
+    from django.core.files.storage import storages
+
+    return storages["blobs"]
+
+
+@deconstructible(path="restaurant.storage.ContentAddressedStorage")
+class ContentAddressedStorage(WrappedStorage):
+    # 내용의 sha256 으로 이름을 정한다: blobs/ab/abcdef….png. 같은 바이트는 한 번만 저장되고
+    # MediaBlob.refs 로 몇 번 저장(참조)됐는지 센다. delete() 는 참조를 하나 놓고, 커밋 후에도 0 이면 지운다.
+    # 이름이 내용으로 정해지므로 한 번 올린 객체는 바뀌지 않는다 → 캐시 헤더를 immutable 로 줄 수 있음.
+    prefix = "blobs"
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(self.prefix + "/")
+
+    def blob_name(self, digest, name):
+        extension = posixpath.splitext(name)[1].lower()
+        return f"{self.prefix}/{digest[:2]}/{digest}{extension}"
+
+    def get_available_name(self, name, max_length=None):
+        # 최종 이름은 _save 에서 내용으로 정한다 (임의 접미사를 붙이지 않음)
+        return name
+
+    @staticmethod
+    def digest(content):
+        # 조각 단위로 읽으며 해시. 파일 전체를 메모리에 올리지 않는다.
+        sha256, size = hashlib.sha256(), 0
+        for chunk in content.chunks():
+            sha256.update(chunk)
+            size += len(chunk)
+        return sha256.hexdigest(), size
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        digest, size = self.digest(content)
+        with transaction.atomic():
+            blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+                digest=digest,
+                defaults={"name": self.blob_name(digest, name), "size": size},
+            )
+            MediaBlob.objects.filter(pk=blob.pk).update(refs=F("refs") + 1)
+            # 파일이 없을 때만 올린다. 행은 새로 만들었어도 파일이 이미 있을 수 있고(앞선 업로드의 트랜잭션이
+            # 롤백된 경우), 이름이 내용의 해시라 같은 바이트다. 있는 이름에 저장하면 백엔드가 접미사를 붙인다.
+            if not self.backend.exists(blob.name):
+                saved = self.backend.save(blob.name, content)
+                if saved != blob.name:
+                    raise RuntimeError(f"blob 이 다른 이름으로 저장됐습니다: {saved}")
+                _count("blob_uploads")
+            else:
+                _count("blob_dedup_hits")
+                _count("blob_dedup_bytes", size)
+        return blob.name
+
+    def delete(self, name):
+        if not self.is_blob(name):
+            self.backend.delete(name)
+            return
+        from . import images
+        from .models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return
+            if blob.refs > 0:
+                MediaBlob.objects.filter(pk=blob.pk).update(refs=F("refs") - 1)
+            if blob.refs > 1:
+                return
+
+        def remove():
+            # 커밋 뒤 여기까지 오는 사이에 같은 내용이 다시 올라왔으면(dedup hit) refs 가 다시 올라가 있다.
+            # 행을 잠근 채 파일과 행을 함께 지우므로 동시에 올리는 쪽은 _save 의 get_or_create 에서 기다렸다가
+            # 새 행을 만들고 파일도 다시 올린다.
+            with transaction.atomic():
+                blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+                if blob is None or blob.refs > 0:
+                    return
+                self.backend.delete(name)
+                for derivative in images.derivative_names(name).values():
+                    self.backend.delete(derivative)
+                blob.delete()
+
+        transaction.on_commit(remove)
@@ -0,0 +1,14 @@
+import tempfile
+
+from django import test
+
+
+class TestCase(test.TestCase):
+    # 커밋 후 시그널이 남기는 검색 저널/스냅샷이 var/search 를 건드리지 않도록 테스트마다 임시 디렉터리를 쓴다
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = test.override_settings(SEARCH_INDEX_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
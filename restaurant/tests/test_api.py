@@ -0,0 +1,122 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from restaurant.models import (
+    Restaurant,
+    RestaurantCategory,
+    RestaurantMenu,
+    Review,
+    ReviewImage,
+    Tag,
+)
+
+
+class RestaurantApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = RestaurantCategory.objects.create(name="분식")
+        cls.tag = Tag.objects.create(name="혼밥")
+        cls.restaurants = []
+        for number in range(7):
+            restaurant = Restaurant.objects.create(
+                name=f"김밥 {number}", category=category
+            )
+            restaurant.tags.add(cls.tag)
+            cls.restaurants.append(restaurant)
+        cls.restaurant = cls.restaurants[0]
+        Restaurant.objects.create(name="폐업 김밥", is_closed=True)
+
+    def setUp(self):
+        # 리뷰 첫 페이지 캐시와 이미지 파생본이 실제 디렉터리에 남지 않도록
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=directory.name + "/media",
+            IMAGE_DERIVATIVES_ASYNC=False,
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "api-test",
+                },
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name + "/cache",
+                },
+            },
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, path, **headers):
+        return self.client.get(path, secure=True, headers=headers)
+
+    def test_cursor_pages_cost_the_same(self):
+        seen = []
+        path = "/api/restaurants/?limit=2"
+        while path:
+            with self.assertNumQueries(4):  # (id, updated_at) + 본문 + 태그 + 이미지
+                response = self.get(path)
+            body = response.json()
+            seen.extend(row["id"] for row in body["results"])
+            path = body["next"]
+        self.assertEqual(seen, sorted((r.pk for r in self.restaurants), reverse=True))
+
+        row = self.get("/api/restaurants/?limit=1").json()["results"][0]
+        self.assertEqual(row["category"], "분식")
+        self.assertIsNone(row["cuisine_type"])
+        self.assertEqual(row["tags"], ["혼밥"])
+
+    def test_list_not_modified_until_page_changes(self):
+        response = self.get("/api/restaurants/?limit=3")
+        etag = response["ETag"]
+        with self.assertNumQueries(1):
+            response = self.get("/api/restaurants/?limit=3", if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # 태그 변경은 save() 를 거치지 않지만 updated_at 이 올라가야 함
+        self.restaurants[-1].tags.remove(self.tag)
+        response = self.get("/api/restaurants/?limit=3", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_etag(self):
+        path = f"/api/restaurants/{self.restaurant.pk}/"
+        etag = self.get(path)["ETag"]
+        self.assertEqual(self.get(path, if_none_match=etag).status_code, 304)
+
+        Review.objects.create(
+            restaurant=self.restaurant, title="-", author="-", content="-", rating=5
+        )
+        response = self.get(path, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rating_histogram"]["5"], 1)
+        self.assertEqual(self.get("/api/restaurants/999999/").status_code, 404)
+
+    def test_menus_and_reviews(self):
+        for name in ("라면", "떡볶이"):
+            RestaurantMenu.objects.create(restaurant=self.restaurant, name=name)
+        response = self.get(f"/api/restaurants/{self.restaurant.pk}/menus/")
+        self.assertEqual(
+            [menu["name"] for menu in response.json()["results"]], ["라면", "떡볶이"]
+        )
+
+        review = Review.objects.create(
+            restaurant=self.restaurant, title="-", author="-", content="-", rating=4
+        )
+        path = f"/api/restaurants/{self.restaurant.pk}/reviews/"
+        response = self.get(path)
+        self.assertEqual(response.json()["results"][0]["images"], [])
+        etag = response["ETag"]
+
+        # 첫 페이지 캐시 무효화. review/a.png 는 실제 파일이 없어 파생 이미지는 건너뛴다.
+        with self.assertLogs("restaurant.images", "WARNING"):
+            with self.captureOnCommitCallbacks(execute=True):
+                ReviewImage.objects.create(
+                    review=review, name="사진", image="review/a.png"
+                )
+        response = self.get(path, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        image = response.json()["results"][0]["images"][0]["image"]
+        self.assertEqual(image["url"], "/media/review/a.png")
+        self.assertEqual(image["thumb_url"], "/media/derivatives/review/a/thumb.webp")
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+from django.test import SimpleTestCase
+
+from ml_model_api.batching import MicroBatcher
+
+
+class MicroBatcherTest(SimpleTestCase):
+    def setUp(self):
+        self.batches = []
+
+    def double(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def test_concurrent_calls_share_batches_in_order(self):
+        batcher = MicroBatcher(self.double, max_batch_size=4, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher(n) for n in range(10)))
+        await batcher.stop()
+
+        self.assertEqual(results, [n * 2 for n in range(10)])
+        self.assertEqual(sorted(sum(self.batches, [])), list(range(10)))
+        self.assertLessEqual(max(map(len, self.batches)), 4)
+        self.assertLess(len(self.batches), 10)
+        self.assertEqual(batcher.stats()["items"], 10)
+
+    async def test_error_fans_out_to_whole_batch(self):
+        def broken(items):
+            raise ValueError("모델 오류")
+
+        batcher = MicroBatcher(broken, max_wait_ms=20)
+        results = await asyncio.gather(
+            *(batcher(n) for n in range(3)), return_exceptions=True
+        )
+        self.assertEqual([type(result) for result in results], [ValueError] * 3)
+
+        batcher.predict = self.double  # 실패한 배치가 워커 자리를 돌려줬다
+        self.assertEqual(await batcher(5), 10)
+        await batcher.stop()
+
+    async def test_cancelled_request_is_not_predicted(self):
+        batcher = MicroBatcher(self.double, max_wait_ms=50)
+        gone = asyncio.ensure_future(batcher(1))
+        kept = asyncio.ensure_future(batcher(2))
+        await asyncio.sleep(0)  # 둘 다 큐에 들어갔다
+        gone.cancel()
+
+        self.assertEqual(await kept, 4)
+        with self.assertRaises(asyncio.CancelledError):
+            await gone
+        self.assertEqual(self.batches, [[2]])
+        await batcher.stop()
+
+    async def test_stop_fails_pending_requests(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow(items):
+            started.set()
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0)
+        calls = [asyncio.ensure_future(batcher(n)) for n in range(3)]
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        # 0 은 predict 중, 1 은 워커 자리를 기다리며 모아 둔 배치, 2 는 아직 큐에
+        stopping = asyncio.ensure_future(batcher.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stopping
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*calls, return_exceptions=True), 5
+        )
+        self.assertEqual(results[0], 0)
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertIsInstance(results[2], RuntimeError)
+        self.assertEqual(batcher.stats()["queued"], 0)
+
+    def test_new_loop_shuts_down_old_executor(self):
+        batcher = MicroBatcher(self.double)
+        self.assertEqual(asyncio.run(batcher(1)), 2)
+        old = batcher.executor
+
+        async def call_and_stop():
+            try:
+                return await batcher(2)
+            finally:
+                await batcher.stop()
+
+        self.assertEqual(asyncio.run(call_and_stop()), 4)
+        with self.assertRaises(RuntimeError):
+            old.submit(print)
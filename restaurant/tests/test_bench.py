@@ -0,0 +1,101 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import override_settings
+
+from restaurant import bench
+from restaurant.models import Restaurant, Review
+from restaurant.tests.base import TestCase
+
+
+class BenchSuiteTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "bench-test",
+                },
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name + "/cache",
+                },
+            },
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_seed_is_deterministic_and_consistent(self):
+        def seed():
+            bench.seed_dataset(30, reviews_per_restaurant=4, seed=7)
+            return list(
+                Restaurant.objects.order_by("pk").values_list(
+                    "name", "rating", "rating_count", "region__eupmyeondong"
+                )
+            )
+
+        with transaction.atomic():
+            first = seed()
+            transaction.set_rollback(True)
+        self.assertEqual(seed(), first)
+
+        restaurant = Restaurant.objects.order_by("pk")[3]
+        self.assertEqual(restaurant.rating_count, restaurant.review_set.count())
+        self.assertEqual(restaurant.card.rating, restaurant.rating)
+
+    def test_suite_writes_report_and_compares(self):
+        output = self.directory / "bench.json"
+        call_command(
+            "bench_suite",
+            "--restaurants=40",
+            "--reviews-per-restaurant=3",
+            "--runs=3",
+            f"--output={output}",
+            stdout=StringIO(),
+        )
+        report = json.loads(output.read_text())
+        self.assertEqual(report["meta"]["restaurants"], 40)
+        self.assertEqual(report["meta"]["reviews"], Review.objects.count())
+        for name in ("index", "admin_reviews", "tag_filter", "rating_reconcile"):
+            self.assertEqual(
+                set(report["results"][name]),
+                {"runs", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+                | {"queries", "peak_kb"},
+            )
+        self.assertEqual(report["results"]["admin_reviews"]["queries"], 5)
+
+        # 기존 데이터 재사용 + 자기 자신과 비교하면 쿼리 수는 같아야 함
+        with self.assertRaises(CommandError):
+            call_command("bench_suite", f"--output={output}", stdout=StringIO())
+        baseline = self.directory / "base.json"
+        baseline.write_text(output.read_text())
+        call_command(
+            "bench_suite",
+            "--no-seed",
+            "--runs=3",
+            f"--output={output}",
+            f"--compare={baseline}",
+            "--threshold=100",
+            stdout=StringIO(),
+        )
+
+    def test_compare(self):
+        baseline = {"results": {"index": {"p95_ms": 10.0, "queries": 2}}}
+        current = {"results": {"index": {"p95_ms": 11.0, "queries": 3}}}
+        self.assertEqual(
+            bench.compare(baseline, current, threshold=0.2),
+            ["index: queries 2 → 3"],
+        )
+        current["results"]["index"].update(p95_ms=13.0, queries=2)
+        self.assertEqual(
+            bench.compare(baseline, current, threshold=0.2),
+            ["index: p95 10.00ms → 13.00ms"],
+        )
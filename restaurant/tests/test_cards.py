@@ -0,0 +1,135 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from restaurant.models import (
+    CuisineType,
+    Region,
+    Restaurant,
+    RestaurantCard,
+    RestaurantCategory,
+    RestaurantImage,
+    Review,
+    Tag,
+)
+from restaurant.tests.base import TestCase
+from restaurant.tests.test_images import png
+
+
+class RestaurantCardTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(
+            MEDIA_ROOT=media_root,
+            IMAGE_DERIVATIVES_ASYNC=False,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cuisine = CuisineType.objects.create(name="한식")
+            self.category = RestaurantCategory.objects.create(
+                name="분식", cuisine_type=self.cuisine
+            )
+            self.region = Region.objects.create(
+                sido="서울", sigungu="강남구", eupmyeondong="역삼동"
+            )
+            self.tag = Tag.objects.create(name="가성비")
+            self.restaurant = Restaurant.objects.create(
+                name="김밥천국",
+                branch_name="강남점",
+                address="서울 강남구 테헤란로 123",
+                category=self.category,
+                region=self.region,
+            )
+            self.restaurant.tags.add(self.tag)
+            # 내용이 같으면 같은 파일이 되므로 크기를 달리한다
+            self.front = RestaurantImage.objects.create(
+                restaurant=self.restaurant,
+                image=ContentFile(png(30, 40), name="front.png"),
+                order=2,
+            )
+            self.representative = RestaurantImage.objects.create(
+                restaurant=self.restaurant,
+                image=ContentFile(png(40, 30), name="main.png"),
+                is_representative=True,
+            )
+
+    def card(self):
+        return RestaurantCard.objects.get(pk=self.restaurant.pk)
+
+    def test_card_contents(self):
+        card = self.card()
+        self.assertEqual(card.name, "김밥천국")
+        self.assertEqual(card.category_name, "분식")
+        self.assertEqual(card.cuisine_type_name, "한식")
+        self.assertEqual(card.region_name, "서울 강남구 역삼동")
+        self.assertEqual(card.tag_names, ["가성비"])
+        self.assertEqual(card.image_url, self.representative.image.url)
+        self.assertEqual(card.thumbnail_url, self.representative.derivative_url("sm"))
+
+    def test_related_changes_refresh_card(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = "혼밥"
+            self.tag.save()
+            self.cuisine.name = "분식류"
+            self.cuisine.save()
+            self.restaurant.tags.add(Tag.objects.create(name="24시"))
+            self.representative.delete()
+            Review.objects.create(
+                restaurant=self.restaurant,
+                title="맛집",
+                author="a",
+                content="b",
+                rating=4,
+            )
+        card = self.card()
+        self.assertEqual(card.tag_names, ["24시", "혼밥"])
+        self.assertEqual(card.cuisine_type_name, "분식류")
+        self.assertEqual(card.image_url, self.front.image.url)
+        self.assertEqual(str(card.rating), "4.00")
+        self.assertEqual(card.rating_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        self.assertEqual(self.card().category_name, "")
+
+    def test_list_is_one_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(3):
+                Restaurant.objects.create(name=f"식당 {number}", rating=f"{number}.5")
+        with self.assertNumQueries(1):
+            response = self.client.get("/restaurants/cards/", {"limit": 2}, secure=True)
+        data = response.json()
+        self.assertEqual([row["name"] for row in data["results"]], ["식당 2", "식당 1"])
+
+        response = self.client.get(
+            "/restaurants/cards/",
+            {"limit": 2, "cursor": data["next_cursor"]},
+            secure=True,
+        )
+        data = response.json()
+        self.assertEqual(
+            [row["name"] for row in data["results"]], ["식당 0", "김밥천국"]
+        )
+        self.assertIsNone(data["next_cursor"])
+
+        response = self.client.get(
+            "/restaurants/cards/", {"category": self.category.pk}, secure=True
+        )
+        self.assertEqual(
+            [row["name"] for row in response.json()["results"]], ["김밥천국"]
+        )
+
+    def test_rebuild_command(self):
+        RestaurantCard.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_restaurant_cards", stdout=out)
+        self.assertIn("rebuilt 1 cards", out.getvalue())
+        self.assertEqual(self.card().tag_names, ["가성비"])
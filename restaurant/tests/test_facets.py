@@ -0,0 +1,190 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+
+from restaurant import cards, facets
+from restaurant.models import CuisineType, Restaurant, RestaurantCategory, Tag
+from restaurant.tests.base import TestCase
+
+
+class FacetIndexTest(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.cuisines = {category: category % 3 for category in range(1, 7)}
+        self.rows = {}
+        self.index = facets.FacetIndex()
+        for pk in rng.sample(range(1, 1_000), 300):  # 빈 색인에서 시작해 늘어나야 한다
+            self.put(
+                pk,
+                rng.choice([None, *self.cuisines]),
+                rng.choice([None, 10, 11, 12]),
+                rng.random() < 0.2,
+                set(rng.sample(range(1, 9), rng.randint(0, 3))),
+            )
+
+    def put(self, pk, category, region, closed, tags):
+        self.rows[pk] = (category, region, closed, tags)
+        self.index.set(pk, category, region, closed, tags, self.cuisines.get(category))
+
+    def brute_force(self, filters, include_closed=False):
+        def values(row, facet):
+            category, region, _, tags = row
+            return {
+                facets.TAG: tags,
+                facets.CATEGORY: {category},
+                facets.CUISINE: {self.cuisines.get(category)},
+                facets.REGION: {region},
+            }[facet] - {None}
+
+        ids = sorted(
+            pk
+            for pk, row in self.rows.items()
+            if (include_closed or not row[2])
+            and all(
+                any(values(row, facet) & set(wanted) for facet, wanted in group.items())
+                for group in filters
+            )
+        )
+        counts = {facet: {} for facet in facets.FACETS}
+        for pk in ids:
+            for facet in facets.FACETS:
+                for value in values(self.rows[pk], facet):
+                    counts[facet][value] = counts[facet].get(value, 0) + 1
+        return ids, counts
+
+    def assertMatches(self, filters, include_closed=False):
+        ids, counts = self.index.query(filters, include_closed)
+        self.assertEqual(
+            (ids.tolist(), counts), self.brute_force(filters, include_closed)
+        )
+
+    def test_and_or_filters_with_counts(self):
+        self.assertMatches([])
+        self.assertMatches([], include_closed=True)
+        self.assertMatches([{facets.TAG: [1, 2]}])
+        self.assertMatches([{facets.TAG: [1]}, {facets.TAG: [2]}])
+        self.assertMatches([{facets.CUISINE: [1]}, {facets.REGION: [10, 12]}])
+        self.assertMatches([{facets.CATEGORY: [2], facets.TAG: [3]}])
+        self.assertMatches([{facets.TAG: [99]}])
+
+    def test_incremental_updates(self):
+        pk = next(iter(self.rows))
+        self.put(pk, 2, 11, False, {1, 5})
+        self.put(5_000, 3, None, False, {8})  # 범위를 넘는 pk → 배열이 늘어난다
+        self.index.remove(next(reversed(self.rows)))
+        del self.rows[next(reversed(self.rows))]
+        self.assertMatches([{facets.TAG: [1, 8]}])
+        self.assertMatches([{facets.CATEGORY: [2, 3]}], include_closed=True)
+
+
+class FacetSyncTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        facets.reset_index()
+        self.addCleanup(facets.reset_index)
+
+        self.korean = CuisineType.objects.create(name="한식")
+        self.western = CuisineType.objects.create(name="양식")
+        self.snack = RestaurantCategory.objects.create(
+            name="분식", cuisine_type=self.korean
+        )
+        self.cheap = Tag.objects.create(name="가성비")
+        self.solo = Tag.objects.create(name="혼밥")
+        self.restaurants = []
+        for name, closed in [
+            ("김밥천국", False),
+            ("떡볶이집", False),
+            ("폐업 분식", True),
+        ]:
+            restaurant = Restaurant.objects.create(
+                name=name, category=self.snack, is_closed=closed
+            )
+            restaurant.tags.add(self.cheap)
+            self.restaurants.append(restaurant)
+        self.restaurants[0].tags.add(self.solo)
+
+    def counts(self, *filters):
+        ids, counts = facets.query(list(filters))
+        return ids.tolist(), counts
+
+    def test_rebuild_and_incremental_updates(self):
+        gimbap, tteokbokki, _ = self.restaurants
+        self.assertEqual(
+            self.counts({facets.TAG: [self.cheap.pk]}),
+            (
+                [gimbap.pk, tteokbokki.pk],
+                {
+                    facets.TAG: {self.cheap.pk: 2, self.solo.pk: 1},
+                    facets.CATEGORY: {self.snack.pk: 2},
+                    facets.CUISINE: {self.korean.pk: 2},
+                    facets.REGION: {},
+                },
+            ),
+        )
+        index = facets.get_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tteokbokki.tags.add(self.solo)
+        self.assertEqual(self.counts()[1][facets.TAG][self.solo.pk], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.solo.restaurant_set.clear()
+        self.assertNotIn(self.solo.pk, self.counts()[1][facets.TAG])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.snack.cuisine_type = self.western
+            self.snack.save()
+        self.assertEqual(
+            self.counts({facets.CUISINE: [self.western.pk]})[0],
+            [gimbap.pk, tteokbokki.pk],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gimbap.delete()
+            Restaurant.objects.create(name="새 분식", category=self.snack)
+        self.assertEqual(self.counts()[1][facets.CATEGORY], {self.snack.pk: 2})
+        self.assertIs(facets.get_index(), index)  # 다시 읽지 않고 따라왔다
+
+    def test_api_and_admin_filter(self):
+        cards.refresh([restaurant.pk for restaurant in self.restaurants])
+        response = self.client.get(
+            "/api/restaurants/facets/",
+            {"tag": f"{self.cheap.pk},{self.solo.pk}", "limit": 1},
+            secure=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["count"], 2)
+        self.assertEqual(
+            body["facets"]["tag"],
+            [
+                {"id": self.cheap.pk, "name": "가성비", "count": 2},
+                {"id": self.solo.pk, "name": "혼밥", "count": 1},
+            ],
+        )
+        self.assertEqual(body["results"][0]["name"], "떡볶이집")  # 최신 순
+
+        response = self.client.get(
+            "/api/restaurants/facets/",
+            {"tag": self.cheap.pk, "cursor": body["next_cursor"]},
+            secure=True,
+        )
+        self.assertEqual(
+            [row["name"] for row in response.json()["results"]], ["김밥천국"]
+        )
+        response = self.client.get(
+            "/api/restaurants/facets/", {"tag": "가성비"}, secure=True
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_login(
+            get_user_model().objects.create_superuser("admin", "a@a.com", "pw")
+        )
+        response = self.client.get(
+            "/admin/restaurant/restaurant/",
+            {"tags__id__exact": self.solo.pk},
+            secure=True,
+        )
+        self.assertContains(response, "가성비 (3)")  # 관리자 수는 폐업 포함
+        self.assertContains(response, "김밥천국")
+        self.assertNotContains(response, "떡볶이집")
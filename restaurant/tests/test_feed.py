@@ -0,0 +1,105 @@
+import tempfile
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from restaurant import feed
+from restaurant.models import Restaurant, Review
+
+
+class ReviewFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name="김밥천국")
+        other = Restaurant.objects.create(name="돈까스하우스")
+        now = timezone.now()
+        reviews = [
+            Review(
+                restaurant=cls.restaurant if n % 5 else other,
+                title=f"리뷰 {n}",
+                author="작성자",
+                content="내용",
+                rating=n % 5 + 1,
+            )
+            for n in range(60)
+        ]
+        Review.objects.bulk_create(reviews)
+        # 같은 시각에 쓰인 리뷰가 여럿 있어도 id 로 순서가 정해져야 한다
+        for number, review in enumerate(reviews):
+            Review.objects.filter(pk=review.pk).update(
+                created_at=now - timedelta(minutes=number // 3)
+            )
+        cls.expected = list(
+            Review.objects.filter(restaurant=cls.restaurant)
+            .order_by("-created_at", "-id")
+            .values_list("pk", flat=True)
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "feed-test",
+                },
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name,
+                },
+            }
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.path = f"/api/restaurants/{self.restaurant.pk}/reviews/"
+
+    def get(self, path, **headers):
+        return self.client.get(path, secure=True, headers=headers)
+
+    def test_cursor_walks_every_review_once(self):
+        seen, path, queries = [], self.path + "?limit=10", []
+        while path:
+            with CaptureQueriesContext(connection) as context:
+                body = self.get(path).json()
+            queries.append(len(context))
+            seen.extend(row["id"] for row in body["results"])
+            path = body["next"]
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(set(queries)), 1)  # 몇 번째 페이지든 쿼리 수가 같다
+
+    def test_first_page_is_cached_until_a_review_changes(self):
+        first = self.get(self.path)
+        with self.assertNumQueries(0):
+            cached = self.get(self.path)
+        self.assertEqual(cached.json(), first.json())
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get(self.path, if_none_match=first["ETag"]).status_code, 304
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(
+                restaurant=self.restaurant,
+                title="새 리뷰",
+                author="작성자",
+                content="내용",
+                rating=5,
+            )
+        response = self.get(self.path)
+        self.assertEqual(response.json()["results"][0]["id"], review.pk)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.get(self.path + "?cursor=not-a-cursor").status_code, 404)
+
+    def test_aggregates_have_no_order_by(self):
+        queryset = Review.objects.filter(restaurant=self.restaurant)
+        self.assertNotIn("ORDER BY", str(queryset.query))
+        self.assertEqual(
+            feed.page(queryset, limit=3)[0],
+            list(queryset.order_by(*feed.ORDERING)[:3]),
+        )
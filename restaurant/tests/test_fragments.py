@@ -0,0 +1,92 @@
+import tempfile
+
+from django.core.cache import caches
+from django.test import override_settings
+
+from restaurant import fragments
+from restaurant.models import Article, Restaurant, Review
+from restaurant.tests.base import TestCase
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "fragment-test",
+                },
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name + "/cache",
+                },
+            },
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        caches["default"].clear()
+        fragments.reset_stats()
+
+    def test_hit_after_first_render(self):
+        fragment = fragments.Fragment("test")
+        calls = []
+
+        def render():
+            calls.append(1)
+            return "html"
+
+        self.assertEqual(fragment.get_or_render(render), ("html", "miss"))
+        self.assertEqual(fragment.get_or_render(render), ("html", "hit"))
+        caches["default"].clear()  # 다른 워커: 공유 캐시에서 읽음
+        self.assertEqual(fragment.get_or_render(render), ("html", "hit"))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(fragments.stats(), {"test:miss": 1, "test:hit": 2})
+
+    def test_stale_while_other_worker_renders(self):
+        fragment = fragments.Fragment("test")
+        fragment.get_or_render(lambda: "old")
+        fragments.bump("test")
+        key = f"fragment:test:{fragments.version('test')}"
+        caches["shared"].add(f"{key}:lock", 1)  # 다른 워커가 생성 중
+
+        self.assertEqual(fragment.get_or_render(lambda: "new"), ("old", "stale"))
+        caches["shared"].delete(f"{key}:lock")
+        self.assertEqual(fragment.get_or_render(lambda: "new"), ("new", "miss"))
+
+    def test_index_served_from_cache_until_data_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="강남 분식 지도",
+                content="-",
+                show_at_index=True,
+                is_published=True,
+            )
+            restaurant = Restaurant.objects.create(name="김밥천국", rating="4.0")
+
+        response = self.client.get("/", secure=True)
+        self.assertContains(response, "강남 분식 지도")
+        self.assertContains(response, "김밥천국")
+        self.assertEqual(response["X-Cache"], "articles=miss, restaurants=miss")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/", secure=True)
+        self.assertEqual(response["X-Cache"], "articles=hit, restaurants=hit")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                restaurant=restaurant, title="-", author="-", content="-", rating=1
+            )
+        response = self.client.get("/", secure=True)
+        self.assertEqual(response["X-Cache"], "articles=hit, restaurants=miss")
+        self.assertContains(response, "리뷰 1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="새 칼럼", content="-", show_at_index=True, is_published=True
+            )
+        response = self.client.get("/", secure=True)
+        self.assertEqual(response["X-Cache"], "articles=miss, restaurants=hit")
+        self.assertContains(response, "새 칼럼")
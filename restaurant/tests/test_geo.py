@@ -0,0 +1,129 @@
+import random
+
+from django.test import SimpleTestCase
+
+from restaurant import geo
+from restaurant.models import Restaurant
+from restaurant.tests.base import TestCase
+
+
+class GeohashTest(SimpleTestCase):
+    def test_encode(self):
+        self.assertEqual(geo.encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geo.encode_geohash(37.566535, 126.977969, 5), "wydm9")
+
+    def test_cover_contains_center(self):
+        cells = geo.geohash_cover(*geo.bounding_box(37.5665, 126.978, 1.0))
+        center = geo.encode_geohash(37.5665, 126.978)
+        self.assertTrue(any(center.startswith(prefix) for prefix in cells))
+        self.assertLessEqual(len(cells), 16)
+
+
+class GeoIndexTest(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.points = {
+            pk: (37.5 + rng.uniform(-0.1, 0.1), 127.0 + rng.uniform(-0.1, 0.1))
+            for pk in range(1, 2001)
+        }
+        self.index = geo.GeoIndex()
+        for pk, (latitude, longitude) in self.points.items():
+            self.index.add(pk, latitude, longitude)
+
+    def brute_force(self, latitude, longitude, radius_km=None, k=None):
+        ranked = sorted(
+            (geo.haversine_km(latitude, longitude, *point), pk)
+            for pk, point in self.points.items()
+        )
+        if radius_km is not None:
+            ranked = [item for item in ranked if item[0] <= radius_km]
+        return [pk for _, pk in ranked[:k]]
+
+    def test_knn_matches_brute_force(self):
+        for latitude, longitude in [(37.5, 127.0), (37.45, 126.95), (37.7, 127.2)]:
+            hits = self.index.nearby(latitude, longitude, k=15)
+            self.assertEqual(
+                [pk for pk, _ in hits], self.brute_force(latitude, longitude, k=15)
+            )
+
+    def test_radius_matches_brute_force(self):
+        hits = self.index.nearby(37.5, 127.0, radius_km=2.0)
+        self.assertEqual(
+            [pk for pk, _ in hits], self.brute_force(37.5, 127.0, radius_km=2.0)
+        )
+        self.assertTrue(all(distance <= 2.0 for _, distance in hits))
+
+    def test_remove_and_move(self):
+        nearest = self.index.nearby(37.5, 127.0, k=1)[0][0]
+        self.index.remove(nearest)
+        del self.points[nearest]
+        self.assertNotIn(nearest, self.index)
+        self.assertEqual(len(self.index), len(self.points))
+
+        self.index.add(5, 37.5, 127.0)
+        self.points[5] = (37.5, 127.0)
+        self.assertEqual(self.index.nearby(37.5, 127.0, k=1)[0][0], 5)
+        self.assertEqual(
+            [pk for pk, _ in self.index.nearby(37.5, 127.0, k=10)],
+            self.brute_force(37.5, 127.0, k=10),
+        )
+
+
+class RestaurantNearbyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.near = Restaurant.objects.create(
+            name="가까운 식당", latitude=37.501274, longitude=127.039585
+        )
+        cls.far = Restaurant.objects.create(
+            name="먼 식당", latitude=37.499947, longitude=127.036102
+        )
+        cls.closed = Restaurant.objects.create(
+            name="폐업 식당", latitude=37.5013, longitude=127.0396, is_closed=True
+        )
+        cls.busan = Restaurant.objects.create(
+            name="부산 식당", latitude=35.1796, longitude=129.0756
+        )
+
+    def setUp(self):
+        super().setUp()
+        geo.reset_index()
+        self.addCleanup(geo.reset_index)
+
+    def test_geohash_saved(self):
+        self.assertEqual(self.near.geohash, geo.encode_geohash(37.501274, 127.039585))
+        self.near.latitude = 35.1796
+        self.near.longitude = 129.0756
+        self.near.save(update_fields=["latitude", "longitude"])
+        self.near.refresh_from_db()
+        self.assertEqual(self.near.geohash, self.busan.geohash)
+
+    def test_nearby(self):
+        results = Restaurant.objects.nearby(37.501274, 127.039585, radius=1.0, k=10)
+        self.assertEqual(results, [self.near, self.far])
+        self.assertAlmostEqual(results[0].distance, 0.0)
+        self.assertLess(results[1].distance, 1.0)
+
+    def test_nearby_combines_with_filters(self):
+        results = Restaurant.objects.exclude(pk=self.near.pk).nearby(
+            37.501274, 127.039585, radius=None, k=2
+        )
+        self.assertEqual(results, [self.far, self.busan])
+
+    def test_index_follows_writes(self):
+        geo.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            created = Restaurant.objects.create(
+                name="새 식당", latitude=37.5012, longitude=127.0395
+            )
+        self.assertIn(created.pk, geo.get_index())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.far.is_closed = True
+            self.far.save()
+        self.assertNotIn(self.far.pk, geo.get_index())
+
+        pk = created.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            created.delete()
+        self.assertNotIn(pk, geo.get_index())
@@ -0,0 +1,94 @@
+from datetime import datetime, time, timezone
+
+from django.test import SimpleTestCase, TestCase
+
+from restaurant.hours import business_minutes
+from restaurant.models import Restaurant
+
+
+class BusinessMinutesTest(SimpleTestCase):
+    def test_same_day(self):
+        self.assertEqual(
+            business_minutes(time(11, 0), time(22, 0), time(21, 30)), (660, 1320, 1290)
+        )
+
+    def test_overnight(self):
+        self.assertEqual(
+            business_minutes(time(18, 0), time(2, 0), time(1, 30)), (1080, 1560, 1530)
+        )
+
+    def test_until_midnight_and_24_hours(self):
+        self.assertEqual(
+            business_minutes(time(0, 0), time(23, 59), time(23, 30)), (0, 1440, 1410)
+        )
+        self.assertEqual(business_minutes(time(9, 0), time(9, 0)), (540, 1980, 1980))
+
+    def test_missing(self):
+        self.assertEqual(business_minutes(None, time(22, 0)), (None, None, None))
+
+
+class OpenAtTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kimbap = Restaurant.objects.create(
+            name="김밥천국",
+            start_time=time(0, 0),
+            end_time=time(23, 59),
+            last_order_time=time(23, 30),
+        )
+        cls.hansot = Restaurant.objects.create(
+            name="한솥도시락",
+            start_time=time(9, 0),
+            end_time=time(21, 0),
+            last_order_time=time(20, 45),
+        )
+        cls.pub = Restaurant.objects.create(
+            name="심야포차",
+            start_time=time(18, 0),
+            end_time=time(2, 0),
+            last_order_time=time(1, 30),
+        )
+        cls.unknown = Restaurant.objects.create(name="시간 미정")
+
+    def open_names(self, value, accepting_orders=False):
+        return set(
+            Restaurant.objects.open_at(
+                value, accepting_orders=accepting_orders
+            ).values_list("name", flat=True)
+        )
+
+    def test_open_at_local_time(self):
+        self.assertEqual(
+            self.open_names(datetime(2026, 1, 1, 12, 0)), {"김밥천국", "한솥도시락"}
+        )
+        self.assertEqual(
+            self.open_names(datetime(2026, 1, 1, 1, 45)), {"김밥천국", "심야포차"}
+        )
+        self.assertEqual(
+            self.open_names(datetime(2026, 1, 1, 1, 45), accepting_orders=True),
+            {"김밥천국"},
+        )
+        self.assertEqual(
+            self.open_names(datetime(2026, 1, 1, 20, 50), accepting_orders=True),
+            {"김밥천국", "심야포차"},
+        )
+
+    def test_aware_datetime_is_converted_to_seoul(self):
+        # UTC 03:00 == 서울 12:00
+        noon_in_seoul = datetime(2026, 1, 1, 3, 0, tzinfo=timezone.utc)
+        self.assertEqual(self.open_names(noon_in_seoul), {"김밥천국", "한솥도시락"})
+
+    def test_combines_with_filters_and_follows_updates(self):
+        self.hansot.end_time = time(23, 0)
+        self.hansot.save(update_fields=["end_time"])
+        late = datetime(2026, 1, 1, 22, 30)
+        self.assertEqual(
+            set(
+                Restaurant.objects.filter(name__startswith="한솥")
+                .open_at(late)
+                .values_list("name", flat=True)
+            ),
+            {"한솥도시락"},
+        )
+        Restaurant.objects.filter(pk=self.kimbap.pk).update(is_closed=True)
+        self.assertNotIn("김밥천국", self.open_names(late))
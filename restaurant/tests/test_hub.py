@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+
+from django.test import SimpleTestCase
+
+from ml_model_api.hub import CLOSE_IDLE, CLOSE_SLOW, DISCONNECT, Hub
+
+
+class Connection:
+    # 웹소켓 대역. 보낸 메시지와 종료 코드를 모은다.
+    def __init__(self):
+        self.sent = []
+        self.closed = []
+
+    async def send(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code):
+        self.closed.append(code)
+
+
+class StuckConnection(Connection):
+    # 받는 쪽이 읽지 않는 연결: 첫 메시지를 보내다 멈춘다
+    async def send(self, text):
+        await asyncio.Event().wait()
+
+
+class HubTest(SimpleTestCase):
+    def connect(self, hub, *channels, connection=None):
+        connection = connection or Connection()
+        subscriber = hub.connect(connection.send, connection.close)
+        for channel in channels:
+            hub.subscribe(subscriber, channel)
+        return connection, subscriber
+
+    async def test_publish_reaches_channel_subscribers_only(self):
+        hub = Hub()
+        one, _ = self.connect(hub, "restaurant:1")
+        other, _ = self.connect(hub, "region:2")
+        self.assertEqual(hub.publish("restaurant:1", {"type": "review"}), 1)
+        self.assertEqual(hub.publish("restaurant:3", {"type": "review"}), 0)
+        await asyncio.sleep(0)
+
+        self.assertEqual(one.sent, [{"channel": "restaurant:1", "type": "review"}])
+        self.assertEqual(other.sent, [])
+        await hub.stop()
+
+    async def test_drop_keeps_newest_messages(self):
+        hub = Hub(max_queue=2)
+        connection, subscriber = self.connect(hub, "restaurant:1")
+        for n in range(4):  # writer 가 돌기 전에 큐가 넘친다
+            hub.publish("restaurant:1", {"n": n})
+        await asyncio.sleep(0)
+
+        self.assertEqual([message["n"] for message in connection.sent], [2, 3])
+        self.assertEqual((subscriber.dropped, hub.stats()["dropped"]), (2, 2))
+        self.assertFalse(subscriber.closed)
+        await hub.stop()
+
+    async def test_disconnect_evicts_slow_subscriber(self):
+        hub = Hub(max_queue=1, overflow=DISCONNECT)
+        slow, subscriber = self.connect(
+            hub, "restaurant:1", connection=StuckConnection()
+        )
+        fast, _ = self.connect(hub, "restaurant:1")
+        for n in range(2):  # slow 는 0 을 보내다 멈췄고 1 이 큐를 채웠다
+            self.assertEqual(hub.publish("restaurant:1", {"n": n}), 2)
+            await asyncio.sleep(0)
+        self.assertEqual(hub.publish("restaurant:1", {"n": 2}), 1)
+        await asyncio.sleep(0)
+
+        self.assertTrue(subscriber.closed)
+        self.assertEqual(slow.closed, [CLOSE_SLOW])
+        self.assertNotIn(subscriber, hub.channels["restaurant:1"])
+        self.assertEqual([message["n"] for message in fast.sent], [0, 1, 2])
+        self.assertEqual(hub.stats()["evicted_slow"], 1)
+        self.assertNotIn("dropped", hub.stats())
+        await hub.stop()
+
+    async def test_idle_subscriber_is_evicted(self):
+        hub = Hub(heartbeat_seconds=0.01, idle_seconds=30)
+        idle, quiet = self.connect(hub, "restaurant:1")
+        alive, _ = self.connect(hub, "restaurant:1")
+        quiet.last_seen = time.monotonic() - 60
+        hub.start()
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(idle.closed, [CLOSE_IDLE])
+        self.assertEqual((idle.sent, alive.closed), ([], []))
+        self.assertIn({"type": "ping"}, alive.sent)
+        self.assertEqual(hub.stats()["connections"], 1)
+        await hub.stop()
+        self.assertEqual(alive.closed, [1001])
+
+    async def test_unsubscribe(self):
+        hub = Hub(max_channels=2)
+        connection, subscriber = self.connect(hub, "restaurant:1", "region:2")
+        with self.assertRaises(ValueError):
+            hub.subscribe(subscriber, "restaurant:3")  # 연결당 채널 수 초과
+        with self.assertRaises(ValueError):
+            hub.subscribe(subscriber, "admin")
+
+        hub.unsubscribe(subscriber, "restaurant:1")
+        self.assertEqual(hub.publish("restaurant:1", {"type": "review"}), 0)
+        self.assertNotIn("restaurant:1", hub.channels)
+        hub.subscribe(subscriber, "restaurant:3")
+        self.assertEqual(subscriber.channels, {"region:2", "restaurant:3"})
+        await hub.stop()
+
+    def test_unknown_overflow_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Hub(overflow="block")
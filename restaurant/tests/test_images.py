@@ -0,0 +1,84 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+
+from restaurant import images
+from restaurant.models import Restaurant, RestaurantImage
+from restaurant.tests.base import TestCase
+
+
+def png(width=1200, height=800):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ImageDerivativesTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root, other_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.addCleanup(shutil.rmtree, other_root)
+        # default_storage 를 다른 곳에 두어 파생 이미지가 이미지 필드의 저장소(blobs)를 쓰는지 확인한다
+        override = override_settings(
+            MEDIA_ROOT=media_root,
+            IMAGE_DERIVATIVES_ASYNC=False,
+            STORAGES={
+                **settings.STORAGES,
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": other_root},
+                },
+            },
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.restaurant = Restaurant.objects.create(name="테스트 식당")
+
+    def test_derivative_name_is_deterministic(self):
+        self.assertEqual(
+            images.derivative_name("restaurant/a.png", "thumb", "webp"),
+            "derivatives/restaurant/a/thumb.webp",
+        )
+
+    def test_generated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = RestaurantImage.objects.create(
+                restaurant=self.restaurant, image=ContentFile(png(), name="a.png")
+            )
+        storage = image.image.storage
+        name = images.derivative_name(image.image.name, "thumb", "webp")
+        self.assertTrue(storage.exists(name))
+        self.assertFalse(default_storage.exists(name))
+        with storage.open(name) as thumb, Image.open(thumb) as opened:
+            self.assertEqual(opened.size, (200, 133))
+            self.assertEqual(opened.format, "WEBP")
+        self.assertEqual(image.derivative_url(), storage.url(name))
+        self.assertIn(" 1600w", image.srcset())
+
+    def test_backfill_command(self):
+        RestaurantImage.objects.create(
+            restaurant=self.restaurant, image=ContentFile(png(), name="b.png")
+        )
+        out = StringIO()
+        call_command("generate_image_derivatives", "--workers", "1", stdout=out)
+        self.assertIn("generated 1, skipped 0", out.getvalue())
+
+        out = StringIO()
+        call_command("generate_image_derivatives", "--workers", "1", stdout=out)
+        self.assertIn("generated 0, skipped 1", out.getvalue())
+
+    def test_broken_image_is_skipped(self):
+        default_storage.save("broken.png", ContentFile(b"\x89PNG"))
+        with self.assertLogs("restaurant.images", "WARNING"):
+            self.assertTrue(
+                images.generate("broken.png", storage=default_storage)["skipped"]
+            )
@@ -0,0 +1,113 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+
+from restaurant import geo
+from restaurant.models import (
+    Region,
+    Restaurant,
+    RestaurantCard,
+    RestaurantCategory,
+    RestaurantMenu,
+    Tag,
+)
+from restaurant.tests.base import TestCase
+
+CSV = """name,branch_name,address,feature,latitude,longitude,start_time,end_time,category,region,tags,menus
+김밥천국,강남점,서울 강남구 테헤란로 123,분식,37.5012,127.0396,09:00,02:00,분식,서울 강남구 역삼동,가성비|24시,참치김밥:4500|라면:4000
+김밥천국,,서울 마포구 양화로 45,분식,37.5563,126.9220,,,분식,서울 마포구 서교동,가성비,
+,,이름 없는 행,,,,,,,,,
+돈까스하우스,본점,서울 강남구 강남대로 1,,37.4979,127.0276,11:00,21:00,양식,서울 강남구 역삼동,,돈까스:9000
+"""
+
+
+class ImportRestaurantsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        geo.reset_index()
+        self.addCleanup(geo.reset_index)
+
+    def run_import(self, content, name="restaurants.csv", **options):
+        path = self.directory / name
+        path.write_text(content, encoding="utf-8")
+        out, err = StringIO(), StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "import_restaurants", str(path), stdout=out, stderr=err, **options
+            )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        out, err = self.run_import(CSV, batch_size=2)
+        self.assertIn("3 created, 0 updated, 1 skipped", out)
+        self.assertIn("line 4: name 이 비어 있습니다.", err)
+
+        gangnam = Restaurant.objects.get(branch_name="강남점")
+        self.assertEqual(gangnam.category.name, "분식")
+        self.assertEqual(str(gangnam.region), "서울 강남구 역삼동")
+        self.assertEqual(
+            sorted(gangnam.tags.values_list("name", flat=True)), ["24시", "가성비"]
+        )
+        self.assertEqual(
+            dict(gangnam.restaurantmenu_set.values_list("name", "price")),
+            {"참치김밥": 4500, "라면": 4000},
+        )
+        # bulk_create 는 save() 를 거치지 않으므로 파생 필드를 직접 채웠는지 확인
+        self.assertEqual(gangnam.geohash, geo.encode_geohash(37.5012, 127.0396))
+        self.assertEqual((gangnam.open_minute, gangnam.close_minute), (540, 1560))
+        self.assertEqual(
+            RestaurantCard.objects.get(pk=gangnam.pk).tag_names, ["24시", "가성비"]
+        )
+        self.assertEqual(Region.objects.count(), 2)
+        self.assertEqual(RestaurantCategory.objects.count(), 2)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_region_column_wins_over_address(self):
+        Region.objects.create(sido="서울", sigungu="강남구", eupmyeondong="역삼동")
+        self.run_import(
+            "name,address,latitude,longitude,region\n"
+            "김밥천국,서울 강남구 역삼동 123,37.5,127.0,서울 마포구 서교동\n"
+            "돈까스하우스,서울 강남구 역삼동 456,37.5,127.0,\n"
+        )
+        self.assertEqual(
+            str(Restaurant.objects.get(name="김밥천국").region), "서울 마포구 서교동"
+        )
+        # 지역 칸이 비어 있으면 주소로 찾는다
+        self.assertEqual(
+            str(Restaurant.objects.get(name="돈까스하우스").region),
+            "서울 강남구 역삼동",
+        )
+
+    def test_reimport_is_idempotent(self):
+        self.run_import(CSV)
+        out, _ = self.run_import(CSV)
+        self.assertIn("0 created, 3 updated", out)
+        self.assertEqual(Restaurant.objects.count(), 3)
+        self.assertEqual(RestaurantMenu.objects.count(), 3)
+        self.assertEqual(Restaurant.tags.through.objects.count(), 3)
+
+    def test_jsonl_updates_only_given_columns(self):
+        self.run_import(CSV)
+        gangnam = Restaurant.objects.get(branch_name="강남점")
+        out, err = self.run_import(
+            '{"name": "김밥천국", "branch_name": "강남점", "address": "서울 강남구 테헤란로 123", '
+            '"tags": ["혼밥"], "menus": [{"name": "라면", "price": 4500}], "is_closed": true}\n'
+            "{broken\n",
+            name="restaurants.jsonl",
+        )
+        self.assertIn("0 created, 1 updated, 1 skipped", out)
+        self.assertIn("line 2", err)
+
+        gangnam.refresh_from_db()
+        self.assertTrue(gangnam.is_closed)
+        self.assertEqual(gangnam.category.name, "분식")  # 파일에 없는 컬럼은 유지
+        self.assertEqual(list(gangnam.tags.values_list("name", flat=True)), ["혼밥"])
+        self.assertEqual(
+            dict(gangnam.restaurantmenu_set.values_list("name", "price")),
+            {"참치김밥": 4500, "라면": 4500},
+        )
@@ -0,0 +1,255 @@
+import http.server
+import json
+import socket
+import tempfile
+import threading
+import urllib.error
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from restaurant import ingest
+from restaurant.models import Restaurant, Review, ReviewImage, SocialChannel
+
+PNG = b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a"
+
+
+def ndjson(*rows):
+    return "\n".join(
+        row if isinstance(row, str) else json.dumps(row, ensure_ascii=False)
+        for row in rows
+    )
+
+
+def review(key, restaurant, rating=5, **extra):
+    return {
+        "key": key,
+        "restaurant": restaurant,
+        "title": "맛집",
+        "author": "크롤러",
+        "content": "맛있어요",
+        "rating": rating,
+        **extra,
+    }
+
+
+@override_settings(REVIEW_INGEST_TOKEN="secret", REVIEW_IMAGE_FETCH_ASYNC=False)
+class ReviewBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name="김밥천국")
+        cls.other = Restaurant.objects.create(name="돈까스하우스")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=directory.name + "/media",
+            IMAGE_DERIVATIVES_ASYNC=False,
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "ingest-test",
+                },
+                "shared": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name + "/cache",
+                },
+            },
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def post(self, body, token="secret"):
+        return self.client.post(
+            "/api/reviews/batch/",
+            body,
+            content_type="application/x-ndjson",
+            secure=True,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def test_requires_token(self):
+        body = ndjson(review("a", self.restaurant.pk))
+        self.assertEqual(self.post(body, token="wrong").status_code, 403)
+        with override_settings(REVIEW_INGEST_TOKEN=""):
+            self.assertEqual(self.post(body, token="").status_code, 403)
+        self.assertFalse(Review.objects.exists())
+
+    def test_batch_skips_bad_lines_and_updates_ratings_once(self):
+        body = ndjson(
+            review("naver:1", self.restaurant.pk, 5, channel="네이버"),
+            review("naver:2", self.restaurant.pk, 3, channel="네이버"),
+            review("naver:2", self.restaurant.pk, 1),  # 같은 배치 안의 중복
+            review("naver:3", self.restaurant.pk, 6),
+            "{not json",
+            review("naver:4", 999_999),
+            review("kakao:1", self.other.pk, 4, channel="카카오"),
+        )
+        response = self.post(body)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(
+            {key: result[key] for key in ("received", "created", "duplicates")},
+            {"received": 7, "created": 3, "duplicates": 1},
+        )
+        self.assertEqual([error["line"] for error in result["errors"]], [4, 5, 6])
+
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_count, 2)
+        self.assertEqual(str(self.restaurant.rating), "4.00")
+        self.assertEqual(SocialChannel.objects.count(), 2)
+
+        # 키가 같으면 다시 보내도 아무것도 바뀌지 않는다
+        result = self.post(body).json()
+        self.assertEqual(result["created"], 0)
+        self.assertEqual(result["duplicates"], 4)
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_count, 2)
+        self.assertEqual(Review.objects.count(), 3)
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        def queries(keys):
+            body = ndjson(*(review(key, self.restaurant.pk) for key in keys))
+            with CaptureQueriesContext(connection) as context:
+                self.post(body)
+            return len(context)
+
+        self.assertEqual(
+            queries([f"a{n}" for n in range(5)]),
+            queries([f"b{n}" for n in range(50)]),
+        )
+
+    def test_images_are_fetched_after_commit(self):
+        body = ndjson(
+            review("naver:1", self.restaurant.pk, images=["https://cdn.test/a.png"]),
+            review("naver:2", self.restaurant.pk, images=["ftp://cdn.test/b.png"]),
+        )
+        with mock.patch.object(ingest, "download", return_value=PNG) as download:
+            # PNG 는 서명뿐인 가짜라 파생 이미지 생성은 실패로 남는다
+            with self.assertLogs("restaurant.images", "WARNING"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    result = self.post(body).json()
+        self.assertEqual((result["created"], result["images"]), (1, 1))
+        download.assert_called_once_with("https://cdn.test/a.png", mock.ANY)
+
+        image = ReviewImage.objects.get()
+        self.assertEqual(image.name, "a.png")
+        self.assertRegex(image.image.name, r"^blobs/.+\.png$")
+        reviews = self.client.get(
+            f"/api/restaurants/{self.restaurant.pk}/reviews/", secure=True
+        ).json()["results"]
+        self.assertEqual(len(reviews[0]["images"]), 1)
+
+    def test_failed_download_stays_pending(self):
+        body = ndjson(review("naver:1", self.restaurant.pk, images=["https://x/a.png"]))
+        with mock.patch.object(ingest, "download", side_effect=OSError("timeout")):
+            with self.assertLogs("restaurant.ingest", "WARNING"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.post(body)
+        self.assertEqual(ingest.pending_images().count(), 1)
+        reviews = self.client.get(
+            f"/api/restaurants/{self.restaurant.pk}/reviews/", secure=True
+        ).json()["results"]
+        self.assertEqual(reviews[0]["images"], [])
+
+        with mock.patch.object(ingest, "download", return_value=PNG):
+            stats = ingest.fetch_images(
+                ingest.pending_images().values_list("pk", flat=True)
+            )
+        self.assertEqual(stats["fetched"], 1)
+        self.assertFalse(ingest.pending_images().exists())
+
+    def test_pending_image_does_not_block_admin_save(self):
+        body = ndjson(
+            review("naver:1", self.restaurant.pk, images=["https://cdn.test/a.png"])
+        )
+        with mock.patch.object(ingest, "download", side_effect=OSError("timeout")):
+            with self.assertLogs("restaurant.ingest", "WARNING"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.post(body)
+        saved, image = Review.objects.get(), ReviewImage.objects.get()
+        self.client.force_login(
+            get_user_model().objects.create_superuser("admin", "a@a.com", "pw")
+        )
+        response = self.client.post(
+            f"/admin/restaurant/review/{saved.pk}/change/",
+            {
+                "title": "고친 제목",
+                "author": saved.author,
+                "content": saved.content,
+                "rating": saved.rating,
+                "restaurant": saved.restaurant_id,
+                "source_key": saved.source_key,
+                "reviewimage_set-TOTAL_FORMS": "1",
+                "reviewimage_set-INITIAL_FORMS": "1",
+                "reviewimage_set-MIN_NUM_FORMS": "0",
+                "reviewimage_set-MAX_NUM_FORMS": "1000",
+                "reviewimage_set-0-id": image.pk,
+                "reviewimage_set-0-review": saved.pk,
+                "reviewimage_set-0-name": image.name,
+                "reviewimage_set-0-source_url": image.source_url,
+            },
+            secure=True,
+        )
+        self.assertEqual(response.status_code, 302)
+        saved.refresh_from_db()
+        self.assertEqual(saved.title, "고친 제목")
+        self.assertTrue(ingest.pending_images().filter(pk=image.pk).exists())
+
+        # 파일도 원본 주소도 없는 행은 여전히 막는다
+        with self.assertRaises(ValidationError):
+            ReviewImage(review=saved, name="빈 행").full_clean()
+
+
+class DownloadTest(SimpleTestCase):
+    def test_rejects_internal_addresses(self):
+        for url in [
+            "http://127.0.0.1/a.png",
+            "http://[::1]/a.png",
+            "http://169.254.169.254/latest/meta-data/",
+            "http://10.0.0.5/a.png",
+        ]:
+            with self.subTest(url=url), self.assertRaises(ValueError):
+                ingest.download(url, 100)
+
+    def test_rejects_names_resolving_to_private_addresses(self):
+        resolved = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.168.0.10", 80))]
+        with mock.patch("socket.getaddrinfo", return_value=resolved):
+            with self.assertRaisesRegex(ValueError, "192.168.0.10"):
+                ingest.download("http://cdn.test/a.png", 100)
+
+    @override_settings(REVIEW_IMAGE_HOSTS=["pstatic.net"])
+    def test_host_allow_list(self):
+        self.assertTrue(ingest.allowed_host("pstatic.net"))
+        self.assertTrue(ingest.allowed_host("blog.pstatic.net"))
+        self.assertFalse(ingest.allowed_host("evilpstatic.net"))
+        with self.assertRaisesRegex(ValueError, "허용되지 않은"):
+            ingest.download("https://cdn.test/a.png", 100)
+
+    def test_redirects_are_not_followed(self):
+        class Redirect(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(302)
+                self.send_header("Location", "http://169.254.169.254/")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.HTTPServer(("127.0.0.1", 0), Redirect)
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        self.addCleanup(server.server_close)
+        port = server.server_address[1]
+
+        def loopback_only(host, port):
+            return socket.getaddrinfo("127.0.0.1", port, type=socket.SOCK_STREAM)
+
+        with mock.patch.object(ingest, "public_addresses", loopback_only):
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                ingest.download(f"http://cdn.test:{port}/a.png", 100)
+        self.assertEqual(raised.exception.code, 302)
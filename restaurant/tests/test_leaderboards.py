@@ -0,0 +1,187 @@
+import random
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from restaurant import cards, leaderboards
+from restaurant.models import Region, Restaurant, RestaurantCategory, Review
+from restaurant.tests.base import TestCase
+
+
+class SortedListTest(SimpleTestCase):
+    @mock.patch.object(leaderboards.SortedList, "LOAD", 4)
+    def test_matches_sorted(self):
+        rng = random.Random(3)
+        keys = rng.sample(range(1_000), 200)
+        values = leaderboards.SortedList(keys[:50])
+        expected = sorted(keys[:50])
+        for key in keys[50:]:
+            values.add(key)
+            expected.append(key)
+        for key in rng.sample(keys, 120):
+            values.remove(key)
+            expected.remove(key)
+        expected.sort()
+        self.assertEqual(len(values), len(expected))
+        self.assertEqual(values.slice(0, 1_000), expected)
+        self.assertEqual(values.slice(7, 19), expected[7:19])
+        self.assertEqual(values.slice(75, 90), expected[75:])
+        self.assertEqual(values.index(expected[33]), 33)
+        self.assertLessEqual(max(map(len, values.buckets)), 8)
+
+
+class LeaderboardsTest(SimpleTestCase):
+    def setUp(self):
+        # (pk, 지역, 카테고리, 폐업, 별점 합, 평가 수)
+        self.boards = leaderboards.Leaderboards.from_rows(
+            [
+                (1, 10, 1, False, 5, 1),  # 5점 하나
+                (2, 10, 2, False, round(4.7 * 250), 250),  # 돈까스하우스: 4.7점 250개
+                (3, 11, 1, False, 4 * 40, 40),
+                (4, 11, None, True, 5 * 90, 90),  # 폐업
+                (5, None, 1, False, 0, 0),  # 평가 없음
+            ],
+            prior_weight=10,
+        )
+
+    def test_bayesian_average_beats_single_review(self):
+        # 평균 m ≈ 4.6 이라 5점 하나(≈4.64)는 4점 40개(≈4.12)보다는 앞선다
+        self.assertEqual([pk for pk, _, _ in self.boards.top()], [2, 1, 3])
+        self.assertAlmostEqual(self.boards.prior_mean, (5 + 1175 + 160) / 291)
+        self.assertEqual(
+            [pk for pk, _, _ in self.boards.top((leaderboards.REGION, 10))], [2, 1]
+        )
+        self.assertEqual(self.boards.top((leaderboards.REGION, 99)), [])
+
+    def test_updates_move_between_boards(self):
+        self.boards.set(1, 11, 1, False, 5 * 300, 300)
+        self.assertEqual(self.boards.rank(1), 1)
+        self.assertEqual(self.boards.rank(1, (leaderboards.REGION, 11)), 1)
+        self.assertIsNone(self.boards.rank(1, (leaderboards.REGION, 10)))
+        self.assertEqual(
+            [pk for pk, _, _ in self.boards.top((leaderboards.CATEGORY, 1))], [1, 3]
+        )
+        self.boards.set(2, 10, 2, True, 1175, 250)
+        self.assertNotIn((leaderboards.REGION, 10), self.boards.boards)
+        self.boards.remove(3)
+        self.assertEqual([pk for pk, _, _ in self.boards.top()], [1])
+
+
+class LeaderboardSyncTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot = Path(directory.name) / "leaderboards.pickle"
+        override = override_settings(LEADERBOARD_SNAPSHOT=self.snapshot)
+        override.enable()
+        self.addCleanup(override.disable)
+        leaderboards.reset_boards()
+        self.addCleanup(leaderboards.reset_boards)
+
+        self.region = Region.objects.create(
+            sido="서울", sigungu="중구", eupmyeondong="명동"
+        )
+        self.category = RestaurantCategory.objects.create(name="돈까스")
+        self.one = Restaurant.objects.create(name="한 번 5점", region=self.region)
+        self.many = Restaurant.objects.create(
+            name="돈까스하우스", region=self.region, category=self.category
+        )
+        self.review(self.one, 5)
+        for rating in [5, 5, 4, 5, 4, 5, 5, 4, 5, 5] * 4:  # 평균 4.7
+            self.review(self.many, rating)
+        ordinary = Restaurant.objects.create(name="보통")
+        for _ in range(20):
+            self.review(ordinary, 3)
+
+    def review(self, restaurant, rating):
+        return Review.objects.create(
+            restaurant=restaurant,
+            title="후기",
+            author="손님",
+            content="-",
+            rating=rating,
+        )
+
+    def ranked(self, scope=leaderboards.ALL):
+        return [pk for pk, _, _ in leaderboards.top(scope, limit=2)]
+
+    def test_rating_changes_update_in_place(self):
+        self.assertEqual(self.ranked(), [self.many.pk, self.one.pk])
+        boards = leaderboards.get_boards()
+        self.assertTrue(self.snapshot.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(30):
+                self.review(self.one, 5)
+        self.assertEqual(self.ranked(), [self.one.pk, self.many.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.one.is_closed = True
+            self.one.save()
+        self.assertEqual(
+            self.ranked((leaderboards.REGION, self.region.pk)), [self.many.pk]
+        )
+        self.assertIs(leaderboards.get_boards(), boards)  # 다시 만들지 않았다
+
+    def test_restart_from_snapshot_catches_up(self):
+        leaderboards.get_boards()
+        leaderboards.reset_boards()  # 프로세스 재시작
+        for _ in range(30):  # 다른 워커의 변경 (이 프로세스에는 색인이 없음)
+            self.review(self.one, 5)
+        with mock.patch.object(leaderboards, "build") as build:
+            self.assertEqual(self.ranked(), [self.one.pk, self.many.pk])
+        build.assert_not_called()
+
+    def test_rebuild_does_not_block_readers_or_refresh(self):
+        old = self.ranked()
+        new = leaderboards.Leaderboards.from_rows([], settings.LEADERBOARD_PRIOR_WEIGHT)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build():
+            started.set()
+            release.wait(5)
+            return new
+
+        with mock.patch.object(leaderboards, "build", slow_build), mock.patch.object(
+            leaderboards, "save"
+        ), mock.patch.object(leaderboards, "catch_up"), override_settings(
+            LEADERBOARD_MAX_AGE=-1
+        ):
+            rebuild = threading.Thread(target=leaderboards.get_boards)
+            rebuild.start()
+            self.assertTrue(started.wait(5))
+            # 다시 만드는 동안에도 지금 순위표로 바로 답하고, 커밋 후 갱신도 기다리지 않는다
+            self.assertEqual(self.ranked(), old)
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(30):
+                    self.review(self.one, 5)
+            self.assertEqual(self.ranked(), [self.one.pk, self.many.pk])
+            release.set()
+            rebuild.join(5)
+        self.assertIs(leaderboards.get_boards(), new)
+
+    def test_api(self):
+        cards.refresh([self.one.pk, self.many.pk])
+        response = self.client.get(
+            "/api/leaderboards/", {"category": self.category.pk}, secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        [first] = response.json()["results"]
+        self.assertEqual((first["rank"], first["name"]), (1, "돈까스하우스"))
+        response = self.client.get(
+            "/api/leaderboards/", {"region": self.region.pk, "offset": 1}, secure=True
+        )
+        self.assertEqual(
+            [row["name"] for row in response.json()["results"]], ["한 번 5점"]
+        )
+        response = self.client.get(
+            "/api/leaderboards/",
+            {"region": self.region.pk, "category": self.category.pk},
+            secure=True,
+        )
+        self.assertEqual(response.status_code, 400)
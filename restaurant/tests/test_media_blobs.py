@@ -0,0 +1,193 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from restaurant import images, storage
+from restaurant.models import (
+    Article,
+    MediaBlob,
+    Restaurant,
+    RestaurantCard,
+    RestaurantImage,
+)
+
+PNG = b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a"
+
+
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        # 가짜 PNG 라 파생 이미지는 만들어지지 않는다. 풀 대신 현재 프로세스에서 바로 시도.
+        override = override_settings(
+            MEDIA_ROOT=self.root, IMAGE_DERIVATIVES_ASYNC=False
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        storage.reset_stats()
+
+        self.restaurant = Restaurant.objects.create(
+            name="테스트 식당",
+            address="서울",
+            phone="010-0000-0000",
+            latitude=37.5,
+            longitude=127.0,
+        )
+
+    def add_image(self, data, name="a.png"):
+        return RestaurantImage.objects.create(
+            restaurant=self.restaurant, image=ContentFile(data, name=name)
+        )
+
+    def files(self):
+        return sorted(
+            str(path.relative_to(self.root))
+            for path in self.root.rglob("*")
+            if path.is_file()
+        )
+
+    def test_identical_uploads_are_stored_once(self):
+        first = self.add_image(PNG + b"same", "a.png")
+        second = self.add_image(PNG + b"same", "b.png")
+        third = self.add_image(PNG + b"other", "a.png")
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, third.image.name)
+        self.assertEqual(len(self.files()), 2)
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).refs, 2)
+        self.assertEqual(storage.stats()["blob_uploads"], 2)
+        self.assertEqual(storage.stats()["blob_dedup_hits"], 1)
+
+    def test_resave_after_rollback_reuses_file(self):
+        # 행은 롤백으로 사라지고 파일만 남은 상태에서 다시 올려도 접미사 붙은 사본을 만들지 않는다
+        with self.assertRaises(ZeroDivisionError), transaction.atomic():
+            self.add_image(PNG + b"same")
+            1 / 0
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertEqual(len(self.files()), 1)
+
+        image = self.add_image(PNG + b"same")
+        self.assertEqual(self.files(), [image.image.name])
+        self.assertEqual(MediaBlob.objects.get(name=image.image.name).refs, 1)
+
+    def test_file_is_removed_when_last_reference_goes(self):
+        first = self.add_image(PNG + b"same")
+        second = self.add_image(PNG + b"same")
+        name = first.image.name
+        derivative = self.root / images.derivative_name(name, "thumb", "webp")
+        derivative.parent.mkdir(parents=True)
+        derivative.write_bytes(b"webp")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
+        self.assertTrue((self.root / name).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+        self.assertFalse((self.root / name).exists())
+        self.assertFalse(derivative.exists())
+
+    def test_reupload_before_removal_keeps_file(self):
+        image = self.add_image(PNG + b"same")
+        name = image.image.name
+        with self.captureOnCommitCallbacks() as callbacks:
+            image.delete()
+        # 커밋과 파일 삭제 사이에 같은 내용이 다시 올라왔다 (dedup hit)
+        again = self.add_image(PNG + b"same")
+        self.assertEqual(again.image.name, name)
+        for callback in callbacks:
+            callback()
+        self.assertTrue((self.root / name).exists())
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
+
+    def test_replacing_image_releases_old_blob(self):
+        image = self.add_image(PNG + b"old")
+        old = image.image.name
+        image.image = ContentFile(PNG + b"new", name="a.png")
+        # 가짜 PNG 라 파생 이미지는 만들지 못하고 경고만 남는다
+        with self.assertLogs("restaurant.images", "WARNING"):
+            with self.captureOnCommitCallbacks(execute=True):
+                image.save()
+
+        self.assertFalse(MediaBlob.objects.filter(name=old).exists())
+        self.assertEqual(MediaBlob.objects.get(name=image.image.name).refs, 1)
+        self.assertEqual(self.files(), [image.image.name])
+
+    def test_dedupe_media_repoints_legacy_files(self):
+        # blobs/ 이전 방식으로 저장된 파일 세 개(두 개는 같은 내용)
+        for name, data in [
+            ("restaurant/a.png", PNG + b"same"),
+            ("restaurant/b.png", PNG + b"same"),
+            ("article/c.png", PNG + b"other"),
+        ]:
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_bytes(data)
+        thumb = self.root / images.derivative_name("restaurant/a.png", "thumb", "webp")
+        thumb.parent.mkdir(parents=True)
+        thumb.write_bytes(b"webp")
+        images_ = [
+            RestaurantImage.objects.create(restaurant=self.restaurant, image=name)
+            for name in ["restaurant/a.png", "restaurant/b.png", "restaurant/b.png"]
+        ]
+        article = Article.objects.create(
+            title="칼럼", content="내용", preview_image="article/c.png"
+        )
+
+        output = StringIO()
+        call_command("dedupe_media", "--dry-run", stdout=output)
+        self.assertIn("reclaimable 12", output.getvalue())
+        self.assertFalse(MediaBlob.objects.exists())
+
+        output = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("dedupe_media", stdout=output)
+        self.assertIn("2 unique blobs, 4 rows repointed", output.getvalue())
+        self.assertIn("reclaimed 12", output.getvalue())
+
+        for image in images_:
+            image.refresh_from_db()
+        article.refresh_from_db()
+        same = images_[0].image.name
+        self.assertEqual({image.image.name for image in images_}, {same})
+        # update() 로 옮겼어도 목록 카드는 새 파일을 가리킨다
+        card = RestaurantCard.objects.get(pk=self.restaurant.pk)
+        self.assertEqual(card.image_url, images_[0].image.url)
+        self.assertEqual(MediaBlob.objects.get(name=same).refs, 3)
+        self.assertEqual(
+            self.files(),
+            sorted(
+                [
+                    same,
+                    article.preview_image.name,
+                    images.derivative_name(same, "thumb", "webp"),
+                ]
+            ),
+        )
+
+    def test_dedupe_media_removes_every_derivative(self):
+        (self.root / "restaurant").mkdir()
+        (self.root / "restaurant/a.png").write_bytes(PNG + b"same")
+        derivatives = images.derivative_names("restaurant/a.png").values()
+        for name in derivatives:
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_bytes(b"derivative")
+        image = RestaurantImage.objects.create(
+            restaurant=self.restaurant, image="restaurant/a.png"
+        )
+
+        call_command("dedupe_media", stdout=StringIO())
+        image.refresh_from_db()
+        self.assertFalse((self.root / "restaurant/a.png").exists())
+        for name in derivatives:
+            self.assertFalse((self.root / name).exists(), name)
+        self.assertEqual(
+            len(self.files()), 1 + len(derivatives)
+        )  # blob 과 복사된 파생 이미지
@@ -0,0 +1,227 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from restaurant import cards, geo, menus
+from restaurant.models import Restaurant, RestaurantMenu, RestaurantMenuSummary
+from restaurant.tests.base import TestCase
+
+
+class PriceBucketTest(SimpleTestCase):
+    def test_mask_covers_every_bucket_in_range(self):
+        self.assertEqual(menus.bucket(2_999), 0)
+        self.assertEqual(menus.bucket(3_000), 1)
+        self.assertEqual(menus.bucket_mask(0, 2_000), 0b1)
+        self.assertEqual(menus.bucket_mask(4_000, 6_500), 0b1110)
+        self.assertEqual(
+            menus.bucket_mask(0, 10**9), (1 << len(menus.PRICE_BUCKETS) + 1) - 1
+        )
+
+
+class MenuNamesTest(SimpleTestCase):
+    def test_substring_match_with_counts(self):
+        names = menus.MenuNames(
+            [("김밥", 10), ("참치김밥", 3), ("라면", 7), ("Pasta", 1)]
+        )
+        self.assertEqual(names.matching("김밥"), {"김밥": 10, "참치김밥": 3})
+        self.assertEqual(names.matching("pas"), {"Pasta": 1})
+        self.assertEqual(names.matching("밥라"), {})  # 이름 경계를 넘는 일치는 없다
+
+        names.add("김밥")
+        names.add("트러플 김밥")
+        self.assertEqual(
+            names.matching("김밥"), {"김밥": 11, "참치김밥": 3, "트러플 김밥": 1}
+        )
+
+        names.add("참치김밥", -3)  # 지워지거나 이름이 바뀐 행
+        names.add("트러플 김밥", -1)
+        self.assertEqual(names.matching("김밥"), {"김밥": 11})
+
+
+class MenuSummaryTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.restaurant = Restaurant.objects.create(name="김밥천국")
+
+    def test_summary_follows_menu_changes(self):
+        gimbap = RestaurantMenu.objects.create(
+            restaurant=self.restaurant, name="김밥", price=3_500
+        )
+        RestaurantMenu.objects.create(
+            restaurant=self.restaurant, name="라면", price=4_500
+        )
+        RestaurantMenu.objects.create(
+            restaurant=self.restaurant, name="돈까스", price=9_000
+        )
+        summary = RestaurantMenuSummary.objects.get(pk=self.restaurant.pk)
+        self.assertEqual(
+            (summary.item_count, summary.min_price, summary.median_price),
+            (3, 3_500, 4_500),
+        )
+        self.assertEqual(summary.max_price, 9_000)
+        self.assertEqual(
+            summary.price_buckets,
+            (1 << menus.bucket(3_500)) | (1 << menus.bucket(9_000)),
+        )
+
+        gimbap.price = 12_000
+        gimbap.save()
+        summary.refresh_from_db()
+        self.assertEqual((summary.min_price, summary.max_price), (4_500, 12_000))
+
+        RestaurantMenu.objects.filter(restaurant=self.restaurant).delete()
+        self.assertFalse(RestaurantMenuSummary.objects.exists())
+
+
+class BudgetSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurants = {}
+        for name, latitude, dishes, closed in [
+            ("시청 분식", 37.5665, [("참치김밥", 4_000), ("라면", 3_500)], False),
+            ("을지로 김밥", 37.5660, [("김밥", 3_000), ("쫄면", 7_000)], False),
+            ("명동 한식", 37.5630, [("김밥 정식", 9_000), ("비빔밥", 7_500)], False),
+            ("폐업 분식", 37.5665, [("김밥", 1_000)], True),
+            ("강남 김밥", 37.4980, [("김밥", 2_500)], False),
+        ]:
+            restaurant = Restaurant.objects.create(
+                name=name,
+                latitude=latitude,
+                longitude=126.978,
+                is_closed=closed,
+            )
+            for dish, price in dishes:
+                RestaurantMenu.objects.create(
+                    restaurant=restaurant, name=dish, price=price
+                )
+            cls.restaurants[name] = restaurant.pk
+
+    def setUp(self):
+        super().setUp()
+        geo.reset_index()
+        self.addCleanup(geo.reset_index)
+        menus.reset_names()
+        self.addCleanup(menus.reset_names)
+        # 카드는 커밋 후에 만들어지므로 여기서 한 번에
+        cards.refresh(self.restaurants.values())
+
+    def names(self, matches):
+        ids = {pk: name for name, pk in self.restaurants.items()}
+        return [(ids[match[0]], match[2], match[3]) for match in matches]
+
+    def test_cheapest_matching_dish_first(self):
+        self.assertEqual(
+            self.names(menus.budget_search(8_000, query="김밥")),
+            [
+                ("강남 김밥", "김밥", 2_500),
+                ("을지로 김밥", "김밥", 3_000),
+                ("시청 분식", "참치김밥", 4_000),
+            ],
+        )
+        self.assertEqual(
+            self.names(menus.budget_search(8_000, min_price=5_000)),
+            [("을지로 김밥", "쫄면", 7_000), ("명동 한식", "비빔밥", 7_500)],
+        )
+
+    def test_near_me_and_plans_agree(self):
+        # 시청 반경 1km: 강남은 빠진다. 후보가 적을 때(요약+IN)와 많을 때(가격순 훑기)의 결과가 같아야 한다.
+        kwargs = dict(query="김밥", latitude=37.5665, longitude=126.978, radius_km=1.0)
+        expected = [
+            ("을지로 김밥", "김밥", 3_000),
+            ("시청 분식", "참치김밥", 4_000),
+            ("명동 한식", "김밥 정식", 9_000),
+        ]
+        self.assertEqual(self.names(menus.budget_search(10_000, **kwargs)), expected)
+        with mock.patch.object(menus, "NAME_ROWS_LIMIT", 0):
+            self.assertEqual(
+                self.names(menus.budget_search(10_000, **kwargs)), expected
+            )
+            with mock.patch.object(menus, "CANDIDATE_LIMIT", 0), mock.patch.object(
+                menus, "SCAN_BATCH", 1
+            ):
+                matches = menus.budget_search(10_000, **kwargs)
+        self.assertEqual(self.names(matches), expected)
+        self.assertLess(matches[0][4], 1.0)
+
+    def test_new_menu_name_is_found_after_commit(self):
+        self.assertEqual(menus.budget_search(20_000, query="트러플"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            RestaurantMenu.objects.create(
+                restaurant_id=self.restaurants["시청 분식"],
+                name="트러플 김밥",
+                price=15_000,
+            )
+        self.assertEqual(
+            self.names(menus.budget_search(20_000, query="트러플")),
+            [("시청 분식", "트러플 김밥", 15_000)],
+        )
+
+    def test_name_counts_follow_inserts_renames_and_deletes(self):
+        names = menus.get_names()
+        self.assertEqual(names.matching("라면"), {"라면": 1})
+        menu = RestaurantMenu.objects.get(name="라면")
+        with self.captureOnCommitCallbacks(execute=True):
+            menu.price = 3_800  # 가격만 바뀐 저장은 세지 않는다
+            menu.save()
+        self.assertEqual(names.matching("라면"), {"라면": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            menu.name = "치즈라면"
+            menu.save()
+        self.assertEqual(names.matching("라면"), {"치즈라면": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            menu.delete()
+        self.assertEqual(names.matching("라면"), {})
+        self.assertEqual(menus.budget_search(20_000, query="라면"), [])
+
+    def test_name_from_another_worker_is_found_in_recent_rows(self):
+        menus.get_names()
+        with self.captureOnCommitCallbacks(
+            execute=False
+        ):  # 이 프로세스의 사전에는 없다
+            RestaurantMenu.objects.create(
+                restaurant_id=self.restaurants["시청 분식"], name="마라탕", price=9_000
+            )
+        self.assertEqual(menus.get_names().matching("마라"), {})
+        self.assertEqual(
+            self.names(menus.budget_search(10_000, query="마라")),
+            [("시청 분식", "마라탕", 9_000)],
+        )
+
+    def test_unknown_name_does_not_scan(self):
+        menus.get_names()
+        with mock.patch.object(
+            menus, "_scan", side_effect=AssertionError
+        ), mock.patch.object(menus, "_among", side_effect=AssertionError):
+            self.assertEqual(menus.budget_search(10_000, query="qzxv"), [])
+            self.assertEqual(
+                menus.budget_search(
+                    10_000, query="qzxv", latitude=37.5665, longitude=126.978
+                ),
+                [],
+            )
+
+    def test_api(self):
+        response = self.client.get(
+            "/api/restaurants/budget/",
+            {"max_price": 8000, "q": "김밥", "lat": 37.5665, "lon": 126.978},
+            secure=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        first = response.json()["results"][0]
+        self.assertEqual(first["name"], "을지로 김밥")
+        self.assertEqual(first["menu"]["price"], 3_000)
+        self.assertEqual(
+            first["menu_summary"],
+            {
+                "item_count": 2,
+                "min_price": 3_000,
+                "median_price": 3_000,
+                "max_price": 7_000,
+            },
+        )
+
+        for params in [{}, {"max_price": "싸게"}, {"max_price": 8000, "lat": 37.5}]:
+            response = self.client.get("/api/restaurants/budget/", params, secure=True)
+            self.assertEqual(response.status_code, 400)
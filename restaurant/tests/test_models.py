@@ -1,5 +1,8 @@
+import tempfile
+from unittest import addModuleCleanup
+
 from django.core.files.base import ContentFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from restaurant.models import (
     Article,
@@ -14,6 +17,18 @@ from restaurant.models import (
     Tag,
 )
 
+# 이미지는 내용의 sha256 으로 저장된다 (restaurant/storage.py ContentAddressedStorage)
+BLOB_NAME = r"^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.png$"
+
+
+def setUpModule():
+    # setUpTestData 에서 이미지를 올리므로 클래스보다 먼저 MEDIA_ROOT 를 임시 디렉터리로 바꾼다
+    directory = tempfile.TemporaryDirectory()
+    addModuleCleanup(directory.cleanup)
+    override = override_settings(MEDIA_ROOT=directory.name)
+    override.enable()
+    addModuleCleanup(override.disable)
+
 
 class ArticleModelTest(TestCase):
     @classmethod
@@ -23,7 +38,7 @@ class ArticleModelTest(TestCase):
             title="테스트 칼럼 제목",
             content="테스트 칼럼 내용",
             preview_image=ContentFile(
-                b"\x89\x50\x4E\x47\x0D\x0A\x1A\x0A", name="test-image.png"
+                b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a", name="test-image.png"
             ),
             show_at_index=True,
             is_published=True,
@@ -36,9 +51,7 @@ class ArticleModelTest(TestCase):
         self.assertEqual(expected_data.content, "테스트 칼럼 내용")
         self.assertEqual(expected_data.show_at_index, True)
         self.assertEqual(expected_data.is_published, True)
-        self.assertTrue(
-            expected_data.preview_image.name.startswith("article/test-image")
-        )
+        self.assertRegex(expected_data.preview_image.name, BLOB_NAME)
 
 
 class RestaurantModelTest(TestCase):
@@ -103,7 +116,7 @@ class RestaurantImageModelTest(TestCase):
         RestaurantImage.objects.create(
             restaurant=restaurant,
             image=ContentFile(
-                b"\x89\x50\x4E\x47\x0D\x0A\x1A\x0A", name="test-image.png"
+                b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a", name="test-image.png"
             ),
         )
 
@@ -111,7 +124,7 @@ class RestaurantImageModelTest(TestCase):
         restaurant_image = RestaurantImage.objects.get(id=1)
         expected_data = restaurant_image
         self.assertEqual(expected_data.restaurant.name, "테스트 식당")
-        self.assertTrue(expected_data.image.name.startswith("restaurant/test-image"))
+        self.assertRegex(expected_data.image.name, BLOB_NAME)
 
 
 class RestaurantMenuModelTest(TestCase):
@@ -164,7 +177,7 @@ class ReviewImageModelTest(TestCase):
         ReviewImage.objects.create(
             review=review,
             image=ContentFile(
-                b"\x89\x50\x4E\x47\x0D\x0A\x1A\x0A", name="test-image.png"
+                b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a", name="test-image.png"
             ),
         )
 
@@ -172,7 +185,7 @@ class ReviewImageModelTest(TestCase):
         review_image = ReviewImage.objects.get(id=1)
         expected_data = review_image
         self.assertEqual(expected_data.review.restaurant.name, "테스트 식당")
-        self.assertTrue(expected_data.image.name.startswith("review/test-image"))
+        self.assertRegex(expected_data.image.name, BLOB_NAME)
 
 
 class SocialChannelModelTest(TestCase):
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from restaurant import profiler
+from restaurant.models import Restaurant, Review
+
+
+class QueryProfilerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            restaurant = Restaurant.objects.create(name=f"김밥 {number}")
+            Review.objects.create(
+                restaurant=restaurant, title="-", author="-", content="-", rating=4
+            )
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            profiler.fingerprint(
+                "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'a''b'  LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            profiler.fingerprint("SELECT rating_1_count FROM t WHERE id IN (%s)"),
+            "SELECT rating_1_count FROM t WHERE id IN (...)",
+        )
+
+    def test_detects_n_plus_one(self):
+        with profiler.profile() as result:
+            for review in Review.objects.all():
+                review.restaurant_name
+        self.assertEqual(result.count, 6)
+        self.assertEqual(list(result.repeated().values()), [5])
+
+        with self.assertRaises(AssertionError):
+            with profiler.query_budget(max_repeats=1):
+                for review in Review.objects.all():
+                    review.restaurant_name
+
+    def test_admin_review_list_budget(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "-")
+        )
+        # 세션 + 사용자 + COUNT 2번(필터 전/후) + 목록. 행마다 레스토랑을 읽으면 +5
+        with profiler.query_budget(max_queries=5, max_repeats=2):
+            response = self.client.get("/admin/restaurant/review/", secure=True)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(
+        QUERY_PROFILER_ENABLED=True,
+        QUERY_PROFILER_SLOW_MS=0,
+        QUERY_PROFILER_SAMPLE_RATE=1.0,
+    )
+    def test_middleware_headers_and_slow_log(self):
+        with self.assertLogs("restaurant.profiler", "WARNING") as logs:
+            response = self.client.get("/api/restaurants/", secure=True)
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="4 queries", app;dur=[\d.]+$',
+        )
+        self.assertIn("GET /api/restaurants/", logs.output[0])
+
+    def test_middleware_disabled_by_default(self):
+        response = self.client.get("/api/restaurants/", secure=True)
+        self.assertNotIn("Server-Timing", response)
@@ -0,0 +1,108 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from restaurant import ratings
+from restaurant.models import Restaurant, Review
+
+
+class RatingAggregateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name="테스트 식당")
+        cls.other = Restaurant.objects.create(name="다른 식당")
+
+    def write_review(self, rating, restaurant=None):
+        return Review.objects.create(
+            restaurant=restaurant or self.restaurant,
+            title="리뷰",
+            author="작성자",
+            content="내용",
+            rating=rating,
+        )
+
+    def test_create_update_delete(self):
+        first = self.write_review(5)
+        self.write_review(4)
+        self.write_review(4)
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_count, 3)
+        self.assertEqual(self.restaurant.rating_sum, 13)
+        self.assertEqual(self.restaurant.rating, Decimal("4.33"))
+        self.assertEqual(
+            self.restaurant.rating_histogram, {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}
+        )
+
+        first.rating = 1
+        first.save()
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_sum, 9)
+        self.assertEqual(self.restaurant.rating_1_count, 1)
+        self.assertEqual(self.restaurant.rating_5_count, 0)
+        self.assertEqual(self.restaurant.rating, Decimal("3.00"))
+
+        first.restaurant = self.other
+        first.save()
+        self.restaurant.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_count, 2)
+        self.assertEqual(self.other.rating_count, 1)
+        self.assertEqual(self.other.rating, Decimal("1.00"))
+
+        first.delete()
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.rating_count, 0)
+        self.assertEqual(self.other.rating, Decimal("0.00"))
+
+    def test_unrelated_update_fields_skip_aggregate(self):
+        review = self.write_review(3)
+        with self.assertNumQueries(1):
+            review.title = "수정"
+            review.save(update_fields=["title"])
+
+    def test_bulk_apply_matches_reviews(self):
+        # 레스토랑이 많으면 upsert 한 번으로 쓰는 경로를 탄다
+        restaurants = [self.restaurant] + [
+            Restaurant.objects.create(name=f"식당 {n}")
+            for n in range(ratings.BULK_APPLY_THRESHOLD)
+        ]
+        self.write_review(2)
+        reviews = [
+            Review(
+                restaurant=restaurant,
+                title="리뷰",
+                author="작성자",
+                content="내용",
+                rating=n % 5 + 1,
+            )
+            for n, restaurant in enumerate(restaurants * 2)
+        ]
+        Review.objects.bulk_create(reviews)
+        changes = ratings.RatingChanges()
+        for review in reviews:
+            changes.add(review.restaurant_id, review.rating)
+        with self.assertNumQueries(5):  # savepoint + 읽기 + upsert + 카드 + 해제
+            changed = changes.apply()
+        self.assertEqual(len(changed), len(restaurants))
+        self.assertEqual(ratings.reconcile([r.pk for r in restaurants], fix=False), [])
+
+    def test_rebuild_ratings(self):
+        self.write_review(5)
+        self.write_review(2)
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(
+            rating=0, rating_count=7, rating_sum=1, rating_5_count=0
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_ratings", "--verify", stdout=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_ratings", "--chunk-size", "1", stdout=out)
+        self.assertIn("1 fixed", out.getvalue())
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.rating_count, 2)
+        self.assertEqual(self.restaurant.rating_sum, 7)
+        self.assertEqual(self.restaurant.rating, Decimal("3.50"))
+        call_command("rebuild_ratings", "--verify", stdout=StringIO())
@@ -0,0 +1,149 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from restaurant import ingest, realtime
+from restaurant.models import Region, Restaurant, Review
+from restaurant.tests.base import TestCase
+
+
+@override_settings(
+    REALTIME_HUB_URL="http://hub.test",
+    REALTIME_HUB_TOKEN="secret",
+    REALTIME_PUBLISH_ASYNC=False,
+)
+class RealtimeEventsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(
+            sido="서울", sigungu="중구", eupmyeondong="명동"
+        )
+        cls.restaurant = Restaurant.objects.create(name="김밥천국", region=cls.region)
+        cls.nowhere = Restaurant.objects.create(name="돈까스하우스")
+
+    def setUp(self):
+        super().setUp()
+        self.real_send = realtime.send
+        patcher = mock.patch.object(realtime, "send")
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sent(self):
+        return [
+            (event["channel"], event["type"])
+            for call in self.send.call_args_list
+            for event in call.args[0]
+        ]
+
+    def test_new_review_publishes_review_and_rating(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(
+                title="맛집",
+                author="손님",
+                content="맛있어요",
+                rating=4,
+                restaurant=self.restaurant,
+            )
+        self.assertCountEqual(
+            self.sent(),
+            [
+                (f"restaurant:{self.restaurant.pk}", realtime.REVIEW),
+                (f"region:{self.region.pk}", realtime.REVIEW),
+                (f"restaurant:{self.restaurant.pk}", realtime.RATING),
+                (f"region:{self.region.pk}", realtime.RATING),
+            ],
+        )
+        events = {
+            event["type"]: event["data"]
+            for call in self.send.call_args_list
+            for event in call.args[0]
+        }
+        self.assertEqual(events[realtime.REVIEW]["review"], review.pk)
+        self.assertEqual(
+            events[realtime.RATING],
+            {"restaurant": self.restaurant.pk, "rating": 4.0, "rating_count": 1},
+        )
+
+    def test_sent_only_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Review.objects.create(
+                title="맛집",
+                author="손님",
+                content="맛",
+                rating=5,
+                restaurant=self.nowhere,
+            )
+        self.send.assert_not_called()
+        self.assertTrue(callbacks)
+
+    def test_closed_flip(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.name = "김밥천국 본점"
+            self.restaurant.save()
+        self.send.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.is_closed = True
+            self.restaurant.save()
+        self.assertEqual(
+            self.sent(),
+            [
+                (f"restaurant:{self.restaurant.pk}", realtime.STATUS),
+                (f"region:{self.region.pk}", realtime.STATUS),
+            ],
+        )
+        self.assertEqual(
+            self.send.call_args.args[0][0]["data"],
+            {"restaurant": self.restaurant.pk, "is_closed": True},
+        )
+
+    def test_ingest_chunk_is_one_publish(self):
+        ingester = ingest.ReviewIngester(fetch=False)
+        rows = [
+            (
+                line_no,
+                {
+                    "key": f"naver:{line_no}",
+                    "restaurant": self.nowhere.pk,
+                    "title": "맛집",
+                    "author": "크롤러",
+                    "content": "맛있어요",
+                    "rating": 5,
+                },
+            )
+            for line_no in range(1, 4)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            list(ingester.run(rows))
+        reviews = [
+            event["data"]["review"]
+            for event in self.send.call_args_list[0].args[0]
+            if event["type"] == realtime.REVIEW
+        ]
+        self.assertCountEqual(reviews, Review.objects.values_list("pk", flat=True))
+        self.assertEqual(
+            self.sent().count((f"restaurant:{self.nowhere.pk}", realtime.RATING)), 1
+        )
+
+    @override_settings(REALTIME_HUB_URL="")
+    def test_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                title="맛집",
+                author="손님",
+                content="맛",
+                rating=5,
+                restaurant=self.nowhere,
+            )
+            self.restaurant.is_closed = True
+            self.restaurant.save()
+        self.send.assert_not_called()
+
+    def test_send_survives_unreachable_hub(self):
+        with mock.patch(
+            "urllib.request.urlopen", side_effect=OSError("connection refused")
+        ) as urlopen, self.assertLogs("restaurant.realtime", "WARNING"):
+            self.real_send([{"channel": "restaurant:1", "type": "review", "data": {}}])
+        request = urlopen.call_args.args[0]
+        self.assertEqual(request.full_url, "http://hub.test/publish")
+        self.assertEqual(request.get_header("X-hub-token"), "secret")
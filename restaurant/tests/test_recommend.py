@@ -0,0 +1,88 @@
+import tempfile
+
+import numpy as np
+from django.test import TestCase
+
+from restaurant import recommend
+from restaurant.models import Restaurant, Review
+
+
+class RecommendTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.a, cls.b, cls.c, cls.d = (
+            Restaurant.objects.create(name=name) for name in ("A", "B", "C", "D")
+        )
+        # A 를 좋아하는 사람은 B 도 좋아하고 C 는 싫어한다. D 는 한 명만 평가.
+        for number in range(4):
+            author = f"user{number}"
+            for restaurant, rating in ((cls.a, 5), (cls.b, 5), (cls.c, 1)):
+                Review.objects.create(
+                    restaurant=restaurant,
+                    title="-",
+                    author=author,
+                    content="-",
+                    rating=rating,
+                )
+        Review.objects.create(
+            restaurant=cls.d, title="-", author="user0", content="-", rating=5
+        )
+
+    def build(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        stats = recommend.build(root=directory.name, **options)
+        return stats, recommend.load(directory.name)
+
+    def neighbors(self, arrays, restaurant_id):
+        position = np.searchsorted(arrays["restaurant_ids"], restaurant_id)
+        begin, end = arrays["indptr"][position : position + 2]
+        return arrays["neighbors"][begin:end].tolist()
+
+    def test_liked_together_are_neighbors(self):
+        stats, arrays = self.build(chunk_size=2)
+        self.assertEqual(stats["ratings"], 13)
+        self.assertEqual(stats["users"], 4)
+        self.assertEqual(
+            arrays["restaurant_ids"].tolist(),
+            sorted(r.pk for r in (self.a, self.b, self.c, self.d)),
+        )
+        self.assertEqual(self.neighbors(arrays, self.a.pk), [self.b.pk])
+        self.assertEqual(self.neighbors(arrays, self.b.pk), [self.a.pk])
+        # 싫어한 쪽과는 음의 유사도, 한 명만 겹치는 D 는 min_support 미만
+        self.assertEqual(self.neighbors(arrays, self.c.pk), [])
+        self.assertEqual(self.neighbors(arrays, self.d.pk), [])
+
+    def test_chunking_does_not_change_result(self):
+        rows = [
+            (f"user{user}", item, (user * 7 + item * 3) % 5 + 1)
+            for user in range(30)
+            for item in range(1, 40)
+            if (user + item) % 3
+        ]
+        whole = recommend.top_k_neighbors(
+            recommend.rating_matrix(rows)[0], k=5, chunk_size=1000
+        )
+        chunked = recommend.top_k_neighbors(
+            recommend.rating_matrix(rows)[0], k=5, chunk_size=7
+        )
+        for left, right in zip(whole, chunked):
+            np.testing.assert_allclose(left, right, rtol=1e-5)
+
+    def test_publish_keeps_recent_versions(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        first = recommend.build(root=directory.name)["path"]
+        arrays = recommend.load(directory.name)
+        self.assertIsInstance(arrays["neighbors"], np.memmap)
+        # 같은 초에 연달아 발행해도 버전 이름이 겹치지 않는다
+        published = [
+            recommend.build(root=directory.name, k=1)["path"]
+            for _ in range(recommend.KEEP_VERSIONS)
+        ]
+        latest = published[-1]
+        self.assertEqual(len({path.name for path in published}), len(published))
+        self.assertFalse(first.exists())
+        self.assertEqual((latest.parent / "CURRENT").read_text(), latest.name)
+        # 지워진 버전을 mmap 한 쪽은 계속 읽을 수 있다
+        self.assertEqual(len(arrays["neighbors"]), 2)
@@ -0,0 +1,107 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from restaurant import regions
+from restaurant.models import Region, Restaurant
+from restaurant.tests.base import TestCase
+
+
+class RegionResolverTest(SimpleTestCase):
+    def setUp(self):
+        self.resolver = regions.RegionResolver(
+            [
+                (1, "서울특별시", "강남구", "역삼동"),
+                (2, "서울", "강남구", "삼성동"),
+                (3, "서울", "중구", "명동"),
+                (4, "부산광역시", "중구", "남포동"),
+                (5, "경기도", "성남시 분당구", "정자동"),
+                (6, "세종특별자치시", "", "보람동"),
+            ]
+        )
+
+    def test_aliases(self):
+        self.assertEqual(self.resolver.resolve("서울 강남구 역삼동 123-4"), 1)
+        self.assertEqual(self.resolver.resolve("서울특별시 강남구 삼성동 1"), 2)
+        self.assertEqual(self.resolver.resolve("부산 중구 남포동 2가"), 4)
+
+    def test_road_address_with_dong_in_parentheses(self):
+        self.assertEqual(
+            self.resolver.resolve("서울 강남구 테헤란로 123 (역삼동, 강남빌딩)"), 1
+        )
+        self.assertEqual(self.resolver.resolve("세종시 한누리대로 2130(보람동)"), 6)
+        self.assertIsNone(self.resolver.resolve("서울 강남구 테헤란로 123"))
+
+    def test_administrative_dong_and_multi_token_sigungu(self):
+        self.assertEqual(self.resolver.resolve("서울 강남구 역삼1동 10"), 1)
+        self.assertEqual(self.resolver.resolve("경기 성남시 분당구 정자동 5"), 5)
+
+    def test_missing_sido(self):
+        self.assertEqual(self.resolver.resolve("강남구 삼성동 1"), 2)
+        self.assertIsNone(self.resolver.resolve("중구 명동 1"))  # 서울/부산 모두 중구
+
+    def test_region_ids(self):
+        self.assertEqual(self.resolver.region_ids("서울특별시"), {1, 2, 3})
+        self.assertEqual(self.resolver.region_ids("서울", "강남구"), {1, 2})
+        self.assertEqual(self.resolver.region_ids("경기", "성남시"), {5})
+        self.assertEqual(self.resolver.region_ids("서울", "강남구", "역삼1동"), {1})
+        self.assertEqual(self.resolver.region_ids("제주"), set())
+
+
+class RestaurantRegionTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        regions.reset_resolver()
+        self.addCleanup(regions.reset_resolver)
+
+        self.yeoksam = Region.objects.create(
+            sido="서울", sigungu="강남구", eupmyeondong="역삼동"
+        )
+        self.seogyo = Region.objects.create(
+            sido="서울", sigungu="마포구", eupmyeondong="서교동"
+        )
+
+    def test_save_resolves_region(self):
+        restaurant = Restaurant.objects.create(
+            name="김밥천국", address="서울특별시 강남구 역삼동 123"
+        )
+        self.assertEqual(restaurant.region, self.yeoksam)
+
+        restaurant.address = "서울 마포구 양화로 45 (서교동)"
+        restaurant.save(update_fields=["address"])
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.region, self.seogyo)
+
+        # 해석할 수 없는 주소는 지정한 지역을 지우지 않음
+        restaurant.address = "어딘가"
+        restaurant.save()
+        self.assertEqual(restaurant.region, self.seogyo)
+
+        self.assertEqual(
+            list(Restaurant.objects.in_region("서울특별시", "마포구")), [restaurant]
+        )
+        self.assertEqual(list(Restaurant.objects.in_region("서울", "강남구")), [])
+
+    def test_backfill_command(self):
+        restaurant = Restaurant.objects.create(
+            name="돈까스", address="서울 강남구 역삼동 1"
+        )
+        missing = Restaurant.objects.create(name="분식", address="주소 없음")
+        Restaurant.objects.update(region=None)
+
+        out = StringIO()
+        call_command("backfill_regions", "--dry-run", stdout=out)
+        self.assertIn("1 would change, 1 unresolved", out.getvalue())
+        self.assertFalse(Restaurant.objects.filter(region__isnull=False).exists())
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("backfill_regions", stdout=out)
+        self.assertIn("checked 2 restaurants", out.getvalue())
+        self.assertIn("unresolved: 주소 없음", out.getvalue())
+        restaurant.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertEqual(restaurant.region, self.yeoksam)
+        self.assertIsNone(missing.region)
+        self.assertEqual(restaurant.card.region_name, "서울 강남구 역삼동")
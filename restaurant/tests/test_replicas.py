@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from restaurant import replicas
+from restaurant.models import Restaurant
+
+
+@override_settings(DATABASE_REPLICAS=["replica1", "replica2"])
+class ReplicaRouterTest(TestCase):
+    # SQLite 대역은 복제되지 않으므로, 어느 DB를 읽었는지는 각 DB에 넣은 행으로 구분한다
+    databases = {"default", "replica1", "replica2"}
+
+    def setUp(self):
+        replicas.reset()
+        self.addCleanup(replicas.reset)
+        for alias in ("replica1", "replica2"):
+            Restaurant.objects.using(alias).bulk_create(
+                [Restaurant(name="복제본 김밥")]
+            )
+        Restaurant.objects.using("default").bulk_create(
+            [Restaurant(name="primary 김밥")]
+        )
+        replicas.reset_stats()
+
+    def names(self):
+        return list(Restaurant.objects.values_list("name", flat=True))
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.names(), ["복제본 김밥"])
+        queries = replicas.stats()
+        self.assertEqual(queries.get("default", 0), 0)
+        self.assertEqual(sum(queries.get(a, 0) for a in ("replica1", "replica2")), 1)
+
+    def test_other_apps_read_primary(self):
+        User.objects.using("default").create(username="admin")
+        self.assertTrue(User.objects.filter(username="admin").exists())
+
+    def test_reads_pinned_to_primary_after_write(self):
+        Restaurant.objects.create(name="새 김밥")
+        self.assertEqual(self.names(), ["primary 김밥", "새 김밥"])
+
+    def test_unhealthy_replica_falls_back(self):
+        def lag(alias):
+            if alias == "replica1":
+                raise ConnectionError
+            return 60
+
+        with mock.patch.object(replicas, "replica_lag", lag):
+            self.assertEqual(replicas.health(), {"replica1": False, "replica2": False})
+            self.assertEqual(self.names(), ["primary 김밥"])
+
+        replicas.reset_stats()
+        with mock.patch.object(replicas, "replica_lag", lambda alias: 0):
+            self.assertEqual(self.names(), ["복제본 김밥"])
+
+    def test_middleware_pins_after_write(self):
+        factory = RequestFactory()
+
+        def write(request):
+            Restaurant.objects.create(name="새 김밥")
+            return HttpResponse()
+
+        def read(request):
+            return HttpResponse(",".join(self.names()))
+
+        response = replicas.PinPrimaryMiddleware(write)(factory.post("/"))
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+
+        response = replicas.PinPrimaryMiddleware(read)(factory.get("/"))
+        self.assertEqual(response.content.decode(), "복제본 김밥")
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+        request = factory.get("/")
+        request.COOKIES[replicas.PIN_COOKIE] = "1"
+        response = replicas.PinPrimaryMiddleware(read)(request)
+        self.assertEqual(response.content.decode(), "primary 김밥,새 김밥")
@@ -0,0 +1,158 @@
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from restaurant import search
+from restaurant.models import Article, Restaurant, RestaurantMenu, Tag
+
+
+class TokenizeTest(SimpleTestCase):
+    def test_hangul_bigrams(self):
+        self.assertEqual(list(search.tokenize("김밥천국")), ["김밥", "밥천", "천국"])
+
+    def test_latin_words(self):
+        self.assertEqual(list(search.tokenize("BHC 치킨!")), ["bhc", "치킨"])
+
+
+class SearchIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = search.SearchIndex()
+        self.index.add(1, [("김밥천국", 3), ("24시간 분식", 1)])
+        self.index.add(2, [("돈까스하우스", 3), ("수제 돈까스", 1)])
+        self.index.add(3, [("분식나라", 3), ("김밥 떡볶이", 1)])
+
+    def test_ranking(self):
+        ranked = [pk for pk, _ in self.index.search("김밥")]
+        self.assertEqual(ranked, [1, 3])
+        self.assertEqual([pk for pk, _ in self.index.search("돈까스")], [2])
+
+    def test_remove(self):
+        self.index.remove(1)
+        self.assertEqual([pk for pk, _ in self.index.search("김밥")], [3])
+        self.assertNotIn("천국", self.index.postings)
+        self.assertNotIn("국", self.index.syllables)
+
+    def test_single_syllable_query(self):
+        # "밥" 은 "김밥", "밥천" 같은 2-gram 으로 색인된 문서에서도 찾는다
+        self.assertCountEqual([pk for pk, _ in self.index.search("밥")], [1, 3])
+        self.assertEqual([pk for pk, _ in self.index.search("국")], [1])
+        self.index.add(4, [("밥", 3)])  # 한 글자 단어로 색인된 문서
+        self.assertIn(4, [pk for pk, _ in self.index.search("밥")])
+
+    def test_snapshot_without_syllables(self):
+        state = dict(self.index.__dict__)
+        del state["syllables"]
+        restored = search.SearchIndex.__new__(search.SearchIndex)
+        restored.__setstate__(state)
+        self.assertEqual([pk for pk, _ in restored.search("국")], [1])
+
+
+class SearchEngineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(
+            name="김밥천국", branch_name="강남점", address="서울 강남구 테헤란로 123"
+        )
+        cls.tag = Tag.objects.create(name="가성비")
+        cls.article = Article.objects.create(
+            title="강남 분식 지도", content="떡볶이 맛집 모음", is_published=True
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(SEARCH_INDEX_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.directory = directory.name
+        search.get_engine().rebuild()  # 배포 때 manage.py rebuild_search_index 가 하는 일
+
+    def ranked(self, query, kind=search.RESTAURANT):
+        return [pk for pk, _ in search.search(query)[kind]]
+
+    def test_signals_keep_index_current(self):
+        self.assertEqual(self.ranked("김밥"), [self.restaurant.pk])
+        self.assertEqual(self.ranked("가성비"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.tags.add(self.tag)
+            RestaurantMenu.objects.create(restaurant=self.restaurant, name="참치김밥")
+        self.assertEqual(self.ranked("가성비"), [self.restaurant.pk])
+        self.assertEqual(self.ranked("참치"), [self.restaurant.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = "혼밥"
+            self.tag.save()
+        self.assertEqual(self.ranked("가성비"), [])
+        self.assertEqual(self.ranked("혼밥"), [self.restaurant.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.delete()
+        self.assertEqual(self.ranked("김밥"), [])
+
+    def test_missing_snapshot_is_empty_without_rebuilding(self):
+        engine = search.SearchEngine(self.directory + "/empty")
+        with self.assertNumQueries(0), self.assertLogs("restaurant.search", "WARNING"):
+            self.assertEqual(engine.search("김밥")[search.RESTAURANT], [])
+            engine.search("김밥")  # 경고는 한 번만
+        call_command("rebuild_search_index", stdout=StringIO())
+        other = search.SearchEngine(self.directory)
+        self.assertEqual(
+            [pk for pk, _ in other.search("김밥")[search.RESTAURANT]],
+            [self.restaurant.pk],
+        )
+
+    def test_unpublished_articles_are_not_indexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            draft = Article.objects.create(
+                title="강남 분식 초안", content="떡볶이", is_published=False
+            )
+        self.assertEqual(self.ranked("분식", search.ARTICLE), [self.article.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.is_published = False
+            self.article.save()
+            draft.is_published = True
+            draft.save()
+        self.assertEqual(self.ranked("분식", search.ARTICLE), [draft.pk])
+
+    def test_other_process_follows_journal(self):
+        search.get_engine().rebuild()
+        other = search.SearchEngine(self.directory)
+        self.assertEqual(
+            [pk for pk, _ in other.search("떡볶이")[search.ARTICLE]],
+            [self.article.pk],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Restaurant.objects.create(name="떡볶이공장", address="서울 마포구")
+        self.assertEqual(len(other.search("떡볶이")[search.RESTAURANT]), 1)
+
+        search.get_engine().rebuild()  # 저널 교체 후에도 스냅샷을 다시 읽어 따라옴
+        self.assertEqual(len(other.search("떡볶이")[search.RESTAURANT]), 1)
+
+    def test_changes_recorded_while_snapshot_is_written_survive_rebuild(self):
+        engine = search.get_engine()
+        write_snapshot = engine._write_snapshot
+
+        def slow_snapshot():
+            write_snapshot()
+            # 스냅샷을 쓰는 동안 다른 프로세스가 커밋하고 저널에 남겼다
+            late = Restaurant.objects.create(name="늦게온집", address="서울 중구")
+            search.SearchEngine(self.directory).record(search.RESTAURANT, [late.pk])
+
+        with mock.patch.object(engine, "_write_snapshot", slow_snapshot):
+            engine.rebuild()
+        other = search.SearchEngine(self.directory)
+        self.assertEqual(len(other.search("늦게온집")[search.RESTAURANT]), 1)
+        self.assertEqual(len(engine.search("늦게온집")[search.RESTAURANT]), 1)
+
+    def test_search_view(self):
+        response = self.client.get("/search/", {"q": "강남"}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["restaurants"][0]["name"], "김밥천국")
+        self.assertEqual(data["articles"][0]["title"], "강남 분식 지도")
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from restaurant import storage
+
+
+class CachedStorageTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.storage = self.make_storage()
+        storage.reset_stats()
+
+    def make_storage(self, **options):
+        # FileSystemStorage 가 S3 대역. 멀티파트는 LocalMultipart 로 간다.
+        options = {
+            "options": {"location": self.root / "bucket"},
+            "cache_dir": self.root / "cache",
+            "cache_max_bytes": 10_000,
+            "chunk_size": 100,
+            "max_concurrency": 3,
+            **options,
+        }
+        return storage.CachedStorage(**options)
+
+    def test_multipart_upload_is_concurrent_and_bounded(self):
+        data = os.urandom(1050)
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+        upload_part = storage.LocalMultipart.upload_part
+
+        def slow_part(multipart, upload, number, chunk):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            try:
+                return upload_part(multipart, upload, number, chunk)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        with mock.patch.object(storage.LocalMultipart, "upload_part", slow_part):
+            name = self.storage.save("review/big.bin", ContentFile(data))
+        self.assertEqual(name, "review/big.bin")
+        self.assertEqual((self.root / "bucket" / name).read_bytes(), data)
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(storage.stats()["parts"], 11)
+        self.assertEqual(list((self.root / "bucket" / ".multipart").iterdir()), [])
+
+        # 올린 파일은 캐시에도 들어가 있어서 바로 다시 읽어도 받지 않는다
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(storage.stats()["cache_hits"], 1)
+
+    def test_failed_part_aborts_upload(self):
+        with mock.patch.object(
+            storage.LocalMultipart, "upload_part", side_effect=OSError("network")
+        ):
+            with self.assertRaises(OSError):
+                self.storage.save("review/big.bin", ContentFile(b"x" * 500))
+        self.assertFalse(self.storage.exists("review/big.bin"))
+        self.assertEqual(list((self.root / "bucket" / ".multipart").iterdir()), [])
+        with self.assertRaises(FileNotFoundError):
+            self.storage.open("review/big.bin")
+
+    def test_read_through_cache(self):
+        backend = self.storage.backend
+        backend.save("a.png", ContentFile(b"a" * 50))
+        with mock.patch.object(backend, "open", wraps=backend.open) as fetch:
+            for _ in range(3):
+                with self.storage.open("a.png") as f:
+                    self.assertEqual(f.read(), b"a" * 50)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(storage.stats(), {"cache_misses": 1, "cache_hits": 2})
+
+        self.storage.delete("a.png")
+        with self.assertRaises(FileNotFoundError):
+            self.storage.open("a.png")
+
+    def test_eviction_drops_least_recently_read(self):
+        cached = self.make_storage(cache_max_bytes=1000)
+        for name in ("a", "b", "c"):
+            cached.backend.save(name, ContentFile(name.encode() * 400))
+        cached.open("a").close()
+        cached.open("b").close()
+        # a 를 다시 읽어서 b 가 가장 오래된 것이 된다
+        old = time.time() - 60
+        os.utime(cached.cache.path("b"), (old, old))
+        cached.open("a").close()
+        cached.open("c").close()
+        self.assertTrue(cached.cache.path("a").exists())
+        self.assertFalse(cached.cache.path("b").exists())
+        self.assertTrue(cached.cache.path("c").exists())
+        self.assertLessEqual(cached.cache.total(), 1000)
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from restaurant import geo, warmup
+from restaurant.management.commands import import_report
+
+
+class WarmupTest(TestCase):
+    def test_runs_every_step(self):
+        with self.assertLogs("restaurant.warmup", "INFO"):
+            timings = warmup.warmup()
+        self.assertEqual(list(timings), ["urls", "templates", "indexes"])
+        self.assertTrue(all(ms is not None for ms in timings.values()))
+
+    def test_failed_step_does_not_stop_startup(self):
+        with mock.patch.object(geo, "get_index", side_effect=RuntimeError("db down")):
+            with self.assertLogs("restaurant.warmup", "WARNING"):
+                timings = warmup.warmup()
+        self.assertIsNone(timings["indexes"])
+        self.assertIsNotNone(timings["templates"])
+
+    def test_parse_importtime(self):
+        rows = import_report.parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     numpy._utils\n"
+            "import time:       300 |        420 |   numpy\n"
+            "import time:        50 |        470 | recommend\n"
+        )
+        self.assertEqual(rows[1], (1, "numpy", 300, 420))
+        self.assertEqual(rows[2][0], 0)
+        self.assertEqual(
+            import_report.by_package(rows), [("numpy", 420), ("recommend", 50)]
+        )
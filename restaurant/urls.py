@@ -1,9 +1,42 @@
 from django.urls import path
 
-from .views import index
+from . import api
+from .views import cache_stats, db_stats, index, restaurant_cards, search
 
 app_name = "restaurant"
 
 urlpatterns = [
     path("", index, name="index"),
+    path("search/", search, name="search"),
+    path("restaurants/cards/", restaurant_cards, name="restaurant-cards"),
+    path("cache/stats/", cache_stats, name="cache-stats"),
+    path("db/stats/", db_stats, name="db-stats"),
+    path("api/restaurants/", api.RestaurantList.as_view(), name="api-restaurants"),
+    path(
+        "api/restaurants/budget/",
+        api.BudgetSearch.as_view(),
+        name="api-restaurant-budget",
+    ),
+    path(
+        "api/restaurants/facets/",
+        api.FacetSearch.as_view(),
+        name="api-restaurant-facets",
+    ),
+    path(
+        "api/restaurants/<int:pk>/",
+        api.RestaurantDetail.as_view(),
+        name="api-restaurant",
+    ),
+    path(
+        "api/restaurants/<int:pk>/menus/",
+        api.RestaurantMenuList.as_view(),
+        name="api-restaurant-menus",
+    ),
+    path(
+        "api/restaurants/<int:pk>/reviews/",
+        api.ReviewList.as_view(),
+        name="api-restaurant-reviews",
+    ),
+    path("api/leaderboards/", api.Leaderboard.as_view(), name="api-leaderboards"),
+    path("api/reviews/batch/", api.ReviewBatch.as_view(), name="api-review-batch"),
 ]
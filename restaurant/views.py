@@ -1,5 +1,158 @@
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from . import fragments, replicas
+from . import search as search_index
+from .models import Article, Restaurant, RestaurantCard
+
+INDEX_ARTICLE_COUNT = 6
+INDEX_RESTAURANT_COUNT = 8
+
+
+def render_index_articles():
+    articles = Article.objects.filter(show_at_index=True, is_published=True).order_by(
+        "-created_at"
+    )[:INDEX_ARTICLE_COUNT]
+    return render_to_string("index_articles.html", {"articles": articles})
+
+
+def render_index_restaurants():
+    restaurants = RestaurantCard.objects.filter(is_closed=False).order_by(
+        "-rating", "-restaurant_id"
+    )[:INDEX_RESTAURANT_COUNT]
+    return render_to_string("index_restaurants.html", {"restaurants": restaurants})
 
 
 def index(request):
-    return render(request, "index.html")
+    # 조각마다 따로 캐시. 캐시가 살아 있으면 DB 쿼리 없이 응답한다.
+    articles, articles_status = fragments.index_articles.get_or_render(
+        render_index_articles
+    )
+    restaurants, restaurants_status = fragments.index_restaurants.get_or_render(
+        render_index_restaurants
+    )
+    response = render(
+        request,
+        "index.html",
+        {
+            "articles_html": mark_safe(articles),
+            "restaurants_html": mark_safe(restaurants),
+        },
+    )
+    response["X-Cache"] = (
+        f"articles={articles_status}, restaurants={restaurants_status}"
+    )
+    return response
+
+
+@staff_member_required
+def cache_stats(request):
+    # 이 워커 프로세스의 조각 캐시 hit/miss/stale 횟수
+    return JsonResponse(fragments.stats())
+
+
+@staff_member_required
+def db_stats(request):
+    # 이 워커 프로세스에서 DB 별로 실행된 쿼리 수와 복제본 상태
+    return JsonResponse({"queries": replicas.stats(), "replicas": replicas.health()})
+
+
+def search(request):
+    # GET /search/?q=김밥&limit=20 → 점수순 레스토랑/칼럼 목록
+    query = request.GET.get("q", "").strip()
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+
+    results = {search_index.RESTAURANT: [], search_index.ARTICLE: []}
+    if query:
+        results = search_index.search(query, limit)
+
+    restaurants = Restaurant.objects.in_bulk(
+        [pk for pk, _ in results[search_index.RESTAURANT]]
+    )
+    articles = Article.objects.filter(is_published=True).in_bulk(
+        [pk for pk, _ in results[search_index.ARTICLE]]
+    )
+    return JsonResponse(
+        {
+            "query": query,
+            "restaurants": [
+                {
+                    "id": pk,
+                    "name": restaurants[pk].name,
+                    "branch_name": restaurants[pk].branch_name,
+                    "address": restaurants[pk].address,
+                    "score": round(score, 4),
+                }
+                for pk, score in results[search_index.RESTAURANT]
+                if pk in restaurants
+            ],
+            "articles": [
+                {"id": pk, "title": articles[pk].title, "score": round(score, 4)}
+                for pk, score in results[search_index.ARTICLE]
+                if pk in articles
+            ],
+        }
+    )
+
+
+CARD_VALUES = [
+    "restaurant_id",
+    "name",
+    "branch_name",
+    "address",
+    "category_name",
+    "cuisine_type_name",
+    "region_name",
+    "tag_names",
+    "image_url",
+    "thumbnail_url",
+    "rating",
+    "rating_count",
+]
+
+
+def restaurant_cards(request):
+    # GET /restaurants/cards/?category=1&region=2&limit=20&cursor=4.50:123
+    # RestaurantCard 한 테이블만 인덱스 순서대로 읽는다 (쿼리 1번, 평점순 키셋 페이지네이션).
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+
+    cards = RestaurantCard.objects.filter(is_closed=False)
+    for param in ("category", "region"):
+        value = request.GET.get(param)
+        if value and value.isdigit():
+            cards = cards.filter(**{f"{param}_id": int(value)})
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        try:
+            rating, _, last_id = cursor.partition(":")
+            rating, last_id = Decimal(rating), int(last_id)
+        except (InvalidOperation, ValueError):
+            return JsonResponse({"detail": "잘못된 cursor 입니다."}, status=400)
+        cards = cards.filter(
+            Q(rating__lt=rating) | Q(rating=rating, restaurant_id__lt=last_id)
+        )
+
+    rows = list(
+        cards.order_by("-rating", "-restaurant_id").values(*CARD_VALUES)[: limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1]['rating']}:{rows[-1]['restaurant_id']}"
+    for row in rows:
+        row["id"] = row.pop("restaurant_id")
+        row["rating"] = str(row["rating"])
+    return JsonResponse({"results": rows, "next_cursor": next_cursor})
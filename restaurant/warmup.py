@@ -0,0 +1,58 @@
+import logging
+import time
+
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+from . import geo, regions, search
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES = ["index.html", "index_articles.html", "index_restaurants.html"]
+
+
+def _urls():
+    # URLconf 를 읽으면 views/api/admin/rest_framework 가 모두 import 된다
+    get_resolver().url_patterns
+
+
+def _templates():
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def _indexes():
+    # 첫 요청이 떠안던 프로세스 단위 색인들
+    regions.get_resolver()
+    geo.get_index()
+    search.search("warmup", limit=1)
+
+
+STEPS = [("urls", _urls), ("templates", _templates), ("indexes", _indexes)]
+
+
+def warmup():
+    # 워커가 요청을 받기 전에 첫 요청이 치르던 비용(import, 템플릿 컴파일, 색인 적재)을 미리 치른다.
+    # 단계가 실패해도(예: DB 가 아직 안 뜸) 기동은 막지 않고 첫 요청이 다시 시도하게 둔다.
+    # 반환값: {단계: ms}. 실패한 단계는 None.
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.warning("warmup step %s failed", name, exc_info=True)
+            timings[name] = None
+            continue
+        timings[name] = (time.perf_counter() - started) * 1000
+    # 여기서 연 DB 연결은 요청 처리 스레드가 아닐 수 있으므로 닫아 둔다
+    connections.close_all()
+    logger.info(
+        "warmup %s",
+        ", ".join(
+            f"{name} {'failed' if ms is None else f'{ms:.0f}ms'}"
+            for name, ms in timings.items()
+        ),
+    )
+    return timings